@@ -1,29 +1,83 @@
 """
 API Key Management
 Handles API key generation, validation, and storage
+
+Validation is served from memory: keys are held only as SHA-256 digests, in
+a dict from digest to metadata, so no plaintext key is kept. ``last_used``
+updates are coalesced and written behind by a background flusher (every
+``flush_interval`` seconds and at shutdown), and changes made by other
+processes (e.g. revocations) are picked up by polling the store's version at
+most every ``reload_interval`` seconds.
+
+Stores:
+    FileAPIKeyStore   api_keys.json, atomic rename + advisory lock (default)
+    RedisAPIKeyStore  shared hash for multi-node deployments
 """
 
+import atexit
 import hashlib
 import json
+import logging
+import os
 import secrets
 import stat
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 
 from src.utils.datetime_utils import utc_now
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
-class APIKeyManager:
-    """Manage API keys for authentication"""
+logger = logging.getLogger(__name__)
 
-    def __init__(self, storage_path: str = "api_keys.json"):
-        self.storage_path = Path(storage_path)
-        self.keys: dict[str, dict] = self._load_keys()
 
-    def _load_keys(self) -> dict[str, dict]:
+def _newer(a: str | None, b: str | None) -> str | None:
+    """Latest of two ISO-8601 UTC timestamps (None-safe)."""
+    if a is None or b is None:
+        return a or b
+    return max(a, b)
+
+
+class APIKeyStore(ABC):
+    """Persistence backend for APIKeyManager."""
+
+    @abstractmethod
+    def load(self) -> dict[str, dict]: ...
+
+    @abstractmethod
+    def version(self) -> Hashable:
+        """Token that changes whenever another writer modifies the store."""
+
+    @abstractmethod
+    def put(self, key_hash: str, data: dict) -> None:
+        """Write one key's metadata through immediately (generate/revoke)."""
+
+    @abstractmethod
+    def flush_last_used(self, updates: dict[str, str]) -> None:
+        """Persist coalesced last_used timestamps (never moving one backwards)."""
+
+
+class FileAPIKeyStore(APIKeyStore):
+    """JSON file store; writes go to a temp file and are renamed into place under a lock."""
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+
+    def load(self) -> dict[str, dict]:
         """Load API keys from storage - handle empty files gracefully"""
-        if self.storage_path.exists():
+        if self.path.exists():
             try:
-                with open(self.storage_path) as f:
+                with open(self.path) as f:
                     content = f.read().strip()
                     if content:
                         return json.loads(content)
@@ -31,11 +85,152 @@ class APIKeyManager:
                 pass  # Return empty dict on error
         return {}
 
-    def _save_keys(self):
-        """Save API keys to storage with restricted file permissions"""
-        with open(self.storage_path, "w") as f:
-            json.dump(self.keys, f, indent=2)
-        self.storage_path.chmod(stat.S_IRUSR | stat.S_IWUSR)
+    def version(self) -> Hashable:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, keys: dict[str, dict]) -> None:
+        """Save API keys with restricted file permissions via atomic rename"""
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IRUSR | stat.S_IWUSR)
+        with os.fdopen(fd, "w") as f:
+            json.dump(keys, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def put(self, key_hash: str, data: dict) -> None:
+        with self._locked():
+            keys = self.load()
+            keys[key_hash] = data
+            self._write(keys)
+
+    def flush_last_used(self, updates: dict[str, str]) -> None:
+        with self._locked():
+            keys = self.load()
+            for key_hash, last_used in updates.items():
+                if key_hash in keys:
+                    keys[key_hash]["last_used"] = _newer(keys[key_hash].get("last_used"), last_used)
+            self._write(keys)
+
+
+class RedisAPIKeyStore(APIKeyStore):
+    """
+    Redis store for multi-node deployments (sync redis client).
+
+    Key metadata lives in the hash ``{prefix}``, last_used timestamps in
+    ``{prefix}:last_used`` (so flushes never rewrite metadata) and
+    ``{prefix}:version`` is bumped on every metadata change.
+    """
+
+    def __init__(self, client: Any, prefix: str = "echoes:api_keys"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "echoes:api_keys") -> "RedisAPIKeyStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix)
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def load(self) -> dict[str, dict]:
+        keys = {self._text(k): json.loads(v) for k, v in self.client.hgetall(self.prefix).items()}
+        for k, v in self.client.hgetall(f"{self.prefix}:last_used").items():
+            k = self._text(k)
+            if k in keys:
+                keys[k]["last_used"] = _newer(keys[k].get("last_used"), self._text(v))
+        return keys
+
+    def version(self) -> Hashable:
+        return self.client.get(f"{self.prefix}:version")
+
+    def put(self, key_hash: str, data: dict) -> None:
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix, key_hash, json.dumps(data))
+        pipe.incr(f"{self.prefix}:version")
+        pipe.execute()
+
+    def flush_last_used(self, updates: dict[str, str]) -> None:
+        if updates:
+            self.client.hset(f"{self.prefix}:last_used", mapping=updates)
+
+
+_managers: "weakref.WeakSet[APIKeyManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_managers() -> None:
+    for manager in list(_managers):
+        manager.close()
+
+
+class APIKeyManager:
+    """Manage API keys for authentication"""
+
+    def __init__(
+        self,
+        storage_path: str = "api_keys.json",
+        *,
+        store: APIKeyStore | None = None,
+        flush_interval: float = 5.0,
+        reload_interval: float = 1.0,
+    ):
+        self.storage_path = Path(storage_path)
+        self.store = store or FileAPIKeyStore(self.storage_path)
+        self.flush_interval = flush_interval
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._pending_last_used: dict[str, str] = {}
+        self._stop = threading.Event()
+        self._flusher: threading.Thread | None = None
+        self.keys: dict[str, dict] = self._load_keys()
+        _managers.add(self)
+
+    def _load_keys(self) -> dict[str, dict]:
+        """Load API keys from the store, remembering its version for change detection"""
+        self._store_version = self.store.version()
+        self._next_reload_check = time.monotonic() + self.reload_interval
+        keys = self.store.load()
+        for key_hash, last_used in self._pending_last_used.items():
+            if key_hash in keys:
+                keys[key_hash]["last_used"] = _newer(keys[key_hash].get("last_used"), last_used)
+        return keys
+
+    def _maybe_reload(self) -> None:
+        """Pick up changes from other processes (e.g. revocations), polled at most every reload_interval"""
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + self.reload_interval
+        if self.store.version() != self._store_version:
+            with self._lock:
+                self.keys = self._load_keys()
+
+    def _save_key(self, key_hash: str) -> None:
+        """Write one key through to the store and adopt the resulting version"""
+        with self._lock:
+            self.store.put(key_hash, self.keys[key_hash])
+            self.keys = self._load_keys()
 
     def _hash_key(self, key: str) -> str:
         """Hash an API key for secure storage"""
@@ -58,21 +253,21 @@ class APIKeyManager:
         key_hash = self._hash_key(api_key)
 
         # Store key metadata
-        self.keys[key_hash] = {
-            "name": name,
-            "role": role,
-            "platforms": platforms or ["echoes", "turbo", "glimpse"],
-            "created_at": utc_now().isoformat(),
-            "last_used": None,
-            "active": True,
-        }
-
-        self._save_keys()
+        with self._lock:
+            self.keys[key_hash] = {
+                "name": name,
+                "role": role,
+                "platforms": platforms or ["echoes", "turbo", "glimpse"],
+                "created_at": utc_now().isoformat(),
+                "last_used": None,
+                "active": True,
+            }
+            self._save_key(key_hash)
         return api_key
 
     def validate_key(self, api_key: str) -> dict | None:
         """
-        Validate an API key
+        Validate an API key (in memory; last_used is persisted by the write-behind flusher)
 
         Args:
             api_key: API key to validate
@@ -80,19 +275,19 @@ class APIKeyManager:
         Returns:
             Key metadata if valid, None otherwise
         """
+        self._maybe_reload()
         key_hash = self._hash_key(api_key)
+        key_data = self.keys.get(key_hash)
 
-        if key_hash not in self.keys:
-            return None
-
-        key_data = self.keys[key_hash]
-
-        if not key_data.get("active", True):
+        if key_data is None or not key_data.get("active", True):
             return None
 
         # Update last used timestamp
-        key_data["last_used"] = utc_now().isoformat()
-        self._save_keys()
+        now = utc_now().isoformat()
+        with self._lock:
+            key_data["last_used"] = now
+            self._pending_last_used[key_hash] = now
+        self._ensure_flusher()
 
         return key_data
 
@@ -108,10 +303,12 @@ class APIKeyManager:
         """
         key_hash = self._hash_key(api_key)
 
-        if key_hash in self.keys:
-            self.keys[key_hash]["active"] = False
-            self._save_keys()
-            return True
+        with self._lock:
+            self._maybe_reload()
+            if key_hash in self.keys:
+                self.keys[key_hash]["active"] = False
+                self._save_key(key_hash)
+                return True
 
         return False
 
@@ -133,3 +330,48 @@ class APIKeyManager:
             }
             for data in self.keys.values()
         ]
+
+    def flush(self) -> int:
+        """Persist coalesced last_used updates now; returns how many keys were written"""
+        with self._lock:
+            updates, self._pending_last_used = self._pending_last_used, {}
+            if not updates:
+                return 0
+            try:
+                self.store.flush_last_used(updates)
+            except Exception:
+                for key_hash, last_used in updates.items():
+                    self._pending_last_used[key_hash] = _newer(self._pending_last_used.get(key_hash), last_used)
+                raise
+            # Re-read so changes other writers made meanwhile are adopted with the new version
+            self.keys = self._load_keys()
+        return len(updates)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is None:
+                # A fresh stop event per flusher: after close(), the next validation starts a working one
+                self._stop = threading.Event()
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, args=(self._stop,), name="api-key-flusher", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Retried on the next interval; pending updates are kept
+                logger.exception("Failed to flush API key last_used updates")
+
+    def close(self) -> None:
+        """Stop the write-behind flusher and flush pending last_used updates (later validations restart it)"""
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+            self._stop.set()
+        if flusher is not None:
+            flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
@@ -1,22 +1,39 @@
 """
 JWT Token Handler
 Manages JWT token generation, validation, and refresh
+
+verify_token keeps a bounded cache of verified tokens (keyed by SHA-256
+digest) holding the decoded claims until the token's ``exp``, so clients
+that reuse one access token skip the decode + HMAC check on every request.
+Revoked tokens (revoke_token or a denylist hook) are evicted immediately.
 """
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import timedelta
 from typing import Any
 
 import jwt
 from jwt.exceptions import InvalidTokenError
 
+from api.metrics import record_jwt_cache, record_jwt_revoked
 from src.utils.datetime_utils import utc_now
 
 
 class JWTHandler:
     """Handle JWT token operations"""
 
-    def __init__(self, secret_key: str | None = None, algorithm: str = "HS256"):
+    def __init__(
+        self,
+        secret_key: str | None = None,
+        algorithm: str = "HS256",
+        verify_cache_size: int | None = None,
+        denylist_hook: Callable[[dict[str, Any]], bool] | None = None,
+    ):
         self.secret_key = secret_key or os.getenv("JWT_SECRET_KEY")
         if not self.secret_key:
             raise ValueError(
@@ -27,6 +44,15 @@ class JWTHandler:
         self.access_token_expire_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
         self.refresh_token_expire_days = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+        # Verified-token cache: digest -> (claims, exp); 0 disables it
+        if verify_cache_size is None:
+            verify_cache_size = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))
+        self.verify_cache_size = verify_cache_size
+        self.denylist_hook = denylist_hook
+        self._verified: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._revoked: dict[bytes, float] = {}
+        self._cache_lock = threading.Lock()
+
     def create_access_token(self, data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
         """
         Create a JWT access token
@@ -79,14 +105,78 @@ class JWTHandler:
             Decoded token payload
 
         Raises:
-            InvalidTokenError: If token is invalid or expired
+            InvalidTokenError: If token is invalid, expired or revoked
         """
+        digest = hashlib.sha256(token.encode()).digest()
+        if self._revoked and digest in self._revoked:
+            record_jwt_revoked()
+            raise InvalidTokenError("Token validation failed: token has been revoked")
+
+        if self.verify_cache_size > 0:
+            with self._cache_lock:
+                entry = self._verified.get(digest)
+                if entry is not None:
+                    if entry[1] > time.time():
+                        self._verified.move_to_end(digest)
+                    else:
+                        del self._verified[digest]
+                        entry = None
+            if entry is not None:
+                record_jwt_cache(hit=True)
+                return self._check_denylist(digest, dict(entry[0]))
+            record_jwt_cache(hit=False)
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
         except InvalidTokenError as e:
             raise InvalidTokenError(f"Token validation failed: {str(e)}") from e
 
+        payload = self._check_denylist(digest, payload)
+        exp = payload.get("exp")
+        if self.verify_cache_size > 0 and isinstance(exp, int | float):
+            with self._cache_lock:
+                self._verified[digest] = (dict(payload), float(exp))
+                while len(self._verified) > self.verify_cache_size:
+                    self._verified.popitem(last=False)
+        return payload
+
+    def _check_denylist(self, digest: bytes, payload: dict[str, Any]) -> dict[str, Any]:
+        if self.denylist_hook is not None and self.denylist_hook(payload):
+            self._evict(digest)
+            record_jwt_revoked()
+            raise InvalidTokenError("Token validation failed: token has been revoked")
+        return payload
+
+    def _evict(self, digest: bytes) -> None:
+        with self._cache_lock:
+            self._verified.pop(digest, None)
+
+    def revoke_token(self, token: str, expires_at: float | None = None) -> None:
+        """
+        Revoke a token: evict it from the verification cache and reject it until it expires
+
+        Args:
+            token: JWT token string
+            expires_at: Unix time the denylist entry can be dropped (defaults to the token's exp)
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        if expires_at is None:
+            try:
+                claims = jwt.decode(token, options={"verify_signature": False})
+                expires_at = float(claims.get("exp", time.time() + 86400 * self.refresh_token_expire_days))
+            except InvalidTokenError:
+                expires_at = time.time() + 86400 * self.refresh_token_expire_days
+        now = time.time()
+        with self._cache_lock:
+            self._verified.pop(digest, None)
+            self._revoked = {d: exp for d, exp in self._revoked.items() if exp > now}
+            self._revoked[digest] = expires_at
+
+    def clear_verify_cache(self) -> None:
+        """Drop all cached verifications (e.g. after rotating the secret key)"""
+        with self._cache_lock:
+            self._verified.clear()
+
     def refresh_access_token(self, refresh_token: str) -> str:
         """
         Generate a new access token from a refresh token
@@ -134,6 +224,11 @@ def verify_token(token: str) -> dict[str, Any]:
     return _jwt_handler.verify_token(token)
 
 
+def revoke_token(token: str) -> None:
+    """Revoke a token (convenience function)"""
+    _jwt_handler.revoke_token(token)
+
+
 def refresh_access_token(refresh_token: str) -> str:
     """Refresh an access token (convenience function)"""
     return _jwt_handler.refresh_access_token(refresh_token)
@@ -0,0 +1,142 @@
+"""
+Batch processing helpers for the REST API.
+
+Runs one async handler over many request items with a bounded pool of
+worker tasks and yields each item's outcome as soon as it completes, so
+batch endpoints can answer with one JSON document or stream NDJSON lines.
+Failures are isolated per item: a bad item yields an error entry and the
+rest of the batch carries on.
+
+Streaming endpoints also accept an NDJSON request body, decoded line by
+line as it arrives (read_ndjson). Processing starts once the body has been
+read: while a StreamingResponse is open, Starlette consumes the request's
+receive channel to watch for disconnects, so the body cannot be read
+concurrently with the streamed output.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Sequence
+from typing import Any
+
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class BatchTooLarge(ValueError):
+    """A batch has more items than the configured maximum."""
+
+    def __init__(self, max_items: int):
+        super().__init__(f"Batch exceeds {max_items} items")
+        self.max_items = max_items
+
+
+def _error_entry(index: int, exc: Exception) -> dict[str, Any]:
+    if isinstance(exc, ValidationError):
+        return {
+            "index": index,
+            "ok": False,
+            "error": "Invalid item",
+            "details": json.loads(exc.json(include_url=False)),
+        }
+    if isinstance(exc, json.JSONDecodeError):
+        return {"index": index, "ok": False, "error": "Invalid JSON", "details": str(exc)}
+    logger.error(f"Batch item {index} failed: {exc}", exc_info=exc)
+    return {"index": index, "ok": False, "error": "Processing failed"}
+
+
+async def iter_batch(
+    items: Sequence[Any],
+    handler: Callable[[Any], Awaitable[Any]],
+    concurrency: int = 8,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Process items concurrently, yielding results in completion order.
+
+    Each yielded entry is ``{"index": i, "ok": True, "result": ...}`` or
+    ``{"index": i, "ok": False, "error": ...}``. At most ``concurrency``
+    items are in flight; closing the iterator early (e.g. the client went
+    away mid-stream) cancels the remaining work.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    pending = iter(enumerate(items))
+
+    async def worker() -> None:
+        try:
+            for index, item in pending:
+                try:
+                    if isinstance(item, json.JSONDecodeError):
+                        raise item  # undecodable NDJSON line (see read_ndjson)
+                    entry = {"index": index, "ok": True, "result": await handler(item)}
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    entry = _error_entry(index, e)
+                await results.put(entry)
+        finally:
+            results.put_nowait(_DONE)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(items))))]
+    try:
+        running = len(workers)
+        while running:
+            entry = await results.get()
+            if entry is _DONE:
+                running -= 1
+            else:
+                yield entry
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def run_batch(
+    items: Sequence[Any],
+    handler: Callable[[Any], Awaitable[Any]],
+    concurrency: int = 8,
+) -> dict[str, Any]:
+    """Process a whole batch and return its results in input order with success/failure counts."""
+    entries = [entry async for entry in iter_batch(items, handler, concurrency)]
+    entries.sort(key=lambda entry: entry["index"])
+    succeeded = sum(entry["ok"] for entry in entries)
+    return {"results": entries, "succeeded": succeeded, "failed": len(entries) - succeeded}
+
+
+async def read_ndjson(chunks: AsyncIterable[bytes], max_items: int | None = None) -> list[Any]:
+    """
+    Decode a newline-delimited JSON body line by line as its chunks arrive.
+
+    Blank lines are skipped. A line that is not valid JSON becomes its
+    JSONDecodeError, which iter_batch reports as that item's error entry.
+    Raises BatchTooLarge as soon as the body has more than max_items lines.
+    """
+    items: list[Any] = []
+    tail = b""
+
+    def add(line: bytes) -> None:
+        if not line.strip():
+            return
+        if max_items is not None and len(items) >= max_items:
+            raise BatchTooLarge(max_items)
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(e)
+
+    async for chunk in chunks:
+        *lines, tail = (tail + chunk).split(b"\n")
+        for line in lines:
+            add(line)
+    add(tail)
+    return items
+
+
+async def ndjson_lines(entries: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode entries as newline-delimited JSON."""
+    async for entry in entries:
+        yield (json.dumps(entry, separators=(",", ":"), default=str) + "\n").encode()
@@ -71,11 +71,24 @@ class APIConfig(BaseSettings):
 
     # Performance
     max_concurrent_requests: int = Field(default=100, env="MAX_CONCURRENT_REQUESTS")
-    request_timeout: int = Field(default=30, env="REQUEST_TIMEOUT")  # seconds
+    request_timeout: int = Field(default=30, env="REQUEST_TIMEOUT")  # seconds to first byte
+    stream_idle_timeout: int = Field(default=30, env="STREAM_IDLE_TIMEOUT")  # seconds between streamed chunks
+    max_batch_size: int = Field(default=1000, env="MAX_BATCH_SIZE")  # items per batch request
+    batch_concurrency: int = Field(default=8, env="BATCH_CONCURRENCY")  # items processed at once per batch
+
+    # CPU executor (process pool for large analysis inputs)
+    cpu_workers: int = Field(default=2, env="CPU_WORKERS")  # 0 runs everything on the event loop
+    cpu_offload_threshold: int = Field(default=32_768, env="CPU_OFFLOAD_THRESHOLD")  # input chars
+    cpu_max_pending: int = Field(default=32, env="CPU_MAX_PENDING")  # offloaded jobs in flight before 503
+    loop_lag_interval: float = Field(default=0.5, env="LOOP_LAG_INTERVAL")  # seconds between lag samples
 
     # WebSocket
     websocket_ping_interval: int = Field(default=20, env="WEBSOCKET_PING_INTERVAL")
     websocket_ping_timeout: int = Field(default=20, env="WEBSOCKET_PING_TIMEOUT")
+    websocket_send_queue_size: int = Field(default=256, env="WEBSOCKET_SEND_QUEUE_SIZE")  # messages per client
+    websocket_overflow_policy: str = Field(
+        default="drop_oldest", env="WEBSOCKET_OVERFLOW_POLICY"
+    )  # drop_oldest, drop_newest, close
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -85,6 +98,7 @@ class PatternDetectionConfig(BaseSettings):
 
     min_confidence: float = Field(default=0.6, env="PATTERN_MIN_CONFIDENCE")
     max_patterns: int = Field(default=10, env="PATTERN_MAX_PATTERNS")
+    max_stream_chars: int = Field(default=1_000_000, env="PATTERN_MAX_STREAM_CHARS")  # per /ws/stream pattern stream
     enable_semantic_analysis: bool = Field(default=True, env="PATTERN_SEMANTIC_ENABLED")
     enable_statistical_analysis: bool = Field(default=True, env="PATTERN_STATISTICAL_ENABLED")
 
@@ -97,7 +111,10 @@ class SelfRAGConfig(BaseSettings):
     min_evidence_threshold: float = Field(default=0.7, env="RAG_MIN_EVIDENCE_THRESHOLD")
     contradiction_threshold: float = Field(default=0.8, env="RAG_CONTRADICTION_THRESHOLD")
     uncertainty_threshold: float = Field(default=0.4, env="RAG_UNCERTAINTY_THRESHOLD")
-    max_evidence_chunks: int = Field(default=10, env="RAG_MAX_EVIDENCE_CHUNKS")
+    max_evidence_chunks: int = Field(default=0, env="RAG_MAX_EVIDENCE_CHUNKS")  # cap on provided evidence; 0: none
+    retrieval_top_k: int = Field(default=5, env="RAG_RETRIEVAL_TOP_K")  # knowledge-base chunks per claim
+    index_dir: str | None = Field(default=None, env="RAG_INDEX_DIR")  # saved FAISSRetriever index
+    verification_cache_size: int = Field(default=1024, env="RAG_VERIFICATION_CACHE_SIZE")  # cached verdicts
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
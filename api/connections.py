@@ -0,0 +1,188 @@
+"""
+WebSocket connection management for real-time streaming.
+
+Every connection gets a bounded send queue drained by its own writer task,
+so a broadcast only enqueues and never waits on a slow peer. Broadcast
+payloads are serialized once and shared by all connections. When a client
+falls behind far enough to fill its queue, the overflow policy decides what
+happens to a broadcast:
+
+    drop_oldest  discard the oldest queued message to make room (default)
+    drop_newest  discard the message being enqueued
+    close        disconnect the client (close code 1013, try again later)
+
+Replies to a client's own requests (send_personal_message) are never dropped:
+they wait for room in the queue, which in turn pauses that client's receive
+loop. close() sends everything already queued before closing the socket.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from typing import Any
+
+from fastapi import WebSocket
+
+from api.logging_structured import get_logger
+from api.metrics import record_ws_dropped, track_connection_manager
+
+logger = get_logger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "close")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+def serialize_message(message: Any) -> str:
+    """Encode a message exactly as ``WebSocket.send_json`` would."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Connection:
+    __slots__ = ("websocket", "queue", "writer", "dropped", "closing")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=queue_size)
+        self.writer: asyncio.Task | None = None
+        self.dropped = 0
+        self.closing = False
+
+
+class ConnectionManager:
+    """WebSocket connection manager for real-time streaming"""
+
+    def __init__(self, queue_size: int = 256, overflow_policy: str = "drop_oldest"):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}")
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.active_connections: dict[WebSocket, _Connection] = {}
+        track_connection_manager(self)
+
+    async def connect(self, websocket: WebSocket):
+        """Accept and register a new WebSocket connection"""
+        await websocket.accept()
+        connection = _Connection(websocket, self.queue_size)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self.active_connections[websocket] = connection
+        logger.info("websocket_connected", total=len(self.active_connections))
+
+    def disconnect(self, websocket: WebSocket):
+        """Remove a WebSocket connection and stop its writer"""
+        connection = self.active_connections.pop(websocket, None)
+        if connection is None:
+            return
+        connection.closing = True
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        # Nothing will be written any more; emptying the queue releases senders waiting for room
+        while not connection.queue.empty():
+            connection.queue.get_nowait()
+        logger.info("websocket_disconnected", remaining=len(self.active_connections))
+
+    async def _writer(self, connection: _Connection) -> None:
+        websocket = connection.websocket
+        queue = connection.queue
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                await websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send message to client: {e}")
+        self.disconnect(websocket)
+
+    def _enqueue(self, connection: _Connection, text: str) -> bool:
+        if connection.closing:
+            return False
+        queue = connection.queue
+        try:
+            queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        connection.dropped += 1
+        record_ws_dropped(self.overflow_policy)
+        if self.overflow_policy == "drop_oldest":
+            queue.get_nowait()
+            queue.put_nowait(text)
+            return True
+        if self.overflow_policy == "close":
+            logger.warning("websocket_slow_client_closed", queued=queue.qsize())
+            self.disconnect(connection.websocket)
+            asyncio.get_running_loop().create_task(
+                self._close(connection.websocket, SLOW_CLIENT_CLOSE_CODE, "Client too slow")
+            )
+        return False
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int, reason: str) -> None:
+        with contextlib.suppress(Exception):
+            await websocket.close(code=code, reason=reason)
+
+    async def broadcast(self, message: dict) -> int:
+        """
+        Broadcast a message to all connected clients.
+
+        The message is serialized once and queued for every connection without
+        waiting for any of them; returns how many connections it was queued for.
+        """
+        text = serialize_message(message)
+        enqueue = self._enqueue
+        # Iterate over a snapshot: the close policy may remove connections as we go
+        return sum(enqueue(connection, text) for connection in list(self.active_connections.values()))
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        """
+        Send a message to a specific client, queued behind earlier messages to it.
+
+        Unlike broadcasts, replies are not subject to the overflow policy: with a
+        full queue this waits until the writer makes room.
+        """
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            try:
+                await websocket.send_json(message)
+            except Exception as e:
+                logger.error(f"Failed to send personal message: {e}")
+            return
+        if not connection.closing:
+            await connection.queue.put(serialize_message(message))
+
+    async def close(self, websocket: WebSocket, code: int = 1000, reason: str = "", drain_timeout: float = 5.0):
+        """Close one connection once its writer has sent what was queued (up to drain_timeout seconds)."""
+        connection = self.active_connections.get(websocket)
+        if connection is not None and not connection.closing and connection.writer is not None:
+            writer = connection.writer
+
+            async def drain() -> None:
+                await connection.queue.put(None)
+                await asyncio.wait([writer])
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(drain(), timeout=drain_timeout)
+        self.disconnect(websocket)
+        await self._close(websocket, code, reason)
+
+    def queue_depths(self) -> list[int]:
+        """Messages waiting to be written, per connection."""
+        return [connection.queue.qsize() for connection in self.active_connections.values()]
+
+    async def close_all(self, drain_timeout: float = 5.0) -> None:
+        """Let writers drain their queues (up to drain_timeout seconds), then close every connection."""
+        connections = list(self.active_connections.values())
+        for connection in connections:
+            with contextlib.suppress(asyncio.QueueFull):
+                connection.queue.put_nowait(None)
+        writers = [c.writer for c in connections if c.writer is not None]
+        if writers:
+            await asyncio.wait(writers, timeout=drain_timeout)
+        for connection in connections:
+            self.disconnect(connection.websocket)
+            await self._close(connection.websocket, 1001, "Server shutting down")
@@ -0,0 +1,202 @@
+"""
+CPU-work executor for the API handlers.
+
+Pattern detection and truth verification are regex- and loop-heavy pure
+Python. Run inline on the event loop, one large request stalls every other
+connection, heartbeats included. Inputs at or above a size threshold are
+shipped to a ProcessPoolExecutor instead. Its workers fork from a forkserver
+that has already imported the detectors, and each worker builds its detector
+and verifier once in the pool initializer. Small inputs stay inline, where a
+round trip to another process would cost more than the work itself.
+
+The number of offloaded jobs in flight is capped. Past the cap, submissions
+raise ExecutorOverloaded, which the API turns into a 503. A LoopLagMonitor
+measures how late the event loop wakes up and exports that on /metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from api.logging_structured import get_logger
+from api.metrics import record_cpu_task, record_loop_lag, track_cpu_executor
+
+logger = get_logger(__name__)
+
+# Imported by the forkserver once, so forked workers start with them loaded
+PRELOAD_MODULES = ["api.pattern_detection", "api.self_rag"]
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when the CPU executor already has its maximum number of jobs in flight."""
+
+
+# --- Worker side --------------------------------------------------------------
+
+
+def _warm_worker() -> None:
+    """Pool initializer: build the shared detector and verifier once per worker."""
+    from api import self_rag
+    from api.pattern_detection import pattern_detector_instance
+
+    pattern_detector_instance()
+    if self_rag.verifier is None:
+        self_rag.verifier = self_rag.create_verifier()
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def detect_patterns_job(
+    text: str, context: dict[str, Any] | None = None, options: dict[str, Any] | None = None
+) -> list[dict[str, Any]]:
+    """Run api.pattern_detection.detect_patterns inside a worker process."""
+    from api.pattern_detection import detect_patterns
+
+    return asyncio.run(detect_patterns(text, context, options))
+
+
+def verify_truth_job(
+    claim: str, evidence: list[str] | None = None, context: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Run api.self_rag.verify_truth inside a worker process."""
+    from api.self_rag import verify_truth
+
+    return asyncio.run(verify_truth(claim, evidence, context))
+
+
+# --- Event loop side ----------------------------------------------------------
+
+
+class CPUExecutor:
+    """
+    Process pool for CPU-bound handler work with size-based routing and a pending-job cap.
+
+    ``max_workers=0`` disables the pool; every job then runs inline.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        offload_threshold: int = 32_768,
+        max_pending: int = 32,
+        start_method: str | None = None,
+    ):
+        self.max_workers = max_workers
+        self.offload_threshold = offload_threshold
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self.pending = 0
+        self._pool: ProcessPoolExecutor | None = None
+        track_cpu_executor(self)
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        method = self.start_method
+        if method is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            context.set_forkserver_preload(PRELOAD_MODULES)
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context, initializer=_warm_worker)
+
+    async def start(self) -> None:
+        """Create the pool and wait until every worker has run its initializer."""
+        if self.max_workers <= 0 or self._pool is not None:
+            return
+        self._pool = self._create_pool()
+        workers = await self._warm(self._pool)
+        logger.info("cpu_executor_started", workers=workers, offload_threshold=self.offload_threshold)
+
+    async def _warm(self, pool: ProcessPoolExecutor) -> int:
+        """Start every worker of ``pool`` now rather than on the first real request; returns their count."""
+        loop = asyncio.get_running_loop()
+        # One job per worker makes the pool start all of them
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _worker_ready) for _ in range(self.max_workers)))
+        return len(set(pids))
+
+    async def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    def should_offload(self, size: int) -> bool:
+        return self._pool is not None and size >= self.offload_threshold
+
+    async def run(self, job: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable job in the pool; raises ExecutorOverloaded when the pending cap is reached."""
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError("CPU executor is not running")
+        if self.pending >= self.max_pending:
+            record_cpu_task("rejected")
+            raise ExecutorOverloaded(f"{self.pending} CPU jobs already pending")
+        self.pending += 1
+        record_cpu_task("offloaded")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, job, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM, signal); replace the pool so later requests recover. Every job
+            # in flight on the broken pool fails together: only the first one swaps it out, and
+            # a pool swapped since (or shut down) is left alone.
+            if self._pool is pool:
+                logger.error("cpu_executor_pool_broken_restarting")
+                replacement = self._pool = self._create_pool()
+                pool.shutdown(wait=False, cancel_futures=True)
+                with contextlib.suppress(BrokenProcessPool, RuntimeError):
+                    await self._warm(replacement)
+            raise
+        finally:
+            self.pending -= 1
+
+    async def submit(
+        self,
+        size: int,
+        job: Callable[..., Any],
+        inline: Callable[..., Awaitable[Any]],
+        *args: Any,
+    ) -> Any:
+        """Run ``job`` in the pool when ``size`` crosses the threshold, else await ``inline`` on the loop."""
+        if self.should_offload(size):
+            return await self.run(job, *args)
+        record_cpu_task("inline")
+        return await inline(*args)
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how much later than requested a short sleep wakes up."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - started - self.interval)
+            record_loop_lag(self.last_lag)
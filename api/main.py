@@ -12,36 +12,43 @@ Key Features:
 - Rate limiting and authentication
 """
 
+import asyncio
 import json
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any
 
 import uvicorn
-from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from pydantic import BaseModel, Field
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
+from pydantic import BaseModel, Field, ValidationError
+
+# Register API Prometheus collectors so /metrics exports them from startup
+import api.metrics  # noqa: F401
+
+# Batch request processing
+from api.batch import BatchTooLarge, iter_batch, ndjson_lines, read_ndjson, run_batch
 
 # Import configuration
 from api.config import get_config, setup_logging
+from api.connections import ConnectionManager
 from api.dependencies import get_breakers
+from api.executor import CPUExecutor, ExecutorOverloaded, LoopLagMonitor, detect_patterns_job, verify_truth_job
 
 # Configure structured logging
 from api.logging_structured import ensure_configured, get_logger
 
 # Import middleware
-from api.middleware import setup_middleware
+from api.middleware import RequestBodyLimitMiddleware, SecurityHeadersMiddleware, setup_middleware
 
 # Import existing engines - REMOVED: RAG middleware eliminated for authentic responses
 # from src.rag_orbit.retrieval import RetrievalEngine
 # from src.rag_orbit.embeddings import EmbeddingEngine
 # from src.rag_orbit.chunking import ChunkingEngine
 # Import pattern detection
-from api.pattern_detection import detect_patterns
+from api.pattern_detection import StreamingPatternDetector, StreamTooLong, detect_patterns, pattern_detector_instance
 from api.self_rag import verify_truth
 from app.resilience.circuit_breakers import ExternalServiceBreakers, initialize_breakers
 from app.resilience.rate_limit import setup_rate_limiting
@@ -55,42 +62,20 @@ logger = get_logger(__name__)
 # chunking_engine = None
 
 
-class ConnectionManager:
-    """WebSocket connection manager for real-time streaming"""
-
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        """Accept and register a new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info("websocket_connected", total=len(self.active_connections))
-
-    def disconnect(self, websocket: WebSocket):
-        """Remove a WebSocket connection"""
-        self.active_connections.remove(websocket)
-        logger.info("websocket_disconnected", remaining=len(self.active_connections))
-
-    async def broadcast(self, message: dict):
-        """Broadcast a message to all connected clients"""
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send message to client: {e}")
-                self.disconnect(connection)
-
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific client"""
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(f"Failed to send personal message: {e}")
-
-
 # Global connection manager
-manager = ConnectionManager()
+_api_config = get_config().api
+manager = ConnectionManager(
+    queue_size=_api_config.websocket_send_queue_size,
+    overflow_policy=_api_config.websocket_overflow_policy,
+)
+
+# Process pool for large analysis inputs, and event-loop lag sampling for /metrics
+cpu_executor = CPUExecutor(
+    max_workers=_api_config.cpu_workers,
+    offload_threshold=_api_config.cpu_offload_threshold,
+    max_pending=_api_config.cpu_max_pending,
+)
+loop_lag_monitor = LoopLagMonitor(interval=_api_config.loop_lag_interval)
 
 
 # Pydantic models for API requests/responses
@@ -124,6 +109,10 @@ class TruthVerificationRequest(BaseModel):
     context: dict[str, Any] | None = Field(None, description="Verification context")
 
 
+class BatchRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(..., description="Request items, each validated and processed on its own")
+
+
 class TruthVerificationResponse(BaseModel):
     verdict: str = Field(..., description="TRUE/FALSE/UNCERTAIN")
     confidence: float = Field(..., description="Confidence score 0-1")
@@ -154,12 +143,21 @@ async def lifespan(app: FastAPI):
 
     await initialize_breakers(redis_client)
 
+    # Workers warm up in the background; jobs submitted meanwhile queue in the pool
+    executor_warmup = asyncio.create_task(cpu_executor.start())
+    loop_lag_monitor.start()
+
     logger.info("Echoes API starting - Direct AI responses (no RAG middleware)")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Echoes API...")
+    await manager.close_all()
+    await loop_lag_monitor.stop()
+    executor_warmup.cancel()
+    await asyncio.gather(executor_warmup, return_exceptions=True)
+    await cpu_executor.shutdown()
     if redis_client:
         await redis_client.aclose()
 
@@ -186,32 +184,11 @@ app.add_middleware(
 setup_rate_limiting(app)
 
 
-class RequestBodyLimitMiddleware(BaseHTTPMiddleware):
-    """Reject request bodies larger than max_bytes."""
-
-    def __init__(self, app, max_bytes: int = 1_048_576):
-        super().__init__(app)
-        self.max_bytes = max_bytes
-
-    async def dispatch(self, request: StarletteRequest, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > self.max_bytes:
-            return JSONResponse(
-                status_code=413,
-                content={"error": "Request body too large"},
-            )
-        return await call_next(request)
-
+async def _executor_overloaded_handler(request, exc: ExecutorOverloaded) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"error": "Server busy"}, headers={"Retry-After": "1"})
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add standard security headers to every response."""
 
-    async def dispatch(self, request: StarletteRequest, call_next):
-        response: Response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        return response
+app.add_exception_handler(ExecutorOverloaded, _executor_overloaded_handler)
 
 
 app.add_middleware(RequestBodyLimitMiddleware, max_bytes=1_048_576)
@@ -253,13 +230,14 @@ async def metrics():
 async def websocket_endpoint(websocket: WebSocket):
     """Main WebSocket endpoint for real-time streaming"""
     await manager.connect(websocket)
+    pattern_stream: StreamingPatternDetector | None = None
 
     try:
         while True:
             data = await websocket.receive_text()
 
             if len(data) > 65_536:
-                await websocket.close(code=1009, reason="Message too large")
+                await manager.close(websocket, code=1009, reason="Message too large")
                 break
 
             message = json.loads(data)
@@ -274,6 +252,8 @@ async def websocket_endpoint(websocket: WebSocket):
 
             if message_type == "pattern_detection":
                 await handle_pattern_detection_websocket(message, websocket)
+            elif message_type == "pattern_stream":
+                pattern_stream = await handle_pattern_stream_websocket(message, websocket, pattern_stream)
             elif message_type == "truth_verification":
                 await handle_truth_verification_websocket(message, websocket)
             else:
@@ -286,12 +266,27 @@ async def websocket_endpoint(websocket: WebSocket):
                 )
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
         manager.disconnect(websocket)
 
 
+# Large inputs run in the CPU executor so they do not stall the event loop
+async def _run_detect_patterns(request: PatternDetectionRequest) -> list[dict[str, Any]]:
+    return await cpu_executor.submit(
+        len(request.text), detect_patterns_job, detect_patterns, request.text, request.context, request.options
+    )
+
+
+async def _run_verify_truth(request: TruthVerificationRequest) -> dict[str, Any]:
+    size = len(request.claim) + sum(len(text) for text in request.evidence or [])
+    return await cpu_executor.submit(
+        size, verify_truth_job, verify_truth, request.claim, request.evidence, request.context
+    )
+
+
 async def handle_pattern_detection_websocket(message: dict, websocket: WebSocket):
     """Handle pattern detection via WebSocket"""
     try:
@@ -308,7 +303,7 @@ async def handle_pattern_detection_websocket(message: dict, websocket: WebSocket
         )
 
         # Perform pattern detection (placeholder - integrate with actual Glimpse)
-        patterns = await detect_patterns(request.text, request.context, request.options)
+        patterns = await _run_detect_patterns(request)
 
         # Send results
         response = PatternDetectionResponse(
@@ -317,10 +312,15 @@ async def handle_pattern_detection_websocket(message: dict, websocket: WebSocket
         )
 
         await manager.send_personal_message(
-            {"type": "pattern_detection_result", "data": response.model_dump()},
+            {"type": "pattern_detection_result", "data": response.model_dump(mode="json")},
             websocket,
         )
 
+    except ExecutorOverloaded:
+        await manager.send_personal_message(
+            {"type": "error", "operation": "pattern_detection", "message": "Server busy, retry later"},
+            websocket,
+        )
     except Exception as e:
         logger.error(f"Pattern detection failed: {e}", exc_info=True)
         await manager.send_personal_message(
@@ -333,6 +333,80 @@ async def handle_pattern_detection_websocket(message: dict, websocket: WebSocket
         )
 
 
+async def handle_pattern_stream_websocket(
+    message: dict, websocket: WebSocket, stream: StreamingPatternDetector | None
+) -> StreamingPatternDetector | None:
+    """
+    Handle one chunk of streamed pattern detection via WebSocket
+
+    Message data: {"text": chunk, "options": {...} (first chunk), "final": bool}.
+    Patterns are pushed as "pattern_events" as soon as they are settled; the
+    final chunk also gets a "pattern_stream_result" with the ranked patterns
+    for the whole stream. Returns the detector state for the next chunk.
+
+    Errors are reported as an "error" frame. An invalid chunk is rejected and
+    the stream kept; otherwise the frame carries "stream_reset": true and the
+    next chunk starts a new stream.
+    """
+    try:
+        data = message.get("data", {})
+        text = data.get("text", "")
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+        if stream is None:
+            stream = StreamingPatternDetector(
+                pattern_detector_instance(),
+                data.get("options"),
+                max_chars=config.patterns.max_stream_chars,
+            )
+
+        offset = stream.text_length
+        events = stream.feed(text, final=bool(data.get("final")))
+        if events:
+            await manager.send_personal_message(
+                {
+                    "type": "pattern_events",
+                    "data": {"offset": offset, "patterns": [p.to_dict() for p in events]},
+                },
+                websocket,
+            )
+
+        if not data.get("final"):
+            return stream
+
+        result = await stream.finish()
+        response = PatternDetectionResponse(
+            patterns=[p.to_dict() for p in result.patterns],
+            confidence=result.confidence,
+        )
+        await manager.send_personal_message(
+            {
+                "type": "pattern_stream_result",
+                "data": {**response.model_dump(mode="json"), "text_length": result.text_length},
+            },
+            websocket,
+        )
+        return None
+
+    except StreamTooLong as e:
+        await _send_pattern_stream_error(websocket, str(e), stream_reset=True)
+        return None
+    except ValueError as e:
+        await _send_pattern_stream_error(websocket, f"Invalid chunk: {e}", stream_reset=False)
+        return stream
+    except Exception as e:
+        logger.error(f"Streaming pattern detection failed: {e}", exc_info=True)
+        await _send_pattern_stream_error(websocket, "Streaming pattern detection failed", stream_reset=True)
+        return None
+
+
+async def _send_pattern_stream_error(websocket: WebSocket, message: str, stream_reset: bool) -> None:
+    await manager.send_personal_message(
+        {"type": "error", "operation": "pattern_stream", "message": message, "stream_reset": stream_reset},
+        websocket,
+    )
+
+
 async def handle_truth_verification_websocket(message: dict, websocket: WebSocket):
     """Handle truth verification via WebSocket"""
     try:
@@ -349,7 +423,7 @@ async def handle_truth_verification_websocket(message: dict, websocket: WebSocke
         )
 
         # Perform truth verification (placeholder - integrate with SELF-RAG)
-        verdict = await verify_truth(request.claim, request.evidence, request.context)
+        verdict = await _run_verify_truth(request)
 
         # Send results
         response = TruthVerificationResponse(
@@ -360,10 +434,15 @@ async def handle_truth_verification_websocket(message: dict, websocket: WebSocke
         )
 
         await manager.send_personal_message(
-            {"type": "truth_verification_result", "data": response.model_dump()},
+            {"type": "truth_verification_result", "data": response.model_dump(mode="json")},
             websocket,
         )
 
+    except ExecutorOverloaded:
+        await manager.send_personal_message(
+            {"type": "error", "operation": "truth_verification", "message": "Server busy, retry later"},
+            websocket,
+        )
     except Exception as e:
         logger.error(f"Truth verification failed: {e}", exc_info=True)
         await manager.send_personal_message(
@@ -380,7 +459,7 @@ async def handle_truth_verification_websocket(message: dict, websocket: WebSocke
 @app.post("/api/patterns/detect", response_model=PatternDetectionResponse)
 async def detect_patterns_rest(request: PatternDetectionRequest):
     """REST endpoint for pattern detection"""
-    patterns = await detect_patterns(request.text, request.context, request.options)
+    patterns = await _run_detect_patterns(request)
     return PatternDetectionResponse(patterns=patterns, confidence=0.85)
 
 
@@ -406,7 +485,7 @@ async def detect_patterns_rest(request: PatternDetectionRequest):
 @app.post("/api/truth/verify", response_model=TruthVerificationResponse)
 async def verify_truth_rest(request: TruthVerificationRequest):
     """REST endpoint for truth verification"""
-    verdict = await verify_truth(request.claim, request.evidence, request.context)
+    verdict = await _run_verify_truth(request)
     return TruthVerificationResponse(
         verdict=verdict.get("verdict", "UNCERTAIN"),
         confidence=verdict.get("confidence", 0.5),
@@ -415,6 +494,86 @@ async def verify_truth_rest(request: TruthVerificationRequest):
     )
 
 
+# Batch endpoints: many items per request, processed by a bounded worker pool
+async def _detect_patterns_item(item: dict[str, Any]) -> dict[str, Any]:
+    request = PatternDetectionRequest.model_validate(item)
+    response = await detect_patterns_rest(request)
+    return response.model_dump(mode="json")
+
+
+async def _verify_truth_item(item: dict[str, Any]) -> dict[str, Any]:
+    request = TruthVerificationRequest.model_validate(item)
+    response = await verify_truth_rest(request)
+    return response.model_dump(mode="json")
+
+
+def _batch_too_large(max_batch_size: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={"error": "Batch too large", "max_batch_size": max_batch_size},
+    )
+
+
+async def _batch_response(batch: BatchRequest, handler):
+    max_batch_size = get_config().api.max_batch_size
+    if len(batch.items) > max_batch_size:
+        return _batch_too_large(max_batch_size)
+    return await run_batch(batch.items, handler, get_config().api.batch_concurrency)
+
+
+async def _stream_response(request: Request, handler):
+    """
+    Stream one NDJSON line per item, in completion order.
+
+    The body is either {"items": [...]} or, with Content-Type
+    application/x-ndjson, one item per line. NDJSON bodies are decoded line
+    by line as they arrive, but processing starts only once the whole body
+    has been read; only the output is streamed (see api.batch).
+    """
+    max_batch_size = get_config().api.max_batch_size
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/x-ndjson":
+        try:
+            items = await read_ndjson(request.stream(), max_batch_size)
+        except BatchTooLarge:
+            return _batch_too_large(max_batch_size)
+    else:
+        try:
+            items = BatchRequest.model_validate_json(await request.body()).items
+        except ValidationError as e:
+            return JSONResponse(status_code=422, content={"detail": json.loads(e.json(include_url=False))})
+        if len(items) > max_batch_size:
+            return _batch_too_large(max_batch_size)
+    return StreamingResponse(
+        ndjson_lines(iter_batch(items, handler, get_config().api.batch_concurrency)),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/api/patterns/detect/batch")
+async def detect_patterns_batch(batch: BatchRequest):
+    """Batch pattern detection; results in input order with per-item errors"""
+    return await _batch_response(batch, _detect_patterns_item)
+
+
+@app.post("/api/patterns/detect/stream")
+async def detect_patterns_stream(request: Request):
+    """Batch pattern detection streamed back as NDJSON as each item completes (JSON or NDJSON body)"""
+    return await _stream_response(request, _detect_patterns_item)
+
+
+@app.post("/api/truth/verify/batch")
+async def verify_truth_batch(batch: BatchRequest):
+    """Batch truth verification; results in input order with per-item errors"""
+    return await _batch_response(batch, _verify_truth_item)
+
+
+@app.post("/api/truth/verify/stream")
+async def verify_truth_stream(request: Request):
+    """Batch truth verification streamed back as NDJSON as each item completes (JSON or NDJSON body)"""
+    return await _stream_response(request, _verify_truth_item)
+
+
 if __name__ == "__main__":
     # Get configuration
     config = get_config()
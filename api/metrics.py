@@ -0,0 +1,123 @@
+"""
+Prometheus metrics for the Echoes API.
+
+Collectors register on the default registry, so everything defined here is
+exported by the /metrics endpoint in api.main.
+"""
+
+import weakref
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Auth Metrics
+JWT_VERIFY_CACHE = Counter(
+    "jwt_verify_cache_total",
+    "JWT verification cache lookups",
+    ["result"],  # hit | miss
+)
+
+JWT_REVOKED = Counter(
+    "jwt_revoked_rejections_total",
+    "Tokens rejected because they were revoked or denylisted",
+)
+
+
+def record_jwt_cache(hit: bool) -> None:
+    """Record a JWT verification cache lookup."""
+    JWT_VERIFY_CACHE.labels(result="hit" if hit else "miss").inc()
+
+
+def record_jwt_revoked() -> None:
+    """Record a rejected revoked token."""
+    JWT_REVOKED.inc()
+
+
+# WebSocket Metrics
+WS_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections",
+)
+
+WS_QUEUE_DEPTH = Gauge(
+    "websocket_send_queue_depth",
+    "Messages queued for WebSocket writers, summed over connections",
+)
+
+WS_QUEUE_DEPTH_MAX = Gauge(
+    "websocket_send_queue_depth_max",
+    "Deepest per-connection WebSocket send queue",
+)
+
+WS_DROPPED = Counter(
+    "websocket_messages_dropped_total",
+    "Messages dropped or connections closed because a send queue overflowed",
+    ["policy"],  # drop_oldest | drop_newest | close
+)
+
+
+# Held weakly so tracking never keeps a manager alive; gauges aggregate over the live ones
+_connection_managers: weakref.WeakSet = weakref.WeakSet()
+
+
+def _ws_queue_depths() -> list[int]:
+    return [depth for manager in list(_connection_managers) for depth in manager.queue_depths()]
+
+
+WS_CONNECTIONS.set_function(lambda: sum(len(m.active_connections) for m in list(_connection_managers)))
+WS_QUEUE_DEPTH.set_function(lambda: sum(_ws_queue_depths()))
+WS_QUEUE_DEPTH_MAX.set_function(lambda: max(_ws_queue_depths(), default=0))
+
+
+def track_connection_manager(manager) -> None:
+    """Include a ConnectionManager's connections and queue depths in the WebSocket gauges."""
+    _connection_managers.add(manager)
+
+
+def record_ws_dropped(policy: str) -> None:
+    """Record a send-queue overflow handled by the given policy."""
+    WS_DROPPED.labels(policy=policy).inc()
+
+
+# CPU Executor Metrics
+CPU_EXECUTOR_PENDING = Gauge(
+    "cpu_executor_pending_jobs",
+    "CPU-bound jobs submitted to the process pool and not yet finished",
+)
+
+CPU_EXECUTOR_TASKS = Counter(
+    "cpu_executor_tasks_total",
+    "CPU-bound handler jobs by where they ran",
+    ["route"],  # offloaded | inline | rejected
+)
+
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Most recent event-loop lag sample",
+)
+
+EVENT_LOOP_LAG_HIST = Histogram(
+    "event_loop_lag_seconds_distribution",
+    "Event-loop lag samples",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+# Held weakly like the connection managers; the gauge sums over the live executors
+_cpu_executors: weakref.WeakSet = weakref.WeakSet()
+CPU_EXECUTOR_PENDING.set_function(lambda: sum(executor.pending for executor in list(_cpu_executors)))
+
+
+def track_cpu_executor(executor) -> None:
+    """Include a CPUExecutor's pending job count in the pending-jobs gauge at scrape time."""
+    _cpu_executors.add(executor)
+
+
+def record_cpu_task(route: str) -> None:
+    """Record where a CPU-bound job ran."""
+    CPU_EXECUTOR_TASKS.labels(route=route).inc()
+
+
+def record_loop_lag(seconds: float) -> None:
+    """Record one event-loop lag sample."""
+    EVENT_LOOP_LAG.set(seconds)
+    EVENT_LOOP_LAG_HIST.observe(seconds)
@@ -1,155 +1,324 @@
 """
 Middleware for Echoes API
 
-Provides authentication, rate limiting, and request processing middleware.
+Provides authentication, request limits, timeouts, security headers and
+request logging as pure ASGI middleware: each class wraps ``receive`` /
+``send`` directly instead of subclassing BaseHTTPMiddleware, so there is no
+extra task or response re-streaming per request, streaming responses keep
+their backpressure, and timeouts never cancel a response mid-stream while it
+is making progress.
 """
 
 import asyncio
+import contextlib
 import logging
 import time
 
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
+PUBLIC_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json"})
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+
+def _client_host(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AuthenticationMiddleware:
     """Middleware for API key authentication"""
 
-    def __init__(self, app, config):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config):
+        self.app = app
         self.config = config
 
-    async def dispatch(self, request: Request, call_next):
-        # Skip authentication for health check and docs
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip authentication for non-HTTP traffic, health check and docs
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # Check if authentication is required
         if not self.config.security.api_key_required:
             # Rate limiting handled by SlowApi
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Extract API key
-        api_key = self._extract_api_key(request)
+        api_key = self._extract_api_key(Headers(scope=scope))
         if not api_key:
-            logger.warning(f"Auth failure: missing API key from {request.client.host if request.client else 'unknown'}")
-            return JSONResponse(
+            logger.warning(f"Auth failure: missing API key from {_client_host(scope)}")
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"error": "API key required"},
             )
+            await response(scope, receive, send)
+            return
 
         # Validate API key
         if api_key not in self.config.security.allowed_api_keys:
-            logger.warning(f"Auth failure: invalid API key from {request.client.host if request.client else 'unknown'}")
-            return JSONResponse(
+            logger.warning(f"Auth failure: invalid API key from {_client_host(scope)}")
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"error": "Invalid API key"},
             )
+            await response(scope, receive, send)
+            return
 
         # Add client info to request state
-        request.state.client_id = api_key
-        request.state.api_key = api_key
+        state = scope.setdefault("state", {})
+        state["client_id"] = api_key
+        state["api_key"] = api_key
 
         # Continue with request
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
-    def _extract_api_key(self, request: Request) -> str | None:
-        """Extract API key from request"""
+    def _extract_api_key(self, headers: Headers) -> str | None:
+        """Extract API key from request headers"""
         # Try Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             return auth_header[7:]  # Remove "Bearer " prefix
 
         # Try X-API-Key header
-        api_key_header = request.headers.get("X-API-Key")
+        api_key_header = headers.get("X-API-Key")
         if api_key_header:
             return api_key_header
 
         return None
 
-    def _get_client_id(self, request: Request) -> str:
+    def _get_client_id(self, scope: Scope) -> str:
         """Get client identifier for rate limiting"""
         # Try to get from API key first
-        api_key = self._extract_api_key(request)
+        api_key = self._extract_api_key(Headers(scope=scope))
         if api_key:
             return api_key
 
         # Fall back to IP address
-        client_ip = request.client.host if request.client else "unknown"
-        return f"ip:{client_ip}"
+        return f"ip:{_client_host(scope)}"
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Middleware for request logging and monitoring"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.request_count = 0
         self.error_count = 0
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
 
         # Increment request count
         self.request_count += 1
 
         # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path} from {request.client.host if request.client else 'unknown'}"
-        )
-
-        try:
-            # Process request
-            response = await call_next(request)
-
-            # Calculate processing time
-            process_time = time.time() - start_time
+        logger.info(f"Request: {scope['method']} {scope['path']} from {_client_host(scope)}")
 
-            # Log response
-            logger.info(f"Response time: {process_time:.2f}")
-            # Check for errors
-            if response.status_code >= 400:
-                self.error_count += 1
+        status_code = 500
 
-            return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
+        try:
+            # Process request
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log error
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             self.error_count += 1
             logger.error(f"Request failed after {process_time:.2f}s: {str(e)}")
             # Re-raise exception
             raise
 
+        # Log response (after the last body chunk for streaming responses)
+        process_time = time.perf_counter() - start_time
+        logger.info(f"Response time: {process_time:.2f}")
+        # Check for errors
+        if status_code >= 400:
+            self.error_count += 1
+
+
+class TimeoutMiddleware:
+    """
+    Streaming-aware request timeouts.
 
-class TimeoutMiddleware(BaseHTTPMiddleware):
-    """Middleware for request timeout handling"""
+    timeout_seconds bounds the time to first byte (until the response starts);
+    once streaming, idle_timeout_seconds bounds the gap between body chunks.
+    A request that times out before responding gets a 408; a stalled stream
+    is cancelled and the connection closed. Time spent in ``send`` (client
+    backpressure) never counts as idle.
+    """
 
-    def __init__(self, app, timeout_seconds: int = 30):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, timeout_seconds: float = 30, idle_timeout_seconds: float | None = None):
+        self.app = app
         self.timeout_seconds = timeout_seconds
+        self.idle_timeout_seconds = timeout_seconds if idle_timeout_seconds is None else idle_timeout_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        started = False
+        sending = 0
+        last_activity = loop.time()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started, sending, last_activity
+            if message["type"] == "http.response.start":
+                started = True
+            sending += 1
+            try:
+                await send(message)
+            finally:
+                sending -= 1
+                last_activity = loop.time()
+
+        task = asyncio.ensure_future(self.app(scope, receive, send_wrapper))
+        try:
+            while True:
+                if started:
+                    deadline = last_activity + self.idle_timeout_seconds
+                else:
+                    deadline = last_activity + self.timeout_seconds
+                remaining = deadline - loop.time()
+                if remaining <= 0 and not sending:
+                    break
+                # Wake at least once per idle period so the switch from the first-byte
+                # deadline to the idle deadline is noticed while waiting
+                timeout = min(max(remaining, 0.05), self.idle_timeout_seconds)
+                done, _ = await asyncio.wait({task}, timeout=timeout)
+                if done:
+                    task.result()
+                    return
+        finally:
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+        if started:
+            logger.warning(f"Stream idle for {self.idle_timeout_seconds}s, closing: {scope['method']} {scope['path']}")
+            return
+        logger.warning(f"Request timeout after {self.timeout_seconds}s: {scope['method']} {scope['path']}")
+        response = JSONResponse(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            content={"error": "Request timeout"},
+        )
+        await response(scope, receive, send)
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class RequestBodyLimitMiddleware:
+    """
+    Reject request bodies larger than max_bytes.
+
+    Content-Length is checked up front; chunked or mislabelled bodies are
+    counted as they are received, so nothing is buffered to find out.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = 1_048_576):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(status_code=413, content={"error": "Request body too large"})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def receive_wrapper() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                # Whatever the app made of the aborted read, the client gets a 413
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._too_large()(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            # Create timeout task
-            return await asyncio.wait_for(call_next(request), timeout=self.timeout_seconds)
-        except TimeoutError:
-            logger.warning(f"Request timeout after {self.timeout_seconds}s: {request.method} {request.url.path}")
-            return JSONResponse(
-                status_code=status.HTTP_408_REQUEST_TIMEOUT,
-                content={"error": "Request timeout"},
-            )
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._too_large()(scope, receive, send)
+
+
+class SecurityHeadersMiddleware:
+    """Add standard security headers to every response."""
+
+    HEADERS = (
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    )
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.HEADERS:
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 
 def setup_middleware(app, config):
     """Setup all middleware for the FastAPI application"""
 
-    # Request timeout
-    app.add_middleware(TimeoutMiddleware, timeout_seconds=config.api.request_timeout)
+    # Request timeout (time to first byte, then idle time between streamed chunks)
+    app.add_middleware(
+        TimeoutMiddleware,
+        timeout_seconds=config.api.request_timeout,
+        idle_timeout_seconds=config.api.stream_idle_timeout,
+    )
 
     # Request logging
     app.add_middleware(RequestLoggingMiddleware)
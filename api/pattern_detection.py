@@ -3,12 +3,19 @@ Pattern Detection Glimpse for Echoes Research Platform
 
 Simplified pattern detection without RAG middleware for authentic AI responses.
 Provides basic pattern recognition without external context enrichment.
+
+StreamingPatternDetector runs the same detection incrementally over text
+that arrives in chunks (e.g. over /ws/stream): regex matches are found in a
+carry-over window so matches spanning chunk boundaries are not lost, and
+word counts and sentence-length moments are kept as rolling state.
 """
 
+import heapq
 import logging
 import re
+from collections import Counter
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 
 # REMOVED: numpy import - not needed for simplified pattern detection
@@ -107,6 +114,11 @@ class PatternDetector:
                 r"\b(interacts?|interactions?|relationships?)\b",
             ],
         }
+        self._compiled_templates = [
+            (pattern_type, regex, re.compile(regex, re.IGNORECASE))
+            for pattern_type, regexes in self.pattern_templates.items()
+            for regex in regexes
+        ]
 
     async def detect_patterns(
         self,
@@ -125,7 +137,7 @@ class PatternDetector:
         Returns:
             PatternDetectionResult with detected patterns
         """
-        start_time = datetime.utcnow()
+        start_time = datetime.now(UTC)
 
         options = options or {}
         min_confidence = options.get("min_confidence", 0.6)
@@ -159,14 +171,14 @@ class PatternDetector:
             sum([p.confidence for p in filtered_patterns]) / len(filtered_patterns) if filtered_patterns else 0.0
         )
 
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = (datetime.now(UTC) - start_time).total_seconds()
 
         return PatternDetectionResult(
             patterns=filtered_patterns,
             confidence=overall_confidence,
             processing_time=processing_time,
             text_length=len(text),
-            timestamp=datetime.utcnow(),
+            timestamp=datetime.now(UTC),
             metadata={
                 "detection_method": "simplified_rule_based",
                 "stages_used": ["rule_based", "statistical"],
@@ -174,54 +186,150 @@ class PatternDetector:
             },
         )
 
+    def _rule_pattern(self, pattern_type: str, regex: str, match_text: str, start: int, end: int) -> DetectedPattern:
+        # Calculate confidence based on match quality
+        confidence = min(0.9, len(match_text) / 20)  # Longer matches = higher confidence
+
+        return DetectedPattern(
+            pattern_type=pattern_type,
+            description=f"{pattern_type.title()} pattern detected: '{match_text}'",
+            confidence=confidence,
+            span=(start, end),
+            evidence=[f"Regex match: {regex}"],
+            metadata={
+                "regex": regex,
+                "match_text": match_text,
+                "method": "rule_based",
+            },
+        )
+
     async def _detect_rule_based_patterns(self, text: str) -> list[DetectedPattern]:
         """Rule-based pattern detection using regex patterns"""
-        patterns = []
         text_lower = text.lower()
+        return [
+            self._rule_pattern(pattern_type, regex, match.group(), match.start(), match.end())
+            for pattern_type, regex, compiled in self._compiled_templates
+            for match in compiled.finditer(text_lower)
+        ]
 
-        for pattern_type, regexes in self.pattern_templates.items():
-            for regex in regexes:
-                matches = list(re.finditer(regex, text_lower, re.IGNORECASE))
-                for match in matches:
-                    # Calculate confidence based on match quality
-                    confidence = min(0.9, len(match.group()) / 20)  # Longer matches = higher confidence
-
-                    pattern = DetectedPattern(
-                        pattern_type=pattern_type,
-                        description=f"{pattern_type.title()} pattern detected: '{match.group()}'",
-                        confidence=confidence,
-                        span=(match.start(), match.end()),
-                        evidence=[f"Regex match: {regex}"],
-                        metadata={
-                            "regex": regex,
-                            "match_text": match.group(),
-                            "method": "rule_based",
-                        },
-                    )
-                    patterns.append(pattern)
+    async def _detect_statistical_patterns(self, text: str) -> list[DetectedPattern]:
+        """Statistical pattern analysis"""
+        stats = TextStatistics()
+        stats.update(text.lower())
+        stats.finish()
+        return stats.patterns(len(text))
+
+    async def analyze_relationships(self, patterns: list[DetectedPattern]) -> list[DetectedPattern]:
+        """
+        Analyze relationships between detected patterns
+
+        Patterns are related by proximity (starts within RELATION_WINDOW chars
+        and of a different type), found with a sweep over patterns sorted by
+        span start instead of comparing all pairs; causal patterns are also
+        linked to every temporal and comparative pattern.
+        """
+        order = sorted(range(len(patterns)), key=lambda j: patterns[j].span[0])
+        starts = [patterns[j].span[0] for j in order]
+        linkable = [j for j, p in enumerate(patterns) if p.pattern_type in ("temporal", "comparative")]
+
+        lo = hi = 0
+        for i in order:
+            pattern = patterns[i]
+            start = pattern.span[0]
+            while starts[lo] <= start - RELATION_WINDOW:
+                lo += 1
+            while hi < len(order) and starts[hi] < start + RELATION_WINDOW:
+                hi += 1
+
+            nearby = sorted(j for j in order[lo:hi] if j != i and patterns[j].pattern_type != pattern.pattern_type)
+            if pattern.pattern_type == "causal" and linkable:
+                # Same order as checking each j in turn: proximity first, then the causal link
+                merged = heapq.merge(((j, 0) for j in nearby), ((j, 1) for j in linkable if j != i))
+                pattern.related_patterns = [
+                    f"{patterns[j].pattern_type}_{j}" if kind == 0 else f"causal_link_{j}" for j, kind in merged
+                ]
+            else:
+                pattern.related_patterns = [f"{patterns[j].pattern_type}_{j}" for j in nearby]
 
         return patterns
 
-    async def _detect_statistical_patterns(self, text: str) -> list[DetectedPattern]:
-        """Statistical pattern analysis"""
-        patterns = []
 
-        # Word frequency analysis
-        words = re.findall(r"\b\w+\b", text.lower())
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
+RELATION_WINDOW = 500  # chars between span starts for proximity relationships
+
+_WORD_RE = re.compile(r"\b\w+\b")
+_WORD_END_RE = re.compile(r"\w\Z")
+_SENTENCE_END_RE = re.compile(r"[.!?]+")
+
+
+class TextStatistics:
+    """
+    Rolling word-frequency and sentence-length state for statistical patterns.
+
+    Text can be fed in arbitrary chunks: a word or sentence cut by a chunk
+    boundary is held back until the next chunk (or finish()) completes it, so
+    the counts are the same as for the whole text at once. Sentence lengths
+    are kept as integer moments, so the mean and variance need no history.
+    """
+
+    def __init__(self):
+        self.word_counts: Counter[str] = Counter()
+        self.total_words = 0
+        self.sentences = 0
+        self._length_sum = 0
+        self._length_sq_sum = 0
+        self._word_tail = ""
+        self._sentence_words = 0
+        self._sentence_tail = ""
+
+    def update(self, text: str) -> None:
+        """Add a chunk of (lowercased) text."""
+        words = _WORD_RE.findall(self._word_tail + text)
+        self._word_tail = ""
+        if words and _WORD_END_RE.search(text):
+            self._word_tail = words.pop()  # may continue in the next chunk
+        self.word_counts.update(words)
+        self.total_words += len(words)
+
+        parts = _SENTENCE_END_RE.split(self._sentence_tail + text)
+        for part in parts[:-1]:
+            self._add_sentence(self._sentence_words + len(part.split()))
+            self._sentence_words = 0
+        last = parts[-1]
+        tokens = last.split()
+        self._sentence_tail = ""
+        if tokens and not last[-1].isspace():
+            self._sentence_tail = tokens.pop()  # partial token
+        self._sentence_words += len(tokens)
+
+    def finish(self) -> None:
+        """Flush the trailing word and sentence."""
+        if self._word_tail:
+            self.word_counts[self._word_tail] += 1
+            self.total_words += 1
+            self._word_tail = ""
+        self._add_sentence(self._sentence_words + len(self._sentence_tail.split()))
+        self._sentence_words = 0
+        self._sentence_tail = ""
+
+    def _add_sentence(self, words: int) -> None:
+        if words:
+            self.sentences += 1
+            self._length_sum += words
+            self._length_sq_sum += words * words
+
+    def patterns(self, text_length: int) -> list[DetectedPattern]:
+        patterns = []
 
         # Detect repetitive patterns
-        total_words = len(words)
-        for word, freq in word_freq.items():
+        total_words = self.total_words
+        for word, freq in self.word_counts.items():
             if freq > total_words * 0.05:  # Word appears in >5% of text
                 confidence = min(0.8, freq / total_words * 10)
                 pattern = DetectedPattern(
                     pattern_type="repetitive",
                     description=f"Repetitive word pattern: '{word}' ({freq} occurrences)",
                     confidence=confidence,
-                    span=(0, len(text)),  # Whole text
+                    span=(0, text_length),  # Whole text
                     evidence=[f"Frequency: {freq}/{total_words}"],
                     metadata={
                         "method": "statistical",
@@ -232,15 +340,11 @@ class PatternDetector:
                 )
                 patterns.append(pattern)
 
-        # Sentence length analysis - simplified without numpy
-        sentences = re.split(r"[.!?]+", text)
-        sentence_lengths = [len(s.strip().split()) for s in sentences if s.strip()]
-
-        if sentence_lengths:
-            avg_length = sum(sentence_lengths) / len(sentence_lengths)
-
-            # Simple variance calculation
-            variance = sum((x - avg_length) ** 2 for x in sentence_lengths) / len(sentence_lengths)
+        # Sentence length analysis
+        n = self.sentences
+        if n:
+            avg_length = self._length_sum / n
+            variance = (n * self._length_sq_sum - self._length_sum**2) / (n * n)
             std_length = variance**0.5
 
             if std_length > avg_length * 0.5:  # High variation in sentence length
@@ -249,7 +353,7 @@ class PatternDetector:
                     pattern_type="structural_variation",
                     description="High variation in sentence structure detected",
                     confidence=confidence,
-                    span=(0, len(text)),
+                    span=(0, text_length),
                     evidence=[f"Avg length: {avg_length:.1f}, Std: {std_length:.1f}"],
                     metadata={
                         "method": "statistical",
@@ -261,37 +365,146 @@ class PatternDetector:
 
         return patterns
 
-    async def analyze_relationships(self, patterns: list[DetectedPattern]) -> list[DetectedPattern]:
-        """Analyze relationships between detected patterns"""
-        # Group patterns by type and proximity
-        for i, pattern in enumerate(patterns):
-            related = []
 
-            for j, other in enumerate(patterns):
-                if i == j:
-                    continue
+class StreamTooLong(ValueError):
+    """A pattern stream grew past StreamingPatternDetector.max_chars."""
 
-                # Check if patterns are related by proximity
-                if abs(pattern.span[0] - other.span[0]) < 500:  # Within 500 chars
-                    if pattern.pattern_type != other.pattern_type:
-                        related.append(f"{other.pattern_type}_{j}")
 
-                # Check semantic relationships
-                if pattern.pattern_type == "causal" and other.pattern_type in [
-                    "temporal",
-                    "comparative",
-                ]:
-                    related.append(f"causal_link_{j}")
+class StreamingPatternDetector:
+    """
+    Incremental pattern detection over text that arrives in chunks.
+
+    feed() returns rule-based patterns as soon as they are settled: a match
+    is only reported once at least ``holdback`` characters follow it, so more
+    text cannot change it. The last ``carry`` characters are kept between
+    chunks, so matches spanning a chunk boundary are found as long as they
+    fit in the window. finish() flushes the tail and returns the same result
+    PatternDetector.detect_patterns gives for the whole text (statistical
+    patterns included, relationships analyzed).
+
+    Spans are offsets into the whole stream. Word counts grow with the
+    stream, so a stream is capped at ``max_chars`` characters; feed() raises
+    StreamTooLong (and keeps its state unchanged) for a chunk that would
+    exceed it.
+    """
 
-            pattern.related_patterns = related
+    def __init__(
+        self,
+        detector: PatternDetector | None = None,
+        options: dict[str, Any] | None = None,
+        *,
+        carry: int = 2048,
+        holdback: int = 64,
+        max_chars: int = 1_000_000,
+    ):
+        self.detector = detector or PatternDetector()
+        options = options or {}
+        self.min_confidence = options.get("min_confidence", 0.6)
+        self.max_patterns = options.get("max_patterns", 10)
+        self.holdback = holdback
+        self.carry = max(carry, 2 * holdback)
+        self.max_chars = max_chars
+        self.text_length = 0
+        self.stats = TextStatistics()
+        self._templates = self.detector._compiled_templates
+        self._buffer = ""  # lowercased tail of the stream, starting at _base
+        self._base = 0
+        self._frontiers = [0] * len(self._templates)  # where each regex resumes (finditer semantics)
+        self._ranked: list[tuple[tuple, DetectedPattern]] = []
+        self._started = datetime.now(UTC)
+
+    def feed(self, chunk: str, final: bool = False) -> list[DetectedPattern]:
+        """
+        Add a chunk; returns newly settled patterns at or above min_confidence, in span order.
 
-        return patterns
+        With final=True the stream is complete, so patterns in the held-back
+        tail are settled and returned too.
+        """
+        if self.text_length + len(chunk) > self.max_chars:
+            raise StreamTooLong(f"Pattern stream exceeds {self.max_chars} characters")
+        lowered = chunk.lower()
+        self.text_length += len(chunk)
+        self.stats.update(lowered)
+        self._buffer += lowered
+        return self._scan(final=final)
+
+    def _scan(self, final: bool) -> list[DetectedPattern]:
+        buffer, base = self._buffer, self._base
+        limit = len(buffer) if final else len(buffer) - self.holdback
+        found = []
+        for index, (pattern_type, regex, compiled) in enumerate(self._templates):
+            # Keep one char of lookbehind for the leading \b
+            pos = max(self._frontiers[index] - base, 1 if base else 0)
+            for match in compiled.finditer(buffer, pos):
+                if match.end() > limit:
+                    break
+                self._frontiers[index] = base + match.end()
+                pattern = self.detector._rule_pattern(
+                    pattern_type, regex, match.group(), base + match.start(), base + match.end()
+                )
+                found.append((base + match.start(), index, pattern))
+
+        if not final and len(buffer) > self.carry:
+            cut = len(buffer) - self.carry
+            self._buffer = buffer[cut:]
+            self._base = base + cut
+
+        found.sort(key=lambda item: item[:2])
+        events = []
+        for start, index, pattern in found:
+            if pattern.confidence >= self.min_confidence:
+                self._rank((-pattern.confidence, index, start), pattern)
+                events.append(pattern)
+        return events
+
+    def _rank(self, key: tuple, pattern: DetectedPattern) -> None:
+        # Keys order like the batch path: confidence, then template order, then position
+        self._ranked.append((key, pattern))
+        if len(self._ranked) > 4 * self.max_patterns + 64:
+            self._ranked = heapq.nsmallest(self.max_patterns, self._ranked, key=lambda item: item[0])
+
+    async def finish(self) -> PatternDetectionResult:
+        """Flush the remaining text (if feed(final=True) has not) and return the full detection result."""
+        self._scan(final=True)
+        self.stats.finish()
+        for k, pattern in enumerate(self.stats.patterns(self.text_length)):
+            if pattern.confidence >= self.min_confidence:
+                self._rank((-pattern.confidence, len(self._templates), k), pattern)
+
+        ranked = heapq.nsmallest(self.max_patterns, self._ranked, key=lambda item: item[0])
+        patterns = [pattern for _, pattern in ranked]
+        patterns = await self.detector.analyze_relationships(patterns)
+        overall_confidence = sum(p.confidence for p in patterns) / len(patterns) if patterns else 0.0
+
+        return PatternDetectionResult(
+            patterns=patterns,
+            confidence=overall_confidence,
+            processing_time=(datetime.now(UTC) - self._started).total_seconds(),
+            text_length=self.text_length,
+            timestamp=datetime.now(UTC),
+            metadata={
+                "detection_method": "simplified_rule_based",
+                "stages_used": ["rule_based", "statistical"],
+                "rag_middleware": False,
+                "streaming": True,
+            },
+        )
 
 
 # Global pattern detector instance
 pattern_detector = None
 
 
+def pattern_detector_instance() -> PatternDetector:
+    """Shared PatternDetector (templates compiled once per process)."""
+    global pattern_detector
+
+    # Initialize pattern detector if needed
+    if pattern_detector is None:
+        pattern_detector = PatternDetector()
+    return pattern_detector
+
+
 async def detect_patterns(
     text: str,
     context: dict[str, Any] | None = None,
@@ -302,17 +515,13 @@ async def detect_patterns(
 
     Simplified version without RAG middleware for authentic AI responses.
     """
-    global pattern_detector
-
-    # Initialize pattern detector if needed
-    if pattern_detector is None:
-        pattern_detector = PatternDetector()
+    detector = pattern_detector_instance()
 
     # Perform detection
-    result = await pattern_detector.detect_patterns(text, context, options)
+    result = await detector.detect_patterns(text, context, options)
 
     # Analyze relationships (simplified without RAG)
-    result.patterns = await pattern_detector.analyze_relationships(result.patterns)
+    result.patterns = await detector.analyze_relationships(result.patterns)
 
     # Convert to dict format for API
     return [pattern.to_dict() for pattern in result.patterns]
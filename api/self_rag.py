@@ -1,21 +1,35 @@
 """
-Simplified Truth Verification Glimpse
+Truth Verification Glimpse
 
-Basic claim verification without RAG middleware for authentic AI responses.
+Claim verification grounded in provided evidence, request context and,
+when configured, a local rag_orbit knowledge-base index.
 """
 
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Any
 
-# REMOVED: RAG middleware imports - using direct AI responses
-# from src.rag_orbit.embeddings import EmbeddingEngine
-# from src.rag_orbit.retrieval import FAISSRetriever
-# from src.rag_orbit.chunking import ChunkingEngine
+import numpy as np
+
+from src.rag_orbit.embeddings import EmbeddingGenerator
+from src.rag_orbit.retrieval import FAISSRetriever
 
 logger = logging.getLogger(__name__)
 
+SUPPORT_KEYWORDS = ("true", "correct", "verified", "confirmed", "supports")
+CONTRADICTION_KEYWORDS = ("false", "incorrect", "contradicts", "denies", "refutes")
+
+
+def _claim_overlap(claim_words: set[str], text: str) -> float:
+    """Share of tokens common to the claim and the text, over the larger token set"""
+    text_words = set(text.lower().split())
+    denominator = max(len(claim_words), len(text_words))
+    return len(claim_words.intersection(text_words)) / denominator if denominator > 0 else 0
+
 
 @dataclass
 class VerificationResult:
@@ -29,6 +43,7 @@ class VerificationResult:
     supporting_evidence: list[str]
     processing_time: float
     timestamp: datetime
+    evidence_dropped: int = 0  # provided entries left out by max_evidence_chunks
 
 
 @dataclass
@@ -43,22 +58,60 @@ class EvidenceChunk:
 
 class SelfRAGVerifier:
     """
-    Simplified truth verification without RAG middleware.
-
-    Basic claim verification for authentic AI responses.
+    Truth verification over provided evidence and an optional knowledge base.
+
+    With a retriever and embedding generator configured, the claim embedding
+    pulls the top-k knowledge-base chunks from the index. Provided evidence is
+    used in full unless ``max_evidence_chunks`` is set; then repeated entries
+    go first, followed by entries that can neither support nor contradict the
+    claim, and the result reports how many were dropped. Results are cached per
+    claim digest.
     """
 
-    def __init__(self):
-        # REMOVED: RAG middleware dependencies
-        # self.embedding_engine = embedding_engine or EmbeddingEngine()
-        # self.retriever = retriever
-        # self.chunking_engine = chunking_engine or ChunkingEngine()
+    def __init__(
+        self,
+        retriever: FAISSRetriever | None = None,
+        embedding_generator: EmbeddingGenerator | None = None,
+        top_k: int = 5,
+        max_evidence_chunks: int = 0,
+        cache_size: int = 1024,
+    ):
+        self.retriever = retriever
+        self.embedding_generator = embedding_generator
+        self.top_k = top_k
+        self.max_evidence_chunks = max_evidence_chunks
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, VerificationResult] = OrderedDict()
 
         # Verification thresholds - simplified
         self.min_evidence_threshold = 0.5
         self.contradiction_threshold = 0.6
         self.uncertainty_threshold = 0.4
 
+    def index_evidence(
+        self,
+        texts: list[str],
+        metadata: list[dict[str, Any]] | None = None,
+        chunk_ids: list[str] | None = None,
+    ) -> int:
+        """Embed texts in one batch and add them to the knowledge-base index. Returns the index size."""
+        if self.retriever is None or self.embedding_generator is None:
+            raise RuntimeError("Knowledge-base indexing requires a retriever and an embedding generator")
+        if texts:
+            start = self.retriever.index.ntotal
+            ids = chunk_ids or [f"kb_{start + i}" for i in range(len(texts))]
+            embeddings, _ = self.embedding_generator.embed_batch(texts, ids)
+            self.retriever.add_documents(embeddings, texts, metadata or [{} for _ in texts], ids)
+        return self.retriever.index.ntotal
+
+    def _cache_key(self, claim: str, evidence: list[str] | None, context: dict[str, Any] | None) -> str:
+        digest = hashlib.sha256()
+        # The index size is part of the key so new knowledge invalidates earlier verdicts
+        kb_size = self.retriever.index.ntotal if self.retriever is not None else 0
+        payload = [claim, evidence or [], context or {}, kb_size]
+        digest.update(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
     async def verify_claim(
         self,
         claim: str,
@@ -78,6 +131,16 @@ class SelfRAGVerifier:
         """
         start_time = datetime.utcnow()
 
+        cache_key = self._cache_key(claim, evidence, context) if self.cache_size > 0 else None
+        cached = self._cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return replace(
+                cached,
+                processing_time=(datetime.utcnow() - start_time).total_seconds(),
+                timestamp=datetime.utcnow(),
+            )
+
         try:
             # Step 1: Gather relevant evidence
             relevant_evidence = await self._gather_evidence(claim, evidence, context)
@@ -90,7 +153,7 @@ class SelfRAGVerifier:
 
             processing_time = (datetime.utcnow() - start_time).total_seconds()
 
-            return VerificationResult(
+            result = VerificationResult(
                 verdict=verdict,
                 confidence=confidence,
                 explanation=explanation,
@@ -99,7 +162,13 @@ class SelfRAGVerifier:
                 supporting_evidence=analysis.get("supporting", []),
                 processing_time=processing_time,
                 timestamp=datetime.utcnow(),
+                evidence_dropped=len(evidence or []) - sum(e.source == "provided" for e in relevant_evidence),
             )
+            if cache_key:
+                self._cache[cache_key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return result
 
         except Exception as e:
             logger.error(f"Truth verification failed: {e}")
@@ -125,45 +194,52 @@ class SelfRAGVerifier:
         """
         Gather relevant evidence for claim verification.
 
-        Simplified version using only provided evidence and context.
+        Provided evidence comes first, then knowledge-base hits above the
+        evidence threshold, then the request context.
         """
         evidence_chunks = []
+        provided = list(enumerate(provided_evidence or []))
+
+        if 0 < self.max_evidence_chunks < len(provided):
+            provided = self._cap_provided(claim, provided)
+
+        use_index = self.retriever is not None and self.retriever.index.ntotal > 0
+        claim_embedding = None
+        if use_index and self.embedding_generator is not None:
+            try:
+                embeddings, _ = self.embedding_generator.embed_batch([claim])
+                claim_embedding = embeddings[0]
+                norm = np.linalg.norm(claim_embedding)
+                if norm > 0:
+                    claim_embedding = claim_embedding / norm
+            except Exception as e:
+                logger.warning(f"Claim embedding failed: {e}")
 
         # Add provided evidence
-        if provided_evidence:
-            for i, text in enumerate(provided_evidence):
-                chunk = EvidenceChunk(
-                    text=text,
-                    relevance_score=0.8,  # High confidence for provided evidence
-                    source="provided",
-                    metadata={"index": i},
-                )
-                evidence_chunks.append(chunk)
-
-        # REMOVED: Knowledge base retrieval - no RAG middleware
-        # if self.retriever:
-        #     try:
-        #         # Get embedding for claim
-        #         claim_embedding = await self.embedding_engine.get_embedding(claim)
-        #
-        #         # Search for relevant documents
-        #         results, _ = self.retriever.search(claim_embedding, top_k=5)
-        #
-        #         for result in results:
-        #             if result.similarity_score > self.min_evidence_threshold:
-        #                 chunk = EvidenceChunk(
-        #                     text=result.text,
-        #                     relevance_score=result.similarity_score,
-        #                     source="knowledge_base",
-        #                     metadata={
-        #                         "chunk_id": result.chunk_id,
-        #                         "similarity": result.similarity_score
-        #                     }
-        #                 )
-        #                 evidence_chunks.append(chunk)
-        #
-        #     except Exception as e:
-        #         logger.warning(f"Knowledge base retrieval failed: {e}")
+        for i, text in provided:
+            chunk = EvidenceChunk(
+                text=text,
+                relevance_score=0.8,  # High confidence for provided evidence
+                source="provided",
+                metadata={"index": i},
+            )
+            evidence_chunks.append(chunk)
+
+        # Knowledge base retrieval
+        if use_index and claim_embedding is not None:
+            try:
+                results, _ = self.retriever.search(claim_embedding, top_k=self.top_k)
+                for result in results:
+                    if result.similarity_score > self.min_evidence_threshold:
+                        chunk = EvidenceChunk(
+                            text=result.text,
+                            relevance_score=result.similarity_score,
+                            source="knowledge_base",
+                            metadata={"chunk_id": result.chunk_id, "similarity": result.similarity_score},
+                        )
+                        evidence_chunks.append(chunk)
+            except Exception as e:
+                logger.warning(f"Knowledge base retrieval failed: {e}")
 
         # Add context as evidence if available
         if context:
@@ -179,6 +255,26 @@ class SelfRAGVerifier:
 
         return evidence_chunks
 
+    def _cap_provided(self, claim: str, provided: list[tuple[int, str]]) -> list[tuple[int, str]]:
+        """
+        Keep ``max_evidence_chunks`` provided entries, in their original order.
+
+        Distinct entries rank ahead of repeats of an earlier one, entries with a
+        support or contradiction keyword (the only ones that can move the
+        verdict) ahead of the rest, then by claim-token overlap.
+        """
+        claim_words = set(claim.lower().split())
+        seen: set[str] = set()
+        ranked = []
+        for index, text in provided:
+            text_lower = text.lower()
+            repeat = text_lower in seen
+            seen.add(text_lower)
+            signal = any(word in text_lower for word in SUPPORT_KEYWORDS + CONTRADICTION_KEYWORDS)
+            ranked.append(((repeat, not signal, -_claim_overlap(claim_words, text_lower), index), (index, text)))
+        ranked.sort(key=lambda item: item[0])
+        return sorted(item for _, item in ranked[: self.max_evidence_chunks])
+
     async def _analyze_claim_against_evidence(self, claim: str, evidence: list[EvidenceChunk]) -> dict[str, Any]:
         """
         Analyze claim against gathered evidence to identify support and contradictions.
@@ -187,32 +283,18 @@ class SelfRAGVerifier:
         contradictions = []
         neutral_evidence = []
 
-        # Simple semantic analysis (can be enhanced with LLM)
-        claim_lower = claim.lower()
+        # Simple semantic analysis (can be enhanced with LLM); the claim is tokenized once
+        claim_words = set(claim.lower().split())
 
         for chunk in evidence:
             text_lower = chunk.text.lower()
 
             # Check for direct support
-            support_keywords = ["true", "correct", "verified", "confirmed", "supports"]
-            contradiction_keywords = [
-                "false",
-                "incorrect",
-                "contradicts",
-                "denies",
-                "refutes",
-            ]
-
-            support_score = sum(1 for word in support_keywords if word in text_lower)
-            contradiction_score = sum(1 for word in contradiction_keywords if word in text_lower)
+            support_score = sum(1 for word in SUPPORT_KEYWORDS if word in text_lower)
+            contradiction_score = sum(1 for word in CONTRADICTION_KEYWORDS if word in text_lower)
 
             # Calculate semantic similarity (simple approach)
-            claim_words = set(claim_lower.split())
-            text_words = set(text_lower.split())
-            overlap = len(claim_words.intersection(text_words))
-            similarity = (
-                overlap / max(len(claim_words), len(text_words)) if max(len(claim_words), len(text_words)) > 0 else 0
-            )
+            similarity = _claim_overlap(claim_words, text_lower)
 
             if contradiction_score > support_score and similarity > 0.3:
                 contradictions.append(chunk.text)
@@ -272,6 +354,31 @@ class SelfRAGVerifier:
 verifier = None
 
 
+def create_verifier() -> SelfRAGVerifier:
+    """
+    Build a verifier wired to the local rag_orbit index configured in SelfRAGConfig.
+
+    Without a loadable index the verifier works from provided evidence and
+    context alone, so no retriever or embedding generator is built.
+    """
+    from api.config import get_config
+
+    rag_config = get_config().rag
+    retriever = None
+    if rag_config.index_dir:
+        try:
+            retriever = FAISSRetriever.load(rag_config.index_dir)
+        except Exception as e:
+            logger.warning(f"Could not load knowledge-base index from {rag_config.index_dir}: {e}")
+    return SelfRAGVerifier(
+        retriever=retriever,
+        embedding_generator=EmbeddingGenerator() if retriever is not None else None,
+        top_k=rag_config.retrieval_top_k,
+        max_evidence_chunks=rag_config.max_evidence_chunks,
+        cache_size=rag_config.verification_cache_size,
+    )
+
+
 async def verify_truth(
     claim: str,
     evidence: list[str] | None = None,
@@ -279,14 +386,12 @@ async def verify_truth(
 ) -> dict[str, Any]:
     """
     Main entry point for truth verification.
-
-    Simplified version without RAG middleware for authentic AI responses.
     """
     global verifier
 
-    # Initialize verifier if needed - simplified without RAG engines
+    # Initialize verifier if needed
     if verifier is None:
-        verifier = SelfRAGVerifier()
+        verifier = create_verifier()
 
     # Perform verification
     result = await verifier.verify_claim(claim, evidence, context)
@@ -301,4 +406,5 @@ async def verify_truth(
         "supporting_evidence": result.supporting_evidence,
         "processing_time": result.processing_time,
         "timestamp": result.timestamp.isoformat(),
+        "evidence_dropped": result.evidence_dropped,
     }
@@ -1,5 +1,6 @@
 """Knowledge management module for EchoesAssistantV2."""
 
 from .knowledge_manager import KnowledgeEntry, KnowledgeManager
+from .sqlite_store import SQLiteKnowledgeStore
 
-__all__ = ["KnowledgeManager", "KnowledgeEntry"]
+__all__ = ["KnowledgeManager", "KnowledgeEntry", "SQLiteKnowledgeStore"]
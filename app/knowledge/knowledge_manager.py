@@ -2,14 +2,22 @@
 Knowledge Manager for EchoesAssistantV2
 
 Handles knowledge gathering, storage, retrieval, and context building.
+
+Entries live in a SQLite database (see sqlite_store). knowledge_base.json is
+kept as an import/export format: an existing file is imported the first time
+the database is created.
 """
 
+import hashlib
 import json
+from collections.abc import Iterable
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from .sqlite_store import SQLiteKnowledgeStore
+
 
 @dataclass
 class KnowledgeEntry:
@@ -43,29 +51,40 @@ class KnowledgeManager:
 
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.knowledge_file = self.storage_path / "knowledge_base.json"
+        self.db_file = self.storage_path / "knowledge.db"
         self.context_file = self.storage_path / "context.json"
 
-        self.knowledge: dict[str, KnowledgeEntry] = {}
+        is_new = not self.db_file.exists()
+        self.store = SQLiteKnowledgeStore(self.db_file)
         self.context: dict[str, Any] = {}
 
-        self._load_knowledge()
+        if is_new and self.knowledge_file.exists():
+            self.import_json(self.knowledge_file)
         self._load_context()
 
-    def _load_knowledge(self):
-        """Load knowledge from storage."""
-        if self.knowledge_file.exists():
-            try:
-                with open(self.knowledge_file, encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.knowledge = {k: KnowledgeEntry.from_dict(v) for k, v in data.items()}
-            except Exception:
-                self.knowledge = {}
-
-    def _save_knowledge(self):
-        """Save knowledge to storage."""
-        data = {k: v.to_dict() for k, v in self.knowledge.items()}
-        with open(self.knowledge_file, "w", encoding="utf-8") as f:
+    def import_json(self, path: str | Path) -> int:
+        """Import entries from a knowledge_base.json-style file ({id: entry}); returns the number imported."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = [KnowledgeEntry.from_dict(v).to_dict() for v in data.values()]
+        except Exception:
+            return 0
+        return self.store.upsert_many(entries)
+
+    def export_json(self, path: str | Path | None = None) -> Path:
+        """Write every entry to a knowledge_base.json-style file (defaults to knowledge_file)."""
+        target = Path(path) if path else self.knowledge_file
+        data = {entry["id"]: entry for entry in self.store.iter_all()}
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
+        tmp.replace(target)
+        return target
+
+    def close(self):
+        """Close the underlying database."""
+        self.store.close()
 
     def _load_context(self):
         """Load context from storage."""
@@ -90,14 +109,41 @@ class KnowledgeManager:
         metadata: dict[str, Any] | None = None,
     ) -> str:
         """Add knowledge entry."""
+        entry = self._new_entry(content, source, category, tags, metadata)
+        self.store.upsert_many([entry.to_dict()])
+        return entry.id
+
+    def add_knowledge_many(self, items: Iterable[dict[str, Any]]) -> list[str]:
+        """
+        Add several entries in one transaction.
+
+        Each item takes add_knowledge's keyword arguments (content, source, and
+        optionally category, tags, metadata). Returns the new IDs in order.
+        """
+        entries = [
+            self._new_entry(
+                item["content"],
+                item["source"],
+                item.get("category", "general"),
+                item.get("tags"),
+                item.get("metadata"),
+            )
+            for item in items
+        ]
+        self.store.upsert_many(entry.to_dict() for entry in entries)
+        return [entry.id for entry in entries]
 
-        # Phase 1: Input Processing
-        import hashlib
-
+    @staticmethod
+    def _new_entry(
+        content: str,
+        source: str,
+        category: str,
+        tags: list[str] | None,
+        metadata: dict[str, Any] | None,
+    ) -> KnowledgeEntry:
         # Generate ID (sha256 for non-crypto identifier)
         entry_id = hashlib.sha256(f"{content}{source}{datetime.now(UTC).isoformat()}".encode()).hexdigest()[:12]
-
-        entry = KnowledgeEntry(
+        return KnowledgeEntry(
             id=entry_id,
             content=content,
             source=source,
@@ -107,14 +153,10 @@ class KnowledgeManager:
             tags=tags or [],
         )
 
-        self.knowledge[entry_id] = entry
-        self._save_knowledge()
-
-        return entry_id
-
     def get_knowledge(self, entry_id: str) -> KnowledgeEntry | None:
         """Get knowledge entry by ID."""
-        return self.knowledge.get(entry_id)
+        data = self.store.get(entry_id)
+        return KnowledgeEntry.from_dict(data) if data else None
 
     def search_knowledge(
         self,
@@ -123,26 +165,20 @@ class KnowledgeManager:
         tags: list[str] | None = None,
         limit: int = 10,
     ) -> list[KnowledgeEntry]:
-        """Search knowledge entries."""
-        results = list(self.knowledge.values())
-
-        # Filter by category
-        if category:
-            results = [e for e in results if e.category == category]
-
-        # Filter by tags
-        if tags:
-            results = [e for e in results if any(t in e.tags for t in tags)]
+        """Search knowledge entries: case-insensitive substring match on content or source, newest first."""
+        return [KnowledgeEntry.from_dict(d) for d in self.store.search(query, category, tags, limit)]
 
-        # Filter by query
-        if query:
-            query_lower = query.lower()
-            results = [e for e in results if query_lower in e.content.lower() or query_lower in e.source.lower()]
-
-        # Sort by timestamp (newest first)
-        results.sort(key=lambda e: e.timestamp, reverse=True)
-
-        return results[:limit]
+    def search_ranked(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 10,
+    ) -> list[tuple[KnowledgeEntry, float]]:
+        """Full-text search ranked by bm25 relevance (higher score is better)."""
+        return [
+            (KnowledgeEntry.from_dict(d), score) for d, score in self.store.search_ranked(query, category, tags, limit)
+        ]
 
     def update_context(self, key: str, value: Any):
         """Update context."""
@@ -175,13 +211,9 @@ class KnowledgeManager:
 
     def get_stats(self) -> dict[str, Any]:
         """Get knowledge statistics."""
-        categories = {}
-        for entry in self.knowledge.values():
-            categories[entry.category] = categories.get(entry.category, 0) + 1
-
         return {
-            "total_entries": len(self.knowledge),
-            "categories": categories,
+            "total_entries": self.store.count(),
+            "categories": self.store.category_counts(),
             "context_keys": len(self.context),
             "storage_path": str(self.storage_path),
         }
@@ -189,8 +221,6 @@ class KnowledgeManager:
     def store_roi_analysis(self, roi_results: dict[str, Any], analysis_id: str | None = None) -> str:
         """Store ROI analysis results in knowledge base."""
         if not analysis_id:
-            import hashlib
-
             timestamp = roi_results.get("timestamp", "")
             institution = roi_results.get("stakeholder_config", {}).get("institution_name", "unknown")
             analysis_id = hashlib.sha256(f"roi_{institution}_{timestamp}".encode()).hexdigest()[:12]
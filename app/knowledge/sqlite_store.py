@@ -0,0 +1,262 @@
+"""
+SQLite storage engine for the knowledge base.
+
+The JSON-backed manager rewrote knowledge_base.json on every insert and
+answered searches with a linear scan that lowercased every entry. This store
+keeps entries in a single SQLite file in WAL mode. Inserts are one indexed row
+write. A batch shares a single transaction.
+
+* ``entries`` holds the rows. The integer rowid preserves insertion order,
+  and (category, timestamp) and timestamp are indexed.
+* ``entry_tags`` maps each tag to the entries carrying it.
+* ``entries_fts`` is an external-content FTS5 index over content and source,
+  kept in sync by triggers. With the trigram tokenizer a quoted query matches
+  substrings, so case-insensitive "contains" searches use the index. bm25()
+  ranks :meth:`SQLiteKnowledgeStore.search_ranked`.
+
+Substring hits from the index are re-checked with Python's ``str.lower`` so
+results match the old in-memory filter exactly. A query that matches many
+entries skips the index and walks entries newest first, stopping once it has
+``limit`` hits. So do queries the trigram index cannot answer: queries under
+three characters, non-ASCII queries, or a SQLite build without the trigram
+tokenizer.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_category_ts ON entries (category, timestamp);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (timestamp);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    tag TEXT NOT NULL,
+    entry_rowid INTEGER NOT NULL REFERENCES entries (rowid) ON DELETE CASCADE,
+    PRIMARY KEY (tag, entry_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_tags_entry ON entry_tags (entry_rowid);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, content, source) VALUES (new.rowid, new.content, new.source);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, content, source) VALUES ('delete', old.rowid, old.content, old.source);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, content, source) VALUES ('delete', old.rowid, old.content, old.source);
+    INSERT INTO entries_fts (rowid, content, source) VALUES (new.rowid, new.content, new.source);
+END;
+"""
+
+_FTS = "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(content, source, content='entries', content_rowid='rowid', tokenize='{tokenizer}')"
+
+_COLUMNS = "id, content, source, category, timestamp, metadata, tags"
+
+_UPSERT = (
+    "INSERT INTO entries (id, content, source, category, timestamp, metadata, tags) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET content = excluded.content, source = excluded.source, "
+    "category = excluded.category, timestamp = excluded.timestamp, "
+    "metadata = excluded.metadata, tags = excluded.tags "
+    "RETURNING rowid"
+)
+_SELECT_BY_ID = "SELECT id, content, source, category, timestamp, metadata, tags FROM entries WHERE id = ?"
+_SELECT_ALL = "SELECT id, content, source, category, timestamp, metadata, tags FROM entries ORDER BY rowid"
+
+_WORD = re.compile(r"\w+")
+
+# Substring queries with at most this many index hits are answered from the hit list;
+# more common ones walk the timestamp index and stop once ``limit`` rows match.
+_FTS_PROBE = 1000
+
+
+def _icontains(haystack: str, needle: str) -> bool:
+    return needle in haystack.lower()
+
+
+def _phrase(text: str) -> str:
+    """Quote ``text`` as a single FTS5 string."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SQLiteKnowledgeStore:
+    """Knowledge entries in SQLite with tag/category indexes and an FTS5 content index."""
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.create_function("icontains", 2, _icontains, deterministic=True)
+        self.trigram = self._create_schema()
+
+    def _create_schema(self) -> bool:
+        with self._conn:
+            existing = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'entries_fts'").fetchone()
+            if existing is None:
+                try:
+                    self._conn.execute(_FTS.format(tokenizer="trigram"))
+                except sqlite3.OperationalError:  # SQLite < 3.34
+                    self._conn.execute(_FTS.format(tokenizer="unicode61"))
+            self._conn.executescript(_SCHEMA)
+            sql = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'entries_fts'").fetchone()[0]
+        return "trigram" in sql
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Writes ----------------------------------------------------------------
+
+    def upsert_many(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Insert or replace entries (dicts in KnowledgeEntry shape) in one transaction."""
+        count = 0
+        with self._lock, self._conn:
+            for entry in entries:
+                tags = list(entry.get("tags") or [])
+                row = self._conn.execute(
+                    _UPSERT,
+                    (
+                        entry["id"],
+                        entry["content"],
+                        entry["source"],
+                        entry["category"],
+                        entry["timestamp"],
+                        json.dumps(entry.get("metadata") or {}),
+                        json.dumps(tags),
+                    ),
+                ).fetchone()
+                rowid = row[0]
+                self._conn.execute("DELETE FROM entry_tags WHERE entry_rowid = ?", (rowid,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO entry_tags (tag, entry_rowid) VALUES (?, ?)",
+                    [(tag, rowid) for tag in tags],
+                )
+                count += 1
+        return count
+
+    def delete(self, entry_id: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,)).rowcount > 0
+
+    # --- Reads -----------------------------------------------------------------
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict[str, Any]:
+        return {
+            "id": row["id"],
+            "content": row["content"],
+            "source": row["source"],
+            "category": row["category"],
+            "timestamp": row["timestamp"],
+            "metadata": json.loads(row["metadata"]),
+            "tags": json.loads(row["tags"]),
+        }
+
+    def get(self, entry_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(_SELECT_BY_ID, (entry_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def category_counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT category, COUNT(*) FROM entries GROUP BY category ORDER BY MIN(rowid)")
+            return dict(rows)
+
+    def iter_all(self) -> Iterable[dict[str, Any]]:
+        """All entries in insertion order."""
+        with self._lock:
+            rows = self._conn.execute(_SELECT_ALL).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _filters(category: str | None, tags: list[str] | None) -> tuple[list[str], list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if category:
+            clauses.append("e.category = ?")
+            params.append(category)
+        if tags:
+            placeholders = ",".join("?" * len(tags))
+            clauses.append(f"e.rowid IN (SELECT entry_rowid FROM entry_tags WHERE tag IN ({placeholders}))")  # noqa: S608 - placeholders only
+            params.extend(tags)
+        return clauses, params
+
+    def search(
+        self,
+        query: str | None = None,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """Case-insensitive substring match on content or source, newest first (ties in insertion order)."""
+        clauses, params = self._filters(category, tags)
+        if query:
+            needle = query.lower()
+            if self.trigram and len(query) >= 3 and query.isascii():
+                with self._lock:
+                    hits = self._conn.execute(
+                        "SELECT rowid FROM entries_fts WHERE entries_fts MATCH ? LIMIT ?",
+                        (_phrase(query), _FTS_PROBE + 1),
+                    ).fetchall()
+                if len(hits) <= _FTS_PROBE:
+                    clauses.append("e.rowid IN (SELECT value FROM json_each(?))")
+                    params.append(json.dumps([h[0] for h in hits]))
+            clauses.append("(icontains(e.content, ?) OR icontains(e.source, ?))")
+            params.extend([needle, needle])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {_COLUMNS} FROM entries e {where} ORDER BY e.timestamp DESC, e.rowid LIMIT ?"  # noqa: S608 - fixed clauses, values bound
+        with self._lock:
+            rows = self._conn.execute(sql, [*params, max(limit, 0)]).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def search_ranked(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 10,
+    ) -> list[tuple[dict[str, Any], float]]:
+        """
+        Entries matching any word of ``query``, best bm25 score first.
+
+        Scores are negated bm25 values, so higher is better. Words shorter than
+        three characters cannot be indexed by the trigram tokenizer and are ignored.
+        """
+        min_len = 3 if self.trigram else 1
+        words = [w for w in _WORD.findall(query) if len(w) >= min_len]
+        if not words:
+            return []
+        clauses, params = self._filters(category, tags)
+        clauses.insert(0, "entries_fts MATCH ?")
+        params.insert(0, " OR ".join(_phrase(w) for w in dict.fromkeys(words)))
+        sql = (
+            "SELECT e.id, e.content, e.source, e.category, e.timestamp, e.metadata, e.tags, "  # noqa: S608 - fixed clauses, values bound
+            "bm25(entries_fts) AS score FROM entries_fts JOIN entries e ON e.rowid = entries_fts.rowid "
+            f"WHERE {' AND '.join(clauses)} ORDER BY score, e.rowid LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, [*params, max(limit, 0)]).fetchall()
+        return [(self._to_dict(row), -row["score"]) for row in rows]
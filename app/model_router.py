@@ -9,15 +9,113 @@ Intelligently selects the most appropriate GPT-4o model based on:
 """
 
 import asyncio
+import contextlib
 import hashlib
+import json
 import logging
+import random
 import re
 import time
-from collections import defaultdict
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
 
+_SEARCH_TOOL_NAMES = frozenset({"web_search", "get_web_page_content", "browser"})
+
+# Word-bounded rules (formerly inline regexes), expressed as literals
+_RECENT_WORDS = [
+    "2024",
+    "2025",
+    "this week",
+    "this month",
+    "this year",
+    "recently",
+    "lately",
+    "what's happening",
+    "what's going on",
+    "what's new",
+]
+_COMPARISON_WORDS = ["compare", "difference", "versus", "vs"]
+_CODE_WORDS = ["def", "class", "import", "public", "private", "interface", "lambda"]
+_EQUATION_SYMBOLS = ["=", "∑", "∫", "√", "π", "≈", "≥", "≤", "^"]
+_EQUATION_WORDS = ["prove", "derive"]
+_SCIENTIFIC_WORDS = ["model", "modeling", "simulate", "hypothesis", "experiment"]
+_SCORED_TAGS = frozenset({"math", "science", "coding"})
+_HEAVY_LITERALS = [
+    "multi-step",
+    "step-by-step",
+    "detailed",
+    "comprehensive",
+    "optimize",
+    "refactor",
+    "architect",
+]
+
+
+@dataclass
+class RoutingFeatures:
+    """Routing signals extracted from a prompt in a single pass."""
+
+    web_search: bool
+    complexity: bool
+    comparison: bool
+    code_block: bool
+    equation: bool
+    scientific: bool
+    heavy: bool
+    math_score: int
+    science_score: int
+    coding_score: int
+    word_count: int
+    question_marks: int
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition as \w for str patterns
+    return ch.isalnum() or ch == "_"
+
+
+def _at_boundary(text: str, index: int, length: int) -> bool:
+    """Equivalent of regex \b at index."""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < length and _is_word_char(text[index])
+    return before != after
+
+
+def _trie_regex(literals) -> str:
+    """
+    Build a prefix-factored alternation that matches the longest literal.
+
+    Factoring shared prefixes keeps the number of branches tried per
+    position small compared to a flat alternation.
+    """
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Optional, greedy: longer literals are tried before the shorter one
+            return body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
 class ModelRouter:
     """
     Routes requests to the most appropriate GPT-4o model.
@@ -135,6 +233,128 @@ class ModelRouter:
             "Glimpse test",
         ]
 
+        self.feature_cache_size = 4096
+        self._feature_cache: OrderedDict[str, RoutingFeatures] = OrderedDict()
+        self.compile_rules()
+
+    def compile_rules(self) -> None:
+        """
+        Compile every routing indicator into one combined matcher.
+
+        Call again after editing the indicator lists. Keyword lists keep their
+        substring semantics; the word-bounded regex rules are expressed as
+        literals whose boundaries are checked on each hit.
+        """
+        tags: dict[str, set[tuple[str, bool]]] = defaultdict(set)
+
+        def add(literals, tag: str, bounded: bool = False) -> None:
+            for literal in literals:
+                tags[literal].add((tag, bounded))
+
+        add(self.web_search_indicators, "web_search")
+        add(self.complexity_indicators, "complexity")
+        add(self.math_indicators, "math")
+        add(self.science_indicators, "science")
+        add(self.coding_indicators, "coding")
+        add(_HEAVY_LITERALS, "heavy")
+        add(["```"], "code_block")
+        add(_RECENT_WORDS, "web_search", bounded=True)
+        add(_COMPARISON_WORDS, "comparison", bounded=True)
+        add(["or"], "or", bounded=True)
+        add(["between"], "between", bounded=True)
+        add(["and"], "and", bounded=True)
+        add(_CODE_WORDS, "code_block", bounded=True)
+        add(_EQUATION_SYMBOLS, "equation")
+        add(_EQUATION_WORDS, "equation", bounded=True)
+        add(_SCIENTIFIC_WORDS, "scientific", bounded=True)
+        add(["\n"], "newline")
+
+        self._rule_tags = {literal: tuple(sorted(t)) for literal, t in tags.items()}
+        # Every literal matching at a position is a prefix of the longest one
+        # there, so each hit expands to (length, tag, bounded, literal) actions
+        self._rule_actions = {
+            literal: tuple(
+                (len(prefix), tag, bounded, prefix)
+                for prefix in self._rule_tags
+                if literal.startswith(prefix)
+                for tag, bounded in self._rule_tags[prefix]
+            )
+            for literal in self._rule_tags
+        }
+        self._rule_matcher = re.compile(_trie_regex(self._rule_tags))
+        self._feature_cache.clear()
+
+    def extract_features(self, prompt: str) -> RoutingFeatures:
+        """
+        Extract all routing features from a prompt in a single scan.
+
+        Results are memoized per prompt (LRU keyed by the prompt's hash).
+        """
+        cached = self._feature_cache.get(prompt)
+        if cached is not None:
+            self._feature_cache.move_to_end(prompt)
+            return cached
+
+        text = prompt.lower()
+        length = len(text)
+        flags: set[str] = set()
+        scored: set[tuple[str, str]] = set()
+        line = 0
+        or_line = -1
+        between_line = -1
+
+        actions = self._rule_actions
+        search = self._rule_matcher.search
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            start_ok = None
+            for size, tag, bounded, literal in actions[match.group()]:
+                if bounded:
+                    if start_ok is None:
+                        start_ok = _at_boundary(text, start, length)
+                    if not start_ok or not _at_boundary(text, start + size, length):
+                        continue
+                if tag in _SCORED_TAGS:
+                    scored.add((tag, literal))
+                elif tag == "newline":
+                    line += 1
+                elif tag == "or":
+                    # \bor\b.*\bor\b: two "or" on the same line
+                    if or_line == line:
+                        flags.add("comparison")
+                    or_line = line
+                elif tag == "between":
+                    between_line = line
+                elif tag == "and":
+                    # \bbetween\b.*\band\b on the same line
+                    if between_line == line:
+                        flags.add("comparison")
+                else:
+                    flags.add(tag)
+            match = search(text, start + 1)
+
+        word_count = len(prompt.split())
+        features = RoutingFeatures(
+            web_search="web_search" in flags,
+            complexity="complexity" in flags,
+            comparison="comparison" in flags,
+            code_block="code_block" in flags,
+            equation="equation" in flags,
+            scientific="scientific" in flags,
+            heavy=word_count > 80 or "heavy" in flags,
+            math_score=sum(1 for tag, _ in scored if tag == "math"),
+            science_score=sum(1 for tag, _ in scored if tag == "science"),
+            coding_score=sum(1 for tag, _ in scored if tag == "coding"),
+            word_count=word_count,
+            question_marks=prompt.count("?"),
+        )
+
+        self._feature_cache[prompt] = features
+        if len(self._feature_cache) > self.feature_cache_size:
+            self._feature_cache.popitem(last=False)
+        return features
+
     def select_model(self, prompt: str, tools: list[dict] = None) -> str:
         """
         Select the most appropriate model based on prompt and tools.
@@ -146,24 +366,27 @@ class ModelRouter:
         Returns:
             str: Selected model name
         """
+        features = self.extract_features(prompt)
+
         # Priority 1: Check if web search is needed but tools are also required
         # Note: gpt-4o-search-preview doesn't support tools, so use gpt-4o for tool + search
-        if self._needs_web_search(prompt, tools) and tools:
+        needs_web_search = features.web_search or self._has_search_tool(tools)
+        if needs_web_search and tools:
             logger.debug("Web search with tools detected, selecting gpt-4o")
             return "gpt-4o"
         # Priority 2: Check if web search is needed without tools
-        elif self._needs_web_search(prompt, tools):
+        elif needs_web_search:
             logger.debug("Web search detected, selecting gpt-4o-search-preview")
             return "gpt-4o-search-preview"
 
         # Priority 3: Specialized math/science/coding tasks
-        specialized_model = self._select_specialized_model(prompt)
+        specialized_model = self._specialized_model_for(features)
         if specialized_model:
             logger.debug("Specialized task detected, selecting %s", specialized_model)
             return specialized_model
 
         # Priority 4: Check for complex reasoning tasks
-        if self._is_complex_task(prompt):
+        if self._is_complex(features):
             logger.debug("Complex task detected, selecting gpt-4o")
             return "gpt-4o"
 
@@ -171,6 +394,23 @@ class ModelRouter:
         logger.debug("Simple task detected, selecting gpt-4o-mini")
         return self.default_model
 
+    def select_models_batch(self, prompts: list[str], tools: list[dict] = None) -> list[str]:
+        """
+        Select models for many prompts at once.
+
+        Args:
+            prompts: User prompts
+            tools: Tools shared by every request in the batch
+
+        Returns:
+            list[str]: Selected model per prompt, in input order
+        """
+        return [self.select_model(prompt, tools) for prompt in prompts]
+
+    @staticmethod
+    def _has_search_tool(tools: list[dict] | None) -> bool:
+        return bool(tools) and any(t.get("name") in _SEARCH_TOOL_NAMES for t in tools)
+
     def _needs_web_search(self, prompt: str, tools: list[dict] = None) -> bool:
         """
         Determine if the prompt requires web search capabilities.
@@ -182,33 +422,16 @@ class ModelRouter:
         Returns:
             bool: True if web search is needed
         """
-        prompt_lower = prompt.lower()
-
-        # Check for explicit search triggers in prompt
-        for indicator in self.web_search_indicators:
-            if indicator in prompt_lower:
-                return True
-
-        # Check if any tools require web search
-        if tools:
-            search_tools = [t for t in tools if t.get("name") in ["web_search", "get_web_page_content", "browser"]]
-            if search_tools:
-                return True
-
-        # Check for questions about recent events or current information
-        recent_patterns = [
-            r"\b(2024|2025)\b",
-            r"\bthis (week|month|year)\b",
-            r"\brecently\b",
-            r"\blately\b",
-            r"\bwhat\'s (happening|going on|new)\b",
-        ]
-
-        for pattern in recent_patterns:
-            if re.search(pattern, prompt_lower):
-                return True
-
-        return False
+        return self.extract_features(prompt).web_search or self._has_search_tool(tools)
+
+    @staticmethod
+    def _is_complex(features: RoutingFeatures) -> bool:
+        return (
+            features.complexity
+            or features.word_count > 30  # longer prompts often indicate complexity
+            or features.question_marks > 1  # multi-part questions
+            or features.comparison
+        )
 
     def _is_complex_task(self, prompt: str) -> bool:
         """
@@ -220,81 +443,30 @@ class ModelRouter:
         Returns:
             bool: True if task is complex
         """
-        prompt_lower = prompt.lower()
-
-        # Check for complexity indicators
-        for indicator in self.complexity_indicators:
-            if indicator in prompt_lower:
-                return True
-
-        # Check prompt length (longer prompts often indicate complexity)
-        word_count = len(prompt.split())
-        if word_count > 30:
-            return True
-
-        # Check for multi-part questions (indicated by multiple question marks)
-        if prompt.count("?") > 1:
-            return True
-
-        # Check for comparison tasks
-        comparison_patterns = [
-            r"\bcompare\b",
-            r"\bdifference\b",
-            r"\bversus\b",
-            r"\bvs\b",
-            r"\bor\b.*\bor\b",
-            r"\bbetween\b.*\band\b",
-        ]
+        return self._is_complex(self.extract_features(prompt))
 
-        for pattern in comparison_patterns:
-            if re.search(pattern, prompt_lower):
-                return True
-
-        return False
-
-    def _select_specialized_model(self, prompt: str) -> str | None:
-        """Determine if prompt requires specialized reasoning models."""
-        prompt_lower = prompt.lower()
-        word_count = len(prompt.split())
-
-        code_block = "```" in prompt or re.search(
-            r"\b(def|class|import|public|private|interface|lambda)\b", prompt_lower
-        )
-        math_score = sum(1 for kw in self.math_indicators if kw in prompt_lower)
-        science_score = sum(1 for kw in self.science_indicators if kw in prompt_lower)
-        coding_score = sum(1 for kw in self.coding_indicators if kw in prompt_lower)
-
-        equation_pattern = re.search(r"(=|∑|∫|√|π|≈|≥|≤|\^|\bprove\b|\bderive\b)", prompt_lower)
-        scientific_pattern = re.search(
-            r"\bmodel(?:ing)?\b|\bsimulate\b|\bhypothesis\b|\bexperiment\b",
-            prompt_lower,
-        )
-
-        heavy_trigger = (
-            word_count > 80
-            or "multi-step" in prompt_lower
-            or "step-by-step" in prompt_lower
-            or "detailed" in prompt_lower
-            or "comprehensive" in prompt_lower
-            or "optimize" in prompt_lower
-            or "refactor" in prompt_lower
-            or "architect" in prompt_lower
-        )
+    @staticmethod
+    def _specialized_model_for(features: RoutingFeatures) -> str | None:
+        heavy = features.heavy
 
         # Coding dominance
-        if coding_score >= 2 or code_block:
-            return "o3" if heavy_trigger or coding_score >= 4 else "o3-mini"
+        if features.coding_score >= 2 or features.code_block:
+            return "o3" if heavy or features.coding_score >= 4 else "o3-mini"
 
         # Math dominance
-        if math_score >= 2 or equation_pattern:
-            return "o3" if heavy_trigger or math_score >= 4 else "o3-mini"
+        if features.math_score >= 2 or features.equation:
+            return "o3" if heavy or features.math_score >= 4 else "o3-mini"
 
         # Science dominance
-        if science_score >= 2 or scientific_pattern:
-            return "o3" if heavy_trigger or science_score >= 4 else "o3-mini"
+        if features.science_score >= 2 or features.scientific:
+            return "o3" if heavy or features.science_score >= 4 else "o3-mini"
 
         return None
 
+    def _select_specialized_model(self, prompt: str) -> str | None:
+        """Determine if prompt requires specialized reasoning models."""
+        return self._specialized_model_for(self.extract_features(prompt))
+
 
 class ModelResponseCache:
     """
@@ -484,3 +656,467 @@ class ModelMetrics:
                 "cache_hits": defaultdict(int),
                 "cache_misses": defaultdict(int),
             }
+
+
+# Per-1K-token pricing for the models the router can select. Same shape as
+# glimpse.alignment.OpenAIAlignmentChecker.MODEL_PRICING, which is consulted
+# for any model not listed here.
+MODEL_PRICING = {
+    "gpt-4o-mini": {"input": 0.00015, "output": 0.0006, "context": 128000},
+    "gpt-4o": {"input": 0.0025, "output": 0.01, "context": 128000},
+    "gpt-4o-search-preview": {"input": 0.0025, "output": 0.01, "context": 128000},
+    "o3-mini": {"input": 0.0011, "output": 0.0044, "context": 200000},
+    "o3": {"input": 0.002, "output": 0.008, "context": 200000},
+}
+
+# Routing capabilities: family groups interchangeable models, quality orders them
+MODEL_CAPABILITIES = {
+    "gpt-4o-mini": {"family": "chat", "quality": 1, "tools": True},
+    "gpt-4o": {"family": "chat", "quality": 2, "tools": True},
+    "gpt-4o-search-preview": {"family": "search", "quality": 2, "tools": False},
+    "o3-mini": {"family": "reasoning", "quality": 2, "tools": True},
+    "o3": {"family": "reasoning", "quality": 3, "tools": True},
+}
+
+
+def get_model_pricing(model: str) -> dict[str, float] | None:
+    """Return per-1K-token pricing for a model, or None if unknown."""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is not None:
+        return pricing
+    try:
+        from glimpse.alignment import OpenAIAlignmentChecker
+    except ImportError:
+        return None
+    return OpenAIAlignmentChecker.MODEL_PRICING.get(model)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate request cost in USD from token counts (0.0 for unknown models)."""
+    pricing = get_model_pricing(model)
+    if pricing is None:
+        return 0.0
+    return (prompt_tokens / 1000) * pricing["input"] + (completion_tokens / 1000) * pricing["output"]
+
+
+@dataclass
+class RoutingSLO:
+    """Per-request service level objectives for model routing."""
+
+    max_latency_s: float | None = None  # rolling p95 latency ceiling
+    max_error_rate: float = 0.2
+    min_quality: int = 0
+    expected_output_tokens: int = 512
+
+
+@dataclass
+class RoutingDecision:
+    """A routing decision and, once recorded, its measured outcome."""
+
+    decision_id: str
+    timestamp: float
+    prompt_hash: str
+    baseline_model: str
+    model: str
+    candidates: list[str]
+    reason: str
+    explored: bool = False
+    estimated_cost: float = 0.0
+    # Outcome (filled by RoutingEngine.record_outcome)
+    latency_s: float | None = None
+    success: bool | None = None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cost: float | None = None
+    error: str | None = None
+    # Set once export_decisions() has written the decision with its outcome
+    exported: bool = False
+
+
+class RollingModelStats:
+    """
+    Rolling window of per-model outcomes with O(1) updates.
+
+    Keeps the last ``window`` requests and running sums so averages and
+    error rates are available without rescanning the window.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: deque[tuple[float, bool, int, int, float]] = deque()
+        self._latency_sum = 0.0
+        self._errors = 0
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._token_samples = 0  # successful samples that reported completion tokens
+        self._cost = 0.0
+        self.total_requests = 0
+        self.total_cost = 0.0
+
+    def record(
+        self,
+        latency_s: float,
+        success: bool,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cost: float = 0.0,
+    ) -> None:
+        sample = (latency_s, success, prompt_tokens, completion_tokens, cost)
+        self._samples.append(sample)
+        self._add(sample, 1)
+        if len(self._samples) > self.window:
+            self._add(self._samples.popleft(), -1)
+        self.total_requests += 1
+        self.total_cost += cost
+
+    def _add(self, sample: tuple[float, bool, int, int, float], sign: int) -> None:
+        latency_s, success, prompt_tokens, completion_tokens, cost = sample
+        self._latency_sum += sign * latency_s
+        self._errors += sign * (0 if success else 1)
+        self._prompt_tokens += sign * prompt_tokens
+        self._completion_tokens += sign * completion_tokens
+        self._token_samples += sign * (1 if success and completion_tokens > 0 else 0)
+        self._cost += sign * cost
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    @property
+    def error_rate(self) -> float:
+        return self._errors / len(self._samples) if self._samples else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self._latency_sum / len(self._samples) if self._samples else 0.0
+
+    @property
+    def token_samples(self) -> int:
+        return self._token_samples
+
+    @property
+    def avg_completion_tokens(self) -> float:
+        """Mean completion tokens over the successful samples that reported usage."""
+        return self._completion_tokens / self._token_samples if self._token_samples else 0.0
+
+    @property
+    def avg_cost(self) -> float:
+        return self._cost / len(self._samples) if self._samples else 0.0
+
+    def latency_percentile(self, q: float) -> float:
+        """Latency percentile over the window (q in [0, 1])."""
+        if not self._samples:
+            return 0.0
+        latencies = sorted(s[0] for s in self._samples)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_requests": self.total_requests,
+            "error_rate": self.error_rate,
+            "avg_latency": self.avg_latency,
+            "p95_latency": self.latency_percentile(0.95),
+            "avg_prompt_tokens": self._prompt_tokens / self.count if self.count else 0.0,
+            "avg_completion_tokens": self.avg_completion_tokens,
+            "avg_cost": self.avg_cost,
+            "total_cost": self.total_cost,
+        }
+
+
+class RoutingEngine:
+    """
+    Cost- and latency-aware routing on top of ModelRouter's heuristics.
+
+    ModelRouter.select_model supplies the baseline (which capability family
+    and minimum quality a prompt needs). The engine then picks the cheapest
+    model in that family whose rolling stats meet the request's SLO, explores
+    alternatives epsilon-greedily, and skips models whose circuit breaker is
+    open. Decisions and outcomes are kept for offline evaluation.
+    """
+
+    def __init__(
+        self,
+        router: ModelRouter | None = None,
+        breakers: Any | None = None,
+        epsilon: float = 0.05,
+        min_samples: int = 10,
+        window: int = 200,
+        max_decisions: int = 10000,
+        seed: int | None = None,
+    ):
+        """
+        Args:
+            router: Heuristic router providing the baseline model
+            breakers: ExternalServiceBreakers (or anything with get_model_breaker);
+                defaults to the process-wide instance when available
+            epsilon: Exploration probability among SLO-eligible candidates
+            min_samples: Samples needed before a model's stats can exclude it
+            window: Rolling window size for per-model stats
+            max_decisions: Number of decisions retained for export
+            seed: Optional RNG seed for reproducible exploration
+        """
+        self.router = router or ModelRouter()
+        self.epsilon = epsilon
+        self.min_samples = min_samples
+        self.window = window
+        self.stats: dict[str, RollingModelStats] = {}
+        self.decisions: deque[RoutingDecision] = deque(maxlen=max_decisions)
+        self._rng = random.Random(seed)  # noqa: S311 - exploration sampling, not security
+        self._opened_at: dict[str, float] = {}  # monotonic time each model's breaker was seen opening
+
+        if breakers is None:
+            try:
+                from app.resilience.circuit_breakers import get_external_breakers
+
+                breakers = get_external_breakers()
+            except Exception as e:  # optional dependency (pybreaker/redis/config)
+                logger.debug("Routing without circuit breakers: %s", e)
+        self.breakers = breakers
+
+    def _stats_for(self, model: str) -> RollingModelStats:
+        stats = self.stats.get(model)
+        if stats is None:
+            stats = self.stats[model] = RollingModelStats(self.window)
+        return stats
+
+    def is_available(self, model: str) -> bool:
+        """False while the model's circuit breaker is open and not yet due for a probe."""
+        if self.breakers is None:
+            return True
+        breaker = self.breakers.get_model_breaker(model)
+        if breaker.current_state != "open":
+            self._opened_at.pop(model, None)
+            return True
+        # A breaker opened elsewhere (shared storage) is timed from when this engine first saw it
+        opened_at = self._opened_at.setdefault(model, time.monotonic())
+        # Let a probe through once reset_timeout has elapsed (half-open)
+        return time.monotonic() >= opened_at + breaker.reset_timeout
+
+    def _feed_breaker(self, model: str, success: bool, error: BaseException | str | None) -> None:
+        """Replay a measured outcome through the model's circuit breaker so failures can open it."""
+        if self.breakers is None:
+            return
+        breaker = self.breakers.get_model_breaker(model)
+        ran = False
+
+        def outcome() -> None:
+            nonlocal ran
+            ran = True
+            if not success:
+                raise error if isinstance(error, Exception) else RuntimeError(str(error or "model call failed"))
+
+        # Raises the replayed failure, or CircuitBreakerError while the breaker refuses calls
+        with contextlib.suppress(Exception):
+            breaker.call(outcome)
+        if breaker.current_state != "open":
+            self._opened_at.pop(model, None)
+        elif ran:
+            self._opened_at[model] = time.monotonic()  # just opened, or re-opened by a failed probe
+
+    def _meets_slo(self, model: str, slo: RoutingSLO) -> bool:
+        stats = self.stats.get(model)
+        if stats is None or stats.count < self.min_samples:
+            return True  # optimistic until there is evidence
+        if stats.error_rate > slo.max_error_rate:
+            return False
+        if slo.max_latency_s is not None and stats.latency_percentile(0.95) > slo.max_latency_s:
+            return False
+        return True
+
+    def _expected_cost(self, model: str, prompt: str, slo: RoutingSLO) -> float:
+        stats = self.stats.get(model)
+        completion = (
+            stats.avg_completion_tokens
+            if stats is not None and stats.token_samples >= self.min_samples
+            else slo.expected_output_tokens
+        )
+        return estimate_cost(model, len(prompt) // 4 + 1, int(completion))
+
+    def route(
+        self,
+        prompt: str,
+        tools: list[dict] | None = None,
+        slo: RoutingSLO | None = None,
+        exclude: set[str] | None = None,
+    ) -> RoutingDecision:
+        """
+        Choose a model for a prompt.
+
+        Args:
+            prompt: User prompt
+            tools: Tools the request will use (rules out tool-less models)
+            slo: Latency/quality objectives for this request
+            exclude: Models to skip (e.g. ones that just failed)
+
+        Returns:
+            RoutingDecision with the chosen model; pass it to record_outcome()
+        """
+        slo = slo or RoutingSLO()
+        exclude = exclude or set()
+        baseline = self.router.select_model(prompt, tools)
+        base_caps = MODEL_CAPABILITIES.get(baseline, {"family": None, "quality": 0})
+        min_quality = max(base_caps["quality"], slo.min_quality)
+
+        def usable(model: str, caps: dict) -> bool:
+            return model not in exclude and (caps["tools"] or not tools) and self.is_available(model)
+
+        family = [
+            m
+            for m, caps in MODEL_CAPABILITIES.items()
+            if caps["family"] == base_caps["family"] and caps["quality"] >= min_quality and usable(m, caps)
+        ]
+        reason = "cheapest_in_slo"
+        candidates = family
+        if not candidates:
+            # Fail over across families rather than sending traffic to an open breaker
+            reason = "failover"
+            candidates = [
+                m for m, caps in MODEL_CAPABILITIES.items() if caps["quality"] >= min_quality and usable(m, caps)
+            ] or [m for m, caps in MODEL_CAPABILITIES.items() if usable(m, caps)]
+
+        if not candidates:
+            reason = "no_available_model"
+            model, eligible, explored = baseline, [baseline], False
+        else:
+            eligible = [m for m in candidates if self._meets_slo(m, slo)]
+            if not eligible:
+                # Nothing meets the SLO: take the fastest observed candidate
+                reason = "slo_unmet_fastest"
+                eligible = [min(candidates, key=lambda m: self._stats_for(m).latency_percentile(0.95))]
+            explored = len(eligible) > 1 and self._rng.random() < self.epsilon
+            if explored:
+                model = self._rng.choice(eligible)
+                reason = "explore"
+            else:
+                model = min(eligible, key=lambda m: self._expected_cost(m, prompt, slo))
+
+        decision = RoutingDecision(
+            decision_id=uuid.uuid4().hex,
+            timestamp=time.time(),
+            prompt_hash=hashlib.sha256(prompt.encode()).hexdigest()[:16],
+            baseline_model=baseline,
+            model=model,
+            candidates=list(eligible),
+            reason=reason,
+            explored=explored,
+            estimated_cost=self._expected_cost(model, prompt, slo),
+        )
+        self.decisions.append(decision)
+        logger.debug("Routed to %s (baseline %s, reason %s)", model, baseline, reason)
+        return decision
+
+    def record_outcome(
+        self,
+        decision: RoutingDecision,
+        latency_s: float,
+        success: bool = True,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        error: BaseException | str | None = None,
+    ) -> None:
+        """
+        Feed a measured outcome back into the model's rolling stats and circuit breaker.
+
+        Callers that make the model call themselves (rather than through
+        execute()) should pass the token counts from the response; see
+        usage_tokens().
+        """
+        self._feed_breaker(decision.model, success, error)
+        cost = estimate_cost(decision.model, prompt_tokens, completion_tokens)
+        self._stats_for(decision.model).record(latency_s, success, prompt_tokens, completion_tokens, cost)
+        decision.latency_s = latency_s
+        decision.success = success
+        decision.prompt_tokens = prompt_tokens
+        decision.completion_tokens = completion_tokens
+        decision.cost = cost
+        decision.error = str(error) if error is not None else None
+
+    @staticmethod
+    def usage_tokens(response: Any) -> tuple[int, int]:
+        """(prompt, completion) tokens from an OpenAI response's usage (Chat Completions or Responses API)."""
+        usage = getattr(response, "usage", None)
+        counts = []
+        for names in (("prompt_tokens", "input_tokens"), ("completion_tokens", "output_tokens")):
+            value = next((getattr(usage, n, None) for n in names if isinstance(getattr(usage, n, None), int)), 0)
+            counts.append(value)
+        return counts[0], counts[1]
+
+    def execute(
+        self,
+        prompt: str,
+        call: Callable[[str], Any],
+        tools: list[dict] | None = None,
+        slo: RoutingSLO | None = None,
+        max_attempts: int = 3,
+    ) -> tuple[Any, RoutingDecision]:
+        """
+        Route, run call(model) and fail over; outcomes feed the model's circuit breaker.
+
+        ``call`` may return an object with a ``usage`` attribute (OpenAI
+        responses); its token counts are recorded with the outcome.
+
+        Returns:
+            (result, decision) for the attempt that succeeded
+
+        Raises:
+            The last error if every attempted model failed
+        """
+        tried: set[str] = set()
+        last_error: BaseException | None = None
+        for _ in range(max_attempts):
+            decision = self.route(prompt, tools, slo, exclude=tried)
+            if decision.reason == "no_available_model" and decision.model in tried:
+                break
+            tried.add(decision.model)
+            start = time.perf_counter()
+            try:
+                result = call(decision.model)
+            except Exception as e:
+                last_error = e
+                self.record_outcome(decision, time.perf_counter() - start, success=False, error=e)
+                logger.warning("Model %s failed, failing over: %s", decision.model, e)
+                continue
+            prompt_tokens, completion_tokens = self.usage_tokens(result)
+            self.record_outcome(
+                decision,
+                time.perf_counter() - start,
+                success=True,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            return result, decision
+        if last_error is None:
+            last_error = RuntimeError("No model available for routing")
+        raise last_error
+
+    def get_model_stats(self) -> dict[str, dict[str, Any]]:
+        """Per-model rolling latency, error rate, token usage and cost."""
+        return {model: stats.to_dict() for model, stats in self.stats.items()}
+
+    def get_decisions(self) -> list[dict[str, Any]]:
+        """Retained routing decisions (with outcomes where recorded) as dicts."""
+        return [asdict(d) for d in self.decisions]
+
+    def export_decisions(self, path: str | Path) -> int:
+        """
+        Append completed decisions to a JSONL file for offline evaluation.
+
+        Only decisions with a recorded outcome that were not exported before
+        are written, so repeated exports never duplicate rows and a pending
+        decision is written once, with its outcome.
+
+        Returns:
+            Number of decisions written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        decisions = [d for d in self.decisions if d.success is not None and not d.exported]
+        with open(path, "a", encoding="utf-8") as f:
+            for decision in decisions:
+                row = asdict(decision)
+                del row["exported"]
+                f.write(json.dumps(row) + "\n")
+        for decision in decisions:
+            decision.exported = True
+        return len(decisions)
@@ -79,6 +79,8 @@ class ExternalServiceBreakers:
             redis_client: Redis client for distributed storage. If None, uses in-memory storage.
         """
         config = get_config()
+        self._redis_client = redis_client
+        self._model_breakers: dict[str, pybreaker.CircuitBreaker] = {}
 
         # Use Redis storage if available, otherwise in-memory
         if redis_client:
@@ -156,6 +158,38 @@ class ExternalServiceBreakers:
 
         return service_breakers.get(service_name.lower(), self.generic)
 
+    def get_model_breaker(self, model: str) -> pybreaker.CircuitBreaker:
+        """
+        Get (or lazily create) a circuit breaker for a single LLM model.
+
+        Per-model breakers use the LLM thresholds but keep independent state so
+        that one failing model can be routed around while others stay closed.
+
+        Args:
+            model: Model name, e.g. "gpt-4o-mini"
+
+        Returns:
+            CircuitBreaker instance for the model
+        """
+        breaker = self._model_breakers.get(model)
+        if breaker is None:
+            config = get_config()
+            name = f"llm:{model}"
+            if self._redis_client:
+                storage = pybreaker.CircuitRedisStorage(pybreaker.STATE_CLOSED, self._redis_client, namespace=name)
+            else:
+                storage = pybreaker.CircuitMemoryStorage(pybreaker.STATE_CLOSED)
+            breaker = pybreaker.CircuitBreaker(
+                fail_max=config.resilience.llm_fail_max,
+                reset_timeout=config.resilience.llm_reset_timeout,
+                state_storage=storage,
+                name=name,
+                exclude=[ValueError, TypeError],
+                listeners=[PrometheusListener(name)],
+            )
+            self._model_breakers[model] = breaker
+        return breaker
+
     async def get_status(self) -> dict[str, dict[str, Any]]:
         """
         Get status of all circuit breakers for monitoring.
@@ -178,6 +212,15 @@ class ExternalServiceBreakers:
                 "name": breaker.name,
             }
 
+        for model, breaker in self._model_breakers.items():
+            status[f"llm:{model}"] = {
+                "state": breaker.current_state,
+                "fail_counter": breaker.fail_counter,
+                "fail_max": breaker.fail_max,
+                "reset_timeout": breaker.reset_timeout,
+                "name": breaker.name,
+            }
+
         return status
 
 
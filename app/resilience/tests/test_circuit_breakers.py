@@ -125,6 +125,18 @@ class TestExternalServiceBreakers:
         assert breakers.get_breaker_for_service("unknown") is breakers.generic
         assert breakers.get_breaker_for_service("random-api") is breakers.generic
 
+    def test_get_model_breaker_is_per_model(self):
+        """Test that each model gets its own independent breaker."""
+        breakers = ExternalServiceBreakers()
+
+        mini = breakers.get_model_breaker("gpt-4o-mini")
+        assert mini is breakers.get_model_breaker("gpt-4o-mini")
+        assert mini is not breakers.get_model_breaker("gpt-4o")
+        assert mini.name == "llm:gpt-4o-mini"
+
+        mini.open()
+        assert breakers.get_model_breaker("gpt-4o").current_state == pybreaker.STATE_CLOSED
+
     @pytest.mark.asyncio
     async def test_get_status(self):
         """Test getting breaker status."""
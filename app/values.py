@@ -3,13 +3,201 @@ Value System for Echoes Assistant V2
 
 Manages three core values: respect, accuracy, helpfulness
 Provides scoring mechanisms for response evaluation and behavior learning.
+
+Responses are scored by indicator phrases (VALUE_INDICATORS). The phrases of
+every value are compiled once into an IndicatorMatcher that both the
+single-response API and the batch evaluator use:
+
+- evaluate_response: one lowercase pass and one lookup per distinct phrase
+- evaluate_batch: an N x values NumPy score matrix. Each phrase is searched
+  once across the whole batch.
+- evaluate_jsonl: streams score matrices for a JSONL transcript corpus,
+  optionally across worker processes.
 """
 
 import json
+import multiprocessing
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+# value -> (base score, [(score change per matched phrase, phrases), ...]) applied in order.
+# Each phrase counts at most once per response and matches as a substring of the lowercased text.
+VALUE_INDICATORS: dict[str, tuple[float, list[tuple[float, tuple[str, ...]]]]] = {
+    # Respect: avoiding harm, considering user feelings
+    "respect": (
+        0.7,
+        [
+            (
+                -0.1,
+                (
+                    "stupid",
+                    "idiot",
+                    "dumb",
+                    "wrong",
+                    "bad",
+                    "terrible",
+                    "you should",
+                    "you must",
+                    "you have to",  # Too directive
+                ),
+            ),
+            (
+                0.05,
+                ("i understand", "that makes sense", "let me help", "i appreciate", "thank you", "please", "sorry"),
+            ),
+        ],
+    ),
+    # Accuracy: factual correctness, avoiding misinformation
+    "accuracy": (
+        0.8,
+        [
+            (
+                -0.05,
+                ("i think", "maybe", "perhaps", "probably", "might be", "could be", "not sure", "i'm not certain"),
+            ),
+            (
+                0.1,
+                ("according to", "research shows", "data indicates", "fact", "evidence", "source", "verified"),
+            ),
+        ],
+    ),
+    # Helpfulness: solving problems, providing value
+    "helpfulness": (
+        0.6,
+        [
+            (
+                0.1,
+                (
+                    "here's how",
+                    "you can",
+                    "try this",
+                    "solution",
+                    "step by step",
+                    "example",
+                    "guide",
+                    "help",
+                    "recommend",
+                    "suggest",
+                    "option",
+                    "alternative",
+                ),
+            ),
+            (-0.2, ("i don't know", "i can't help", "no idea", "sorry, i can't", "that's not possible")),
+        ],
+    ),
+}
+
+
+class IndicatorMatcher:
+    """
+    Every value's indicator phrases compiled into one phrase table.
+
+    A response's scores are computed from the set of distinct phrases it
+    contains. Matches are counted per indicator group (integer counts), and
+    each group's change is then applied in VALUE_INDICATORS order. Single and
+    batch scoring therefore give identical floats.
+    """
+
+    def __init__(self, indicators: dict[str, tuple[float, list[tuple[float, tuple[str, ...]]]]] = VALUE_INDICATORS):
+        self.value_names = tuple(indicators)
+        self.base = np.array([base for base, _ in indicators.values()])
+        phrase_ids: dict[str, int] = {}
+        self.groups: list[tuple[int, float]] = []  # (value column, change per match)
+        members: list[list[int]] = []
+        for column, (_, rules) in enumerate(indicators.values()):
+            for change, phrases in rules:
+                self.groups.append((column, change))
+                members.append([phrase_ids.setdefault(phrase, len(phrase_ids)) for phrase in phrases])
+        self.phrases = tuple(phrase_ids)
+
+        # phrase -> groups it counts towards; as a matrix, presence @ membership gives group counts
+        phrase_groups: list[list[int]] = [[] for _ in self.phrases]
+        self.membership = np.zeros((len(self.phrases), len(self.groups)), dtype=np.int64)
+        for group, ids in enumerate(members):
+            for i in ids:
+                phrase_groups[i].append(group)
+                self.membership[i, group] += 1
+        self._table = [(phrase, tuple(groups)) for phrase, groups in zip(self.phrases, phrase_groups, strict=True)]
+
+    def score(self, text: str) -> dict[str, float]:
+        """Scores for one response."""
+        lowered = text.lower()
+        counts = [0] * len(self.groups)
+        for phrase, groups in self._table:
+            if phrase in lowered:
+                for group in groups:
+                    counts[group] += 1
+        scores = [float(base) for base in self.base]
+        for group, (column, change) in enumerate(self.groups):
+            scores[column] += counts[group] * change
+        return {name: max(0.0, min(1.0, score)) for name, score in zip(self.value_names, scores, strict=True)}
+
+    def presence(self, texts: Sequence[str]) -> np.ndarray:
+        """N x phrases boolean matrix: which distinct phrases each text contains."""
+        lowered = [text.lower() for text in texts]
+        found = np.zeros((len(lowered), len(self.phrases)), dtype=bool)
+        if not lowered:
+            return found
+        # One joined haystack: each phrase is located with str.find across the batch,
+        # skipping to the next text after a hit (phrases never contain the separator)
+        starts = [0]
+        for text in lowered:
+            starts.append(starts[-1] + len(text) + 1)
+        haystack = "\0".join(lowered)
+        last = len(lowered) - 1
+        for column, phrase in enumerate(self.phrases):
+            rows = []
+            pos = haystack.find(phrase)
+            while pos != -1:
+                row = bisect_right(starts, pos) - 1
+                rows.append(row)
+                if row == last:
+                    break
+                pos = haystack.find(phrase, starts[row + 1])
+            found[rows, column] = True
+        return found
+
+    def score_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """N x values float matrix (columns in ``value_names`` order)."""
+        counts = self.presence(texts).astype(np.int64) @ self.membership
+        scores = np.tile(self.base, (len(texts), 1))
+        for group, (column, change) in enumerate(self.groups):
+            scores[:, column] += counts[:, group] * change
+        return np.clip(scores, 0.0, 1.0, out=scores)
+
+
+_default_matcher: IndicatorMatcher | None = None
+
+
+def get_indicator_matcher() -> IndicatorMatcher:
+    """The compiled matcher for VALUE_INDICATORS (built once per process)."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = IndicatorMatcher()
+    return _default_matcher
+
+
+def _score_jsonl_chunk(args: tuple[int, list[str], str]) -> tuple[list[int], np.ndarray]:
+    """Parse and score a chunk of JSONL lines; returns (line numbers, score matrix). Runs in worker processes."""
+    first_line, lines, field = args
+    numbers, texts = [], []
+    for offset, raw in enumerate(lines):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            continue
+        text = record.get(field) if isinstance(record, dict) else record
+        if isinstance(text, str):
+            numbers.append(first_line + offset)
+            texts.append(text)
+    return numbers, get_indicator_matcher().score_matrix(texts)
+
 
 @dataclass
 class ValueScore:
@@ -52,6 +240,8 @@ class ValueSystem:
         # Load existing values if available
         self.load_values()
 
+        self.matcher = get_indicator_matcher()
+
     def get_value_score(self, value_name: str) -> float:
         """Get the current score for a specific value."""
         if value_name not in self.values:
@@ -94,18 +284,56 @@ class ValueSystem:
         Returns:
             Dictionary with scores for each value
         """
-        scores = {}
+        return self.matcher.score(response)
+
+    def evaluate_batch(self, responses: Sequence[str]) -> np.ndarray:
+        """
+        Evaluate many responses in one pass.
+
+        Args:
+            responses: Response texts
+
+        Returns:
+            N x values matrix of scores, columns in ``self.matcher.value_names`` order
+        """
+        return self.matcher.score_matrix(responses)
+
+    def evaluate_jsonl(
+        self,
+        path: str | Path,
+        field: str = "response",
+        batch_size: int = 2048,
+        processes: int = 1,
+    ) -> Iterator[tuple[list[int], np.ndarray]]:
+        """
+        Stream scores for a JSONL corpus, one chunk at a time.
 
-        # Evaluate respect (avoiding harm, considering user feelings)
-        scores["respect"] = self._evaluate_respect(response, context)
+        Each line is a JSON object whose ``field`` holds the response text, or
+        a bare JSON string. Blank, malformed and text-less lines are skipped.
 
-        # Evaluate accuracy (factual correctness, avoiding misinformation)
-        scores["accuracy"] = self._evaluate_accuracy(response, context)
+        Args:
+            path: JSONL file to read
+            field: Key of the response text in each record
+            batch_size: Lines scored together
+            processes: Worker processes; chunks are parsed and scored in
+                parallel and yielded in file order
+
+        Yields:
+            (1-based line numbers, matching rows of the score matrix)
+        """
+        with open(path, encoding="utf-8") as f:
 
-        # Evaluate helpfulness (solving problems, providing value)
-        scores["helpfulness"] = self._evaluate_helpfulness(response, context)
+            def chunks() -> Iterator[tuple[int, list[str], str]]:
+                line = 1
+                while lines := list(islice(f, batch_size)):
+                    yield line, lines, field
+                    line += len(lines)
 
-        return scores
+            if processes <= 1:
+                yield from map(_score_jsonl_chunk, chunks())
+                return
+            with multiprocessing.get_context().Pool(processes) as pool:
+                yield from pool.imap(_score_jsonl_chunk, chunks())
 
     def get_overall_score(self, response_scores: dict[str, float]) -> float:
         """
@@ -125,6 +353,14 @@ class ValueSystem:
 
         return weighted_sum / total_weight
 
+    def get_overall_scores(self, score_matrix: np.ndarray) -> np.ndarray:
+        """Weighted overall score for every row of an evaluate_batch matrix."""
+        weights = np.array([self.get_value_weight(name) for name in self.matcher.value_names])
+        total_weight = sum(self.get_value_weight(name) for name in self.values.keys())
+        if total_weight == 0:
+            return np.zeros(len(score_matrix))
+        return score_matrix @ weights / total_weight
+
     def provide_feedback(
         self,
         response: str,
@@ -180,117 +416,15 @@ class ValueSystem:
 
     def _evaluate_respect(self, response: str, context: dict[str, Any] | None = None) -> float:
         """Evaluate response for respect (avoiding harm, empathy, boundaries)."""
-        response_lower = response.lower()
-
-        # Negative indicators (reduce score)
-        negative_indicators = [
-            "stupid",
-            "idiot",
-            "dumb",
-            "wrong",
-            "bad",
-            "terrible",
-            "you should",
-            "you must",
-            "you have to",  # Too directive
-        ]
-
-        # Positive indicators (increase score)
-        positive_indicators = [
-            "i understand",
-            "that makes sense",
-            "let me help",
-            "i appreciate",
-            "thank you",
-            "please",
-            "sorry",
-        ]
-
-        negative_count = sum(1 for word in negative_indicators if word in response_lower)
-        positive_count = sum(1 for word in positive_indicators if word in response_lower)
-
-        # Base score of 0.7, adjusted by indicators
-        score = 0.7
-        score -= negative_count * 0.1  # -0.1 per negative indicator
-        score += positive_count * 0.05  # +0.05 per positive indicator
-
-        return max(0.0, min(1.0, score))
+        return self.matcher.score(response)["respect"]
 
     def _evaluate_accuracy(self, response: str, context: dict[str, Any] | None = None) -> float:
         """Evaluate response for accuracy (factual correctness, avoiding uncertainty)."""
-        response_lower = response.lower()
-
-        # Indicators of uncertainty (reduce score)
-        uncertainty_indicators = [
-            "i think",
-            "maybe",
-            "perhaps",
-            "probably",
-            "might be",
-            "could be",
-            "not sure",
-            "i'm not certain",
-        ]
-
-        # Indicators of confidence (increase score)
-        confidence_indicators = [
-            "according to",
-            "research shows",
-            "data indicates",
-            "fact",
-            "evidence",
-            "source",
-            "verified",
-        ]
-
-        uncertainty_count = sum(1 for phrase in uncertainty_indicators if phrase in response_lower)
-        confidence_count = sum(1 for phrase in confidence_indicators if phrase in response_lower)
-
-        # Base score of 0.8, adjusted by indicators
-        score = 0.8
-        score -= uncertainty_count * 0.05  # -0.05 per uncertainty indicator
-        score += confidence_count * 0.1  # +0.1 per confidence indicator
-
-        return max(0.0, min(1.0, score))
+        return self.matcher.score(response)["accuracy"]
 
     def _evaluate_helpfulness(self, response: str, context: dict[str, Any] | None = None) -> float:
         """Evaluate response for helpfulness (solving problems, providing value)."""
-        response_lower = response.lower()
-
-        # Indicators of helpfulness (increase score)
-        helpful_indicators = [
-            "here's how",
-            "you can",
-            "try this",
-            "solution",
-            "step by step",
-            "example",
-            "guide",
-            "help",
-            "recommend",
-            "suggest",
-            "option",
-            "alternative",
-        ]
-
-        # Indicators of unhelpfulness (reduce score)
-        unhelpful_indicators = [
-            "i don't know",
-            "i can't help",
-            "no idea",
-            "sorry, i can't",
-            "that's not possible",
-        ]
-
-        helpful_count = sum(1 for phrase in helpful_indicators if phrase in response_lower)
-        unhelpful_count = sum(1 for phrase in unhelpful_indicators if phrase in response_lower)
-
-        # Base score of 0.6, adjusted by indicators
-        score = 0.6
-        score += helpful_count * 0.1  # +0.1 per helpful indicator
-        score -= unhelpful_count * 0.2  # -0.2 per unhelpful indicator
-
-        return max(0.0, min(1.0, score))
+        return self.matcher.score(response)["helpfulness"]
 
     def get_values_summary(self) -> dict[str, Any]:
         """Get a summary of current values and their scores."""
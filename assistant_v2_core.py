@@ -47,13 +47,16 @@ from openai import APIError, AuthenticationError, OpenAI
 
 from core_modules.caching import cached_method
 from core_modules.catch_release_system import CacheLevel, ContentType, catch_release
+from core_modules.context_window import ContextWindow, Summarizer, Tokenizer, estimate_tokens
 from core_modules.cross_reference_system import cross_reference_system
 from core_modules.directory_analysis_mixin import DirectoryAnalysisMixin
 from core_modules.dynamic_error_handler import error_handler
+from core_modules.event_log import get_event_log
 from core_modules.humor_engine import PressureLevel, humor_engine
 from core_modules.intent_awareness_engine import IntentType, intent_engine
 from core_modules.knowledge_graph_mixin import KnowledgeGraphMixin
 from core_modules.legal_accounting_mixin import LegalAccountingMixin
+from core_modules.memory_store import MemoryStore
 from core_modules.metrics import ModelMetrics
 from core_modules.multimodal_mixin import MultimodalMixin
 from core_modules.parallel_simulation_engine import (
@@ -101,6 +104,7 @@ try:
         GlimpseResult,
         PrivacyGuard,
     )
+    from glimpse.client_factory import get_http_client
 
     GLIMPSE_AVAILABLE = True
 except ImportError as e:
@@ -134,6 +138,9 @@ except ImportError as e:
                 essence=f"Intent: {draft.goal}; constraints: {draft.constraints or 'none'}",
             )
 
+    def get_http_client():
+        return None  # OpenAI falls back to its own per-client pool
+
 
 # Action Execution
 try:
@@ -192,7 +199,7 @@ except ImportError as e:
 
 # Dynamic Model Router
 try:
-    from app.model_router import ModelMetrics, ModelResponseCache, ModelRouter
+    from app.model_router import ModelMetrics, ModelResponseCache, ModelRouter, RoutingEngine
 
     MODEL_ROUTER_AVAILABLE = True
 except ImportError as e:
@@ -208,6 +215,10 @@ except ImportError as e:
     class ModelMetrics:
         pass
 
+    class RoutingEngine:
+        def __init__(self, *args, **kwargs):
+            pass
+
 
 # Quantum State Management
 try:
@@ -385,16 +396,40 @@ MAX_TOOL_ITERATIONS = 5
 
 
 class ContextManager:
-    def __init__(self, max_history: int = 10, max_tokens: int = 8000):
+    """
+    Per-session conversation windows capped at ``max_history`` exchanges and ``max_tokens`` tokens.
+
+    See core_modules.context_window. Token counts are cached per message, so
+    ``get_token_count`` costs nothing extra. A ``summarizer`` folds evicted
+    turns into a summary message kept after any pinned system message.
+    """
+
+    def __init__(
+        self,
+        max_history: int = 10,
+        max_tokens: int = 8000,
+        tokenizer: Tokenizer | None = None,
+        summarizer: Summarizer | None = None,
+    ):
         self.max_history = max_history
         self.max_tokens = max_tokens
-        self.conversations = {}  # session_id → messages
+        self.tokenizer = tokenizer or estimate_tokens
+        self.summarizer = summarizer
+        self.windows: dict[str, ContextWindow] = {}  # session_id → window
+
+    def _window(self, session_id: str) -> ContextWindow:
+        window = self.windows.get(session_id)
+        if window is None:
+            window = self.windows[session_id] = ContextWindow(
+                self.max_tokens,
+                max_messages=self.max_history * 2,
+                tokenizer=self.tokenizer,
+                summarizer=self.summarizer,
+            )
+        return window
 
     def add_message(self, session_id: str, role: str, content: str):
-        if session_id not in self.conversations:
-            self.conversations[session_id] = []
-
-        self.conversations[session_id].append(
+        self._window(session_id).append(
             {
                 "role": role,
                 "content": content,
@@ -402,53 +437,32 @@ class ContextManager:
             }
         )
 
-        # Keep only recent messages
-        if len(self.conversations[session_id]) > self.max_history * 2:
-            self.conversations[session_id] = self.conversations[session_id][-self.max_history * 2 :]
+    def load_messages(self, session_id: str, messages: list[dict]):
+        """Replace a session's window with restored messages (the newest ones that fit are kept)."""
+        window = self._window(session_id)
+        window.clear()
+        window.extend(messages)
+
+    def pin_message(self, session_id: str, content: str | None, role: str = "system"):
+        """Pin a system message ahead of the history (None clears it)."""
+        self._window(session_id).pin({"role": role, "content": content} if content is not None else None)
 
     def get_messages(self, session_id: str, limit: int | None = None) -> list[dict]:
-        if session_id not in self.conversations:
+        window = self.windows.get(session_id)
+        if window is None:
             return []
+        return window.messages(limit * 2 if limit else None)  # * 2 for user + assistant pairs
 
-        messages = self.conversations[session_id]
-        if limit:
-            return messages[-limit * 2 :]  # * 2 for user + assistant pairs
-        return messages[-self.max_history * 2 :]
+    def get_token_count(self, session_id: str, limit: int | None = None) -> int:
+        """Estimated tokens of what ``get_messages(session_id, limit)`` returns."""
+        window = self.windows.get(session_id)
+        if window is None:
+            return 0
+        return window.tokens(limit * 2 if limit else None)
 
     def clear_session(self, session_id: str):
-        if session_id in self.conversations:
-            del self.conversations[session_id]
-
-
-class MemoryStore:
-    def __init__(self, storage_path: str = "data/memory"):
-        self.storage_path = Path(storage_path)
-        self.storage_path.mkdir(parents=True, exist_ok=True)
-
-    def save_conversation(self, session_id: str, messages: list[dict]):
-        file_path = self.storage_path / f"{session_id}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "session_id": session_id,
-                    "messages": messages,
-                    "saved_at": datetime.now(UTC).isoformat(),
-                },
-                f,
-                indent=2,
-            )
-
-    def load_conversation(self, session_id: str) -> list[dict] | None:
-        file_path = self.storage_path / f"{session_id}.json"
-        if not file_path.exists():
-            return None
-
-        with open(file_path, encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("messages", [])
-
-    def list_conversations(self) -> list[str]:
-        return [f.stem for f in self.storage_path.glob("*.json")]
+        if session_id in self.windows:
+            del self.windows[session_id]
 
 
 class EchoesAssistantV2(
@@ -512,13 +526,15 @@ class EchoesAssistantV2(
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, http_client=get_http_client())
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
 
         # Dynamic Model Router
         self.model_router = ModelRouter()
+        # Cost/latency-aware routing; set ROUTER_EXPLORATION_RATE to enable exploration
+        self.routing_engine = RoutingEngine(self.model_router, epsilon=float(os.getenv("ROUTER_EXPLORATION_RATE", "0")))
         self.response_cache = ModelResponseCache()
         self.model_metrics = ModelMetrics()
 
@@ -543,7 +559,7 @@ class EchoesAssistantV2(
         # Load existing conversation if available
         saved_messages = self.memory_store.load_conversation(self.session_id)
         if saved_messages:
-            self.context_manager.conversations[self.session_id] = saved_messages
+            self.context_manager.load_messages(self.session_id, saved_messages)
 
         # Phase 3: Component Initialization
         # Tool framework
@@ -698,7 +714,6 @@ class EchoesAssistantV2(
 
                 ts = _dt.now(UTC).isoformat()
                 try:
-                    os.makedirs("results", exist_ok=True)
                     rec = {
                         "ts": ts,
                         "input_text": draft.input_text,
@@ -706,12 +721,9 @@ class EchoesAssistantV2(
                         "constraints": draft.constraints,
                         "session_id": self.session_id,
                     }
-                    with open(
-                        os.path.join("results", "glimpse_commits.jsonl"),
-                        "a",
-                        encoding="utf-8",
-                    ) as f:
-                        f.write(_json.dumps(rec, ensure_ascii=False) + "\n")
+                    get_event_log(os.path.join("results", "glimpse_commits.jsonl")).append(
+                        _json.dumps(rec, ensure_ascii=False)
+                    )
                 except Exception:
                     # Silent best-effort; never block user flow
                     pass
@@ -720,8 +732,6 @@ class EchoesAssistantV2(
                 try:
                     import uuid as _uuid
 
-                    audit_path = os.path.expanduser("~/.echoes/audit.ndjson")
-                    os.makedirs(os.path.dirname(audit_path), exist_ok=True)
                     audit_entry = {
                         "id": f"aud-{_uuid.uuid4().hex[:16]}",
                         "timestamp": ts,
@@ -735,8 +745,7 @@ class EchoesAssistantV2(
                             "committed": True,
                         },
                     }
-                    with open(audit_path, "a", encoding="utf-8") as _af:
-                        _af.write(_json.dumps(audit_entry, ensure_ascii=False) + "\n")
+                    get_event_log("~/.echoes/audit.ndjson").append(_json.dumps(audit_entry, ensure_ascii=False))
                 except Exception:
                     # Never block user flow on audit write failure
                     pass
@@ -771,7 +780,7 @@ class EchoesAssistantV2(
                 self.enable_external_contact = False
 
         # API Configuration
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=get_http_client())
         # Default to Responses API (new standard) - migration complete!
         # Set USE_RESPONSES_API=false to use Chat Completions API if needed
         self.use_responses_api = os.getenv("USE_RESPONSES_API", "true").lower() in (
@@ -1124,6 +1133,25 @@ class EchoesAssistantV2(
                 status.error(f"RAG search failed: {str(e)}")
             return []
 
+    def _tally_usage(self, usage: list[int], response) -> None:
+        """Add a response's (or a stream chunk's) token usage to a running [prompt, completion] tally."""
+        prompt_tokens, completion_tokens = self.routing_engine.usage_tokens(response)
+        usage[0] += prompt_tokens
+        usage[1] += completion_tokens
+
+    def _fail_over(self, decision, message: str, tools, tried: set[str], error: Exception):
+        """
+        Record a failed routed call and route the request again.
+
+        The failure feeds the model's circuit breaker, so repeated failures
+        take it out of rotation. Returns the new RoutingDecision, or None when
+        every usable model has already been tried.
+        """
+        self.routing_engine.record_outcome(decision, time.time() - decision.timestamp, success=False, error=error)
+        tried.add(decision.model)
+        retry = self.routing_engine.route(message, tools, exclude=tried)
+        return None if retry.model in tried else retry
+
     def _execute_tool_call(self, tool_call, status: EnhancedStatusIndicator | None = None) -> str:
         if not self.enable_tools or not self.tool_registry:
             error_msg = "Tool calling is disabled or registry not available"
@@ -1514,6 +1542,7 @@ class EchoesAssistantV2(
         # Status indicator
         status = EnhancedStatusIndicator(enabled=show_status if show_status is not None else self.enable_status)
 
+        routing_decision = None
         try:
             # Phase 2: Message Building
             # Build messages
@@ -1554,7 +1583,10 @@ class EchoesAssistantV2(
             tool_calling_enabled = self.enable_tools and self.tool_registry is not None
 
             # Select the best model for this request
-            selected_model = self.model_router.select_model(message, tools)
+            routing_decision = self.routing_engine.route(message, tools)
+            selected_model = routing_decision.model
+            tried_models: set[str] = set()
+            usage = [0, 0]  # prompt, completion tokens across this request's calls
             start_time = time.time()
 
             # Convert messages to appropriate format
@@ -1583,6 +1615,7 @@ class EchoesAssistantV2(
                             max_output_tokens=self.max_tokens,
                             stream=False,
                         )
+                        self._tally_usage(usage, response)
 
                         # Extract content and tool calls from response.output
                         response_text = ""
@@ -1623,6 +1656,7 @@ class EchoesAssistantV2(
                             max_tokens=(self.max_tokens if "o3" not in selected_model else None),
                             stream=False,
                         )
+                        self._tally_usage(usage, response)
 
                         # Extract content and tool calls
                         response_message = response.choices[0].message
@@ -1714,21 +1748,17 @@ class EchoesAssistantV2(
                     if status:
                         status.error(error_msg)
 
-                    # Try fallback to default model
-                    if selected_model != self.default_model:
-                        if status:
-                            status.start_phase(f"{STATUS_RETRY} Retrying with {self.default_model}", 0)
-                        try:
-                            selected_model = self.default_model
-                            # Retry the entire loop with default model
-                            continue
-                        except APIError as fallback_error:
-                            error_msg = f"Fallback also failed: {str(fallback_error)}"
-                            if status:
-                                status.error(error_msg)
-                            return error_msg
-                    else:
+                    # Fail over to the next model the routing engine picks
+                    retry = self._fail_over(routing_decision, message, tools, tried_models, e)
+                    routing_decision = None  # its failure is recorded
+                    if retry is None:
                         return error_msg
+                    routing_decision, selected_model = retry, retry.model
+                    usage = [0, 0]
+                    start_time = time.time()
+                    if status:
+                        status.start_phase(f"{STATUS_RETRY} Retrying with {selected_model}", 0)
+                    continue
 
             # Generate final response after tool execution
             if status:
@@ -1745,6 +1775,7 @@ class EchoesAssistantV2(
                     max_output_tokens=self.max_tokens,
                     stream=False,
                 )
+                self._tally_usage(usage, final_response)
 
                 # Extract final response content
                 assistant_response = ""
@@ -1766,6 +1797,7 @@ class EchoesAssistantV2(
                     max_tokens=self.max_tokens if "o3" not in selected_model else None,
                     stream=False,
                 )
+                self._tally_usage(usage, final_response)
 
                 # Extract final response content
                 assistant_response = final_response.choices[0].message.content
@@ -1773,6 +1805,9 @@ class EchoesAssistantV2(
             # Record metrics for successful completion
             response_time = time.time() - start_time
             self.model_metrics.record_usage_sync(selected_model, response_time, success=True)
+            self.routing_engine.record_outcome(
+                routing_decision, response_time, prompt_tokens=usage[0], completion_tokens=usage[1]
+            )
 
             if status:
                 status.complete_phase("Response generated")
@@ -1960,6 +1995,10 @@ class EchoesAssistantV2(
                 status.error(error_msg)
             return error_msg
         except APIError as e:
+            if routing_decision is not None:
+                self.routing_engine.record_outcome(
+                    routing_decision, time.time() - routing_decision.timestamp, success=False, error=e
+                )
             error_msg = f"API Error: {str(e)}"
             if status:
                 status.error(error_msg)
@@ -2014,6 +2053,7 @@ class EchoesAssistantV2(
         # Status indicator
         status = EnhancedStatusIndicator(enabled=show_status if show_status is not None else self.enable_status)
 
+        routing_decision = None
         try:
             # Phase 2: Message Building
             # Build messages
@@ -2054,7 +2094,10 @@ class EchoesAssistantV2(
             tool_calling_enabled = self.enable_tools and self.tool_registry is not None
 
             # Select the best model for this request
-            selected_model = self.model_router.select_model(message, tools)
+            routing_decision = self.routing_engine.route(message, tools)
+            selected_model = routing_decision.model
+            tried_models: set[str] = set()
+            usage = [0, 0]  # prompt, completion tokens across this request's calls
             start_time = time.time()
 
             # Convert messages to appropriate format
@@ -2091,7 +2134,9 @@ class EchoesAssistantV2(
                         for chunk in response:
                             # Handle different chunk types in Responses API
                             if hasattr(chunk, "type"):
-                                if chunk.type == "response.output_text.done":
+                                if chunk.type == "response.completed":
+                                    self._tally_usage(usage, getattr(chunk, "response", None))
+                                elif chunk.type == "response.output_text.done":
                                     # Final text chunk
                                     if hasattr(chunk, "text"):
                                         response_text += chunk.text
@@ -2158,10 +2203,12 @@ class EchoesAssistantV2(
                             max_completion_tokens=(self.max_tokens if "o3" in selected_model else None),
                             max_tokens=(self.max_tokens if "o3" not in selected_model else None),
                             stream=True,
+                            stream_options={"include_usage": True},
                         )
 
-                        # Stream response chunks
+                        # Stream response chunks; usage arrives on the last, choice-less chunk
                         for chunk in response:
+                            self._tally_usage(usage, chunk)
                             if chunk.choices and chunk.choices[0].delta.content:
                                 response_text += chunk.choices[0].delta.content
                                 yield chunk.choices[0].delta.content
@@ -2176,6 +2223,12 @@ class EchoesAssistantV2(
                             # Save response and return
                             self.context_manager.add_message(self.session_id, "assistant", response_text)
                             self.model_metrics.record_usage_sync(selected_model, time.time() - start_time, success=True)
+                            self.routing_engine.record_outcome(
+                                routing_decision,
+                                time.time() - start_time,
+                                prompt_tokens=usage[0],
+                                completion_tokens=usage[1],
+                            )
                             return  # Already yielded content
 
                         # Initialize status for tool execution
@@ -2264,6 +2317,12 @@ class EchoesAssistantV2(
                         # No tool calls, save response and return
                         self.context_manager.add_message(self.session_id, "assistant", response_text)
                         self.model_metrics.record_usage_sync(selected_model, time.time() - start_time, success=True)
+                        self.routing_engine.record_outcome(
+                            routing_decision,
+                            time.time() - start_time,
+                            prompt_tokens=usage[0],
+                            completion_tokens=usage[1],
+                        )
                         return  # Already yielded content
 
                 except APIError as e:
@@ -2271,23 +2330,18 @@ class EchoesAssistantV2(
                     if status:
                         status.error(error_msg)
 
-                    # Try fallback to default model
-                    if selected_model != self.default_model:
-                        if status:
-                            status.start_phase(f"{STATUS_RETRY} Retrying with {self.default_model}", 0)
-                        try:
-                            selected_model = self.default_model
-                            # Retry the entire loop with default model
-                            continue
-                        except APIError as fallback_error:
-                            error_msg = f"Fallback also failed: {str(fallback_error)}"
-                            if status:
-                                status.error(error_msg)
-                            yield error_msg
-                            return
-                    else:
+                    # Fail over to the next model the routing engine picks
+                    retry = self._fail_over(routing_decision, message, tools, tried_models, e)
+                    routing_decision = None  # its failure is recorded
+                    if retry is None:
                         yield error_msg
                         return
+                    routing_decision, selected_model = retry, retry.model
+                    usage = [0, 0]
+                    start_time = time.time()
+                    if status:
+                        status.start_phase(f"{STATUS_RETRY} Retrying with {selected_model}", 0)
+                    continue
 
             # Generate final response after tool execution (streaming)
             if status:
@@ -2309,7 +2363,9 @@ class EchoesAssistantV2(
                 for chunk in final_response:
                     # Handle different chunk types in Responses API
                     if hasattr(chunk, "type"):
-                        if chunk.type == "response.output_text.done":
+                        if chunk.type == "response.completed":
+                            self._tally_usage(usage, getattr(chunk, "response", None))
+                        elif chunk.type == "response.output_text.done":
                             # Final text chunk
                             if hasattr(chunk, "text"):
                                 yield chunk.text
@@ -2338,16 +2394,21 @@ class EchoesAssistantV2(
                     max_completion_tokens=(self.max_tokens if "o3" in selected_model else None),
                     max_tokens=self.max_tokens if "o3" not in selected_model else None,
                     stream=True,  # Stream the final response
+                    stream_options={"include_usage": True},
                 )
 
                 # Stream final response chunks
                 for chunk in final_response:
+                    self._tally_usage(usage, chunk)
                     if chunk.choices and chunk.choices[0].delta.content:
                         yield chunk.choices[0].delta.content
 
             # Record metrics for successful completion
             response_time = time.time() - start_time
             self.model_metrics.record_usage_sync(selected_model, response_time, success=True)
+            self.routing_engine.record_outcome(
+                routing_decision, response_time, prompt_tokens=usage[0], completion_tokens=usage[1]
+            )
 
             if status:
                 status.complete_phase("Response generated")
@@ -2358,6 +2419,10 @@ class EchoesAssistantV2(
                 status.error(error_msg)
             yield error_msg
         except APIError as e:
+            if routing_decision is not None:
+                self.routing_engine.record_outcome(
+                    routing_decision, time.time() - routing_decision.timestamp, success=False, error=e
+                )
             error_msg = f"API Error: {str(e)}"
             if status:
                 status.error(error_msg)
@@ -2702,10 +2767,7 @@ class EchoesAssistantV2(
             try:
                 import json as _json_local
 
-                audit_path = os.path.expanduser("~/.echoes/audit.ndjson")  # noqa: ASYNC240
-                os.makedirs(os.path.dirname(audit_path), exist_ok=True)
-                with open(audit_path, "a", encoding="utf-8") as _af:  # noqa: ASYNC230
-                    _af.write(_json_local.dumps(audit_entry, ensure_ascii=False) + "\n")
+                get_event_log("~/.echoes/audit.ndjson").append(_json_local.dumps(audit_entry, ensure_ascii=False))
             except Exception:
                 # Never block user flow on audit write failure
                 pass
@@ -3320,7 +3382,6 @@ def interactive_mode():
         # Minimal, safe persistence on commit
         def _commit_sink(d: Draft) -> None:
             try:
-                os.makedirs("results", exist_ok=True)
                 import json as _json
                 from datetime import datetime as _dt
 
@@ -3330,12 +3391,9 @@ def interactive_mode():
                     "goal": d.goal,
                     "constraints": d.constraints,
                 }
-                with open(
-                    os.path.join("results", "glimpse_commits.jsonl"),
-                    "a",
-                    encoding="utf-8",
-                ) as f:
-                    f.write(_json.dumps(rec, ensure_ascii=False) + "\n")
+                get_event_log(os.path.join("results", "glimpse_commits.jsonl")).append(
+                    _json.dumps(rec, ensure_ascii=False)
+                )
             except Exception:
                 # Silent best-effort; never block user flow
                 pass
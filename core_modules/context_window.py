@@ -0,0 +1,180 @@
+"""
+Token-budgeted conversation window.
+
+ContextManager used to trim history by message count only, and rebuild list
+slices on every call. Callers had no idea how many tokens the history held.
+A ContextWindow keeps one session's messages in a deque, each with a token
+estimate computed once on append, plus a running total. Appending evicts the
+oldest messages until the total (head slots included) fits ``max_tokens``.
+Each message is evicted at most once, so eviction is O(1) amortized.
+
+Two head slots are never evicted and are always returned first: the pinned
+system message, set by the caller, then the summary. When a ``summarizer``
+is set, evicted messages are passed to it with the current summary, and its
+return value becomes the new summary. Dropped turns are folded into a
+rolling summary instead of vanishing, and the pinned message is never
+overwritten by it.
+
+The default tokenizer is a local heuristic (about four characters per token
+plus a fixed per-message overhead). Pass any ``Callable[[str], int]``, for
+example a tiktoken encoder's ``lambda s: len(enc.encode(s))``, for exact
+counts.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from itertools import islice
+from typing import Any
+
+Tokenizer = Callable[[str], int]
+Summarizer = Callable[[str | None, list[dict[str, Any]]], str | None]
+
+# Role/separator tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class ContextWindow:
+    """One session's messages under a token budget (and optionally a message cap)."""
+
+    __slots__ = (
+        "max_tokens",
+        "max_messages",
+        "tokenizer",
+        "summarizer",
+        "_items",
+        "_total",
+        "_pinned",
+        "_summary",
+        "evicted_count",
+    )
+
+    def __init__(
+        self,
+        max_tokens: int,
+        *,
+        max_messages: int | None = None,
+        tokenizer: Tokenizer = estimate_tokens,
+        summarizer: Summarizer | None = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.tokenizer = tokenizer
+        self.summarizer = summarizer
+        self._items: deque[tuple[dict[str, Any], int]] = deque()
+        self._total = 0
+        self._pinned: tuple[dict[str, Any], int] | None = None
+        self._summary: tuple[dict[str, Any], int] | None = None
+        self.evicted_count = 0
+
+    def count_tokens(self, message: dict[str, Any]) -> int:
+        return self.tokenizer(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+
+    # --- State -----------------------------------------------------------------
+
+    def _head(self) -> list[tuple[dict[str, Any], int]]:
+        return [slot for slot in (self._pinned, self._summary) if slot is not None]
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of the pinned and summary messages plus every message in the window."""
+        return self._total + sum(tokens for _, tokens in self._head())
+
+    @property
+    def pinned(self) -> dict[str, Any] | None:
+        return self._pinned[0] if self._pinned else None
+
+    @property
+    def summary(self) -> dict[str, Any] | None:
+        return self._summary[0] if self._summary else None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (message for message, _ in self._items)
+
+    # --- Updates ---------------------------------------------------------------
+
+    def append(self, message: dict[str, Any]) -> list[dict[str, Any]]:
+        """Add a message and evict from the front until within budget; returns the evicted messages."""
+        tokens = self.count_tokens(message)
+        self._items.append((message, tokens))
+        self._total += tokens
+        return self._evict()
+
+    def extend(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Add several messages (e.g. a restored history), evicting once at the end."""
+        for message in messages:
+            tokens = self.count_tokens(message)
+            self._items.append((message, tokens))
+            self._total += tokens
+        return self._evict()
+
+    def pin(self, message: dict[str, Any] | None) -> None:
+        """Set (or clear with None) the pinned system message; the summary slot is separate."""
+        self._pinned = (message, self.count_tokens(message)) if message is not None else None
+        self._evict()
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._total = 0
+        self._pinned = None
+        self._summary = None
+
+    def _over_budget(self) -> bool:
+        return len(self._items) > 1 and (
+            self.total_tokens > self.max_tokens
+            or (self.max_messages is not None and len(self._items) > self.max_messages)
+        )
+
+    def _evict(self) -> list[dict[str, Any]]:
+        evicted: list[dict[str, Any]] = []
+        items = self._items
+        # The newest message always stays, even if it alone exceeds the budget.
+        # A summary that grows can push the window over budget again, hence the outer loop.
+        while self._over_budget():
+            batch = []
+            while self._over_budget():
+                message, tokens = items.popleft()
+                self._total -= tokens
+                batch.append(message)
+            self.evicted_count += len(batch)
+            evicted.extend(batch)
+            if self.summarizer is not None:
+                self._fold(batch)
+        return evicted
+
+    def _fold(self, evicted: list[dict[str, Any]]) -> None:
+        previous = self.summary.get("content") if self.summary else None
+        summary = self.summarizer(previous, evicted)
+        if summary is not None:
+            message = {"role": "system", "content": summary, "summary": True}
+            self._summary = (message, self.count_tokens(message))
+
+    # --- Reads -----------------------------------------------------------------
+
+    def messages(self, limit: int | None = None, *, include_pinned: bool = True) -> list[dict[str, Any]]:
+        """The pinned and summary messages (if any), then the newest ``limit`` messages (all if None), oldest first."""
+        if limit is None or limit >= len(self._items):
+            tail = [message for message, _ in self._items]
+        else:
+            tail = [message for message, _ in islice(reversed(self._items), max(limit, 0))]
+            tail.reverse()
+        if include_pinned:
+            tail[:0] = [message for message, _ in self._head()]
+        return tail
+
+    def tokens(self, limit: int | None = None, *, include_pinned: bool = True) -> int:
+        """Token estimate of exactly what ``messages(limit)`` returns, from the cached per-message counts."""
+        if limit is None or limit >= len(self._items):
+            total = self._total
+        else:
+            total = sum(tokens for _, tokens in islice(reversed(self._items), max(limit, 0)))
+        if include_pinned:
+            total += sum(tokens for _, tokens in self._head())
+        return total
@@ -0,0 +1,611 @@
+"""
+Shared append-only JSONL event log writer.
+
+Several hot paths used to open, append to and close a JSONL file for every
+event: the Glimpse commit handlers, the Echoes audit log
+(~/.echoes/audit.ndjson), the partition pipeline's emit_event and the outcome
+prediction store. An :class:`EventLogWriter` keeps one file descriptor per log
+and commits events in groups:
+
+* ``append(record)`` encodes the record in the caller's thread and adds it to
+  a bounded in-memory buffer. When the buffer is full, ``append`` blocks until
+  it drains (backpressure, nothing is dropped).
+* Fire-and-forget appends are written by one background flusher thread shared
+  by every writer. It drains each buffer with a single ``write`` at most
+  ``flush_interval`` seconds after the first pending event, or as soon as
+  ``batch_size`` events are waiting.
+* ``append(record, wait=True)`` returns once the record is written. The first
+  waiting caller becomes the leader and writes everything buffered so far,
+  other callers' events included. Concurrent callers therefore share one
+  write and one fsync (group commit), and an uncontended caller writes inline
+  without a thread hand-off.
+
+Durability policies (:class:`Durability`):
+
+* ``every_event``: every append waits until its group is fsynced.
+* ``interval``: fsync at most every ``fsync_interval`` seconds while there is
+  unsynced data (the flusher handles it).
+* ``os_buffered``: never fsync explicitly; the OS decides.
+
+Rotation is optional. When the active file reaches ``max_bytes``, or has been
+open for ``max_age`` seconds, it is renamed to ``<stem>.<UTC timestamp><suffix>``
+and a new active file is started at the same path. With ``compress=True`` the
+closed segment is gzipped in the background. :class:`EventLogReader` reads and
+tails across closed segments (plain or gzipped) and the active file.
+
+If the active path is renamed or removed from outside (e.g. by a store that
+seals its own segments), the next write reopens it.
+
+Use :func:`get_event_log` to share one writer per path within a process.
+Pending events are flushed at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class Durability(StrEnum):
+    """When appended events are fsynced."""
+
+    EVERY_EVENT = "every_event"
+    INTERVAL = "interval"
+    OS_BUFFERED = "os_buffered"
+
+
+def _default_dumps(record: Any) -> str:
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _rotated_pattern(path: Path) -> re.Pattern[str]:
+    return re.compile(rf"{re.escape(path.stem)}\.(\d{{8}}T\d{{12}})(?:-\d+)?{re.escape(path.suffix)}(\.gz)?")
+
+
+class EventLogWriter:
+    """
+    Buffered, group-committing writer for one JSONL file.
+
+    Args:
+        path: Active log file (parent directories are created)
+        durability: Fsync policy, see :class:`Durability`
+        fsync_interval: Seconds between fsyncs under ``Durability.INTERVAL``
+        flush_interval: Max seconds a fire-and-forget event waits in the buffer
+        batch_size: Pending events that trigger an immediate background flush
+        max_pending: Buffer bound; ``append`` blocks while it is full
+        max_bytes: Rotate once the active file reaches this size (None: never)
+        max_age: Rotate once the writer has had the active file open this many seconds (None: never)
+        compress: Gzip closed segments
+        dumps: Serializer for records that are not already ``str``/``bytes``
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        durability: Durability | str = Durability.INTERVAL,
+        fsync_interval: float = 1.0,
+        flush_interval: float = 0.1,
+        batch_size: int = 512,
+        max_pending: int = 10_000,
+        max_bytes: int | None = None,
+        max_age: float | None = None,
+        compress: bool = False,
+        dumps: Callable[[Any], str] = _default_dumps,
+    ):
+        self.path = Path(path)
+        self.durability = Durability(durability)
+        self.fsync_interval = fsync_interval
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.dumps = dumps
+
+        self._cond = threading.Condition()
+        self._pending: list[bytes] = []
+        self._first_pending_at = 0.0
+        self._enqueued = 0  # sequence number of the last buffered event
+        self._written = 0  # ... of the last event written to the file
+        self._synced = 0  # ... of the last event fsynced
+        self._writing = False  # a leader (caller or flusher) owns the file
+        self._closed = False
+        self.last_error: OSError | None = None
+        self._failed = (0, -1)  # sequence range of the batch that raised last_error
+
+        self._fd: int | None = None
+        self._ino: int | None = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._last_sync = time.monotonic()
+
+    # --- Appends ---------------------------------------------------------------
+
+    def _encode(self, record: Any) -> bytes:
+        if isinstance(record, bytes):
+            data = record
+        elif isinstance(record, str):
+            data = record.encode("utf-8")
+        else:
+            data = self.dumps(record).encode("utf-8")
+        return data if data.endswith(b"\n") else data + b"\n"
+
+    def append(self, record: Any, *, wait: bool = False) -> int:
+        """
+        Buffer one event; returns its sequence number.
+
+        ``record`` is a JSON-serializable object, or an already serialized
+        line (``str``/``bytes``). With ``wait=True`` (always under
+        ``every_event``) this returns once the event is written (and fsynced
+        under ``every_event``). A failed write is raised to waiting callers.
+        Without waiting, failures are logged and kept in ``last_error``.
+        """
+        data = self._encode(record)
+        with self._cond:
+            if self._closed:
+                raise ValueError(f"event log {self.path} is closed")
+            while len(self._pending) >= self.max_pending:
+                _flusher.wake(self)
+                self._cond.wait()
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append(data)
+            self._enqueued += 1
+            seq = self._enqueued
+            background = len(self._pending) == 1 or len(self._pending) >= self.batch_size
+        if wait or self.durability is Durability.EVERY_EVENT:
+            self.wait_for(seq)
+        elif background:
+            _flusher.wake(self)
+        return seq
+
+    def wait_for(self, seq: int) -> None:
+        """Block until event ``seq`` (from :meth:`append`) is written, or fsynced under ``every_event``."""
+        self._commit(seq, sync=self.durability is Durability.EVERY_EVENT)
+
+    def flush(self, *, sync: bool = False) -> None:
+        """Write everything buffered so far (and fsync it with ``sync=True``)."""
+        with self._cond:
+            target = self._enqueued
+        self._commit(target, sync=sync)
+
+    def sync(self) -> None:
+        self.flush(sync=True)
+
+    def _commit(self, target: int, *, sync: bool) -> None:
+        """Return once event ``target`` is written (and synced); leads a group write when no one else is."""
+        while True:
+            with self._cond:
+                while True:
+                    done = self._synced if sync else self._written
+                    if done >= target:
+                        if self.last_error is not None and self._failed[0] <= target <= self._failed[1]:
+                            raise self.last_error
+                        return
+                    if not self._writing:
+                        break
+                    self._cond.wait()
+                self._writing = True
+                batch, self._pending = self._pending, []
+                last = self._enqueued
+                self._cond.notify_all()  # room in the buffer again
+            self._lead(batch, last, sync=sync)
+
+    def _lead(self, batch: list[bytes], last: int, *, sync: bool) -> None:
+        """Write ``batch`` (events up to ``last``) as the current leader, then fsync/rotate as due."""
+        first = last - len(batch) + 1
+        error = None
+        synced = None
+        try:
+            if batch:
+                self._write(b"".join(batch))
+            if sync or self._sync_due():
+                self._fsync()
+                synced = last
+            if self._rotation_due():
+                self._rotate()
+                if self.durability is not Durability.OS_BUFFERED:
+                    synced = last
+        except OSError as e:
+            error = e
+            logger.warning("Could not write event log %s: %s", self.path, e)
+        with self._cond:
+            self._written = last
+            if synced is not None:
+                self._synced = synced
+            elif error is not None:
+                self._synced = last  # nothing more will reach the disk for these events
+            if error is not None:
+                self.last_error = error
+                self._failed = (first, last)
+            self._writing = False
+            self._cond.notify_all()
+
+    # --- File handling (only the current leader touches these) -----------------
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(self._fd)
+        self._ino, self._size = st.st_ino, st.st_size
+        self._opened_at = time.time()
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _ensure_current(self) -> None:
+        """(Re)open the active path, e.g. after it was renamed or removed from outside."""
+        if self._fd is not None:
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == self._ino:
+                return
+            self._close_fd()
+        self._open()
+
+    def _write(self, data: bytes) -> None:
+        self._ensure_current()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+        self._size += len(data)
+
+    def _fsync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+        self._last_sync = time.monotonic()
+
+    def _sync_due(self) -> bool:
+        return (
+            self.durability is Durability.INTERVAL
+            and self._synced < self._written
+            and time.monotonic() - self._last_sync >= self.fsync_interval
+        )
+
+    def _rotation_due(self) -> bool:
+        if self._fd is None or self._size == 0:
+            return False
+        if self.max_bytes is not None and self._size >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.time() - self._opened_at >= self.max_age
+
+    def _rotate(self) -> Path:
+        if self.durability is not Durability.OS_BUFFERED:
+            self._fsync()
+        self._close_fd()
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 0
+        while target.exists() or target.with_name(target.name + ".gz").exists():
+            n += 1
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+        os.replace(self.path, target)
+        self._open()
+        if self.compress:
+            threading.Thread(target=_gzip_segment, args=(target,), name="event-log-gzip", daemon=True).start()
+        return target
+
+    def rotate(self) -> Path | None:
+        """Flush and close the active file as a rotated segment; returns its path (None if empty)."""
+        self.flush()
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._writing = True
+        try:
+            self._ensure_current()
+            return self._rotate() if self._size else None
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    # --- Background work -------------------------------------------------------
+
+    def _next_deadline(self) -> float | None:
+        """Monotonic time the flusher should next look at this writer (None: nothing to do)."""
+        deadlines = []
+        if self._pending:
+            deadlines.append(self._first_pending_at + self.flush_interval)
+        if self.durability is Durability.INTERVAL and self._synced < self._written:
+            deadlines.append(self._last_sync + self.fsync_interval)
+        if self.max_age is not None and self._size:
+            deadlines.append(time.monotonic() + max(0.0, self._opened_at + self.max_age - time.time()))
+        return min(deadlines) if deadlines else None
+
+    def _background_tick(self, now: float) -> None:
+        with self._cond:
+            if self._writing:
+                return
+            flush = bool(self._pending) and (
+                len(self._pending) >= self.batch_size or now >= self._first_pending_at + self.flush_interval
+            )
+            if not (flush or self._sync_due() or self._rotation_due()):
+                return
+            self._writing = True
+            if flush:
+                batch, self._pending, last = self._pending, [], self._enqueued
+                self._cond.notify_all()  # room in the buffer again
+            else:
+                batch, last = [], self._written
+        self._lead(batch, last, sync=False)
+
+    # --- Lifecycle -------------------------------------------------------------
+
+    @property
+    def inode(self) -> int | None:
+        """Inode of the file the last batch went to."""
+        return self._ino
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def close(self) -> None:
+        """Flush, fsync (unless os_buffered) and close; later appends raise ValueError."""
+        try:
+            self.flush(sync=self.durability is not Durability.OS_BUFFERED)
+        except OSError:
+            pass
+        with self._cond:
+            self._closed = True
+            while self._writing:
+                self._cond.wait()
+            self._close_fd()
+        _flusher.forget(self)
+
+
+def _gzip_segment(path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.gz.tmp")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, path.with_name(path.name + ".gz"))
+        path.unlink()
+    except OSError as e:
+        logger.warning("Could not compress event log segment %s: %s", path, e)
+        tmp.unlink(missing_ok=True)
+
+
+class _Flusher:
+    """One daemon thread that flushes, fsyncs and rotates every writer with background work."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._writers: set[EventLogWriter] = set()
+        self._thread: threading.Thread | None = None
+        self._woken = False
+
+    def wake(self, writer: EventLogWriter) -> None:
+        with self._cond:
+            self._writers.add(writer)
+            self._woken = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def forget(self, writer: EventLogWriter) -> None:
+        with self._cond:
+            self._writers.discard(writer)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                writers = list(self._writers)
+                self._woken = False
+            now = time.monotonic()
+            for writer in writers:
+                writer._background_tick(now)
+            deadlines = []
+            idle = []
+            for writer in writers:
+                with writer._cond:
+                    deadline = writer._next_deadline()
+                if deadline is None:
+                    idle.append(writer)
+                else:
+                    deadlines.append(deadline)
+            # Never hold this lock while taking a writer's: append() wakes us with its own lock held
+            with self._cond:
+                if self._woken:
+                    continue  # a writer was added or got busy since the snapshot
+                self._writers.difference_update(idle)  # wake() re-adds them on their next append
+                # A deadline already past means a caller is leading that writer; poll briefly
+                self._cond.wait(max(0.001, min(deadlines) - time.monotonic()) if deadlines else None)
+
+
+_flusher = _Flusher()
+_registry: dict[str, EventLogWriter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_event_log(path: str | Path, **options: Any) -> EventLogWriter:
+    """
+    The process-wide writer for ``path``, created with ``options`` on first use.
+
+    Later calls for the same path return the existing writer and ignore ``options``.
+    The durability policy defaults to ECHOES_EVENT_LOG_DURABILITY (else ``interval``).
+    """
+    key = os.path.abspath(os.path.expanduser(str(path)))
+    options.setdefault("durability", os.environ.get("ECHOES_EVENT_LOG_DURABILITY", Durability.INTERVAL))
+    with _registry_lock:
+        writer = _registry.get(key)
+        if writer is None or writer._closed:
+            writer = _registry[key] = EventLogWriter(key, **options)
+        return writer
+
+
+def close_all() -> None:
+    """Flush and close every shared writer (registered to run at exit)."""
+    with _registry_lock:
+        writers = list(_registry.values())
+        _registry.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all)
+
+
+class EventLogReader:
+    """Reads a rotated event log in order: closed segments (plain or gzipped), then the active file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(os.path.expanduser(str(path)))
+
+    def segments(self) -> list[Path]:
+        """Closed segments oldest first, then the active file if it exists."""
+        pattern = _rotated_pattern(self.path)
+        closed: dict[str, Path] = {}
+        if self.path.parent.is_dir():
+            for candidate in self.path.parent.iterdir():
+                match = pattern.fullmatch(candidate.name)
+                if match:
+                    # Prefer the plain file while its gzip copy is being written
+                    name = candidate.name.removesuffix(".gz")
+                    if name not in closed or not match.group(2):
+                        closed[name] = candidate
+        paths = [closed[name] for name in sorted(closed, key=self._segment_key)]
+        if self.path.is_file():
+            paths.append(self.path)
+        return paths
+
+    def _segment_key(self, name: str) -> tuple[str, int]:
+        stem = name[len(self.path.stem) + 1 : len(name) - len(self.path.suffix)]
+        stamp, _, n = stem.partition("-")
+        return stamp, int(n or 0)
+
+    @staticmethod
+    def _open(path: Path):
+        return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+    @staticmethod
+    def _parse(line: bytes) -> Any | None:
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def __iter__(self) -> Iterator[Any]:
+        """Every parseable record, oldest first (blank and torn lines skipped)."""
+        for path in self.segments():
+            try:
+                with self._open(path) as f:
+                    for line in f:
+                        if line.strip() and line.endswith(b"\n"):
+                            record = self._parse(line)
+                            if record is not None:
+                                yield record
+            except FileNotFoundError:
+                continue  # compressed or removed while listing
+
+    def tail(self, n: int) -> list[Any]:
+        """The last ``n`` records, reading segments newest first and only as many as needed."""
+        found: deque[Any] = deque()
+        if n <= 0:
+            return []
+        for path in reversed(self.segments()):
+            try:
+                with self._open(path) as f:
+                    records = [
+                        r
+                        for r in (self._parse(line) for line in f if line.strip() and line.endswith(b"\n"))
+                        if r is not None
+                    ]
+            except FileNotFoundError:
+                continue
+            need = n - len(found)
+            if need > 0 and records:
+                found.extendleft(reversed(records[-need:]))
+            if len(found) >= n:
+                break
+        return list(found)
+
+    def follow(
+        self,
+        *,
+        from_start: bool = False,
+        poll_interval: float = 0.5,
+        stop: threading.Event | None = None,
+    ) -> Iterator[Any]:
+        """
+        Yield records as they are appended, following the active file across rotations.
+
+        Starts at the current end unless ``from_start``, in which case closed
+        segments are replayed first. Runs until ``stop`` is set.
+        """
+        stop = stop or threading.Event()
+        if from_start:
+            closed = [path for path in self.segments() if path != self.path]
+            for path in closed:
+                with self._open(path) as f:
+                    for line in f:
+                        record = self._parse(line) if line.strip() else None
+                        if record is not None:
+                            yield record
+        handle = None
+        buffer = b""
+        try:
+            while not stop.is_set():
+                if handle is None:
+                    try:
+                        handle = open(self.path, "rb")
+                    except FileNotFoundError:
+                        stop.wait(poll_interval)
+                        continue
+                    if not from_start:
+                        handle.seek(0, os.SEEK_END)
+                    from_start = True  # files opened after a rotation are read from the top
+                chunk = handle.read()
+                if chunk:
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        record = self._parse(line) if line.strip() else None
+                        if record is not None:
+                            yield record
+                    continue
+                try:
+                    rotated = os.stat(self.path).st_ino != os.fstat(handle.fileno()).st_ino
+                except FileNotFoundError:
+                    rotated = True
+                if rotated:
+                    # The old file is complete once renamed; drain it before switching
+                    rest = handle.read()
+                    handle.close()
+                    handle = None
+                    buffer += rest
+                    if buffer.strip():
+                        record = self._parse(buffer)
+                        if record is not None:
+                            yield record
+                    buffer = b""
+                    continue
+                stop.wait(poll_interval)
+        finally:
+            # Also runs when the consumer stops early (GeneratorExit) or a read raises
+            if handle is not None:
+                handle.close()
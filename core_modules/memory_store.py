@@ -0,0 +1,366 @@
+"""
+Conversation persistence for EchoesAssistantV2.
+
+Saving a conversation used to rewrite ``{session_id}.json`` with the whole
+message list on every turn. That is O(history) per save, and a crash
+mid-write tore the file. Each session now has two files:
+
+* ``{session_id}.json``: the snapshot. It is valid JSON in the old
+  ``{"session_id", "messages", "saved_at"}`` shape, but written one message
+  per line, so the last N messages can be read from the end of the file. It
+  is replaced atomically (temp file, fsync, rename).
+* ``{session_id}.journal.ndjson``: messages appended since the snapshot, one
+  JSON object per line after a header line. When the journal reaches
+  ``compact_every`` messages it is folded into a new snapshot.
+
+Snapshot and journal share a generation number. A journal whose generation
+differs from the snapshot's is left over from a compaction interrupted after
+the rename, and is ignored. A torn last journal line (crash mid-append) is
+dropped on read and cut off before the next append.
+
+``_catalog.json`` caches per-session message count, last-updated time and
+byte size, so listing needs no directory scan. It is rewritten atomically
+after each save. On startup, entries whose byte size no longer matches the
+files are rebuilt.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CATALOG_NAME = "_catalog.json"
+JOURNAL_SUFFIX = ".journal.ndjson"
+SNAPSHOT_FORMAT = "lines"
+
+_TAIL_CHUNK = 64 * 1024
+
+
+def _digest(message: dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(message, sort_keys=True).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes, fsync: bool = True) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_lines_backwards(path: Path):
+    """Yield complete lines of ``path`` from last to first, reading fixed-size chunks from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        remainder = b""
+        while pos > 0:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            yield from reversed(lines)
+        yield remainder
+
+
+class MemoryStore:
+    """Per-session snapshot + append-only journal, with a catalog for listing."""
+
+    def __init__(self, storage_path: str = "data/memory", compact_every: int = 256):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.compact_every = compact_every
+        self.catalog_path = self.storage_path / CATALOG_NAME
+        self._lock = threading.RLock()
+        self._checked_journals: set[str] = set()
+        self._catalog: dict[str, dict[str, Any]] = {}
+        self._load_catalog()
+
+    # --- Paths -----------------------------------------------------------------
+
+    def _snapshot_path(self, session_id: str) -> Path:
+        return self.storage_path / f"{session_id}.json"
+
+    def _journal_path(self, session_id: str) -> Path:
+        return self.storage_path / f"{session_id}{JOURNAL_SUFFIX}"
+
+    def _disk_bytes(self, session_id: str) -> int:
+        total = 0
+        for path in (self._snapshot_path(session_id), self._journal_path(session_id)):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    # --- Catalog ---------------------------------------------------------------
+
+    def _load_catalog(self) -> None:
+        try:
+            self._catalog = json.loads(self.catalog_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._catalog = {}
+
+        # One directory scan per process: pick up sessions written without the catalog, drop deleted ones
+        on_disk = {p.name[: -len(JOURNAL_SUFFIX)] for p in self.storage_path.glob(f"*{JOURNAL_SUFFIX}")}
+        on_disk |= {p.stem for p in self.storage_path.glob("*.json") if p.name != CATALOG_NAME}
+        changed = False
+        for session_id in set(self._catalog) - on_disk:
+            del self._catalog[session_id]
+            changed = True
+        for session_id in on_disk:
+            entry = self._catalog.get(session_id)
+            if entry is None or entry.get("bytes") != self._disk_bytes(session_id):
+                changed |= self._rebuild_entry(session_id)
+        if changed:
+            self._write_catalog()
+
+    def _rebuild_entry(self, session_id: str) -> bool:
+        try:
+            header, snapshot = self._read_snapshot(session_id)
+            journal = self._read_journal(session_id, header.get("generation", 0))
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable conversation %s: %s", session_id, e)
+            return False
+        messages = snapshot + journal
+        path = self._snapshot_path(session_id)
+        mtime = max((p.stat().st_mtime for p in (path, self._journal_path(session_id)) if p.exists()), default=0.0)
+        self._catalog[session_id] = {
+            "messages": len(messages),
+            "updated_at": datetime.fromtimestamp(mtime, UTC).isoformat(),
+            "bytes": self._disk_bytes(session_id),
+            "generation": header.get("generation", 0),
+            "snapshot_messages": len(snapshot),
+            "journal_messages": len(journal),
+            "line_snapshot": header.get("format") == SNAPSHOT_FORMAT,
+            "first_digest": _digest(messages[0]) if messages else None,
+            "last_digest": _digest(messages[-1]) if messages else None,
+        }
+        return True
+
+    def _write_catalog(self) -> None:
+        # No fsync: the catalog is a cache, checked against file sizes on startup
+        _atomic_write(self.catalog_path, json.dumps(self._catalog, sort_keys=True).encode("utf-8"), fsync=False)
+
+    # --- Snapshot / journal I/O ------------------------------------------------
+
+    def _read_snapshot(self, session_id: str) -> tuple[dict[str, Any], list[dict]]:
+        path = self._snapshot_path(session_id)
+        if not path.exists():
+            return {}, []
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, list):  # pre-journal format: the bare message list
+            return {}, data
+        messages = data.pop("messages", [])
+        return data, messages
+
+    def _write_snapshot(self, session_id: str, messages: list[dict], generation: int) -> None:
+        header = {
+            "session_id": session_id,
+            "saved_at": datetime.now(UTC).isoformat(),
+            "format": SNAPSHOT_FORMAT,
+            "generation": generation,
+        }
+        lines = [json.dumps(header)[:-1] + ', "messages": [']
+        lines.extend(json.dumps(m) + ("," if i < len(messages) - 1 else "") for i, m in enumerate(messages))
+        lines.append("]}")
+        _atomic_write(self._snapshot_path(session_id), ("\n".join(lines) + "\n").encode("utf-8"))
+
+    def _read_journal(self, session_id: str, generation: int) -> list[dict]:
+        path = self._journal_path(session_id)
+        if not path.exists():
+            return []
+        messages = []
+        with open(path, "rb") as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("generation") != generation:
+                    return []
+            except ValueError:
+                return []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final append
+                messages.append(json.loads(line))
+        return messages
+
+    def _reset_journal(self, session_id: str, generation: int) -> None:
+        header = json.dumps({"session_id": session_id, "generation": generation}) + "\n"
+        _atomic_write(self._journal_path(session_id), header.encode("utf-8"))
+        self._checked_journals.add(session_id)
+
+    def _append_journal(self, session_id: str, messages: list[dict]) -> None:
+        path = self._journal_path(session_id)
+        data = "".join(json.dumps(m) + "\n" for m in messages).encode("utf-8")
+        with open(path, "r+b") as f:
+            if session_id not in self._checked_journals:
+                # Cut off a torn line left by a crash before appending after it
+                content = f.read()
+                end = content.rfind(b"\n") + 1
+                if end != len(content):
+                    f.truncate(end)
+                self._checked_journals.add(session_id)
+            f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+
+    # --- Public API ------------------------------------------------------------
+
+    def append_messages(self, session_id: str, messages: list[dict]) -> None:
+        """Append messages to a session's journal, compacting once the journal is long enough."""
+        with self._lock:
+            entry = self._catalog.get(session_id)
+            if entry is None:
+                self._rewrite(session_id, list(messages))
+                return
+            if not messages:
+                return
+            if not self._journal_path(session_id).exists():
+                self._reset_journal(session_id, entry["generation"])
+            self._append_journal(session_id, messages)
+            entry["messages"] += len(messages)
+            entry["journal_messages"] += len(messages)
+            if entry["messages"] == len(messages):
+                entry["first_digest"] = _digest(messages[0])
+            entry["last_digest"] = _digest(messages[-1])
+            if entry["journal_messages"] >= self.compact_every:
+                self.compact(session_id)
+                return
+            self._touch(session_id)
+
+    def save_conversation(self, session_id: str, messages: list[dict]):
+        """
+        Persist ``messages`` as the session's full history.
+
+        When ``messages`` extends what was saved before, only the new tail is
+        journaled. Otherwise (trimmed or edited history) the snapshot is rewritten.
+        "Extends" means the saved count is consistent with the snapshot and
+        journal counts, and the first and last saved messages are unchanged. A
+        sliding window moves the first message, so trims are caught; edits
+        strictly between the two are not checked, to keep saves O(new messages).
+        """
+        with self._lock:
+            entry = self._catalog.get(session_id)
+            saved = entry["messages"] if entry else 0
+            extends = (
+                entry is not None
+                and saved == entry.get("snapshot_messages", 0) + entry.get("journal_messages", 0)
+                and len(messages) >= saved
+                and (
+                    saved == 0
+                    or (
+                        _digest(messages[0]) == entry.get("first_digest")
+                        and _digest(messages[saved - 1]) == entry["last_digest"]
+                    )
+                )
+            )
+            if extends:
+                self.append_messages(session_id, messages[saved:])
+            else:
+                self._rewrite(session_id, list(messages))
+
+    def compact(self, session_id: str) -> None:
+        """Fold the journal into a new snapshot and start an empty journal."""
+        with self._lock:
+            messages = self.load_conversation(session_id) or []
+            self._rewrite(session_id, messages)
+
+    def _rewrite(self, session_id: str, messages: list[dict]) -> None:
+        entry = self._catalog.get(session_id)
+        generation = (entry["generation"] + 1) if entry else 0
+        self._write_snapshot(session_id, messages, generation)
+        self._reset_journal(session_id, generation)
+        self._catalog[session_id] = {
+            "messages": len(messages),
+            "generation": generation,
+            "snapshot_messages": len(messages),
+            "journal_messages": 0,
+            "line_snapshot": True,
+            "first_digest": _digest(messages[0]) if messages else None,
+            "last_digest": _digest(messages[-1]) if messages else None,
+        }
+        self._touch(session_id)
+
+    def _touch(self, session_id: str) -> None:
+        entry = self._catalog[session_id]
+        entry["updated_at"] = datetime.now(UTC).isoformat()
+        entry["bytes"] = self._disk_bytes(session_id)
+        self._write_catalog()
+
+    def load_conversation(self, session_id: str, last_n: int | None = None) -> list[dict] | None:
+        """
+        Load a session's messages, or only the last ``last_n`` of them.
+
+        Tail loads read the journal and then the end of the snapshot backwards,
+        without parsing earlier history.
+        """
+        with self._lock:
+            entry = self._catalog.get(session_id)
+            if entry is None:
+                if not self._snapshot_path(session_id).exists():
+                    return None
+                if not self._rebuild_entry(session_id):
+                    return None
+                entry = self._catalog[session_id]
+            generation = entry["generation"]
+
+            journal = self._read_journal(session_id, generation)
+            if last_n is None or not entry.get("line_snapshot"):
+                _, snapshot = self._read_snapshot(session_id)
+                messages = snapshot + journal
+                return messages if last_n is None else messages[-last_n:] if last_n > 0 else []
+            if last_n <= 0:
+                return []
+            if len(journal) >= last_n:
+                return journal[-last_n:]
+            return self._snapshot_tail(session_id, last_n - len(journal)) + journal
+
+    def _snapshot_tail(self, session_id: str, count: int) -> list[dict]:
+        tail: list[dict] = []
+        for raw in _read_lines_backwards(self._snapshot_path(session_id)):
+            line = raw.strip()
+            if not line or line == b"]}":
+                continue
+            if line.endswith(b"["):  # header line: reached the first message
+                break
+            tail.append(json.loads(line.rstrip(b",")))
+            if len(tail) == count:
+                break
+        tail.reverse()
+        return tail
+
+    def list_conversations(self) -> list[str]:
+        with self._lock:
+            return list(self._catalog)
+
+    def conversation_info(self, session_id: str) -> dict[str, Any] | None:
+        """Catalog entry for one session: message count, last-updated time and byte size."""
+        with self._lock:
+            entry = self._catalog.get(session_id)
+            return None if entry is None else self._info(session_id, entry)
+
+    def list_conversation_info(self) -> list[dict[str, Any]]:
+        """Catalog entries for every session, most recently updated first."""
+        with self._lock:
+            infos = [self._info(sid, entry) for sid, entry in self._catalog.items()]
+        infos.sort(key=lambda info: info["updated_at"], reverse=True)
+        return infos
+
+    @staticmethod
+    def _info(session_id: str, entry: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "session_id": session_id,
+            "messages": entry["messages"],
+            "updated_at": entry["updated_at"],
+            "bytes": entry["bytes"],
+        }
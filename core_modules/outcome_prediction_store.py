@@ -1,15 +1,27 @@
-"""Append-only log + empirical outcome rates for simulation predictions."""
+"""Segmented append-only log + empirical outcome rates for simulation predictions."""
 
 from __future__ import annotations
 
 import json
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal, cast
 
+from core_modules.event_log import Durability, EventLogWriter, get_event_log
 from core_modules.helpers import utc_now_iso_ms
+from core_modules.outcome_statistics import GLOBAL_KEY, OutcomeStatistics, OutcomeSummary
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +38,9 @@ MIN_GLOBAL_SAMPLES = 5
 
 # Cap total JSONL lines (prediction + feedback rows) to bound disk use on long runs.
 MAX_JSONL_LINES_DEFAULT = 10_000
+# Rows per segment default to this fraction of the cap, so retention drops ~10% at a time.
+SEGMENTS_PER_LOG = 10
+SEGMENT_ROWS_UNBOUNDED = 10_000
 
 
 def normalize_action_key(action: str) -> str:
@@ -62,17 +77,353 @@ class EmpiricalProbabilities:
     action_key: str
 
 
+@dataclass
+class _Segment:
+    """Row count and per-action feedback tallies of one log segment."""
+
+    seq: int
+    rows: int = 0
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    last_at: float | None = None  # epoch seconds of the newest feedback row
+
+    def tally(self, action_key: str, outcome: str, at: float | None = None) -> None:
+        by_outcome = self.counts.setdefault(action_key, {})
+        by_outcome[outcome] = by_outcome.get(outcome, 0) + 1
+        if at is not None and (self.last_at is None or at > self.last_at):
+            self.last_at = at
+
+
+def _recorded_at(value: Any) -> float | None:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_feedback(line: bytes | str) -> tuple[str, str, float | None] | None:
+    """(action_key, outcome, recorded_at epoch seconds) for a feedback row, None for anything else."""
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or obj.get("event") != "feedback":
+        return None
+    outcome = obj.get("outcome")
+    if outcome not in DEFAULT_PRIOR:
+        return None
+    return obj.get("action_key") or "_empty", outcome, _recorded_at(obj.get("recorded_at"))
+
+
 class OutcomePredictionStore:
-    """JSONL-backed store: feedback rows train empirical outcome probabilities."""
+    """
+    Segmented JSONL store: feedback rows train empirical outcome probabilities.
+
+    ``log_path`` is the active segment; sealed segments sit beside it as
+    ``<stem>.<seq>.jsonl``. Once the active segment holds ``segment_rows``
+    rows it is sealed by rename, and whole old segments are deleted so at most
+    ``max_jsonl_lines`` rows stay on disk. Feedback tallies per sealed segment
+    are snapshotted in ``<stem>.counts.json``: startup loads the snapshot and
+    scans only the active segment, after which per-action and global counters
+    are updated on append and queries never read the log.
+
+    Rows go through the shared event log writer for ``log_path``
+    (core_modules.event_log). Appends return once the row is written, but
+    threads appending at the same time share one write (group commit). The
+    writer reopens the active path after it is sealed.
+
+    With ``shared=True`` several processes can append to one log. Each append
+    holds an exclusive ``flock`` on ``<stem>.lock``, first folds in rows other
+    processes wrote, then writes its row with a single ``O_APPEND`` write.
+    Queries pick up other writers' rows incrementally from the last offset read.
+
+    Feedback also feeds ``statistics``, an OutcomeStatistics with sliding-window
+    and time-decayed counts. On startup it is replayed from the active segment
+    and from sealed segments recent enough to still matter.
+    """
 
     def __init__(
         self,
         log_path: Path | None = None,
         *,
         max_jsonl_lines: int | None = None,
+        segment_rows: int | None = None,
+        shared: bool = False,
+        statistics: OutcomeStatistics | None = None,
     ) -> None:
         self.log_path = log_path or Path("data/simulation_outcomes.jsonl")
         self._max_jsonl_lines = max_jsonl_lines if max_jsonl_lines is not None else MAX_JSONL_LINES_DEFAULT
+        if segment_rows is None:
+            bounded = self._max_jsonl_lines > 0
+            segment_rows = self._max_jsonl_lines // SEGMENTS_PER_LOG if bounded else SEGMENT_ROWS_UNBOUNDED
+        if self._max_jsonl_lines > 0:
+            segment_rows = min(segment_rows, self._max_jsonl_lines)
+        self._segment_rows = max(1, segment_rows)
+        self.shared = shared
+        self.statistics = statistics or OutcomeStatistics(tuple(DEFAULT_PRIOR), DEFAULT_PRIOR)
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._sealed: list[_Segment] = []
+        self._active = _Segment(seq=0)
+        self._active_offset = 0  # bytes of the active segment folded into the counters
+        self._active_ino: int | None = None
+        self._snapshot_id: tuple[int, int, int] | None = None  # (inode, mtime, size) of the snapshot last seen
+        self._per_action: dict[str, dict[str, int]] = {}
+        self._global: dict[str, int] = {}
+
+    @property
+    def _events(self) -> EventLogWriter:
+        return get_event_log(self.log_path, durability=Durability.OS_BUFFERED)
+
+    # --- paths -----------------------------------------------------------------
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.log_path.with_name(f"{self.log_path.stem}.{seq:08d}{self.log_path.suffix}")
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return self.log_path.with_name(f"{self.log_path.stem}.counts.json")
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.log_path.with_name(f"{self.log_path.stem}.lock")
+
+    def _sealed_on_disk(self) -> list[tuple[int, Path]]:
+        pattern = re.compile(rf"{re.escape(self.log_path.stem)}\.(\d{{8}}){re.escape(self.log_path.suffix)}")
+        sealed = []
+        if self.log_path.parent.is_dir():
+            for path in self.log_path.parent.iterdir():
+                match = pattern.fullmatch(path.name)
+                if match:
+                    sealed.append((int(match.group(1)), path))
+        return sorted(sealed)
+
+    def segment_paths(self) -> list[Path]:
+        """Sealed segments oldest first, then the active segment if it exists."""
+        paths = [path for _, path in self._sealed_on_disk()]
+        if self.log_path.is_file():
+            paths.append(self.log_path)
+        return paths
+
+    @contextmanager
+    def _file_lock(self):
+        if not self.shared or fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- counters --------------------------------------------------------------
+
+    def _add_counts(self, counts: dict[str, dict[str, int]], sign: int = 1) -> None:
+        for action_key, by_outcome in counts.items():
+            action = self._per_action.setdefault(action_key, {})
+            for outcome, n in by_outcome.items():
+                action[outcome] = action.get(outcome, 0) + sign * n
+                self._global[outcome] = self._global.get(outcome, 0) + sign * n
+                if not action[outcome]:
+                    del action[outcome]
+                if not self._global[outcome]:
+                    del self._global[outcome]
+            if not action:
+                del self._per_action[action_key]
+
+    def _count_feedback(self, action_key: str, outcome: str, at: float | None) -> None:
+        self._active.tally(action_key, outcome, at)
+        self.statistics.observe(action_key, outcome, at)
+        action = self._per_action.setdefault(action_key, {})
+        action[outcome] = action.get(outcome, 0) + 1
+        self._global[outcome] = self._global.get(outcome, 0) + 1
+
+    # --- loading ---------------------------------------------------------------
+
+    def _stat_snapshot(self) -> tuple[int, int, int] | None:
+        try:
+            st = self._snapshot_path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._events.flush()  # rows other stores in this process still have buffered
+            self._load()
+        elif self.shared:
+            if self._stat_snapshot() != self._snapshot_id:
+                self._load()  # another process sealed or dropped segments
+            else:
+                self._catch_up()
+
+    def _load(self) -> None:
+        """Rebuild counters from the counts snapshot plus a scan of the active segment."""
+        self._sealed, self._per_action, self._global = [], {}, {}
+        self._active, self._active_offset, self._active_ino = _Segment(seq=0), 0, None
+        self.statistics.clear()
+        self._loaded = True
+
+        self._snapshot_id = self._stat_snapshot()
+        try:
+            data = json.loads(self._snapshot_path.read_text(encoding="utf-8"))
+            snapshot = {int(entry["seq"]): entry for entry in data.get("segments", [])}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            snapshot = {}
+
+        on_disk = self._sealed_on_disk()
+        # Time statistics only need rows younger than their horizon; replay just those segments
+        horizon = time.time() - self.statistics.horizon_seconds
+        for seq, path in on_disk:
+            entry = snapshot.get(seq)
+            if entry is not None:
+                segment = _Segment(
+                    seq=seq, rows=int(entry["rows"]), counts=entry["counts"], last_at=entry.get("last_at")
+                )
+                if segment.last_at is not None and segment.last_at >= horizon:
+                    self._scan_segment(path, seq, observe=True)
+            else:
+                segment = self._scan_segment(path, seq, observe=True)
+            self._sealed.append(segment)
+            self._add_counts(segment.counts)
+        if {seq for seq, _ in on_disk} != set(snapshot):
+            self._write_snapshot()
+
+        self._catch_up()
+
+    def _scan_segment(self, path: Path, seq: int, *, observe: bool = False) -> _Segment:
+        segment = _Segment(seq=seq)
+        try:
+            with path.open("rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    segment.rows += 1
+                    parsed = _parse_feedback(line)
+                    if parsed:
+                        segment.tally(*parsed)
+                        if observe:
+                            self.statistics.observe(*parsed)
+        except OSError as e:
+            logger.warning("Could not read outcome log segment %s: %s", path, e)
+        return segment
+
+    def _catch_up(self) -> None:
+        """Fold rows appended to the active segment since the last read (by any process) into the counters."""
+        try:
+            with self.log_path.open("rb") as f:
+                st = os.fstat(f.fileno())
+                if self._active_ino is not None and (st.st_ino != self._active_ino or st.st_size < self._active_offset):
+                    # Another process sealed the segment we were following
+                    self._load()
+                    return
+                self._active_ino = st.st_ino
+                if st.st_size == self._active_offset:
+                    return
+                f.seek(self._active_offset)
+                data = f.read()
+        except FileNotFoundError:
+            if self._active_ino is not None:
+                self._load()
+            return
+        except OSError as e:
+            logger.warning("Could not read outcome log: %s", e)
+            return
+
+        end = data.rfind(b"\n") + 1  # a row still being written is picked up next time
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            self._active.rows += 1
+            parsed = _parse_feedback(line)
+            if parsed:
+                self._count_feedback(*parsed)
+        self._active_offset += end
+
+    # --- writing ---------------------------------------------------------------
+
+    def _write_snapshot(self) -> None:
+        state = {
+            "version": 1,
+            "segments": [
+                {"seq": s.seq, "rows": s.rows, "counts": s.counts, "last_at": s.last_at} for s in self._sealed
+            ],
+        }
+        tmp = self._snapshot_path.with_name(f".{self._snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(state, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self._snapshot_path)
+            self._snapshot_id = self._stat_snapshot()
+        except OSError as e:
+            logger.warning("Could not write outcome counts snapshot: %s", e)
+            tmp.unlink(missing_ok=True)
+
+    def _rotate(self) -> None:
+        """Seal the active segment, then drop whole old segments beyond the row budget."""
+        self._events.flush()
+        seq = self._sealed[-1].seq + 1 if self._sealed else 1
+        if not self.log_path.is_file():
+            # Removed from outside; its rows are gone
+            self._add_counts(self._active.counts, sign=-1)
+        elif self._active.rows <= self._segment_rows:
+            self.log_path.replace(self._segment_path(seq))
+            self._active.seq = seq
+            self._sealed.append(self._active)
+        else:
+            # Oversized (e.g. a log written before segmenting): split so retention stays fine-grained
+            lines = [line for line in self.log_path.read_bytes().splitlines(keepends=True) if line.strip()]
+            for start in range(0, len(lines), self._segment_rows):
+                chunk = lines[start : start + self._segment_rows]
+                segment = _Segment(seq=seq, rows=len(chunk))
+                for line in chunk:
+                    parsed = _parse_feedback(line)
+                    if parsed:
+                        segment.tally(*parsed)
+                tmp = self.log_path.with_name(f".{self.log_path.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(b"".join(line if line.endswith(b"\n") else line + b"\n" for line in chunk))
+                tmp.replace(self._segment_path(seq))
+                self._sealed.append(segment)
+                seq += 1
+            self.log_path.unlink()
+        self._active, self._active_offset, self._active_ino = _Segment(seq=0), 0, None
+
+        if self._max_jsonl_lines > 0:
+            # Leave room for a full active segment
+            budget = self._max_jsonl_lines - self._segment_rows
+            sealed_rows = sum(s.rows for s in self._sealed)
+            while self._sealed and sealed_rows > budget:
+                oldest = self._sealed.pop(0)
+                sealed_rows -= oldest.rows
+                self._add_counts(oldest.counts, sign=-1)
+                self._segment_path(oldest.seq).unlink(missing_ok=True)
+        self._write_snapshot()
+
+    def _append_row(self, row: dict[str, Any]) -> None:
+        row["recorded_at"] = utc_now_iso_ms()
+        at = _recorded_at(row["recorded_at"])
+        data = (json.dumps(row, sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+        events = self._events
+        try:
+            with self._lock, self._file_lock():
+                self._ensure_loaded()
+                if self._active.rows >= self._segment_rows:
+                    self._rotate()
+                if self.shared:
+                    # Other processes must see the row before the flock is released
+                    events.append(data, wait=True)
+                    self._active_ino = events.inode
+                else:
+                    seq = events.append(data)
+                self._active_offset += len(data)
+                self._active.rows += 1
+                if row.get("event") == "feedback":
+                    self._count_feedback(row["action_key"] or "_empty", row["outcome"], at)
+            if not self.shared:
+                # Outside the lock, so rows from concurrent threads are written together
+                events.wait_for(seq)
+        except OSError as e:
+            logger.warning("Could not append outcome log row: %s", e)
 
     def append_prediction_record(
         self,
@@ -99,71 +450,23 @@ class OutcomePredictionStore:
         row = {"event": "feedback", "action_key": action_key, "outcome": outcome}
         self._append_row(row)
 
-    def _append_row(self, row: dict[str, Any]) -> None:
-        row["recorded_at"] = utc_now_iso_ms()
-        try:
-            self.log_path.parent.mkdir(parents=True, exist_ok=True)
-            with self.log_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(row, sort_keys=True, ensure_ascii=False) + "\n")
-            self._maybe_trim_log()
-        except OSError as e:
-            logger.warning("Could not append outcome log row: %s", e)
-
-    def _maybe_trim_log(self) -> None:
-        """Keep at most ``_max_jsonl_lines`` lines by dropping oldest records."""
-        if self._max_jsonl_lines <= 0 or not self.log_path.is_file():
-            return
-        try:
-            text = self.log_path.read_text(encoding="utf-8")
-        except OSError as e:
-            logger.warning("Could not read outcome log for trim: %s", e)
-            return
-        lines = [ln for ln in text.splitlines() if ln.strip()]
-        if len(lines) <= self._max_jsonl_lines:
-            return
-        keep = lines[-self._max_jsonl_lines :]
-        tmp = self.log_path.with_suffix(self.log_path.suffix + ".tmp")
-        try:
-            tmp.write_text("\n".join(keep) + "\n", encoding="utf-8")
-            tmp.replace(self.log_path)
-        except OSError as e:
-            logger.warning("Could not trim outcome log: %s", e)
-            try:
-                if tmp.is_file():
-                    tmp.unlink()
-            except OSError:
-                pass
-
-    def _load_feedback_counts(self) -> tuple[dict[str, dict[str, int]], dict[str, int]]:
-        """Returns (per_action outcome tallies, global outcome tallies)."""
-        per_action: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        global_counts: dict[str, int] = defaultdict(int)
-
-        if not self.log_path.is_file():
-            return {}, {}
+    def feedback_counts(self, action_key: str) -> tuple[dict[str, int], dict[str, int]]:
+        """Returns (outcome tallies for ``action_key``, global outcome tallies) over the retained log."""
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._per_action.get(action_key, {})), dict(self._global)
 
-        try:
-            with self.log_path.open(encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if obj.get("event") != "feedback":
-                        continue
-                    key = obj.get("action_key") or "_empty"
-                    oc = obj.get("outcome")
-                    if oc not in DEFAULT_PRIOR:
-                        continue
-                    per_action[key][oc] += 1
-                    global_counts[oc] += 1
-        except OSError as e:
-            logger.warning("Could not read outcome log: %s", e)
+    def outcome_summary(self, action: str, *, level: float | None = None) -> OutcomeSummary:
+        """Windowed and decayed counts, posterior mean and credible intervals for ``action`` (no log reads)."""
+        with self._lock:
+            self._ensure_loaded()
+        return self.statistics.summary(normalize_action_key(action), level=level)
 
-        return dict(per_action), dict(global_counts)
+    def global_outcome_summary(self, *, level: float | None = None) -> OutcomeSummary:
+        """Same as outcome_summary, over all actions."""
+        with self._lock:
+            self._ensure_loaded()
+        return self.statistics.summary(GLOBAL_KEY, level=level)
 
     @staticmethod
     def _counts_to_probs(counts: dict[str, int]) -> dict[str, float]:
@@ -175,9 +478,8 @@ class OutcomePredictionStore:
     def empirical_probabilities(self, action: str) -> EmpiricalProbabilities:
         """Derive outcome probabilities from logged feedback with fallback hierarchy."""
         action_key = normalize_action_key(action)
-        per_action, global_counts = self._load_feedback_counts()
+        action_counts, global_counts = self.feedback_counts(action_key)
 
-        action_counts = dict(per_action.get(action_key, {}))
         n_action = sum(action_counts.get(k, 0) for k in DEFAULT_PRIOR)
         n_global = sum(global_counts.get(k, 0) for k in DEFAULT_PRIOR)
 
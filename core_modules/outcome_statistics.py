@@ -0,0 +1,298 @@
+"""Windowed and time-decayed outcome statistics with Beta/Dirichlet credible intervals.
+
+All-time tallies treat a failure from last quarter the same as one from this
+morning. This engine keeps two drift-aware views of the feedback stream,
+per action key and globally:
+
+* sliding-window counts: a ring of time buckets per key, expired lazily as
+  the clock advances;
+* exponentially decayed counts: a vector scaled by ``2 ** (-dt / half_life)``
+  whenever the key is touched.
+
+Both are updated in O(1) per feedback event, amortised over the buckets a key
+skips, and queried in O(labels). Posterior estimates put a Dirichlet prior
+(``prior_strength`` pseudo-observations spread by ``prior``) on the decayed
+counts. Each label's marginal is a Beta distribution, and its quantiles give
+the credible interval.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+GLOBAL_KEY = "__global__"
+
+
+# --- Beta quantiles (no SciPy dependency) --------------------------------------
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-14:
+            break
+    return h
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _betacf(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _betacf(b, a, 1.0 - x) / b
+
+
+def beta_ppf(q: float, a: float, b: float) -> float:
+    """Inverse of beta_cdf: Newton steps from a normal approximation, kept inside a bisection bracket."""
+    if q <= 0.0:
+        return 0.0
+    if q >= 1.0:
+        return 1.0
+    log_norm = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+    mean = a / (a + b)
+    sd = math.sqrt(a * b / ((a + b) ** 2 * (a + b + 1.0)))
+    z = math.sqrt(2.0) * _erfinv(2.0 * q - 1.0)
+    lo, hi = 0.0, 1.0
+    x = min(max(mean + z * sd, 1e-9), 1.0 - 1e-9)
+    for _ in range(100):
+        err = beta_cdf(x, a, b) - q
+        if err < 0:
+            lo = x
+        else:
+            hi = x
+        pdf = math.exp(log_norm + (a - 1.0) * math.log(x) + (b - 1.0) * math.log1p(-x))
+        step = err / pdf if pdf > 0 else 0.0
+        nxt = x - step
+        if not lo < nxt < hi:
+            nxt = (lo + hi) / 2.0
+        if abs(nxt - x) < 1e-12 or hi - lo < 1e-12:
+            return nxt
+        x = nxt
+    return x
+
+
+_ERFINV_CENTRAL = (
+    3.43273939e-07,
+    -3.5233877e-06,
+    -4.39150654e-06,
+    0.00021858087,
+    -0.00125372503,
+    -0.00417768164,
+    0.246640727,
+    1.50140941,
+)
+_ERFINV_TAIL = (
+    0.000100950558,
+    0.00134934322,
+    -0.00367342844,
+    0.00573950773,
+    -0.0076224613,
+    0.00943887047,
+    1.00167406,
+    2.83297682,
+)
+
+
+def _erfinv(y: float) -> float:
+    """Inverse error function (Giles' single-precision approximation; only seeds Newton)."""
+    w = -math.log((1.0 - y) * (1.0 + y))
+    if w < 5.0:
+        w, p, coefficients = w - 2.5, 2.81022636e-08, _ERFINV_CENTRAL
+    else:
+        w, p, coefficients = math.sqrt(w) - 3.0, -0.000200214257, _ERFINV_TAIL
+    for c in coefficients:
+        p = c + p * w
+    return p * y
+
+
+# --- Per-key state -------------------------------------------------------------
+
+
+class _Track:
+    """Bucket ring and decayed vector for one action key."""
+
+    __slots__ = ("epochs", "buckets", "window", "head", "decayed", "decayed_at")
+
+    def __init__(self, n_buckets: int, n_labels: int):
+        self.epochs = [-1] * n_buckets
+        self.buckets = [[0] * n_labels for _ in range(n_buckets)]
+        self.window = [0] * n_labels
+        self.head = -1  # newest bucket index seen
+        self.decayed = [0.0] * n_labels
+        self.decayed_at: float | None = None
+
+    def advance(self, bucket: int) -> None:
+        """Expire ring slots that fall out of the window once ``bucket`` is the newest."""
+        n = len(self.epochs)
+        if bucket <= self.head:
+            return
+        first = max(self.head + 1, bucket - n + 1)
+        for idx in range(first, bucket + 1):
+            slot = idx % n
+            if self.epochs[slot] != -1:
+                counts = self.buckets[slot]
+                for i, c in enumerate(counts):
+                    if c:
+                        self.window[i] -= c
+                        counts[i] = 0
+                self.epochs[slot] = -1
+        self.head = bucket
+
+    def add(self, label: int, bucket: int, at: float, half_life: float) -> None:
+        self.advance(bucket)
+        if bucket > self.head - len(self.epochs):
+            slot = bucket % len(self.epochs)
+            self.epochs[slot] = bucket
+            self.buckets[slot][label] += 1
+            self.window[label] += 1
+
+        if self.decayed_at is None:
+            self.decayed_at = at
+        if at >= self.decayed_at:
+            factor = 0.5 ** ((at - self.decayed_at) / half_life)
+            if factor != 1.0:
+                self.decayed = [v * factor for v in self.decayed]
+            self.decayed[label] += 1.0
+            self.decayed_at = at
+        else:
+            # Late event: enter it already decayed to the vector's reference time
+            self.decayed[label] += 0.5 ** ((self.decayed_at - at) / half_life)
+
+    def decayed_now(self, now: float, half_life: float) -> list[float]:
+        if self.decayed_at is None:
+            return list(self.decayed)
+        factor = 0.5 ** (max(0.0, now - self.decayed_at) / half_life)
+        return [v * factor for v in self.decayed]
+
+
+@dataclass(frozen=True)
+class OutcomeSummary:
+    """Drift-aware view of one action key's (or the global) feedback."""
+
+    action_key: str
+    window_counts: dict[str, int]
+    decayed_counts: dict[str, float]
+    posterior_mean: dict[str, float]
+    intervals: dict[str, tuple[float, float]]
+    level: float
+
+    @property
+    def window_samples(self) -> int:
+        return sum(self.window_counts.values())
+
+    @property
+    def decayed_samples(self) -> float:
+        return sum(self.decayed_counts.values())
+
+
+class OutcomeStatistics:
+    """Incremental windowed / decayed outcome counts per action key, plus a global aggregate."""
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        prior: Mapping[str, float],
+        *,
+        window_seconds: float = 7 * 86_400,
+        bucket_seconds: float = 3_600,
+        half_life_seconds: float = 3 * 86_400,
+        prior_strength: float = 2.0,
+        level: float = 0.9,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if window_seconds <= 0 or bucket_seconds <= 0 or half_life_seconds <= 0:
+            raise ValueError("window, bucket and half-life must be positive")
+        self.labels = tuple(labels)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        total = sum(prior[label] for label in self.labels)
+        self._alpha0 = [prior_strength * prior[label] / total for label in self.labels]
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.half_life_seconds = half_life_seconds
+        self.level = level
+        self.clock = clock
+        self._n_buckets = max(1, math.ceil(window_seconds / bucket_seconds))
+        self._tracks: dict[str, _Track] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def horizon_seconds(self) -> float:
+        """Age beyond which an event no longer matters (outside the window, decayed below 0.1%)."""
+        return max(self.window_seconds, 10 * self.half_life_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tracks.clear()
+
+    def observe(self, action_key: str, outcome: str, at: float | None = None) -> None:
+        """Count one feedback event for ``action_key`` and the global aggregate."""
+        label = self._index.get(outcome)
+        if label is None:
+            return
+        at = self.clock() if at is None else at
+        bucket = int(at // self.bucket_seconds)
+        with self._lock:
+            for key in (action_key, GLOBAL_KEY):
+                track = self._tracks.get(key)
+                if track is None:
+                    track = self._tracks[key] = _Track(self._n_buckets, len(self.labels))
+                track.add(label, bucket, at, self.half_life_seconds)
+
+    def summary(
+        self, action_key: str = GLOBAL_KEY, *, now: float | None = None, level: float | None = None
+    ) -> OutcomeSummary:
+        """Window counts, decayed counts, Dirichlet posterior mean and per-label credible intervals."""
+        now = self.clock() if now is None else now
+        level = self.level if level is None else level
+        with self._lock:
+            track = self._tracks.get(action_key)
+            if track is None:
+                window = [0] * len(self.labels)
+                decayed = [0.0] * len(self.labels)
+            else:
+                track.advance(int(now // self.bucket_seconds))
+                window = list(track.window)
+                decayed = track.decayed_now(now, self.half_life_seconds)
+
+        alphas = [a0 + d for a0, d in zip(self._alpha0, decayed, strict=True)]
+        alpha_sum = sum(alphas)
+        tail = (1.0 - level) / 2.0
+        intervals = {}
+        for label, alpha in zip(self.labels, alphas, strict=True):
+            rest = alpha_sum - alpha
+            intervals[label] = (beta_ppf(tail, alpha, rest), beta_ppf(1.0 - tail, alpha, rest))
+        return OutcomeSummary(
+            action_key=action_key,
+            window_counts=dict(zip(self.labels, window, strict=True)),
+            decayed_counts=dict(zip(self.labels, decayed, strict=True)),
+            posterior_mean={label: alpha / alpha_sum for label, alpha in zip(self.labels, alphas, strict=True)},
+            intervals=intervals,
+            level=level,
+        )
@@ -18,6 +18,7 @@ from typing import Any
 
 from core_modules.outcome_prediction_store import (
     DEFAULT_PRIOR,
+    MIN_ACTION_SAMPLES,
     OutcomePredictionStore,
     canonical_outcome_label,
     normalize_action_key,
@@ -247,12 +248,12 @@ class ParallelSimulationEngine:
                 execution_time=execution_time,
             )
 
-            # Update instance
-            instance.status = SimulationStatus.COMPLETED
+            # Update instance (status last: waiters read result once COMPLETED is visible)
             instance.completed_at = datetime.now()
             instance.result = asdict(sim_result)
             instance.confidence = sim_result.confidence
             instance.relevance_score = result.get("relevance_score", 0.5)
+            instance.status = SimulationStatus.COMPLETED
 
             # Update statistics
             self.stats["completed_simulations"] += 1
@@ -352,6 +353,16 @@ class ParallelSimulationEngine:
         _context = input_data.get("context", {})  # noqa: F841 — reserved for future use
 
         emp = self._outcome_store.empirical_probabilities(action)
+        # In-memory windowed/decayed statistics: no log reads per simulation
+        recent = self._outcome_store.outcome_summary(action)
+        if recent.window_samples >= MIN_ACTION_SAMPLES:
+            # Enough recent feedback for this action: use the drift-aware posterior
+            probs, source = recent.posterior_mean, "recent_posterior"
+            intervals = recent.intervals
+        else:
+            # The posterior's credible intervals would not describe these estimates
+            probs, source = emp.probs, emp.source
+            intervals = None
 
         descriptions = {
             "success": f"{action} succeeds with expected results",
@@ -372,7 +383,8 @@ class ParallelSimulationEngine:
         outcomes = [
             {
                 "type": outcome_type,
-                "probability": emp.probs[outcome_type],
+                "probability": probs[outcome_type],
+                "probability_interval": list(intervals[outcome_type]) if intervals else None,
                 "description": descriptions[outcome_type],
                 "timeline": timelines[outcome_type],
                 "dependencies": dependency_sets[outcome_type],
@@ -380,7 +392,7 @@ class ParallelSimulationEngine:
             for outcome_type in DEFAULT_PRIOR
         ]
 
-        success_prob = emp.probs["success"]
+        success_prob = probs["success"]
 
         return {
             "outcome": {
@@ -388,9 +400,12 @@ class ParallelSimulationEngine:
                 "most_likely": max(outcomes, key=lambda x: x["probability"]),
                 "risk_assessment": ("medium" if success_prob > 0.5 else "high"),
                 "prediction_meta": {
-                    "source": emp.source,
+                    "source": source,
                     "action_samples": emp.action_samples,
                     "global_samples": emp.global_samples,
+                    "window_samples": recent.window_samples,
+                    "decayed_samples": recent.decayed_samples,
+                    "interval_level": recent.level if intervals else None,
                 },
             },
             "confidence": 0.75,
@@ -2,6 +2,10 @@
 
 Implements Echoes-only event stages:
   conflict_detected -> candidate_scored -> candidate_resolved -> resolution_committed
+
+Committed resolutions live in a sharded segment store
+(manifests/resolution_store, see core_modules.resolution_store) keyed by
+conflict_id.
 """
 
 from __future__ import annotations
@@ -13,6 +17,9 @@ from hashlib import sha256
 from pathlib import Path
 from typing import Any
 
+from core_modules.event_log import get_event_log
+from core_modules.resolution_store import ResolutionStore
+
 SCOPE_WEIGHTS = {
     "path_space": 2,
     "content_attraction": 1,
@@ -38,10 +45,37 @@ def _audit_path() -> Path:
     return Path.home() / ".echoes" / "audit.ndjson"
 
 
+def open_resolution_store() -> ResolutionStore:
+    """Open the class-of-21 resolution store, importing legacy per-conflict JSON files on first use."""
+    manifests = _scope_root() / "manifests"
+    store = ResolutionStore(manifests / "resolution_store")
+    legacy_dir = manifests / "resolutions"
+    if store.created and legacy_dir.is_dir():
+        store.import_directory(legacy_dir)
+    return store
+
+
+def load_resolution(conflict_id: str) -> dict[str, Any] | None:
+    """Latest committed resolution for a conflict, or None."""
+    with open_resolution_store() as store:
+        return store.get(conflict_id)
+
+
+def iter_resolutions(since: str | datetime | None = None, until: str | datetime | None = None) -> list[dict[str, Any]]:
+    """Resolutions committed in [since, until), oldest first."""
+    with open_resolution_store() as store:
+        return [resolution for _, resolution in store.iter_range(since, until)]
+
+
 def _append_jsonl(path: Path, payload: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=True, sort_keys=True) + "\n")
+    """
+    Append one row through the shared event log writer for ``path``.
+
+    The row is in the file when this returns, as with the old open/append/close,
+    so a process crash cannot lose it and readers see it at once. Concurrent
+    callers still share one write (group commit).
+    """
+    get_event_log(path).append(json.dumps(payload, ensure_ascii=True, sort_keys=True), wait=True)
 
 
 def emit_event(event: str, payload: dict[str, Any]) -> None:
@@ -130,100 +164,97 @@ def run_conflict_pipeline(conflicts: list[dict[str, Any]]) -> list[dict[str, Any
     Args:
         conflicts: list with keys partition_id, partition_key, entities
     """
-    scope_root = _scope_root()
-    resolutions_dir = scope_root / "manifests" / "resolutions"
-    resolutions_dir.mkdir(parents=True, exist_ok=True)
-
     summaries: list[dict[str, Any]] = []
 
-    for conflict in conflicts:
-        partition_id = str(conflict["partition_id"])
-        partition_key = str(conflict["partition_key"])
-        entities = list(conflict.get("entities") or [])
-
-        conflict_id = f"cf-{sha256(f'{partition_id}:{partition_key}'.encode()).hexdigest()[:12]}"
-        emit_event(
-            "conflict_detected",
-            {
-                "conflict_id": conflict_id,
-                "partition_id": partition_id,
-                "partition_key": partition_key,
-                "entity_count": len(entities),
-            },
-        )
-
-        claims: list[dict[str, Any]] = []
-        for entity in entities:
-            claims.extend(_claims_for_entity(conflict_id, entity, partition_id, partition_key))
+    with open_resolution_store() as store:
+        for conflict in conflicts:
+            partition_id = str(conflict["partition_id"])
+            partition_key = str(conflict["partition_key"])
+            entities = list(conflict.get("entities") or [])
 
-        emit_event(
-            "candidate_scored",
-            {
-                "conflict_id": conflict_id,
-                "partition_id": partition_id,
-                "candidate_count": len(claims),
-            },
-        )
+            conflict_id = f"cf-{sha256(f'{partition_id}:{partition_key}'.encode()).hexdigest()[:12]}"
+            emit_event(
+                "conflict_detected",
+                {
+                    "conflict_id": conflict_id,
+                    "partition_id": partition_id,
+                    "partition_key": partition_key,
+                    "entity_count": len(entities),
+                },
+            )
 
-        winner, losers = _select_winner(claims)
+            claims: list[dict[str, Any]] = []
+            for entity in entities:
+                claims.extend(_claims_for_entity(conflict_id, entity, partition_id, partition_key))
 
-        emit_event(
-            "candidate_resolved",
-            {
-                "conflict_id": conflict_id,
-                "partition_id": partition_id,
-                "winner_candidate_id": winner["candidate_id"],
-            },
-        )
-
-        resolution = {
-            "resolution_id": f"rs-{sha256((conflict_id + winner['candidate_id']).encode()).hexdigest()[:12]}",
-            "conflict_id": conflict_id,
-            "partition_id": partition_id,
-            "partition_key": partition_key,
-            "winner": {
-                "candidate_id": winner["candidate_id"],
-                "entity_id": winner["entity_id"],
-                "claim_kind": winner["claim_kind"],
-                "confidence": winner["confidence"],
-            },
-            "losers": [
+            emit_event(
+                "candidate_scored",
                 {
-                    "candidate_id": c["candidate_id"],
-                    "entity_id": c["entity_id"],
-                    "claim_kind": c["claim_kind"],
-                    "confidence": c["confidence"],
-                }
-                for c in losers
-            ],
-            "policy": "confidence-first",
-            "tie_breakers": ["scope_weight", "candidate_id_lexical"],
-            "timestamp": _now_iso(),
-        }
+                    "conflict_id": conflict_id,
+                    "partition_id": partition_id,
+                    "candidate_count": len(claims),
+                },
+            )
 
-        resolution_path = resolutions_dir / f"{conflict_id}.json"
-        with resolution_path.open("w", encoding="utf-8") as f:
-            json.dump(resolution, f, ensure_ascii=True, indent=2, sort_keys=True)
-            f.write("\n")
+            winner, losers = _select_winner(claims)
 
-        emit_event(
-            "resolution_committed",
-            {
-                "conflict_id": conflict_id,
-                "partition_id": partition_id,
-                "resolution_path": str(resolution_path),
-            },
-        )
+            emit_event(
+                "candidate_resolved",
+                {
+                    "conflict_id": conflict_id,
+                    "partition_id": partition_id,
+                    "winner_candidate_id": winner["candidate_id"],
+                },
+            )
 
-        summaries.append(
-            {
+            resolution = {
+                "resolution_id": f"rs-{sha256((conflict_id + winner['candidate_id']).encode()).hexdigest()[:12]}",
                 "conflict_id": conflict_id,
                 "partition_id": partition_id,
-                "winner_entity_id": winner["entity_id"],
-                "winner_candidate_id": winner["candidate_id"],
-                "blocked_entity_ids": sorted({c["entity_id"] for c in losers if c["entity_id"] != winner["entity_id"]}),
+                "partition_key": partition_key,
+                "winner": {
+                    "candidate_id": winner["candidate_id"],
+                    "entity_id": winner["entity_id"],
+                    "claim_kind": winner["claim_kind"],
+                    "confidence": winner["confidence"],
+                },
+                "losers": [
+                    {
+                        "candidate_id": c["candidate_id"],
+                        "entity_id": c["entity_id"],
+                        "claim_kind": c["claim_kind"],
+                        "confidence": c["confidence"],
+                    }
+                    for c in losers
+                ],
+                "policy": "confidence-first",
+                "tie_breakers": ["scope_weight", "candidate_id_lexical"],
+                "timestamp": _now_iso(),
             }
-        )
+
+            store.put(conflict_id, resolution)
+
+            emit_event(
+                "resolution_committed",
+                {
+                    "conflict_id": conflict_id,
+                    "partition_id": partition_id,
+                    "resolution_store": str(store.root),
+                    "resolution_key": conflict_id,
+                },
+            )
+
+            summaries.append(
+                {
+                    "conflict_id": conflict_id,
+                    "partition_id": partition_id,
+                    "winner_entity_id": winner["entity_id"],
+                    "winner_candidate_id": winner["candidate_id"],
+                    "blocked_entity_ids": sorted(
+                        {c["entity_id"] for c in losers if c["entity_id"] != winner["entity_id"]}
+                    ),
+                }
+            )
 
     return summaries
 
@@ -0,0 +1,457 @@
+"""
+Durable, checkpointed log for hash-chained Decision Provenance Records (DPRs).
+
+The in-memory provenance chain in legal_safeguards was lost on restart, and
+verifying it re-hashed every record. This log persists the chain and keeps
+verification proportional to what was appended since the last check.
+
+Layout under ``log_dir``:
+
+* ``provenance.<seq:08d>.ndjson`` segments: one DPR per line. After every
+  ``checkpoint_every`` records comes a signed checkpoint line holding the
+  running chain hash, the record count and the last dpr_id. Segments rotate
+  right after a checkpoint once they hold ``segment_entries`` records.
+* ``checkpoints.ndjson`` locates every checkpoint line (segment, byte range),
+  so opening the log and building proofs never scan the whole chain. It is a
+  cache: on open, checkpoints missing from it are re-derived from the tail.
+* ``verified.json`` is a signed marker for the last checkpoint that
+  :meth:`ProvenanceLog.verify` checked. The next incremental verification
+  re-reads that one checkpoint line and continues after it.
+
+Appends go straight to the segment file (O_APPEND). They are fsynced in
+batches: every ``fsync_every`` records, after ``fsync_interval`` seconds, and
+at every checkpoint. A torn last line left by a crash is cut off on open.
+
+A proof for one record (:meth:`ProvenanceLog.prove`) has three parts: the
+signed checkpoint before the record, the records up to the next checkpoint,
+and that signed checkpoint. :func:`verify_proof` re-links them without access
+to the log.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+GENESIS_HASH = "genesis"
+SEGMENT_PREFIX = "provenance."
+SEGMENT_SUFFIX = ".ndjson"
+INDEX_NAME = "checkpoints.ndjson"
+VERIFIED_NAME = "verified.json"
+
+
+# --- Record sealing (shared with the in-memory chain) --------------------------
+
+
+def chain_hash(parent_hash: str, partial: dict[str, Any]) -> str:
+    """sha256 over the parent hash and the record's canonical JSON (without chain_hash/signature)."""
+    return hashlib.sha256((parent_hash + json.dumps(partial, sort_keys=True)).encode()).hexdigest()
+
+
+def _hmac(secret: bytes, payload: dict[str, Any]) -> str:
+    return hmac.new(secret, json.dumps(payload, sort_keys=True).encode(), hashlib.sha256).hexdigest()
+
+
+def seal_record(partial: dict[str, Any], parent_hash: str, secret: bytes) -> dict[str, Any]:
+    """Add chain_hash and the HMAC signature to a DPR body."""
+    dpr = {**partial, "chain_hash": chain_hash(parent_hash, partial)}
+    dpr["signature"] = _hmac(secret, dpr)
+    return dpr
+
+
+def check_record(dpr: dict[str, Any], parent_hash: str, secret: bytes | None) -> bool:
+    """True when ``dpr`` links to ``parent_hash`` and (given a secret) carries a valid signature."""
+    unsigned = {k: v for k, v in dpr.items() if k != "signature"}
+    partial = {k: v for k, v in unsigned.items() if k != "chain_hash"}
+    if dpr.get("chain_hash") != chain_hash(parent_hash, partial):
+        return False
+    return secret is None or hmac.compare_digest(dpr.get("signature", ""), _hmac(secret, unsigned))
+
+
+def check_checkpoint(record: dict[str, Any], secret: bytes) -> bool:
+    unsigned = {k: v for k, v in record.items() if k != "signature"}
+    return record.get("checkpoint") is True and hmac.compare_digest(
+        record.get("signature", ""), _hmac(secret, unsigned)
+    )
+
+
+def verify_proof(proof: dict[str, Any], secret: bytes) -> bool:
+    """Check a proof from :meth:`ProvenanceLog.prove`: signed anchors, unbroken chain, target record included."""
+    start, end, records = proof.get("start"), proof.get("end"), proof.get("records", [])
+    if end is None or not check_checkpoint(end, secret):
+        return False
+    if start is not None and not check_checkpoint(start, secret):
+        return False
+    count = start["count"] if start else 0
+    current = start["chain_hash"] if start else GENESIS_HASH
+    if not count <= proof.get("sequence_number", -1) < count + len(records):
+        return False
+    for offset, dpr in enumerate(records):
+        if dpr.get("sequence_number") != count + offset or not check_record(dpr, current, secret):
+            return False
+        current = dpr["chain_hash"]
+    return end["count"] == count + len(records) and end["chain_hash"] == current
+
+
+# --- Log -----------------------------------------------------------------------
+
+
+@dataclass
+class _Checkpoint:
+    count: int
+    chain_hash: str
+    last_dpr_id: str | None
+    segment: int
+    offset: int  # start of the checkpoint line
+    end: int  # byte just past it
+
+
+class ProvenanceLog:
+    """Append-only, segmented, checkpointed DPR chain on disk."""
+
+    def __init__(
+        self,
+        log_dir: str | Path,
+        secret: bytes,
+        *,
+        checkpoint_every: int = 1000,
+        segment_entries: int = 100_000,
+        fsync_every: int = 256,
+        fsync_interval: float = 1.0,
+    ):
+        if not secret:
+            raise ValueError("a signing secret is required")
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.secret = secret
+        self.checkpoint_every = checkpoint_every
+        self.segment_entries = max(segment_entries, checkpoint_every)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.lock = threading.RLock()
+
+        self.count = 0
+        self.head_hash = GENESIS_HASH
+        self.head_dpr_id: str | None = None
+        self._checkpoints: list[_Checkpoint] = []
+        self._segment = 0
+        self._segment_records = 0
+        self._since_checkpoint = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._fd: int | None = None
+        self._recover()
+
+    # --- Paths / files -----------------------------------------------------------
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.log_dir / f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}"
+
+    def segment_paths(self) -> list[Path]:
+        return sorted(self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    @staticmethod
+    def _segment_seq(path: Path) -> int:
+        return int(path.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+
+    def _open_segment(self, seq: int) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+        self._segment = seq
+        self._fd = os.open(self._segment_path(seq), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _write(self, line: bytes) -> int:
+        """Append one line to the current segment; returns its start offset."""
+        offset = os.lseek(self._fd, 0, os.SEEK_END)
+        view = memoryview(line)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+        return offset
+
+    def _iter_from(self, segment: int, offset: int) -> Iterator[tuple[int, int, int, dict[str, Any]]]:
+        """Yield (segment, start, end, record) for every complete line from a position onward."""
+        for path in self.segment_paths():
+            seq = self._segment_seq(path)
+            if seq < segment:
+                continue
+            with open(path, "rb") as f:
+                pos = offset if seq == segment else 0
+                f.seek(pos)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    yield seq, pos, pos + len(line), json.loads(line)
+                    pos += len(line)
+
+    # --- Recovery ----------------------------------------------------------------
+
+    def _load_index(self) -> None:
+        sizes = {self._segment_seq(p): p.stat().st_size for p in self.segment_paths()}
+        try:
+            with open(self.log_dir / INDEX_NAME, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        cp = _Checkpoint(**json.loads(line))
+                    except (ValueError, TypeError):
+                        break
+                    if cp.end > sizes.get(cp.segment, -1):
+                        break  # index ran ahead of data that never reached disk
+                    self._checkpoints.append(cp)
+        except FileNotFoundError:
+            pass
+
+    def _append_index(self, cp: _Checkpoint) -> None:
+        with open(self.log_dir / INDEX_NAME, "a", encoding="utf-8") as f:
+            f.write(json.dumps(cp.__dict__) + "\n")
+
+    def _recover(self) -> None:
+        """Restore the head from the last indexed checkpoint plus a scan of the records after it."""
+        self._load_index()
+        if self._checkpoints and not self._checkpoint_matches(self._checkpoints[-1]):
+            # Segments were rewritten underneath the index; rebuild it from a full scan
+            self._checkpoints = []
+            (self.log_dir / INDEX_NAME).unlink(missing_ok=True)
+        segments = self.segment_paths()
+        if self._checkpoints:
+            cp = self._checkpoints[-1]
+            self.count, self.head_hash, self.head_dpr_id = cp.count, cp.chain_hash, cp.last_dpr_id
+            start_segment, start_offset = cp.segment, cp.end
+        else:
+            start_segment, start_offset = (self._segment_seq(segments[0]) if segments else 0), 0
+
+        segment, end = start_segment, start_offset
+        for segment, start, end, record in self._iter_from(start_segment, start_offset):
+            if record.get("checkpoint"):
+                cp = _Checkpoint(record["count"], record["chain_hash"], record["last_dpr_id"], segment, start, end)
+                self._checkpoints.append(cp)
+                self._append_index(cp)
+                self._since_checkpoint = 0
+            else:
+                self.count += 1
+                self.head_hash = record["chain_hash"]
+                self.head_dpr_id = record["dpr_id"]
+                self._since_checkpoint += 1
+
+        if segments:
+            last = self._segment_seq(segments[-1])
+            path = self._segment_path(last)
+            complete = end if segment == last else 0
+            if segment == last and path.stat().st_size > complete:
+                with open(path, "r+b") as f:
+                    f.truncate(complete)  # torn final line
+            self._open_segment(last)
+            # Segments start right after a checkpoint, so the active one holds everything past
+            # the last checkpoint written to an earlier segment
+            before = next((cp.count for cp in reversed(self._checkpoints) if cp.segment < last), 0)
+            self._segment_records = self.count - before
+        else:
+            self._open_segment(0)
+
+    # --- Writes ------------------------------------------------------------------
+
+    def append(self, dpr: dict[str, Any]) -> None:
+        """Persist a sealed DPR; it must extend the current head."""
+        with self.lock:
+            if dpr["sequence_number"] != self.count or dpr.get("parent_dpr_id") != self.head_dpr_id:
+                raise ValueError("record does not extend the provenance chain head")
+            self._write((json.dumps(dpr, sort_keys=True) + "\n").encode())
+            self.count += 1
+            self.head_hash = dpr["chain_hash"]
+            self.head_dpr_id = dpr["dpr_id"]
+            self._since_checkpoint += 1
+            self._segment_records += 1
+            self._unsynced += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self.checkpoint()
+            elif self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+
+    def checkpoint(self) -> dict[str, Any] | None:
+        """Write a signed checkpoint for the current head (no-op if nothing new since the last one)."""
+        with self.lock:
+            if self._since_checkpoint == 0:
+                return None
+            record = {
+                "checkpoint": True,
+                "count": self.count,
+                "chain_hash": self.head_hash,
+                "last_dpr_id": self.head_dpr_id,
+                "timestamp": datetime.now(UTC).isoformat(),
+            }
+            record["signature"] = _hmac(self.secret, record)
+            line = (json.dumps(record, sort_keys=True) + "\n").encode()
+            offset = self._write(line)
+            self.sync()
+            cp = _Checkpoint(self.count, self.head_hash, self.head_dpr_id, self._segment, offset, offset + len(line))
+            self._checkpoints.append(cp)
+            self._append_index(cp)
+            self._since_checkpoint = 0
+            if self._segment_records >= self.segment_entries:
+                self._open_segment(self._segment + 1)
+                self._segment_records = 0
+            return record
+
+    def sync(self) -> None:
+        with self.lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        with self.lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+    # --- Reads -------------------------------------------------------------------
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Every DPR in chain order (checkpoint lines skipped)."""
+        segments = self.segment_paths()
+        if not segments:
+            return
+        for _, _, _, record in self._iter_from(self._segment_seq(segments[0]), 0):
+            if not record.get("checkpoint"):
+                yield record
+
+    def _read_checkpoint(self, cp: _Checkpoint) -> dict[str, Any] | None:
+        """The checkpoint line at ``cp``'s byte range, or None unless exactly one whole line sits there."""
+        start = max(cp.offset - 1, 0)
+        try:
+            with open(self._segment_path(cp.segment), "rb") as f:
+                f.seek(start)
+                data = f.read(cp.end - start)
+            if (cp.offset and not data.startswith(b"\n")) or not data.endswith(b"\n"):
+                return None
+            record = json.loads(data)
+        except (OSError, ValueError):
+            return None
+        return record if isinstance(record, dict) else None
+
+    def _checkpoint_matches(self, cp: _Checkpoint) -> bool:
+        record = self._read_checkpoint(cp)
+        return (
+            record is not None
+            and check_checkpoint(record, self.secret)
+            and (record["count"], record["chain_hash"]) == (cp.count, cp.chain_hash)
+        )
+
+    def prove(self, sequence_number: int) -> dict[str, Any]:
+        """Proof that one record belongs to the chain (see :func:`verify_proof`)."""
+        with self.lock:
+            counts = [cp.count for cp in self._checkpoints]
+            i = bisect.bisect_right(counts, sequence_number)
+            if not 0 <= sequence_number < self.count:
+                raise IndexError(f"no provenance record {sequence_number}")
+            if i == len(counts):
+                raise ValueError(f"record {sequence_number} is not covered by a checkpoint yet; call checkpoint()")
+            start_cp = self._checkpoints[i - 1] if i else None
+            end_cp = self._checkpoints[i]
+            if start_cp:
+                position = (start_cp.segment, start_cp.end)
+            else:
+                segments = self.segment_paths()
+                position = (self._segment_seq(segments[0]), 0)
+            records = []
+            for _, _, _, record in self._iter_from(*position):
+                if record.get("checkpoint"):
+                    break
+                records.append(record)
+            return {
+                "sequence_number": sequence_number,
+                "start": self._read_checkpoint(start_cp) if start_cp else None,
+                "records": records,
+                "end": self._read_checkpoint(end_cp),
+            }
+
+    # --- Verification ------------------------------------------------------------
+
+    def _load_verified(self) -> _Checkpoint | None:
+        """The last verified checkpoint, if its marker is authentic and the line it names is unchanged."""
+        try:
+            marker = json.loads((self.log_dir / VERIFIED_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        signature = marker.pop("signature", "")
+        if not hmac.compare_digest(signature, _hmac(self.secret, marker)):
+            return None
+        cp = _Checkpoint(**marker)
+        return cp if self._checkpoint_matches(cp) else None
+
+    def _store_verified(self, cp: _Checkpoint) -> None:
+        marker = dict(cp.__dict__)
+        marker["signature"] = _hmac(self.secret, marker)
+        tmp = self.log_dir / (VERIFIED_NAME + ".tmp")
+        tmp.write_text(json.dumps(marker), encoding="utf-8")
+        os.replace(tmp, self.log_dir / VERIFIED_NAME)
+
+    def verify(self, full: bool = False) -> dict[str, Any]:
+        """
+        Check chain hashes, signatures, sequence numbers and checkpoints.
+
+        Incremental by default: starts after the last verified checkpoint, so
+        the cost is proportional to the records appended since then.
+        ``full=True`` re-checks from genesis.
+        """
+        with self.lock:
+            self.sync()
+            anchor = None if full else self._load_verified()
+            if anchor is not None:
+                count, current, position = anchor.count, anchor.chain_hash, (anchor.segment, anchor.end)
+            else:
+                segments = self.segment_paths()
+                count, current = 0, GENESIS_HASH
+                position = (self._segment_seq(segments[0]) if segments else 0, 0)
+            verified_from = count
+            last_cp = anchor
+            try:
+                for segment, start, end, record in self._iter_from(*position):
+                    if record.get("checkpoint"):
+                        if (
+                            not check_checkpoint(record, self.secret)
+                            or record["count"] != count
+                            or record["chain_hash"] != current
+                        ):
+                            return self._broken(count, verified_from)
+                        last_cp = _Checkpoint(count, current, record["last_dpr_id"], segment, start, end)
+                        continue
+                    if record.get("sequence_number") != count or not check_record(record, current, self.secret):
+                        return self._broken(count, verified_from)
+                    current = record["chain_hash"]
+                    count += 1
+            except (ValueError, KeyError):  # unparseable line
+                return self._broken(count, verified_from)
+            if count != self.count:
+                return self._broken(count, verified_from)
+            if last_cp is not None and last_cp is not anchor:
+                self._store_verified(last_cp)
+            return {
+                "valid": True,
+                "total": self.count,
+                "broken_at": None,
+                "verified_from": verified_from,
+                "checked": count - verified_from,
+            }
+
+    def _broken(self, at: int, verified_from: int) -> dict[str, Any]:
+        return {
+            "valid": False,
+            "total": self.count,
+            "broken_at": at,
+            "verified_from": verified_from,
+            "checked": at - verified_from,
+        }
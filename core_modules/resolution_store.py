@@ -0,0 +1,427 @@
+"""
+Sharded, append-only on-disk store for partition-conflict resolutions.
+
+The partition conflict pipeline used to write one JSON file per resolution
+and find state by listing the resolutions directory. With tens of thousands
+of conflicts that meant one inode per resolution and directory scans for
+every lookup. This store packs resolutions into a few append-only files.
+
+Layout under ``root``:
+
+* ``store.json``: format version and shard count (fixed when the store is
+  created).
+* ``shard_<nn>/segment_<seq:06d>.jsonl``: append-only segments. Each line is
+  ``{"key", "timestamp", "value"}``. A key always goes to the same shard
+  (crc32 of the key). A shard appends to its highest-numbered segment and
+  starts a new one past ``max_segment_bytes``.
+* ``shard_<nn>/index.tsv``: one ``key, segment, offset, length, timestamp``
+  line per record, appended right after the record. Loading it gives the
+  key -> (segment, offset, length) map. A point lookup is a dict hit plus one
+  positioned read, with no directory walk.
+
+Writing a key again supersedes the older record; the last write wins. The old
+bytes stay in their segment until :meth:`ResolutionStore.compact` copies each
+shard's live records into a fresh segment, swaps in a new index and deletes
+the old segments.
+
+Shards load lazily, so a point lookup only reads its own shard's index.
+Range iteration by timestamp keeps a sorted (timestamp, key) list built on
+first use. On load, records the index has not seen (e.g. after a crash
+between the two appends) are re-indexed from the active segment, and a torn
+last line is cut off. The store assumes a single writer process; threads
+share one lock.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+FORMAT_VERSION = 1
+META_NAME = "store.json"
+SHARD_PREFIX = "shard_"
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_NAME = "index.tsv"
+
+
+@dataclass(slots=True)
+class _Entry:
+    segment: int
+    offset: int
+    length: int
+    timestamp: str
+
+
+def _index_line(key: str, entry: _Entry) -> bytes:
+    return f"{key}\t{entry.segment}\t{entry.offset}\t{entry.length}\t{entry.timestamp}\n".encode()
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _bound(value: str | datetime | None) -> str | None:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _Shard:
+    """One shard directory: its segments, its index log and the in-memory key map."""
+
+    def __init__(self, directory: Path, max_segment_bytes: int):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.entries: dict[str, _Entry] = {}
+        self.records = 0  # records in the segments, superseded ones included
+        self.active = 1
+        self.active_size = 0
+        self._read_fds: dict[int, int] = {}
+        self._segment_fd: int | None = None
+        self._index_fd: int | None = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    # --- Files -------------------------------------------------------------------
+
+    def segment_path(self, seq: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{seq:06d}{SEGMENT_SUFFIX}"
+
+    def segments(self) -> list[int]:
+        return sorted(
+            int(p.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+            for p in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")
+        )
+
+    def _reader(self, seq: int) -> int:
+        fd = self._read_fds.get(seq)
+        if fd is None:
+            fd = self._read_fds[seq] = os.open(self.segment_path(seq), os.O_RDONLY)
+        return fd
+
+    def _open_writers(self) -> None:
+        if self._segment_fd is None:
+            self._segment_fd = os.open(self.segment_path(self.active), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if self._index_fd is None:
+            self._index_fd = os.open(self.directory / INDEX_NAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def close(self) -> None:
+        for fd in [*self._read_fds.values(), self._segment_fd, self._index_fd]:
+            if fd is not None:
+                os.close(fd)
+        self._read_fds = {}
+        self._segment_fd = self._index_fd = None
+
+    def sync(self) -> None:
+        for fd in (self._segment_fd, self._index_fd):
+            if fd is not None:
+                os.fsync(fd)
+
+    # --- Loading -----------------------------------------------------------------
+
+    def _load(self) -> None:
+        segments = self.segments()
+        sizes = {seq: self.segment_path(seq).stat().st_size for seq in segments}
+        self.active = segments[-1] if segments else 1
+        indexed_end = 0
+
+        index_path = self.directory / INDEX_NAME
+        good = 0
+        try:
+            data = index_path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        for raw in data.splitlines(keepends=True):
+            try:
+                key, seg, offset, length, timestamp = raw.decode().rstrip("\n").split("\t")
+                entry = _Entry(int(seg), int(offset), int(length), timestamp)
+            except ValueError:
+                break
+            if not raw.endswith(b"\n") or entry.offset + entry.length > sizes.get(entry.segment, -1):
+                break  # torn line, or the index ran ahead of data that never reached disk
+            self.entries[key] = entry
+            self.records += 1
+            if entry.segment == self.active:
+                indexed_end = max(indexed_end, entry.offset + entry.length)
+            good += len(raw)
+        if good < len(data):
+            os.truncate(index_path, good)
+
+        self.active_size = sizes.get(self.active, 0)
+        self._catch_up(indexed_end)
+
+        # Segments left behind by an interrupted compaction hold no live records
+        live = {entry.segment for entry in self.entries.values()}
+        for seq in segments:
+            if seq != self.active and seq not in live:
+                self.segment_path(seq).unlink(missing_ok=True)
+
+    def _catch_up(self, indexed_end: int) -> None:
+        """Index complete records the index has not seen; cut off a torn tail."""
+        if self.active_size <= indexed_end:
+            return
+        path = self.segment_path(self.active)
+        pos, lines = indexed_end, []
+        with open(path, "rb") as f:
+            f.seek(pos)
+            for raw in f:
+                try:
+                    record = json.loads(raw) if raw.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    break
+                entry = _Entry(self.active, pos, len(raw), record["timestamp"])
+                self.entries[record["key"]] = entry
+                self.records += 1
+                lines.append(_index_line(record["key"], entry))
+                pos += len(raw)
+        if pos < self.active_size:
+            os.truncate(path, pos)
+            self.active_size = pos
+        if lines:
+            self._open_writers()
+            _write_all(self._index_fd, b"".join(lines))
+
+    # --- Reads / writes ----------------------------------------------------------
+
+    def read(self, entry: _Entry) -> dict[str, Any]:
+        return json.loads(os.pread(self._reader(entry.segment), entry.length, entry.offset))
+
+    def append(self, key: str, timestamp: str, line: bytes) -> _Entry | None:
+        """Write one record and its index line; returns the entry it supersedes."""
+        if self.active_size and self.active_size + len(line) > self.max_segment_bytes:
+            self._roll(self.active + 1)
+        self._open_writers()
+        entry = _Entry(self.active, self.active_size, len(line), timestamp)
+        _write_all(self._segment_fd, line)
+        self.active_size += len(line)
+        _write_all(self._index_fd, _index_line(key, entry))
+        self.records += 1
+        previous = self.entries.get(key)
+        self.entries[key] = entry
+        return previous
+
+    def _roll(self, seq: int) -> None:
+        if self._segment_fd is not None:
+            os.close(self._segment_fd)
+            self._segment_fd = None
+        self.active, self.active_size = seq, 0
+
+    @property
+    def dead_records(self) -> int:
+        return self.records - len(self.entries)
+
+    def compact(self) -> tuple[int, int]:
+        """Rewrite live records into one new segment; returns (records dropped, bytes reclaimed)."""
+        old_segments = self.segments()
+        if not self.dead_records and len(old_segments) <= 1:
+            return 0, 0
+        before = sum(self.segment_path(seq).stat().st_size for seq in old_segments)
+        seq = self.active + 1
+        live = sorted(self.entries.items(), key=lambda item: (item[1].segment, item[1].offset))
+        chunks, index_lines, pos = [], [], 0
+        entries: dict[str, _Entry] = {}
+        for key, entry in live:
+            data = os.pread(self._reader(entry.segment), entry.length, entry.offset)
+            entries[key] = moved = _Entry(seq, pos, len(data), entry.timestamp)
+            chunks.append(data)
+            index_lines.append(_index_line(key, moved))
+            pos += len(data)
+
+        with open(self.segment_path(seq), "wb") as f:
+            f.write(b"".join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp = self.directory / f"{INDEX_NAME}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(index_lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(tmp, self.directory / INDEX_NAME)
+        for old in old_segments:
+            self.segment_path(old).unlink(missing_ok=True)
+
+        dropped = self.dead_records
+        self.entries, self.records = entries, len(entries)
+        self.active, self.active_size = seq, pos
+        return dropped, before - pos
+
+
+class ResolutionStore:
+    """
+    Key -> resolution store packed into sharded append-only segment files.
+
+    Args:
+        root: Store directory (created if missing)
+        shards: Shard count for a new store; an existing store keeps its own
+        max_segment_bytes: Size at which a shard starts a new segment
+    """
+
+    def __init__(self, root: str | Path, *, shards: int = 16, max_segment_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.lock = threading.RLock()
+
+        meta_path = self.root / META_NAME
+        self.created = not meta_path.exists()
+        if self.created:
+            meta = {"version": FORMAT_VERSION, "shards": shards}
+            tmp = meta_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp, meta_path)
+        else:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"unsupported resolution store version: {meta.get('version')}")
+        self.shard_count = int(meta["shards"])
+        self._shards: list[_Shard | None] = [None] * self.shard_count
+        self._by_time: list[tuple[str, str]] | None = None
+
+    def __enter__(self) -> ResolutionStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Shards ------------------------------------------------------------------
+
+    def _shard_index(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % self.shard_count
+
+    def _shard(self, index: int) -> _Shard:
+        shard = self._shards[index]
+        if shard is None:
+            directory = self.root / f"{SHARD_PREFIX}{index:02d}"
+            shard = self._shards[index] = _Shard(directory, self.max_segment_bytes)
+        return shard
+
+    def _all_shards(self) -> list[_Shard]:
+        return [self._shard(i) for i in range(self.shard_count)]
+
+    def _time_index(self) -> list[tuple[str, str]]:
+        if self._by_time is None:
+            self._by_time = sorted(
+                (entry.timestamp, key) for shard in self._all_shards() for key, entry in shard.entries.items()
+            )
+        return self._by_time
+
+    # --- API ---------------------------------------------------------------------
+
+    def put(self, key: str, value: Any, timestamp: str | datetime | None = None) -> None:
+        """
+        Store ``value`` under ``key``, superseding any earlier record.
+
+        The timestamp used for range iteration defaults to ``value["timestamp"]``
+        when present, else the current UTC time.
+        """
+        if not key or any(c in key for c in "\t\r\n"):
+            raise ValueError(f"invalid resolution key: {key!r}")
+        if timestamp is None and isinstance(value, dict):
+            timestamp = value.get("timestamp")
+        timestamp = _bound(timestamp) or datetime.now(UTC).isoformat()
+        record = {"key": key, "timestamp": timestamp, "value": value}
+        line = (json.dumps(record, ensure_ascii=True, sort_keys=True) + "\n").encode()
+        with self.lock:
+            previous = self._shard(self._shard_index(key)).append(key, timestamp, line)
+            if self._by_time is not None:
+                if previous is not None:
+                    i = bisect.bisect_left(self._by_time, (previous.timestamp, key))
+                    del self._by_time[i]
+                bisect.insort(self._by_time, (timestamp, key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            shard = self._shard(self._shard_index(key))
+            entry = shard.entries.get(key)
+            return default if entry is None else shard.read(entry)["value"]
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            return key in self._shard(self._shard_index(key)).entries
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(shard.entries) for shard in self._all_shards())
+
+    def keys(self) -> list[str]:
+        with self.lock:
+            return [key for shard in self._all_shards() for key in shard.entries]
+
+    def iter_range(
+        self, start: str | datetime | None = None, end: str | datetime | None = None
+    ) -> Iterator[tuple[str, Any]]:
+        """Yield (key, value) with ``start <= timestamp < end`` in timestamp order (ISO-8601 UTC strings)."""
+        start, end = _bound(start), _bound(end)
+        with self.lock:
+            by_time = self._time_index()
+            lo = bisect.bisect_left(by_time, (start,)) if start is not None else 0
+            hi = bisect.bisect_left(by_time, (end,)) if end is not None else len(by_time)
+            keys = [key for _, key in by_time[lo:hi]]
+        for key in keys:
+            with self.lock:
+                shard = self._shard(self._shard_index(key))
+                entry = shard.entries.get(key)
+                if entry is None:
+                    continue
+                value = shard.read(entry)["value"]
+            yield key, value
+
+    def compact(self) -> dict[str, int]:
+        """Drop superseded records from every shard."""
+        dropped = reclaimed = 0
+        with self.lock:
+            for shard in self._all_shards():
+                d, r = shard.compact()
+                dropped += d
+                reclaimed += r
+        return {"dropped_records": dropped, "reclaimed_bytes": reclaimed}
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            shards = self._all_shards()
+            return {
+                "shards": self.shard_count,
+                "live_records": sum(len(s.entries) for s in shards),
+                "superseded_records": sum(s.dead_records for s in shards),
+                "segments": sum(len(s.segments()) for s in shards),
+            }
+
+    def import_directory(self, directory: str | Path, key_field: str = "conflict_id") -> int:
+        """Load legacy one-file-per-resolution JSON files; keys already in the store are kept."""
+        imported = 0
+        for path in sorted(Path(directory).glob("*.json")):
+            try:
+                value = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            key = str(value.get(key_field) or path.stem) if isinstance(value, dict) else path.stem
+            if key not in self:
+                self.put(key, value)
+                imported += 1
+        return imported
+
+    def sync(self) -> None:
+        with self.lock:
+            for shard in self._shards:
+                if shard is not None:
+                    shard.sync()
+
+    def close(self) -> None:
+        with self.lock:
+            for shard in self._shards:
+                if shard is not None:
+                    shard.close()
+            self._shards = [None] * self.shard_count
+            self._by_time = None
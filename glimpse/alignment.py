@@ -11,7 +11,8 @@ from enum import StrEnum
 from typing import Any
 
 import numpy as np
-from openai import AsyncOpenAI
+
+from .client_factory import get_async_openai_client
 
 # Type aliases
 FunctionCall = dict[str, Any]
@@ -124,7 +125,7 @@ class OpenAIAlignmentChecker:
         cache_config: CacheConfig | None = None,
         knowledge_base: KnowledgeBase | None = None,
     ):
-        self.client = AsyncOpenAI(api_key=api_key) if api_key else AsyncOpenAI()
+        self.client = get_async_openai_client(api_key=api_key)
         self.default_model = default_model
         self.metrics_history = []
         self.conversation_history = {}
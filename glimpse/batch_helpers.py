@@ -6,8 +6,7 @@ Groups similar drafts and issues combined requests when possible.
 import asyncio
 import logging
 
-import openai
-
+from glimpse.client_factory import get_async_openai_client
 from glimpse.Glimpse import Draft
 
 logger = logging.getLogger(__name__)
@@ -37,8 +36,8 @@ async def batch_chat_completion(
     Returns responses in the same order as inputs.
     Direct OpenAI API calls - bypassing the wrapper.
     """
-    # Create AsyncOpenAI client directly (no wrapper)
-    client = openai.AsyncOpenAI()
+    # Shared client: the batch reuses pooled keep-alive connections (no wrapper)
+    client = get_async_openai_client()
 
     # Limit concurrency to avoid rate limits
     semaphore = asyncio.Semaphore(5)
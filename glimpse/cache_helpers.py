@@ -1,33 +1,228 @@
 """
 Caching helpers for Glimpse, tuned for OpenAI API responses.
-Provides prompt-aware keying, TTL/LRU eviction, and optional persistence.
+Provides prompt-aware keying, TTL/LRU eviction, single-flight request
+coalescing and optional shared persistence (SQLite file or Redis).
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import os
+import sqlite3
+import threading
 import time
+from abc import ABC, abstractmethod
 from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
 from typing import Any
 
 # Import metrics
-from .metrics import record_cache_hit, record_cache_miss, update_cache_size
+from .metrics import (
+    record_cache_coalesced,
+    record_cache_hit,
+    record_cache_miss,
+    update_cache_size,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class _LeaderCancelled(Exception):
+    """Set on a single-flight future when its leader is cancelled; followers retry."""
+
+
+class CacheBackend(ABC):
+    """
+    Shared storage tier behind PromptCache's in-process LRU.
+
+    Backends store JSON-serializable responses keyed by prompt hash so that
+    several worker processes (and restarts) can share one hit rate.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return (value, stored_at) for key, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, stored_at: float, ttl_seconds: int) -> None:
+        """Store value for key, expiring after ttl_seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove key if present."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+    async def close(self) -> None:
+        """Release any resources held by the backend."""
+        return None
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Local file-backed cache shared by all workers on one host.
+
+    Uses WAL mode so readers in other processes are not blocked by writers.
+    Blocking sqlite calls are pushed to a worker thread.
+    """
+
+    # Trim the table back to max_size every N writes instead of on every set
+    TRIM_EVERY = 256
+
+    def __init__(self, path: str | Path, max_size: int = 10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_prompt_cache_stored ON prompt_cache(stored_at)")
+            self._conn.commit()
+
+    def _get_sync(self, key: str) -> tuple[Any, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM prompt_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, expires_at = row
+        if expires_at < time.time():
+            self._delete_sync(key)
+            return None
+        return json.loads(value), stored_at
+
+    def _set_sync(self, key: str, value: str, stored_at: float, ttl_seconds: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, stored_at, stored_at + ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_EVERY == 0:
+                self._conn.execute("DELETE FROM prompt_cache WHERE expires_at < ?", (time.time(),))
+                self._conn.execute(
+                    "DELETE FROM prompt_cache WHERE key IN "
+                    "(SELECT key FROM prompt_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+            self._conn.commit()
+
+    def _delete_sync(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _clear_sync(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM prompt_cache")
+            self._conn.commit()
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: Any, stored_at: float, ttl_seconds: int) -> None:
+        serialized = json.dumps(value, separators=(",", ":"))
+        await asyncio.to_thread(self._set_sync, key, serialized, stored_at, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete_sync, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear_sync)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache shared across hosts; expiry is delegated to Redis TTLs."""
+
+    def __init__(self, client: Any, prefix: str = "glimpse:prompt:"):
+        self._client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_config(cls, redis_config: Any = None, prefix: str = "glimpse:prompt:") -> "RedisCacheBackend":
+        """Build a backend from api.config.RedisConfig (defaults to the global config)."""
+        from redis.asyncio import Redis
+
+        if redis_config is None:
+            from api.config import get_config
+
+            redis_config = get_config().redis
+
+        if redis_config.url:
+            client = Redis.from_url(redis_config.url)
+        else:
+            client = Redis(
+                host=redis_config.host,
+                port=redis_config.port,
+                db=redis_config.db,
+                password=redis_config.password,
+            )
+        return cls(client, prefix=prefix)
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        raw = await self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["v"], entry["t"]
+
+    async def set(self, key: str, value: Any, stored_at: float, ttl_seconds: int) -> None:
+        payload = json.dumps({"v": value, "t": stored_at}, separators=(",", ":"))
+        await self._client.set(self.prefix + key, payload, ex=max(1, int(ttl_seconds)))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        async for redis_key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(redis_key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
 class PromptCache:
     """
     LRU cache with TTL for OpenAI prompt/response pairs.
     Keys are deterministic hashes of prompt components.
+
+    An optional CacheBackend acts as a shared second tier; local misses fall
+    through to it and backend hits are promoted into the local LRU.
+    Concurrent identical requests can be coalesced with get_or_compute().
     """
 
-    def __init__(self, max_size: int = 1000, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: int = 3600,
+        backend: CacheBackend | None = None,
+    ):
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
+        self.backend = backend
         self._cache: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
 
     @staticmethod
     def _hash_prompt(messages: list[dict], model: str, temperature: float, max_tokens: int | None) -> str:
@@ -41,6 +236,65 @@ class PromptCache:
         serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
         return hashlib.sha256(serialized.encode()).hexdigest()
 
+    def _store_local(self, key: str, response: Any, timestamp: float) -> None:
+        # Check if key already exists to avoid unnecessary evictions
+        if key in self._cache:
+            self._cache[key] = (response, timestamp)
+            self._cache.move_to_end(key)
+            update_cache_size(len(self._cache))
+            return
+
+        # Evict oldest if over capacity
+        while len(self._cache) >= self.max_size:
+            self._cache.popitem(last=False)
+
+        self._cache[key] = (response, timestamp)
+        update_cache_size(len(self._cache))
+
+    async def _lookup(self, key: str) -> Any | None:
+        """Check the local LRU, then the shared backend; updates hit/miss metrics."""
+        entry = self._cache.get(key)
+        if entry is not None:
+            result, timestamp = entry
+            if time.time() - timestamp <= self.ttl_seconds:
+                # Cache hit - update LRU and metrics
+                self._cache.move_to_end(key)
+                self._hits += 1
+                record_cache_hit()
+                return result
+            # Expired - remove from cache and fall through
+            self._cache.pop(key, None)  # Safe pop with default
+            update_cache_size(len(self._cache))
+
+        if self.backend is not None:
+            try:
+                shared = await self.backend.get(key)
+            except Exception as e:
+                logger.warning("cache_backend_get_failed", extra={"error": str(e)})
+                shared = None
+            if shared is not None:
+                result, timestamp = shared
+                if time.time() - timestamp <= self.ttl_seconds:
+                    self._store_local(key, result, timestamp)
+                    self._hits += 1
+                    record_cache_hit()
+                    return result
+
+        self._misses += 1
+        record_cache_miss()
+        return None
+
+    async def _store(self, key: str, response: Any) -> None:
+        now = time.time()
+        self._store_local(key, response, now)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, response, now, self.ttl_seconds)
+            except (TypeError, ValueError):
+                logger.debug("cache_backend_skip_unserializable", extra={"key": key})
+            except Exception as e:
+                logger.warning("cache_backend_set_failed", extra={"error": str(e)})
+
     async def get(
         self,
         messages: list[dict],
@@ -50,28 +304,7 @@ class PromptCache:
     ) -> Any | None:
         """Return cached response if available and not expired."""
         key = self._hash_prompt(messages, model, temperature, max_tokens)
-        entry = self._cache.get(key)
-
-        # Update metrics
-        if entry is None:
-            self._misses += 1
-            record_cache_miss()
-            return None
-
-        result, timestamp = entry
-        if time.time() - timestamp > self.ttl_seconds:
-            # Expired - remove from cache and count as miss
-            self._cache.pop(key, None)  # Safe pop with default
-            self._misses += 1
-            record_cache_miss()
-            update_cache_size(len(self._cache))
-            return None
-
-        # Cache hit - update LRU and metrics
-        self._cache.move_to_end(key)
-        self._hits += 1
-        record_cache_hit()
-        return result
+        return await self._lookup(key)
 
     async def set(
         self,
@@ -83,34 +316,117 @@ class PromptCache:
     ) -> None:
         """Cache the response with LRU eviction."""
         key = self._hash_prompt(messages, model, temperature, max_tokens)
-        now = time.time()
+        await self._store(key, response)
 
-        # Check if key already exists to avoid unnecessary evictions
-        if key in self._cache:
-            self._cache[key] = (response, now)
-            self._cache.move_to_end(key)
-            update_cache_size(len(self._cache))
-            return
-
-        # Evict oldest if over capacity
-        while len(self._cache) >= self.max_size:
-            self._cache.popitem(last=False)
+    async def get_or_compute(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float,
+        max_tokens: int | None,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the cached response or run compute() once per key.
+
+        Concurrent callers with the same prompt hash await the single in-flight
+        call (single-flight) instead of each issuing their own upstream request.
+        Exceptions propagate to every waiter and nothing is cached. If the
+        leading caller is cancelled, one waiting follower takes over the call.
+        """
+        key = self._hash_prompt(messages, model, temperature, max_tokens)
 
-        self._cache[key] = (response, now)
-        update_cache_size(len(self._cache))
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                cached = await self._lookup(key)
+                if cached is not None:
+                    return cached
+                # Another caller may have started the same call while we awaited the backend
+                inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._lead(key, compute)
+
+            self._coalesced += 1
+            record_cache_coalesced()
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # The leader was cancelled, not this caller: the first follower to
+                # loop back becomes the new leader and the others coalesce onto it
+                continue
+
+    async def _lead(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            # Only cache successful responses
+            if result is not None:
+                await self._store(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved so a leader without followers does not warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
 
     def get_hit_rate(self) -> float:
         total = self._hits + self._misses
         return self._hits / total if total > 0 else 0.0
 
+    def get_stats(self) -> dict[str, Any]:
+        """Return cache counters for reporting."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_rate": self.get_hit_rate(),
+            "size": len(self._cache),
+            "inflight": len(self._inflight),
+            "backend": type(self.backend).__name__ if self.backend else None,
+        }
+
     async def clear(self) -> None:
         """Clear all entries and reset metrics."""
         self._cache.clear()
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
+        if self.backend is not None:
+            await self.backend.clear()
         update_cache_size(0)  # Update metrics to reflect empty cache
 
 
+def create_cache_backend(kind: str | None = None) -> CacheBackend | None:
+    """
+    Build a shared cache backend from the environment.
+
+    GLIMPSE_CACHE_BACKEND selects "memory" (default, no shared tier), "sqlite"
+    or "redis". The SQLite file location is taken from GLIMPSE_CACHE_PATH and
+    Redis settings come from api.config.RedisConfig.
+    """
+    kind = (kind or os.getenv("GLIMPSE_CACHE_BACKEND", "memory")).lower()
+    if kind in {"", "memory", "none"}:
+        return None
+    if kind == "sqlite":
+        path = os.getenv(
+            "GLIMPSE_CACHE_PATH",
+            str(Path.home() / ".echoes" / "glimpse_prompt_cache.sqlite3"),
+        )
+        return SQLiteCacheBackend(path)
+    if kind == "redis":
+        return RedisCacheBackend.from_config()
+    raise ValueError(f"Unknown GLIMPSE_CACHE_BACKEND: {kind!r}")
+
+
 # Global cache instance (can be swapped or configured)
 _default_cache: PromptCache | None = None
 
@@ -120,7 +436,7 @@ def get_default_cache() -> PromptCache:
     global _default_cache
     if _default_cache is None:
         # Increased defaults for higher repetition workloads
-        _default_cache = PromptCache(max_size=2000, ttl_seconds=7200)
+        _default_cache = PromptCache(max_size=2000, ttl_seconds=7200, backend=create_cache_backend())
     return _default_cache
 
 
@@ -157,29 +473,12 @@ def cached_openai_call(cache: PromptCache | None = None, skip_cache: bool = Fals
             # Get cache instance
             cache_instance = cache or get_default_cache()
 
-            # Try cache lookup
-            cached = await cache_instance.get(messages, model, temperature, max_tokens)
-            if cached is not None:
-                logger.debug(
-                    "cache_hit",
-                    extra={
-                        "model": model,
-                        "messages_len": len(messages),
-                        "cache_size": len(cache_instance._cache),  # type: ignore
-                    },
-                )
-                return cached
+            async def compute() -> Any:
+                return await func(messages, model, temperature, max_tokens, **kwargs)
 
-            # Cache miss - call the function and cache the result
+            # Cache lookup, coalescing concurrent identical requests onto one call
             try:
-                result = await func(messages, model, temperature, max_tokens, **kwargs)
-
-                # Only cache successful responses
-                if result is not None:
-                    await cache_instance.set(messages, model, temperature, max_tokens, result)
-
-                return result
-
+                return await cache_instance.get_or_compute(messages, model, temperature, max_tokens, compute)
             except Exception as e:
                 logger.error(
                     "cache_miss_error",
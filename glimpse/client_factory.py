@@ -0,0 +1,415 @@
+"""
+Process-wide pooled HTTP clients for OpenAI call sites.
+
+Every OpenAI/AsyncOpenAI client built through this module shares one httpx
+connection pool (per event loop for async clients), so bursts of calls reuse
+warm keep-alive connections instead of paying TCP/TLS handshakes for each
+new client. Pool wait time and connection reuse are exported as Prometheus
+metrics (see glimpse.metrics).
+
+Configuration (environment, read when the first client is built):
+    GLIMPSE_HTTP_MAX_CONNECTIONS     max open connections (default 100)
+    GLIMPSE_HTTP_MAX_KEEPALIVE       max idle keep-alive connections (default 20)
+    GLIMPSE_HTTP_KEEPALIVE_EXPIRY    idle connection lifetime in seconds (default 30)
+    GLIMPSE_HTTP2                    "1"/"0"; HTTP/2 needs the optional h2 package
+    GLIMPSE_HTTP_POOL_TIMEOUT        seconds to wait for a free connection (default 30)
+
+Shared clients ignore close() from borrowers (e.g. an OpenAI client used as a
+context manager); call close_http_clients() / aclose_http_clients() to shut
+the pools down. Both are also closed at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+import openai
+
+from .metrics import record_http_pool_wait
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default}")
+        return default
+
+
+def http2_available() -> bool:
+    """Whether the optional h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings shared by every pooled client."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float = 600.0
+    pool_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "HTTPPoolConfig":
+        return cls(
+            max_connections=int(_env_float("GLIMPSE_HTTP_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(_env_float("GLIMPSE_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=_env_float("GLIMPSE_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            http2=os.getenv("GLIMPSE_HTTP2", "1").lower() in ("1", "true", "yes"),
+            pool_timeout=_env_float("GLIMPSE_HTTP_POOL_TIMEOUT", cls.pool_timeout),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.read_timeout,
+            connect=self.connect_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def use_http2(self) -> bool:
+        return self.http2 and http2_available()
+
+
+class PoolStats:
+    """Thread-safe counters for pooled requests (mirrored to Prometheus)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.reused_connections = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record(self, client: str, wait: float, reused: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        record_http_pool_wait(client, wait, reused)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_rate": self.reused_connections / self.requests if self.requests else 0.0,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class _PoolProbe:
+    """
+    Per-request httpcore trace hook.
+
+    The first connection-level event marks the end of the pool wait:
+    "connection.connect_tcp.started" means a new connection was opened,
+    a "send_request_headers.started" event first means a pooled one was reused.
+    """
+
+    __slots__ = ("client", "stats", "started", "done", "previous")
+
+    def __init__(self, client: str, stats: PoolStats, previous: Any = None):
+        self.client = client
+        self.stats = stats
+        self.started = time.perf_counter()
+        self.done = False
+        self.previous = previous
+
+    def observe(self, event: str) -> None:
+        if self.done:
+            return
+        if event == "connection.connect_tcp.started" or event.endswith(".send_request_headers.started"):
+            self.done = True
+            reused = not event.startswith("connection.")
+            self.stats.record(self.client, time.perf_counter() - self.started, reused)
+
+    def sync_trace(self, event: str, info: dict) -> None:
+        self.observe(event)
+        if self.previous is not None:
+            self.previous(event, info)
+
+    async def async_trace(self, event: str, info: dict) -> None:
+        self.observe(event)
+        if self.previous is not None:
+            await self.previous(event, info)
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, stats: PoolStats):
+        self._transport = transport
+        self._stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        probe = _PoolProbe("sync", self._stats, request.extensions.get("trace"))
+        request.extensions = {**request.extensions, "trace": probe.sync_trace}
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that keeps one connection pool per running event loop.
+
+    httpcore connections are bound to the loop that opened them, so a single
+    process-wide AsyncClient would break across asyncio.run() calls; pools of
+    loops that have gone away are dropped with the loop.
+    """
+
+    def __init__(self, config: HTTPPoolConfig, stats: PoolStats):
+        self._config = config
+        self._stats = stats
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = httpx.AsyncHTTPTransport(limits=self._config.limits, http2=self._config.use_http2())
+            self._pools[loop] = pool
+        return pool
+
+    @property
+    def pool_count(self) -> int:
+        return len(self._pools)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        probe = _PoolProbe("async", self._stats, request.extensions.get("trace"))
+        request.extensions = {**request.extensions, "trace": probe.async_trace}
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the current loop's pool gracefully, then the other loops' pools (see close_pools())."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        self.close_pools()
+        if pool is not None:
+            await pool.aclose()
+
+    def close_pools(self) -> None:
+        """
+        Close every loop's pool from synchronous code without waiting on it.
+
+        Each pool is closed on its own loop: run to completion if that loop is
+        idle, scheduled on it if it is running. Pools of closed loops already
+        lost their connections with the loop and are just dropped.
+        """
+        pools = list(self._pools.items())
+        self._pools.clear()
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, pool in pools:
+            if loop.is_closed():
+                continue
+            try:
+                if loop is current:
+                    loop.create_task(pool.aclose())
+                elif loop.is_running():
+                    asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+                else:
+                    loop.run_until_complete(pool.aclose())
+            except Exception as e:
+                logger.debug(f"Could not close async HTTP pool: {e}")
+
+
+class _SharedHttpxClient(openai.DefaultHttpxClient):
+    def close(self) -> None:  # borrowers must not close the shared pool
+        pass
+
+    def _shutdown(self) -> None:
+        super().close()
+
+
+class _SharedAsyncHttpxClient(openai.DefaultAsyncHttpxClient):
+    async def aclose(self) -> None:  # borrowers must not close the shared pool
+        pass
+
+    async def _shutdown(self) -> None:
+        await super().aclose()
+
+    def _shutdown_nowait(self) -> None:
+        self._transport.close_pools()
+
+
+_lock = threading.Lock()
+_config: HTTPPoolConfig | None = None
+_stats = PoolStats()
+_http_client: _SharedHttpxClient | None = None
+_async_http_client: _SharedAsyncHttpxClient | None = None
+_openai_clients: dict[tuple, openai.OpenAI] = {}
+_async_openai_clients: dict[tuple, openai.AsyncOpenAI] = {}
+
+
+def configure_http_pool(config: HTTPPoolConfig | None = None) -> HTTPPoolConfig:
+    """
+    Set the pool configuration (defaults to HTTPPoolConfig.from_env()).
+
+    Applies to clients built afterwards; call close_http_clients() first to
+    rebuild pools that already exist.
+    """
+    global _config
+    with _lock:
+        _config = config or HTTPPoolConfig.from_env()
+        if _config.http2 and not http2_available():
+            logger.info("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        return _config
+
+
+def get_http_pool_config() -> HTTPPoolConfig:
+    return _config or configure_http_pool()
+
+
+def get_http_client() -> httpx.Client:
+    """Shared sync httpx client (thread-safe) for openai.OpenAI(http_client=...)."""
+    global _http_client
+    if _http_client is None:
+        config = get_http_pool_config()
+        with _lock:
+            if _http_client is None:
+                transport = httpx.HTTPTransport(limits=config.limits, http2=config.use_http2())
+                _http_client = _SharedHttpxClient(
+                    transport=_InstrumentedTransport(transport, _stats),
+                    timeout=config.timeout,
+                )
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async httpx client for openai.AsyncOpenAI(http_client=...); safe across event loops."""
+    global _async_http_client
+    if _async_http_client is None:
+        config = get_http_pool_config()
+        with _lock:
+            if _async_http_client is None:
+                _async_http_client = _SharedAsyncHttpxClient(
+                    transport=_LoopLocalAsyncTransport(config, _stats),
+                    timeout=config.timeout,
+                )
+    return _async_http_client
+
+
+def _client_key(api_key: str | None, base_url: str | None, client_kwargs: dict[str, Any]) -> tuple | None:
+    # Key on what the client will resolve from the environment, so a changed
+    # OPENAI_API_KEY / OPENAI_BASE_URL builds a new client instead of reusing a stale one
+    if api_key is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+    if base_url is None:
+        base_url = os.getenv("OPENAI_BASE_URL")
+    key = (api_key, base_url, tuple(sorted(client_kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def get_openai_client(api_key: str | None = None, base_url: str | None = None, **client_kwargs: Any) -> openai.OpenAI:
+    """Cached openai.OpenAI bound to the shared sync pool."""
+    key = _client_key(api_key, base_url, client_kwargs)
+    client = _openai_clients.get(key) if key is not None else None
+    if client is None:
+        client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client(), **client_kwargs)
+        if key is not None:
+            _openai_clients[key] = client
+    return client
+
+
+def get_async_openai_client(
+    api_key: str | None = None, base_url: str | None = None, **client_kwargs: Any
+) -> openai.AsyncOpenAI:
+    """Cached openai.AsyncOpenAI bound to the shared async pool."""
+    key = _client_key(api_key, base_url, client_kwargs)
+    client = _async_openai_clients.get(key) if key is not None else None
+    if client is None:
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_async_http_client(),
+            **client_kwargs,
+        )
+        if key is not None:
+            _async_openai_clients[key] = client
+    return client
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Pool configuration plus request/reuse/wait counters."""
+    config = get_http_pool_config()
+    transport = _async_http_client._transport if _async_http_client is not None else None
+    return {
+        "config": {**asdict(config), "http2_active": config.use_http2()},
+        "sync_client": _http_client is not None,
+        "async_pools": transport.pool_count if isinstance(transport, _LoopLocalAsyncTransport) else 0,
+        **_stats.to_dict(),
+    }
+
+
+def close_http_clients() -> None:
+    """
+    Close the sync and async pools and forget all cached clients.
+
+    Async pools are closed on their own event loops without waiting; from
+    async code prefer aclose_http_clients(), which awaits the current loop's pool.
+    """
+    global _http_client, _async_http_client
+    with _lock:
+        http_client, _http_client = _http_client, None
+        async_client, _async_http_client = _async_http_client, None
+        _openai_clients.clear()
+        _async_openai_clients.clear()
+    if http_client is not None:
+        http_client._shutdown()
+    if async_client is not None:
+        async_client._shutdown_nowait()
+
+
+async def aclose_http_clients() -> None:
+    """Gracefully close the current loop's async pool, then the other pools."""
+    async_client = _async_http_client
+    if async_client is not None:
+        await async_client._shutdown()
+    close_http_clients()
+
+
+atexit.register(close_http_clients)
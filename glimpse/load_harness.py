@@ -0,0 +1,399 @@
+"""
+Open-loop load-testing harness for the Glimpse stack.
+
+Drives AsyncOpenAIClient (target "client") or GlimpseEngine (target
+"engine") at a target request rate against an OpenAI-compatible endpoint,
+by default a local glimpse.stub_server instance, and writes a JSON report
+with latency percentiles, cache hit rate, rate-limiter waits and error mix.
+
+Requests are scheduled on a fixed timeline regardless of how fast earlier
+requests complete (open loop), and latency is measured from the scheduled
+send time so a saturated client shows up as queueing delay rather than as
+a silently lower request rate.
+
+Usage:
+    python -m glimpse.load_harness --rps 50 --duration 30 --out results/loadtest.json
+    python -m glimpse.load_harness --target engine --baseline results/loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import shutil
+import subprocess
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .cache_helpers import PromptCache, cached_openai_call
+from .engine import Draft, GlimpseEngine
+from .metrics import REGISTRY
+from .openai_wrapper import AsyncOpenAIClient
+from .rate_limiter import AdaptiveRateLimiter
+from .stub_server import LatencyDistribution, OpenAIStubServer, StubConfig
+
+# Prompt pool reused from load_test_openai so results are comparable
+PROMPT_POOL = [
+    ("Summarize the quarterly sales report for leadership.", "summarize quarterly sales", "keep it under 150 words"),
+    ("Explain the new API authentication flow.", "explain auth flow", "include code examples"),
+    ("Generate a release notes draft for v2.1.", "generate release notes", "highlight breaking changes"),
+    ("Outline the migration steps from old to new schema.", "outline migration steps", "assume PostgreSQL"),
+    ("Write a brief intro for the blog post on AI ethics.", "write intro", "tone: professional"),
+    ("Create a technical summary of the latest security patch.", "summarize security patch", "focus on CVEs"),
+    ("Draft an email to stakeholders about the outage.", "notify stakeholders", "include RCA"),
+    ("Provide a quick overview of the new feature flags.", "describe feature flags", "give examples"),
+    ("Summarize user feedback from the last sprint.", "summarize feedback", "highlight themes"),
+    ("Explain how the new caching layer works.", "explain caching", "include pseudo-code"),
+]
+
+
+@dataclass
+class LoadTestConfig:
+    """Client-side load shape."""
+
+    target: str = "client"  # "client" or "engine"
+    rps: float = 20.0
+    duration_s: float = 10.0
+    arrival: str = "poisson"  # "poisson" or "constant"
+    repeat_fraction: float = 0.7  # share of requests drawn from PROMPT_POOL
+    model: str = "gpt-4o-mini"
+    max_tokens: int = 64
+    request_timeout_s: float = 30.0
+    seed: int | None = 42
+
+
+@dataclass
+class RequestSample:
+    scheduled: float
+    started: float
+    finished: float
+    ok: bool
+    error: str | None = None
+
+
+@dataclass
+class LoadTestReport:
+    """JSON-serializable result of one load-test run."""
+
+    meta: dict[str, Any]
+    requests: dict[str, Any]
+    latency_ms: dict[str, float]
+    service_latency_ms: dict[str, float]
+    schedule_lag_ms: dict[str, float]
+    cache: dict[str, Any]
+    rate_limiter: dict[str, Any]
+    errors: dict[str, int]
+    upstream: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in [0, 100]); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize_ms(values_s: list[float]) -> dict[str, float]:
+    values = [v * 1000 for v in values_s]
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+def _git_commit() -> str | None:
+    git = shutil.which("git")
+    if git is None:
+        return None
+    try:
+        result = subprocess.run([git, "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5, check=False)  # noqa: S603
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _wait_metric(name: str) -> float:
+    return REGISTRY.get_sample_value(name, {"endpoint": "chat/completions"}) or 0.0
+
+
+class LoadGenerator:
+    """Open-loop generator issuing requests against an OpenAI-compatible base URL."""
+
+    def __init__(
+        self,
+        config: LoadTestConfig,
+        base_url: str,
+        cache: PromptCache | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        api_key: str = "sk-stub",
+    ):
+        self.config = config
+        self.cache = cache or PromptCache(max_size=10000)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        # SDK-level retries off: retries/backoff are exercised in call_with_backoff
+        self.client = AsyncOpenAIClient(
+            api_key=api_key,
+            rate_limiter=self.rate_limiter,
+            base_url=base_url,
+            max_retries=0,
+            timeout=config.request_timeout_s,
+        )
+        self._rng = random.Random(config.seed)
+        # GlimpseEngine keeps per-glimpse try state, so each in-flight request
+        # borrows an idle engine; at most peak-concurrency engines are built
+        self._idle_engines: list[GlimpseEngine] = []
+
+        @cached_openai_call(cache=self.cache)
+        async def _chat(messages, model, temperature, max_tokens=None, **kwargs):
+            return await self.client.chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+
+        self._chat = _chat
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _glimpse(self, draft: Draft) -> None:
+        if self._idle_engines:
+            engine = self._idle_engines.pop()
+        else:
+            engine = GlimpseEngine(sampler=self._sampler, enable_performance=False, enable_clarifiers=False)
+        try:
+            engine.reset()
+            await engine.glimpse(draft)
+        finally:
+            self._idle_engines.append(engine)
+
+    def _next_draft(self, index: int) -> Draft:
+        if self._rng.random() < self.config.repeat_fraction:
+            return Draft(*self._rng.choice(PROMPT_POOL))
+        return Draft(f"Unique request {index} ({self._rng.random():.6f})", "respond briefly", "")
+
+    async def _sampler(self, draft: Draft) -> tuple[str, str, str | None, bool]:
+        user_content = f"Goal: {draft.goal}\nInput: {draft.input_text}"
+        if draft.constraints:
+            user_content += f"\nConstraints: {draft.constraints}"
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": user_content},
+        ]
+        # temperature=0 keeps responses cacheable so cache behaviour is measured
+        response = await self._chat(messages, self.config.model, 0.0, self.config.max_tokens)
+        content = response["choices"][0]["message"]["content"]
+        return content, content.split(".")[0], None, True
+
+    async def _fire(self, index: int, scheduled: float) -> RequestSample:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        draft = self._next_draft(index)
+        try:
+            if self.config.target == "engine":
+                await self._glimpse(draft)
+            else:
+                await self._sampler(draft)
+            return RequestSample(scheduled, started, loop.time(), ok=True)
+        except Exception as e:
+            return RequestSample(scheduled, started, loop.time(), ok=False, error=type(e).__name__)
+
+    async def run(self) -> list[RequestSample]:
+        """Issue requests on an open-loop schedule and wait for all of them."""
+        if self.config.target not in {"client", "engine"}:
+            raise ValueError(f"Unknown load-test target: {self.config.target!r}")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + self.config.duration_s
+        scheduled = start
+        tasks: list[asyncio.Task] = []
+        index = 0
+        while scheduled < end:
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._fire(index, scheduled)))
+            index += 1
+            if self.config.arrival == "poisson":
+                scheduled += self._rng.expovariate(self.config.rps)
+            else:
+                scheduled = start + index / self.config.rps
+        return list(await asyncio.gather(*tasks))
+
+
+def build_report(
+    config: LoadTestConfig,
+    samples: list[RequestSample],
+    generator: LoadGenerator,
+    wall_time_s: float,
+    wait_before: tuple[float, float],
+    upstream: dict[str, Any] | None = None,
+) -> LoadTestReport:
+    succeeded = [s for s in samples if s.ok]
+    wait_sum = _wait_metric("rate_limit_wait_seconds_sum") - wait_before[0]
+    wait_count = _wait_metric("rate_limit_wait_seconds_count") - wait_before[1]
+    limiter_stats = generator.rate_limiter.stats
+
+    return LoadTestReport(
+        meta={
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "config": asdict(config),
+        },
+        requests={
+            "scheduled": len(samples),
+            "succeeded": len(succeeded),
+            "failed": len(samples) - len(succeeded),
+            "error_rate": round((len(samples) - len(succeeded)) / len(samples), 6) if samples else 0.0,
+            "target_rps": config.rps,
+            "achieved_rps": round(len(succeeded) / wall_time_s, 3) if wall_time_s > 0 else 0.0,
+            "wall_time_s": round(wall_time_s, 3),
+        },
+        latency_ms=summarize_ms([s.finished - s.scheduled for s in succeeded]),
+        service_latency_ms=summarize_ms([s.finished - s.started for s in succeeded]),
+        schedule_lag_ms=summarize_ms([s.started - s.scheduled for s in samples]),
+        cache=generator.cache.get_stats(),
+        rate_limiter={
+            "delayed_requests": int(wait_count),
+            "wait_seconds_total": round(wait_sum, 6),
+            "rate_limited_responses": limiter_stats.rate_limited_requests,
+            "errors": limiter_stats.errors,
+            "current_rpm": generator.rate_limiter.current_rpm,
+        },
+        errors=dict(Counter(s.error for s in samples if s.error)),
+        upstream=upstream or {},
+    )
+
+
+async def run_load_test(
+    config: LoadTestConfig,
+    base_url: str | None = None,
+    stub_config: StubConfig | None = None,
+) -> LoadTestReport:
+    """
+    Run one load test and return its report.
+
+    Without base_url an in-process OpenAIStubServer is started (and its
+    token/429 accounting included in the report under "upstream").
+    """
+    server = None
+    if base_url is None:
+        server = await OpenAIStubServer(stub_config or StubConfig(seed=config.seed)).start()
+        base_url = server.base_url
+
+    generator = None
+    try:
+        generator = LoadGenerator(config, base_url)
+        wait_before = (_wait_metric("rate_limit_wait_seconds_sum"), _wait_metric("rate_limit_wait_seconds_count"))
+        started = time.perf_counter()
+        samples = await generator.run()
+        wall_time = time.perf_counter() - started
+        upstream = {"base_url": base_url}
+        if server is not None:
+            upstream.update({"stub": server.stats.to_dict(), "stub_config": asdict(server.config)})
+        return build_report(config, samples, generator, wall_time, wait_before, upstream)
+    finally:
+        if generator is not None:
+            await generator.close()
+        if server is not None:
+            await server.stop()
+
+
+def write_report(report: LoadTestReport, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.to_dict(), indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def diff_reports(baseline: dict[str, Any], current: dict[str, Any]) -> dict[str, dict[str, float]]:
+    """Key metric deltas (current - baseline) between two report dicts."""
+    keys = [
+        ("latency_ms", "p50"),
+        ("latency_ms", "p95"),
+        ("latency_ms", "p99"),
+        ("requests", "achieved_rps"),
+        ("requests", "error_rate"),
+        ("cache", "hit_rate"),
+        ("rate_limiter", "wait_seconds_total"),
+    ]
+    diff = {}
+    for section, key in keys:
+        before = baseline.get(section, {}).get(key, 0.0) or 0.0
+        after = current.get(section, {}).get(key, 0.0) or 0.0
+        diff[f"{section}.{key}"] = {"baseline": before, "current": after, "delta": round(after - before, 6)}
+    return diff
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the Glimpse stack")
+    parser.add_argument("--target", choices=["client", "engine"], default="client")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--repeat-fraction", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", default=None, help="use an existing endpoint instead of the in-process stub")
+    parser.add_argument("--latency", default="lognormal", help="stub latency distribution")
+    parser.add_argument("--mean-ms", type=float, default=250.0)
+    parser.add_argument("--stddev-ms", type=float, default=100.0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--rpm-limit", type=int, default=None)
+    parser.add_argument("--error-probability", type=float, default=0.0)
+    parser.add_argument("--out", default="results/loadtest.json")
+    parser.add_argument("--baseline", default=None, help="previous report to diff against")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    config = LoadTestConfig(
+        target=args.target,
+        rps=args.rps,
+        duration_s=args.duration,
+        arrival=args.arrival,
+        repeat_fraction=args.repeat_fraction,
+        seed=args.seed,
+    )
+    stub_config = StubConfig(
+        latency=LatencyDistribution(args.latency, args.mean_ms, args.stddev_ms),
+        rate_limit_probability=args.rate_limit_probability,
+        rpm_limit=args.rpm_limit,
+        error_probability=args.error_probability,
+        seed=args.seed,
+    )
+    report = asyncio.run(run_load_test(config, base_url=args.base_url, stub_config=stub_config))
+    path = write_report(report, args.out)
+
+    print(f"=== Glimpse load test ({config.target}, {config.rps} rps for {config.duration_s}s) ===")
+    print(f"requests: {report.requests}")
+    print(f"latency_ms: {report.latency_ms}")
+    print(f"cache hit rate: {report.cache['hit_rate']:.1%}  coalesced: {report.cache['coalesced']}")
+    print(f"rate limiter: {report.rate_limiter}")
+    print(f"errors: {report.errors or 'none'}")
+    print(f"report written to {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for metric, values in diff_reports(baseline, report.to_dict()).items():
+            print(f"  {metric:<32} {values['baseline']:>12} -> {values['current']:>12} ({values['delta']:+})")
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,10 @@ OPENAI_TOKENS = Counter(
 CACHE_HITS = Counter("prompt_cache_hits_total", "Total number of cache hits")
 CACHE_MISSES = Counter("prompt_cache_misses_total", "Total number of cache misses")
 CACHE_SIZE = Gauge("prompt_cache_size", "Current number of items in the cache")
+CACHE_COALESCED = Counter(
+    "prompt_cache_coalesced_total",
+    "Total number of requests that joined an in-flight call for the same prompt",
+)
 
 # Glimpse Glimpse Metrics
 GLIMPSE_ATTEMPTS = Counter(
@@ -130,6 +134,21 @@ RATE_LIMIT_WAIT_TIME = Histogram(
 )
 
 
+# Shared HTTP connection pool metrics (glimpse.client_factory)
+HTTP_POOL_WAIT = Histogram(
+    "http_pool_wait_seconds",
+    "Time requests spent waiting for a pooled HTTP connection",
+    ["client"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, float("inf")),
+)
+
+HTTP_POOL_CONNECTIONS = Counter(
+    "http_pool_connections_total",
+    "Requests served by a newly opened or a reused pooled connection",
+    ["client", "connection"],
+)
+
+
 def record_openai_request(endpoint: str, model: str, duration: float, status_code: int = 200) -> None:
     """Record metrics for an OpenAI API request."""
     OPENAI_REQUESTS.labels(endpoint=endpoint, status_code=status_code, model=model).inc()
@@ -154,6 +173,11 @@ def record_cache_miss() -> None:
     CACHE_MISSES.inc()
 
 
+def record_cache_coalesced() -> None:
+    """Record a request that was coalesced onto an in-flight call."""
+    CACHE_COALESCED.inc()
+
+
 def update_cache_size(size: int) -> None:
     """Update the current cache size."""
     CACHE_SIZE.set(size)
@@ -205,6 +229,12 @@ def record_rate_limit_wait_time(wait_time: float, endpoint: str = "default") ->
     RATE_LIMIT_WAIT_TIME.labels(endpoint=endpoint).observe(wait_time)
 
 
+def record_http_pool_wait(client: str, wait_time: float, reused: bool) -> None:
+    """Record time spent acquiring a pooled connection and whether it was reused."""
+    HTTP_POOL_WAIT.labels(client=client).observe(wait_time)
+    HTTP_POOL_CONNECTIONS.labels(client=client, connection="reused" if reused else "new").inc()
+
+
 def get_metrics() -> bytes:
     """Return the current metrics in Prometheus text format."""
     return generate_latest(REGISTRY)
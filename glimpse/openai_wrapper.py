@@ -28,6 +28,7 @@ except ImportError:
 
 
 # Import metrics and rate limiter
+from .client_factory import get_async_openai_client
 from .metrics import (
     record_openai_request,
     record_openai_tokens,
@@ -293,8 +294,12 @@ class AsyncOpenAIClient:
         self,
         api_key: str | None = None,
         rate_limiter: AdaptiveRateLimiter | None = None,
+        base_url: str | None = None,
+        **client_kwargs: Any,
     ):
-        self._client = openai.AsyncOpenAI(api_key=api_key)
+        # base_url/client_kwargs allow pointing at a local stub (see glimpse.stub_server);
+        # connections come from the shared pool in glimpse.client_factory
+        self._client = get_async_openai_client(api_key=api_key, base_url=base_url, **client_kwargs)
         self._rate_limiter = rate_limiter or get_default_rate_limiter()
 
     async def chat_completion(
@@ -353,6 +358,10 @@ class AsyncOpenAIClient:
 
         return await call_with_backoff(_call, endpoint="embeddings")
 
+    async def close(self) -> None:
+        """Close the underlying OpenAI client (the shared connection pool stays open)."""
+        await self._client.close()
+
 
 # Convenience global client (can be replaced or configured)
 _default_client: AsyncOpenAIClient | None = None
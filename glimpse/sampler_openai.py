@@ -5,11 +5,10 @@ Bypasses the wrapper layer for direct access to OpenAI's API.
 
 import logging
 
-import openai
-
 from glimpse.Glimpse import Draft
 
 from .cache_helpers import cached_openai_call
+from .client_factory import get_async_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -75,8 +74,8 @@ async def _openai_chat_completion(
     **kwargs,
 ) -> dict:
     """Cached wrapper around the actual OpenAI chat completion using direct API."""
-    # Create AsyncOpenAI client directly (no wrapper)
-    client = openai.AsyncOpenAI()
+    # Shared client backed by the process-wide connection pool (no wrapper)
+    client = get_async_openai_client()
 
     # Direct API call - bypassing the wrapper
     response = await client.chat.completions.create(
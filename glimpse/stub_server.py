@@ -0,0 +1,293 @@
+"""
+Local OpenAI-compatible stub server for offline load testing.
+
+Serves /v1/chat/completions and /v1/embeddings with configurable latency
+distributions, 429 injection (random and/or an RPM budget) and token
+accounting, so Glimpse can be load tested without network access.
+
+Run standalone:
+    python -m glimpse.stub_server --port 8099 --latency lognormal --mean-ms 300
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    Server-side latency model.
+
+    kind: "fixed", "uniform", "normal", "lognormal" or "exponential".
+    Normal/lognormal use mean_ms and stddev_ms; uniform spans
+    [mean_ms - stddev_ms, mean_ms + stddev_ms]. Samples are clamped at 0.
+    """
+
+    kind: str = "lognormal"
+    mean_ms: float = 250.0
+    stddev_ms: float = 100.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a latency sample in seconds."""
+        if self.kind == "fixed":
+            ms = self.mean_ms
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.mean_ms - self.stddev_ms, self.mean_ms + self.stddev_ms)
+        elif self.kind == "normal":
+            ms = rng.gauss(self.mean_ms, self.stddev_ms)
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1.0 / self.mean_ms) if self.mean_ms > 0 else 0.0
+        elif self.kind == "lognormal":
+            if self.mean_ms <= 0:
+                ms = 0.0
+            else:
+                # Parameterize by the desired mean/stddev of the lognormal itself
+                variance = self.stddev_ms**2
+                sigma2 = math.log(1 + variance / self.mean_ms**2)
+                mu = math.log(self.mean_ms) - sigma2 / 2
+                ms = rng.lognormvariate(mu, math.sqrt(sigma2))
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.kind!r}")
+        return max(0.0, ms) / 1000.0
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub server."""
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    rate_limit_probability: float = 0.0  # random 429s
+    rpm_limit: int | None = None  # 429 once more than this many requests land in 60s
+    error_probability: float = 0.0  # random 500s
+    completion_tokens: int = 64
+    retry_after_seconds: float = 1.0
+    seed: int | None = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class StubStats:
+    """Counters for requests, injected errors and tokens served."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.by_model: dict[str, int] = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "by_model": dict(self.by_model),
+        }
+
+
+class OpenAIStubServer:
+    """aiohttp application emulating the subset of the OpenAI API Glimpse uses."""
+
+    def __init__(self, config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self.stats = StubStats()
+        self._rng = random.Random(self.config.seed)
+        self._recent: deque[float] = deque()
+        self._runner: web.AppRunner | None = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self.app.router.add_post("/v1/embeddings", self._embeddings)
+        self.app.router.add_get("/stub/stats", self._get_stats)
+        self.app.router.add_post("/stub/reset", self._reset)
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to hand to OpenAI clients (includes /v1)."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> "OpenAIStubServer":
+        """Start serving; with port=0 an ephemeral port is chosen."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "OpenAIStubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def _over_rpm_limit(self) -> bool:
+        if self.config.rpm_limit is None:
+            return False
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.config.rpm_limit:
+            return True
+        self._recent.append(now)
+        return False
+
+    def _injected_error(self) -> web.Response | None:
+        if self._over_rpm_limit() or self._rng.random() < self.config.rate_limit_probability:
+            self.stats.rate_limited += 1
+            return web.json_response(
+                {
+                    "error": {
+                        "message": "Rate limit reached (stub)",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                status=429,
+                headers={"retry-after": str(self.config.retry_after_seconds)},
+            )
+        if self._rng.random() < self.config.error_probability:
+            self.stats.server_errors += 1
+            return web.json_response(
+                {"error": {"message": "Internal error (stub)", "type": "server_error"}},
+                status=500,
+            )
+        return None
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats.requests += 1
+        error = self._injected_error()
+        if error is not None:
+            return error
+
+        await asyncio.sleep(self.config.latency.sample(self._rng))
+
+        model = body.get("model", "gpt-4o-mini")
+        prompt_text = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        prompt_tokens = estimate_tokens(prompt_text)
+        completion_tokens = min(self.config.completion_tokens, body.get("max_tokens") or self.config.completion_tokens)
+        content = f"Stub response for: {prompt_text[:80]}. " + "lorem " * max(0, completion_tokens - 8)
+
+        self.stats.completed += 1
+        self.stats.prompt_tokens += prompt_tokens
+        self.stats.completion_tokens += completion_tokens
+        self.stats.by_model[model] = self.stats.by_model.get(model, 0) + 1
+
+        return web.json_response(
+            {
+                "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content.strip()},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+
+    async def _embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats.requests += 1
+        error = self._injected_error()
+        if error is not None:
+            return error
+
+        await asyncio.sleep(self.config.latency.sample(self._rng))
+
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        prompt_tokens = sum(estimate_tokens(str(text)) for text in inputs)
+        self.stats.completed += 1
+        self.stats.prompt_tokens += prompt_tokens
+
+        return web.json_response(
+            {
+                "object": "list",
+                "model": body.get("model", "text-embedding-3-small"),
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [self._rng.random() for _ in range(8)]}
+                    for i in range(len(inputs))
+                ],
+                "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+            }
+        )
+
+    async def _get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"stats": self.stats.to_dict(), "config": asdict(self.config)})
+
+    async def _reset(self, request: web.Request) -> web.Response:
+        self.stats.reset()
+        self._recent.clear()
+        return web.json_response({"status": "reset"})
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default="lognormal", help="fixed|uniform|normal|lognormal|exponential")
+    parser.add_argument("--mean-ms", type=float, default=250.0)
+    parser.add_argument("--stddev-ms", type=float, default=100.0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--rpm-limit", type=int, default=None)
+    parser.add_argument("--error-probability", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    config = StubConfig(
+        latency=LatencyDistribution(args.latency, args.mean_ms, args.stddev_ms),
+        rate_limit_probability=args.rate_limit_probability,
+        rpm_limit=args.rpm_limit,
+        error_probability=args.error_probability,
+        seed=args.seed,
+    )
+    server = OpenAIStubServer(config, host=args.host, port=args.port)
+    print(f"OpenAI stub listening on {server.base_url}")
+    web.run_app(server.app, host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
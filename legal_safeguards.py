@@ -5,20 +5,29 @@ Provides cognitive accounting and legal safeguards for the Echoes assistant.
 Consent changes and data processing decisions produce tamper-evident
 Decision Provenance Records (DPRs) for regulatory traceability.
 
+With ``provenance_dir`` (or PROVENANCE_LOG_DIR) set, DPRs are written to a
+durable, checkpointed log (core_modules.provenance_log) that survives restarts
+and verifies incrementally. Otherwise they are kept in memory.
+
 LIMITATIONS: Keyword-based consent/protection checks are not sufficient
 for production safety without classifier context.
 """
 
-import hashlib
-import hmac
-import json
 import os
+import threading
 import uuid
+from collections import deque
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
+from core_modules.provenance_log import GENESIS_HASH, ProvenanceLog, chain_hash, seal_record
+
+# DPRs kept in memory when the durable log holds the full chain
+RECENT_PROVENANCE = 1024
+
 
 class ConsentType(Enum):
     """Types of consent for data processing."""
@@ -54,11 +63,17 @@ class CognitiveEffortMetrics:
 class CognitiveAccountingSystem:
     """Simple cognitive accounting system."""
 
-    def __init__(self):
+    def __init__(self, provenance_dir: str | Path | None = None):
         self.metrics_history: list[CognitiveEffortMetrics] = []
         self.consent_records: dict[str, ConsentType] = {}
         self.protection_settings: dict[str, ProtectionLevel] = {}
-        self.provenance_chain: list[dict[str, Any]] = []
+        self.provenance_dir = provenance_dir or os.environ.get("PROVENANCE_LOG_DIR") or None
+        # With a durable log this holds only the most recent DPRs; the log has the full chain
+        self.provenance_chain: list[dict[str, Any]] | deque[dict[str, Any]] = (
+            deque(maxlen=RECENT_PROVENANCE) if self.provenance_dir else []
+        )
+        self._provenance_log: ProvenanceLog | None = None
+        self._provenance_lock = threading.Lock()
 
     def record_effort(self, metrics: CognitiveEffortMetrics):
         """Record cognitive effort metrics."""
@@ -140,10 +155,31 @@ class CognitiveAccountingSystem:
             "consent_records": len(self.consent_records),
             "protection_settings": len(self.protection_settings),
             "average_metrics": self.get_average_metrics(),
-            "provenance_records": len(self.provenance_chain),
+            "provenance_records": self.provenance_count,
             "provenance_version": "1.0.0",
         }
 
+    @staticmethod
+    def _provenance_secret() -> bytes:
+        secret = os.environ.get("JWT_SECRET")
+        if not secret:
+            raise OSError(
+                "JWT_SECRET environment variable is required for provenance signing. "
+                "Refusing to sign with a default — set JWT_SECRET to a secure random value."
+            )
+        return secret.encode()
+
+    def _get_provenance_log(self) -> ProvenanceLog | None:
+        """Open the durable log on first use (the signing secret is needed to write checkpoints)."""
+        if self.provenance_dir and self._provenance_log is None:
+            self._provenance_log = ProvenanceLog(self.provenance_dir, self._provenance_secret())
+        return self._provenance_log
+
+    @property
+    def provenance_count(self) -> int:
+        log = self._get_provenance_log() if self.provenance_dir else None
+        return log.count if log else len(self.provenance_chain)
+
     def _emit_provenance(
         self,
         *,
@@ -157,61 +193,102 @@ class CognitiveAccountingSystem:
     ) -> dict[str, Any] | None:
         """Create and store a Decision Provenance Record (DPR)."""
         try:
-            dpr_id = str(uuid.uuid4())
-            timestamp = datetime.now(UTC).isoformat()
-            parent = self.provenance_chain[-1] if self.provenance_chain else None
-            seq = (parent["sequence_number"] + 1) if parent else 0
-
-            partial = {
-                "dpr_id": dpr_id,
-                "parent_dpr_id": parent["dpr_id"] if parent else None,
-                "timestamp": timestamp,
-                "sequence_number": seq,
-                "decision_type": decision_type,
-                "action_taken": action_taken,
-                "reasoning_summary": reasoning,
-                "authority_type": authority,
-                "actor_id": actor_id,
-                "safety_verdicts": [{"gate_id": gate_id, "verdict": verdict}] if gate_id else [],
-                "provenance_version": "1.0.0",
-            }
-
-            serialized = json.dumps(partial, sort_keys=True)
-            parent_hash = parent["chain_hash"] if parent else "genesis"
-            chain_hash = hashlib.sha256((parent_hash + serialized).encode()).hexdigest()
-
-            dpr = {**partial, "chain_hash": chain_hash}
-            full_serialized = json.dumps(dpr, sort_keys=True)
-
-            secret = os.environ.get("JWT_SECRET")
-            if not secret:
-                raise OSError(
-                    "JWT_SECRET environment variable is required for provenance signing. "
-                    "Refusing to sign with a default — set JWT_SECRET to a secure random value."
+            secret = self._provenance_secret()
+            with self._provenance_lock:
+                return self._append_provenance(
+                    secret,
+                    decision_type=decision_type,
+                    action_taken=action_taken,
+                    actor_id=actor_id,
+                    reasoning=reasoning,
+                    authority=authority,
+                    verdict=verdict,
+                    gate_id=gate_id,
                 )
-            signature = hmac.new(secret.encode(), full_serialized.encode(), hashlib.sha256).hexdigest()
-            dpr["signature"] = signature
-
-            self.provenance_chain.append(dpr)
-            return dpr
         except Exception:
             return None
 
+    def _append_provenance(
+        self,
+        secret: bytes,
+        *,
+        decision_type: str,
+        action_taken: str,
+        actor_id: str,
+        reasoning: str,
+        authority: str,
+        verdict: str,
+        gate_id: str,
+    ) -> dict[str, Any]:
+        log = self._get_provenance_log()
+        if log is not None:
+            parent_hash, parent_id, seq = log.head_hash, log.head_dpr_id, log.count
+        else:
+            parent = self.provenance_chain[-1] if self.provenance_chain else None
+            parent_hash = parent["chain_hash"] if parent else GENESIS_HASH
+            parent_id = parent["dpr_id"] if parent else None
+            seq = (parent["sequence_number"] + 1) if parent else 0
+
+        partial = {
+            "dpr_id": str(uuid.uuid4()),
+            "parent_dpr_id": parent_id,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "sequence_number": seq,
+            "decision_type": decision_type,
+            "action_taken": action_taken,
+            "reasoning_summary": reasoning,
+            "authority_type": authority,
+            "actor_id": actor_id,
+            "safety_verdicts": [{"gate_id": gate_id, "verdict": verdict}] if gate_id else [],
+            "provenance_version": "1.0.0",
+        }
+        dpr = seal_record(partial, parent_hash, secret)
+        if log is not None:
+            log.append(dpr)
+        self.provenance_chain.append(dpr)
+        return dpr
+
     def get_provenance_chain(self) -> list[dict[str, Any]]:
         """Return the full provenance chain for audit."""
+        log = self._get_provenance_log()
+        if log is not None:
+            return list(log.iter_records())
         return list(self.provenance_chain)
 
-    def verify_provenance_chain(self) -> dict[str, Any]:
-        """Verify integrity of the provenance chain."""
+    def prove_provenance(self, sequence_number: int) -> dict[str, Any]:
+        """Checkpoint-anchored proof for one DPR (see core_modules.provenance_log.verify_proof)."""
+        log = self._get_provenance_log()
+        if log is None:
+            raise RuntimeError("provenance proofs need a durable log (provenance_dir / PROVENANCE_LOG_DIR)")
+        try:
+            return log.prove(sequence_number)
+        except ValueError:  # not checkpointed yet
+            log.checkpoint()
+            return log.prove(sequence_number)
+
+    def close(self):
+        """Flush and close the durable provenance log, if any."""
+        if self._provenance_log is not None:
+            self._provenance_log.close()
+            self._provenance_log = None
+
+    def verify_provenance_chain(self, full: bool = False) -> dict[str, Any]:
+        """
+        Verify integrity of the provenance chain.
+
+        With a durable log, verification resumes after the last verified
+        checkpoint unless ``full`` is set.
+        """
+        log = self._get_provenance_log()
+        if log is not None:
+            return log.verify(full=full)
         if not self.provenance_chain:
             return {"valid": True, "total": 0, "broken_at": None}
         for i, dpr in enumerate(self.provenance_chain):
             parent_hash = self.provenance_chain[i - 1]["chain_hash"] if i > 0 else "genesis"
             without_sig = {k: v for k, v in dpr.items() if k not in ("signature",)}
             without_chain = {k: v for k, v in without_sig.items() if k != "chain_hash"}
-            serialized = json.dumps(without_chain, sort_keys=True)
-            expected = hashlib.sha256((parent_hash + serialized).encode()).hexdigest()
-            if dpr["chain_hash"] != expected:
+            if dpr["chain_hash"] != chain_hash(parent_hash, without_chain):
                 return {
                     "valid": False,
                     "total": len(self.provenance_chain),
@@ -11,16 +11,30 @@ Tracks:
 - Payment processing and delivery
 - User interactions and system events
 - Compliance and regulatory requirements
+
+Integrity is kept by an append-only Merkle tree over the trail's lines (see
+merkle.py). Each append costs O(log n) instead of re-hashing the whole file.
+The tree root and its frontier (the right-edge subtree roots) are recorded in
+integrity_checksums.json after every write. Inclusion proofs show that a
+record is in the trail. Consistency proofs show that a later trail extends an
+earlier one. Both can be checked externally with verify_inclusion_proof /
+verify_consistency_proof.
 """
 
 import hashlib
 import json
 import os
+import struct
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .merkle import MerkleTree, leaf_hash, push_frontier, root_from_frontier, verify_consistency, verify_inclusion
+
+# End offset (after the newline) of every audit line, one unsigned 64-bit value per record
+_OFFSET = struct.Struct("<Q")
+
 # Default base_dir: repo-relative (allow override via ECHOES_ROOT)
 _DEFAULT_BASE = str(
     Path(os.environ.get("ECHOES_ROOT", str(Path(__file__).resolve().parent.parent.parent.parent.parent)))
@@ -63,6 +77,14 @@ class AuditTrail:
         # Audit log files
         self.main_audit_file = self.data_dir / "audit_trail.jsonl"
         self.integrity_file = self.data_dir / "integrity_checksums.json"
+        self.merkle_dir = self.data_dir / "merkle"
+        self.offsets_file = self.merkle_dir / "offsets.bin"
+
+        self.merkle_dir.mkdir(exist_ok=True)
+        self._offsets_fd = os.open(self.offsets_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._tree: MerkleTree | None = None
+        self._log_bytes = 0
+        self._load_tree()
 
         print("✅ Audit Trail initialized - complete transparency and accountability")
 
@@ -106,10 +128,10 @@ class AuditTrail:
         )
 
         # Save to audit log
-        self._append_to_audit_log(entry)
+        line = self._append_to_audit_log(entry)
 
         # Update integrity checks
-        self._update_integrity_checksums()
+        self._update_integrity_checksums([line])
 
         print(f"📝 Audit logged: {component}.{action} for user {user_id}")
         return entry_id
@@ -212,11 +234,17 @@ class AuditTrail:
             integrity_status["integrity_violations"].append("Audit file missing")
             return integrity_status
 
+        # Rebuild the Merkle root in the same pass (O(log n) memory) and compare it with the tree's
+        self._catch_up()
+        frontier: dict[int, bytes] = {}
+        size = 0
         try:
-            with open(self.main_audit_file) as f:
+            with open(self.main_audit_file, "rb") as f:
                 for line_num, line in enumerate(f, 1):
                     if line.strip():
                         integrity_status["total_entries"] += 1
+                        push_frontier(frontier, size, leaf_hash(line.strip()))
+                        size += 1
                         try:
                             entry = json.loads(line)
                             # Verify checksum
@@ -239,6 +267,14 @@ class AuditTrail:
                 f"File read error: {str(e)}"
             )
 
+        merkle_root = root_from_frontier([frontier[level] for level in sorted(frontier, reverse=True)]).hex()
+        integrity_status["tree_size"] = self._tree.size
+        integrity_status["merkle_root"] = self._tree.root().hex()
+        if size != self._tree.size or merkle_root != integrity_status["merkle_root"]:
+            integrity_status["integrity_violations"].append(
+                f"Merkle root mismatch: trail hashes to {merkle_root} over {size} entries"
+            )
+
         integrity_status["integrity_status"] = (
             "VERIFIED"
             if len(integrity_status["integrity_violations"]) == 0
@@ -247,32 +283,151 @@ class AuditTrail:
 
         return integrity_status
 
-    def _append_to_audit_log(self, entry: AuditEntry):
-        """Append entry to the audit log file."""
-        with open(self.main_audit_file, "a") as f:
-            f.write(json.dumps(asdict(entry)) + "\n")
+    def _append_to_audit_log(self, entry: AuditEntry) -> bytes:
+        """Append entry to the audit log file; returns the line written (without newline)."""
+        self._catch_up()
+        line = json.dumps(asdict(entry)).encode()
+        with open(self.main_audit_file, "ab") as f:
+            f.write(line + b"\n")
+        return line
 
     def _calculate_checksum(self, data: dict[str, Any]) -> str:
         """Calculate SHA-256 checksum for data integrity."""
         data_str = json.dumps(data, sort_keys=True)
         return hashlib.sha256(data_str.encode()).hexdigest()
 
-    def _update_integrity_checksums(self):
-        """Update integrity checksums file."""
-        if self.main_audit_file.exists():
-            with open(self.main_audit_file, "rb") as f:
-                file_hash = hashlib.sha256(f.read()).hexdigest()
+    def _update_integrity_checksums(self, lines: list[bytes]):
+        """Add newly written lines to the Merkle tree and record the new root and frontier."""
+        ends = []
+        for line in lines:
+            self._log_bytes += len(line) + 1
+            ends.append(_OFFSET.pack(self._log_bytes))
+        self._tree.append_many(lines)
+        os.write(self._offsets_fd, b"".join(ends))
+
+        integrity_data = {
+            "last_updated": datetime.now(UTC).isoformat(),
+            "merkle_root": self._tree.root().hex(),
+            "tree_size": self._tree.size,
+            "frontier": {str(level): node.hex() for level, node in sorted(self._tree.frontier.items())},
+            "total_entries": self._tree.size,
+        }
+        tmp_file = self.integrity_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(integrity_data, f, indent=2)
+        os.replace(tmp_file, self.integrity_file)
+
+    # --- Merkle tree -------------------------------------------------------
+
+    def _load_tree(self):
+        """Open the tree at the size both it and the offsets index agree on, then add any unindexed lines."""
+        if self._tree is not None:
+            self._tree.close()
+        records = os.fstat(self._offsets_fd).st_size // _OFFSET.size
+        self._tree = MerkleTree(self.merkle_dir, size=records)
+        size = self._tree.size
+        if records != size or os.fstat(self._offsets_fd).st_size % _OFFSET.size:
+            os.ftruncate(self._offsets_fd, size * _OFFSET.size)
+        self._log_bytes = self._entry_end(size - 1) if size else 0
+        self._catch_up()
+
+    def _entry_end(self, index: int) -> int:
+        return _OFFSET.unpack(os.pread(self._offsets_fd, _OFFSET.size, index * _OFFSET.size))[0]
+
+    def _catch_up(self):
+        """Index lines appended without a tree update (pre-Merkle trails, crashes, other AuditTrail instances)."""
+        if os.fstat(self._offsets_fd).st_size != self._tree.size * _OFFSET.size:
+            self._load_tree()  # another instance extended the tree
+            return
+        try:
+            log_size = self.main_audit_file.stat().st_size
+        except FileNotFoundError:
+            return
+        if log_size <= self._log_bytes:
+            return
+        lines = []
+        with open(self.main_audit_file, "rb") as f:
+            f.seek(self._log_bytes)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial line still being written
+                if not raw.strip():
+                    self._log_bytes += len(raw)
+                    continue
+                lines.append(raw.strip())
+                if len(lines) >= 10_000:
+                    self._update_integrity_checksums(lines)
+                    lines = []
+        if lines:
+            self._update_integrity_checksums(lines)
+
+    def _read_entry_line(self, index: int) -> bytes:
+        start = self._entry_end(index - 1) if index else 0
+        with open(self.main_audit_file, "rb") as f:
+            f.seek(start)
+            return f.read(self._entry_end(index) - start).strip()
+
+    @property
+    def tree_size(self) -> int:
+        """Number of audit records covered by the Merkle tree."""
+        self._catch_up()
+        return self._tree.size
+
+    def merkle_root(self, tree_size: int | None = None) -> str:
+        """Hex Merkle root of the whole trail, or of its first ``tree_size`` records."""
+        self._catch_up()
+        return self._tree.root(tree_size).hex()
+
+    def get_inclusion_proof(self, index: int, tree_size: int | None = None) -> dict[str, Any]:
+        """
+        Prove that audit record ``index`` (0-based, in log order) is part of the trail.
 
-            integrity_data = {
-                "last_updated": datetime.now(UTC).isoformat(),
-                "audit_file_hash": file_hash,
-                "total_entries": sum(
-                    1 for line in open(self.main_audit_file) if line.strip()
-                ),
-            }
+        Args:
+            index: Position of the record in the trail
+            tree_size: Size of the trail to prove against (defaults to the current size)
 
-            with open(self.integrity_file, "w") as f:
-                json.dump(integrity_data, f, indent=2)
+        Returns:
+            Proof dict for verify_inclusion_proof; ``leaf`` is the exact audit line
+        """
+        self._catch_up()
+        tree_size = self._tree.size if tree_size is None else tree_size
+        path = self._tree.inclusion_proof(index, tree_size)
+        leaf = self._read_entry_line(index)
+        return {
+            "leaf_index": index,
+            "tree_size": tree_size,
+            "root": self._tree.root(tree_size).hex(),
+            "audit_path": [node.hex() for node in path],
+            "leaf": leaf.decode(),
+            "entry": json.loads(leaf),
+        }
+
+    def get_consistency_proof(self, old_size: int, new_size: int | None = None) -> dict[str, Any]:
+        """
+        Prove that the trail at ``new_size`` records only appended to the trail at ``old_size``.
+
+        A verifier compares ``old_root`` with a root it recorded earlier before
+        trusting the proof.
+        """
+        self._catch_up()
+        new_size = self._tree.size if new_size is None else new_size
+        proof = self._tree.consistency_proof(old_size, new_size)
+        return {
+            "old_size": old_size,
+            "new_size": new_size,
+            "old_root": self._tree.root(old_size).hex(),
+            "new_root": self._tree.root(new_size).hex(),
+            "proof": [node.hex() for node in proof],
+        }
+
+    def close(self):
+        """Release the Merkle tree and offset index file handles."""
+        if self._tree is not None:
+            self._tree.close()
+            self._tree = None
+        if self._offsets_fd is not None:
+            os.close(self._offsets_fd)
+            self._offsets_fd = None
 
     def _filter_by_time_range(
         self, entries: list[dict[str, Any]], time_range: str
@@ -402,6 +557,43 @@ class AuditTrail:
         return recommendations
 
 
+def verify_inclusion_proof(proof: dict[str, Any], trusted_root: str | None = None) -> bool:
+    """
+    Check a proof from AuditTrail.get_inclusion_proof without access to the trail.
+
+    Args:
+        proof: The inclusion proof
+        trusted_root: Root obtained independently (defaults to the root in the proof)
+    """
+    root = trusted_root or proof["root"]
+    return verify_inclusion(
+        leaf_hash(proof["leaf"].encode()),
+        proof["leaf_index"],
+        proof["tree_size"],
+        [bytes.fromhex(node) for node in proof["audit_path"]],
+        bytes.fromhex(root),
+    )
+
+
+def verify_consistency_proof(proof: dict[str, Any], trusted_old_root: str | None = None) -> bool:
+    """
+    Check a proof from AuditTrail.get_consistency_proof: the trail only grew between the two sizes.
+
+    Args:
+        proof: The consistency proof
+        trusted_old_root: Root recorded earlier for ``old_size`` (defaults to the one in the proof)
+    """
+    if trusted_old_root is not None and trusted_old_root != proof["old_root"]:
+        return False
+    return verify_consistency(
+        proof["old_size"],
+        proof["new_size"],
+        bytes.fromhex(proof["old_root"]),
+        bytes.fromhex(proof["new_root"]),
+        [bytes.fromhex(node) for node in proof["proof"]],
+    )
+
+
 # Integration functions for other Tab components
 def audit_work_entry(user_id: str, work_details: dict[str, Any]):
     """Audit a work entry from work tracking."""
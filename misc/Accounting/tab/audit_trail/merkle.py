@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Append-only Merkle tree for the audit trail (RFC 6962 / RFC 9162 hashing).
+
+The tree is stored as one file per level (``level_00.bin``, ``level_01.bin``,
+...) holding fixed-width 32-byte node hashes. Level 0 holds the leaf hashes.
+Level L gets a node each time an aligned perfect subtree of 2**L leaves
+completes. Appending a leaf writes one hash to level 0 and one more hash for
+each subtree it completes: O(log n) worst case, O(1) amortized.
+
+The frontier is the root of every complete subtree along the right edge, one
+per set bit of the tree size. It is the last node of the matching level file,
+so reopening the tree reads O(log n) hashes. The tree root folds the frontier.
+Any aligned subtree hash is a single positioned read. That keeps inclusion
+and consistency proofs at O(log n) reads, plus a short recursion on the
+right edge.
+
+Leaf and node hashes use the RFC 6962 domain separation (0x00 / 0x01
+prefixes). Proofs produced here therefore verify with any RFC 9162
+implementation, and :func:`verify_inclusion` / :func:`verify_consistency`
+below implement the RFC verification algorithms.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+HASH_SIZE = 32
+LEVEL_PATTERN = "level_{:02d}.bin"
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash a leaf (RFC 6962: SHA-256(0x00 || data))."""
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash an interior node (RFC 6962: SHA-256(0x01 || left || right))."""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly smaller than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def root_from_frontier(frontier: list[bytes]) -> bytes:
+    """Fold the right-edge subtree roots (largest first) into the tree root."""
+    if not frontier:
+        return EMPTY_ROOT
+    root = frontier[-1]
+    for subtree in reversed(frontier[:-1]):
+        root = node_hash(subtree, root)
+    return root
+
+
+def push_frontier(frontier: dict[int, bytes], size: int, leaf: bytes) -> list[tuple[int, bytes]]:
+    """
+    Add a leaf hash to ``frontier`` (level -> subtree root) for a tree of ``size`` leaves.
+
+    Returns the (level, hash) nodes completed by this leaf, the leaf itself included.
+    """
+    completed = [(0, leaf)]
+    node, level = leaf, 0
+    while size >> level & 1:
+        node = node_hash(frontier.pop(level), node)
+        level += 1
+        completed.append((level, node))
+    frontier[level] = node
+    return completed
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, path: list[bytes], root: bytes) -> bool:
+    """Check an audit path for leaf hash ``leaf`` at ``index`` in a tree of ``size`` leaves (RFC 9162 2.1.3.2)."""
+    if index >= size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(old_size: int, new_size: int, old_root: bytes, new_root: bytes, proof: list[bytes]) -> bool:
+    """Check that the tree of ``old_size`` leaves is a prefix of the one of ``new_size`` (RFC 9162 2.1.4.2)."""
+    if old_size > new_size:
+        return False
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if old_size == 0:
+        return not proof
+    if not proof:
+        return False
+    if old_size & (old_size - 1) == 0:
+        proof = [old_root, *proof]
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == old_root and sr == new_root
+
+
+class MerkleTree:
+    """
+    Persistent append-only Merkle tree over per-level hash files.
+
+    Args:
+        directory: Where the level files live (created if missing)
+        size: Committed tree size. Level files are cut back to it, dropping
+            hashes written after the last commit (e.g. before a crash). If
+            None, the size is taken from the leaf level.
+    """
+
+    def __init__(self, directory: str | Path, size: int | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._fds: list[int] = []
+        self.size = 0
+        self.frontier: dict[int, bytes] = {}
+        self._open(size)
+
+    # --- Files ---------------------------------------------------------------
+
+    def _level_path(self, level: int) -> Path:
+        return self.directory / LEVEL_PATTERN.format(level)
+
+    def _fd(self, level: int) -> int:
+        while len(self._fds) <= level:
+            path = self._level_path(len(self._fds))
+            self._fds.append(os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644))
+        return self._fds[level]
+
+    def _level_len(self, level: int) -> int:
+        return os.fstat(self._fd(level)).st_size // HASH_SIZE
+
+    def _open(self, size: int | None) -> None:
+        leaves = self._level_len(0)
+        size = leaves if size is None else min(size, leaves)
+        level = 0
+        while size >> level or self._level_path(level).exists():
+            expected = size >> level
+            have = self._level_len(level)
+            if have > expected or os.fstat(self._fd(level)).st_size % HASH_SIZE:
+                os.ftruncate(self._fd(level), expected * HASH_SIZE)
+            elif have < expected:
+                # Lost the tail of an upper level (unsynced crash): rebuild it from the level below
+                below = self._read_range(level - 1, have * 2, expected * 2)
+                self._write(level, b"".join(node_hash(below[i], below[i + 1]) for i in range(0, len(below), 2)))
+            level += 1
+        self.size = size
+        self.frontier = {
+            level: self.node(level, (size >> level) - 1) for level in range(size.bit_length()) if size >> level & 1
+        }
+
+    def _write(self, level: int, data: bytes) -> None:
+        fd = self._fd(level)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+
+    def _read_range(self, level: int, start: int, end: int) -> list[bytes]:
+        data = os.pread(self._fd(level), (end - start) * HASH_SIZE, start * HASH_SIZE)
+        return [data[i : i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+    def node(self, level: int, index: int) -> bytes:
+        """Hash of the aligned subtree covering leaves [index * 2**level, (index + 1) * 2**level)."""
+        data = os.pread(self._fd(level), HASH_SIZE, index * HASH_SIZE)
+        if len(data) != HASH_SIZE:
+            raise IndexError(f"no level {level} node {index}")
+        return data
+
+    def sync(self) -> None:
+        for fd in self._fds:
+            os.fsync(fd)
+
+    def close(self) -> None:
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    # --- Appends -------------------------------------------------------------
+
+    def append(self, data: bytes) -> int:
+        """Add one leaf; returns its index."""
+        return self.append_hashes([leaf_hash(data)])
+
+    def append_many(self, items: list[bytes]) -> int:
+        """Add several leaves with one write per touched level; returns the first new index."""
+        return self.append_hashes([leaf_hash(data) for data in items])
+
+    def append_hashes(self, leaves: list[bytes]) -> int:
+        first = self.size
+        pending: dict[int, list[bytes]] = {}
+        for leaf in leaves:
+            for level, node in push_frontier(self.frontier, self.size, leaf):
+                pending.setdefault(level, []).append(node)
+            self.size += 1
+        # Lower levels first: a crash leaves upper levels short, which _open repairs
+        for level in sorted(pending):
+            self._write(level, b"".join(pending[level]))
+        return first
+
+    # --- Reads / proofs ------------------------------------------------------
+
+    def root(self, size: int | None = None) -> bytes:
+        """Root of the current tree, or of its first ``size`` leaves."""
+        if size is None or size == self.size:
+            return root_from_frontier([self.frontier[level] for level in sorted(self.frontier, reverse=True)])
+        if not 0 <= size <= self.size:
+            raise ValueError(f"tree size {size} outside 0..{self.size}")
+        return self.subtree_hash(0, size) if size else EMPTY_ROOT
+
+    def subtree_hash(self, start: int, end: int) -> bytes:
+        """MTH(D[start:end]) for the ranges RFC 6962 proofs visit (``start`` aligned to the split)."""
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            level = n.bit_length() - 1
+            return self.node(level, start >> level)
+        k = _split(n)
+        return node_hash(self.subtree_hash(start, start + k), self.subtree_hash(start + k, end))
+
+    def _check_size(self, size: int | None) -> int:
+        size = self.size if size is None else size
+        if not 0 <= size <= self.size:
+            raise ValueError(f"tree size {size} outside 0..{self.size}")
+        return size
+
+    def inclusion_proof(self, index: int, size: int | None = None) -> list[bytes]:
+        """Audit path for leaf ``index`` in the tree of the first ``size`` leaves (RFC 6962 PATH)."""
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise IndexError(f"leaf {index} outside a tree of {size}")
+        path: list[bytes] = []
+        start, end = 0, size
+        # Walk down from the root, collecting siblings top-down, then reverse to leaf-first order
+        while end - start > 1:
+            k = _split(end - start)
+            if index < start + k:
+                path.append(self.subtree_hash(start + k, end))
+                end = start + k
+            else:
+                path.append(self.subtree_hash(start, start + k))
+                start += k
+        path.reverse()
+        return path
+
+    def consistency_proof(self, old_size: int, new_size: int | None = None) -> list[bytes]:
+        """Proof that the first ``old_size`` leaves are a prefix of the first ``new_size`` (RFC 6962 PROOF)."""
+        new_size = self._check_size(new_size)
+        if not 0 <= old_size <= new_size:
+            raise ValueError(f"old size {old_size} outside 0..{new_size}")
+        if old_size in (0, new_size):
+            return []
+        proof: list[bytes] = []
+        m, start, end, complete = old_size, 0, new_size, True
+        while m != end - start:
+            k = _split(end - start)
+            if m <= k:
+                proof.append(self.subtree_hash(start + k, end))
+                end = start + k
+            else:
+                proof.append(self.subtree_hash(start, start + k))
+                m -= k
+                start += k
+                complete = False
+        if not complete:
+            proof.append(self.subtree_hash(start, end))
+        proof.reverse()
+        return proof
@@ -1,10 +1,11 @@
 import json
 from collections.abc import Sequence
 from dataclasses import dataclass
-from math import sqrt
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 @dataclass
 class RetrievalResult:
@@ -33,6 +34,8 @@ class FAISSRetriever:
         self._texts: list[str] = []
         self._metadata: list[dict[str, Any]] = []
         self._chunk_ids: list[str] = []
+        # Row-normalised copy of _embeddings, rebuilt lazily when documents are added
+        self._matrix: np.ndarray | None = None
 
     @property
     def index(self) -> _IndexCompat:
@@ -59,37 +62,52 @@ class FAISSRetriever:
         self._metadata.extend(metadata)
         self._chunk_ids.extend(chunk_ids)
 
+    def _normalized_matrix(self) -> np.ndarray:
+        if self._matrix is None or self._matrix.shape[0] != len(self._embeddings):
+            matrix = np.asarray(self._embeddings, dtype=np.float64).reshape(len(self._embeddings), -1)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._matrix = matrix / norms
+        return self._matrix
+
     def search(
         self,
         query_embedding: Sequence[float],
         top_k: int = 5,
         category_filter: str | None = None,
     ):
-        if not len(self._texts):
+        if not len(self._texts) or top_k <= 0:
             return [], RetrievalMetrics(num_results=0)
 
-        query = [float(value) for value in query_embedding]
-        qn = sqrt(sum(value * value for value in query)) or 1.0
-
-        rows = []
-        for idx, emb in enumerate(self._embeddings):
-            md = self._metadata[idx] if idx < len(self._metadata) else {}
-            if category_filter and md.get("category") != category_filter:
-                continue
-            en = sqrt(sum(value * value for value in emb)) or 1.0
-            score = float(sum(left * right for left, right in zip(query, emb, strict=False)) / (qn * en))
-            rows.append((score, idx))
+        query = np.asarray(query_embedding, dtype=np.float64).ravel()
+        qn = float(np.linalg.norm(query)) or 1.0
+        scores = self._normalized_matrix() @ (query / qn)
+
+        candidates = np.arange(len(scores))
+        if category_filter:
+            keep = [
+                idx for idx, md in enumerate(self._metadata[: len(scores)]) if md.get("category") == category_filter
+            ]
+            candidates = np.asarray(keep, dtype=np.intp)
+            scores = scores[candidates]
+
+        # Partial selection of the top_k, then a stable sort (score desc, insertion order) of just those
+        if top_k < len(scores):
+            part = np.argpartition(-scores, top_k - 1)[:top_k]
+            threshold = scores[part].min()
+            part = np.flatnonzero(scores >= threshold)
+        else:
+            part = np.arange(len(scores))
+        order = part[np.lexsort((part, -scores[part]))][:top_k]
 
-        rows.sort(key=lambda x: x[0], reverse=True)
-        selected = rows[:top_k]
         results = [
             RetrievalResult(
                 chunk_id=self._chunk_ids[idx],
                 text=self._texts[idx],
                 metadata=self._metadata[idx],
-                similarity_score=score,
+                similarity_score=float(score),
             )
-            for score, idx in selected
+            for score, idx in zip(scores[order], candidates[order], strict=True)
         ]
         return results, RetrievalMetrics(num_results=len(results))
 
@@ -0,0 +1,205 @@
+"""
+Throughput benchmark of the API middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Both stacks wrap the same small app with body limit, security headers,
+authentication, logging and timeout layers (the order api.main installs
+them) and are driven in-process through httpx's ASGI transport with N
+concurrent clients, so the numbers isolate middleware overhead from network
+and server costs. Reports requests/s with p50/p99 latency for a JSON
+endpoint, a POST with a body and a streamed response.
+
+Usage:
+    python tests/benchmark_api_middleware.py [--requests 3000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.middleware import (
+    AuthenticationMiddleware,
+    RequestBodyLimitMiddleware,
+    RequestLoggingMiddleware,
+    SecurityHeadersMiddleware,
+    TimeoutMiddleware,
+)
+
+API_KEY = "bench-key"
+CONFIG = SimpleNamespace(security=SimpleNamespace(api_key_required=True, allowed_api_keys=[API_KEY]))
+
+
+# --- Legacy stack (BaseHTTPMiddleware, as before the ASGI rewrite) -----------
+
+
+class LegacyBodyLimit(BaseHTTPMiddleware):
+    def __init__(self, app, max_bytes=1_048_576):
+        super().__init__(app)
+        self.max_bytes = max_bytes
+
+    async def dispatch(self, request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > self.max_bytes:
+            return JSONResponse(status_code=413, content={"error": "Request body too large"})
+        return await call_next(request)
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+class LegacyAuth(BaseHTTPMiddleware):
+    def __init__(self, app, config):
+        super().__init__(app)
+        self.config = config
+
+    async def dispatch(self, request, call_next):
+        auth = request.headers.get("Authorization", "")
+        api_key = auth[7:] if auth.startswith("Bearer ") else request.headers.get("X-API-Key")
+        if api_key not in self.config.security.allowed_api_keys:
+            return JSONResponse(status_code=401, content={"error": "Invalid API key"})
+        request.state.client_id = api_key
+        return await call_next(request)
+
+
+class LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.time()
+        logging.getLogger(__name__).info(f"Request: {request.method} {request.url.path}")
+        response = await call_next(request)
+        logging.getLogger(__name__).info(f"Response time: {time.time() - start:.2f}")
+        return response
+
+
+class LegacyTimeout(BaseHTTPMiddleware):
+    def __init__(self, app, timeout_seconds=30):
+        super().__init__(app)
+        self.timeout_seconds = timeout_seconds
+
+    async def dispatch(self, request, call_next):
+        try:
+            return await asyncio.wait_for(call_next(request), timeout=self.timeout_seconds)
+        except TimeoutError:
+            return JSONResponse(status_code=408, content={"error": "Request timeout"})
+
+
+# --- App ------------------------------------------------------------------
+
+
+async def item(request: Request):
+    return JSONResponse({"id": request.path_params["item_id"], "ok": True})
+
+
+async def ingest(request: Request):
+    body = await request.body()
+    return JSONResponse({"size": len(body)})
+
+
+async def stream(request: Request):
+    async def chunks():
+        for i in range(8):
+            yield f"chunk{i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def build(stack: str) -> Starlette:
+    app = Starlette(
+        routes=[
+            Route("/items/{item_id}", item),
+            Route("/ingest", ingest, methods=["POST"]),
+            Route("/stream", stream),
+        ]
+    )
+    if stack == "legacy":
+        layers = [
+            (LegacyBodyLimit, {}),
+            (LegacySecurityHeaders, {}),
+            (LegacyTimeout, {}),
+            (LegacyLogging, {}),
+            (LegacyAuth, {"config": CONFIG}),
+        ]
+    else:
+        layers = [
+            (RequestBodyLimitMiddleware, {}),
+            (SecurityHeadersMiddleware, {}),
+            (TimeoutMiddleware, {"timeout_seconds": 30}),
+            (RequestLoggingMiddleware, {}),
+            (AuthenticationMiddleware, {"config": CONFIG}),
+        ]
+    for cls, kwargs in layers:
+        app.add_middleware(cls, **kwargs)
+    return app
+
+
+async def run(app: Starlette, kind: str, requests: int, concurrency: int) -> list[float]:
+    headers = {"Authorization": f"Bearer {API_KEY}"}
+    body = b"x" * 4096
+    latencies: list[float] = []
+    counter = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for i in counter:
+                start = time.perf_counter()
+                if kind == "get":
+                    response = await client.get(f"/items/{i}", headers=headers)
+                elif kind == "post":
+                    response = await client.post("/ingest", content=body, headers=headers)
+                else:
+                    response = await client.get("/stream", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.status_code
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def report(label: str, latencies: list[float], elapsed: float) -> float:
+    q = statistics.quantiles(latencies, n=100)
+    rps = len(latencies) / elapsed
+    print(f"  {label:<8} {rps:10,.0f} req/s   p50 {q[49] * 1e3:7.2f} ms   p99 {q[98] * 1e3:7.2f} ms")
+    return rps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"=== API middleware stack ({args.requests:,} requests per case, concurrency {args.concurrency}) ===")
+    for kind in ("get", "post", "stream"):
+        print(f"{kind}:")
+        results = {}
+        for stack in ("legacy", "asgi"):
+            app = build(stack)
+            asyncio.run(run(app, kind, min(args.requests, 100), args.concurrency))  # warm up
+            start = time.perf_counter()
+            latencies = asyncio.run(run(app, kind, args.requests, args.concurrency))
+            results[stack] = report(stack, latencies, time.perf_counter() - start)
+        print(f"  speedup  {results['asgi'] / results['legacy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
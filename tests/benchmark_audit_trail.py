@@ -0,0 +1,130 @@
+"""
+Benchmark audit-trail integrity upkeep on a large trail.
+
+The legacy AuditTrail re-hashed the whole audit file and re-counted its lines
+after every log_event, so each append cost O(n). The Merkle-tree trail adds
+one leaf (O(log n) hashes) and rewrites the small root/frontier record. This
+builds a trail of ``--records`` entries, then times single appends at that
+size, inclusion and consistency proofs, and their verification.
+
+Usage:
+    python tests/benchmark_audit_trail.py [--records 1000000] [--appends 200]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "misc", "Accounting", "tab")
+)
+
+from audit_trail import AuditTrail, verify_consistency_proof, verify_inclusion_proof
+
+
+class LegacyIntegrity:
+    """The pre-Merkle checksum update: hash the whole file and count its lines."""
+
+    def __init__(self, audit_file, integrity_file):
+        self.audit_file = audit_file
+        self.integrity_file = integrity_file
+
+    def update(self):
+        with open(self.audit_file, "rb") as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+        integrity_data = {
+            "last_updated": datetime.now(UTC).isoformat(),
+            "audit_file_hash": file_hash,
+            "total_entries": sum(1 for line in open(self.audit_file) if line.strip()),
+        }
+        with open(self.integrity_file, "w") as f:
+            json.dump(integrity_data, f, indent=2)
+
+
+def write_records(path, n: int) -> None:
+    with open(path, "w") as f:
+        for i in range(n):
+            details = {"hours": i % 8, "task": "benchmark"}
+            entry = {
+                "entry_id": f"{i:016x}",
+                "timestamp": "2025-01-01T00:00:00+00:00",
+                "user_id": f"user_{i % 97}",
+                "component": "work_tracking",
+                "action": "work_entry_logged",
+                "details": details,
+                "checksum": hashlib.sha256(json.dumps(details, sort_keys=True).encode()).hexdigest(),
+                "compliance_flags": ["work_logged"],
+            }
+            f.write(json.dumps(entry) + "\n")
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--appends", type=int, default=200)
+    args = parser.parse_args()
+    print(f"=== Audit trail integrity ({args.records:,} records) ===")
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        trail_dir = os.path.join(tmp, "audit_trail", "data")
+        os.makedirs(trail_dir)
+        audit_file = os.path.join(trail_dir, "audit_trail.jsonl")
+        write_records(audit_file, args.records)
+
+        # Opening indexes the existing lines into the tree once
+        start = time.perf_counter()
+        trail = AuditTrail(tmp)
+        build = time.perf_counter() - start
+
+        legacy = LegacyIntegrity(audit_file, os.path.join(tmp, "legacy_checksums.json"))
+        legacy_append = timed(legacy.update, 3)
+
+        n = 0
+
+        def log_one():
+            nonlocal n
+            n += 1
+            trail.log_event("bench", "payout_engine", "payout_processed", {"amount": n}, ["payment_processed"])
+
+        merkle_append = timed(log_one, args.appends)
+        size = trail.tree_size
+        inclusion = timed(lambda: trail.get_inclusion_proof(size // 3), 200)
+        proof = trail.get_inclusion_proof(size // 3)
+        inclusion_verify = timed(lambda: verify_inclusion_proof(proof), 200)
+        consistency = timed(lambda: trail.get_consistency_proof(args.records // 2 + 1), 200)
+        cproof = trail.get_consistency_proof(args.records // 2 + 1)
+        consistency_verify = timed(lambda: verify_consistency_proof(cproof), 200)
+        start = time.perf_counter()
+        status = trail.verify_audit_integrity()
+        full_verify = time.perf_counter() - start
+        trail.close()
+
+    print(f"{'initial tree build (one-off)':<34} {build:8.3f}s")
+    print(f"{'legacy integrity update':<34} {legacy_append * 1000:10.3f} ms/append")
+    print(f"{'Merkle log_event (whole append)':<34} {merkle_append * 1000:10.3f} ms/append")
+    print(f"{'inclusion proof':<34} {inclusion * 1000:10.3f} ms  ({len(proof['audit_path'])} hashes)")
+    print(f"{'verify inclusion proof':<34} {inclusion_verify * 1000:10.3f} ms")
+    print(f"{'consistency proof':<34} {consistency * 1000:10.3f} ms  ({len(cproof['proof'])} hashes)")
+    print(f"{'verify consistency proof':<34} {consistency_verify * 1000:10.3f} ms")
+    print(f"{'full integrity scan':<34} {full_verify:8.3f}s  ({status['integrity_status']})")
+    print(f"\nspeedup: append {legacy_append / merkle_append:,.0f}x at {size:,} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the conversation context window on long sessions.
+
+The legacy ContextManager trimmed by message count with list slices, and the
+caller had to re-estimate the history's size on every turn. The ContextWindow
+keeps a deque with cached per-message token counts and a running total, and
+evicts to a token budget. Each turn here is one add_message plus one
+get_messages/token count, as a chat turn does.
+
+Usage:
+    python tests/benchmark_context_window.py [--turns 10000] [--max-history 500] [--max-tokens 8000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import UTC, datetime
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant_v2_core import ContextManager
+from core_modules.context_window import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+
+class LegacyContextManager:
+    """The count-trimmed manager: list slices per call, no token accounting."""
+
+    def __init__(self, max_history: int = 10):
+        self.max_history = max_history
+        self.conversations = {}
+
+    def add_message(self, session_id: str, role: str, content: str):
+        if session_id not in self.conversations:
+            self.conversations[session_id] = []
+        self.conversations[session_id].append(
+            {"role": role, "content": content, "timestamp": datetime.now(UTC).isoformat()}
+        )
+        if len(self.conversations[session_id]) > self.max_history * 2:
+            self.conversations[session_id] = self.conversations[session_id][-self.max_history * 2 :]
+
+    def get_messages(self, session_id: str, limit: int | None = None) -> list[dict]:
+        messages = self.conversations.get(session_id, [])
+        if limit:
+            return messages[-limit * 2 :]
+        return messages[-self.max_history * 2 :]
+
+
+def legacy_turn(manager: LegacyContextManager, content: str, max_tokens: int) -> int:
+    manager.add_message("s", "user", content)
+    history = manager.get_messages("s")
+    # The caller re-estimates and trims to the budget itself
+    total = 0
+    kept = 0
+    for message in reversed(history):
+        tokens = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if kept and total + tokens > max_tokens:
+            break
+        total += tokens
+        kept += 1
+    return total
+
+
+def window_turn(manager: ContextManager, content: str) -> int:
+    manager.add_message("s", "user", content)
+    manager.get_messages("s")
+    return manager.get_token_count("s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=10_000)
+    parser.add_argument("--max-history", type=int, default=500)
+    parser.add_argument("--max-tokens", type=int, default=8000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    contents = ["word " * rng.randint(5, 200) for _ in range(args.turns)]
+    print(f"=== Context window ({args.turns:,} turns, {args.max_history} exchanges, {args.max_tokens:,} tokens) ===")
+
+    legacy = LegacyContextManager(args.max_history)
+    start = time.perf_counter()
+    legacy_totals = [legacy_turn(legacy, c, args.max_tokens) for c in contents]
+    legacy_elapsed = time.perf_counter() - start
+
+    manager = ContextManager(max_history=args.max_history, max_tokens=args.max_tokens)
+    start = time.perf_counter()
+    totals = [window_turn(manager, c) for c in contents]
+    elapsed = time.perf_counter() - start
+
+    for label, seconds in (("legacy (slice + re-estimate)", legacy_elapsed), ("token-budgeted window", elapsed)):
+        print(f"{label:<30} {seconds:8.3f}s  {seconds / args.turns * 1e6:9.1f} us/turn")
+    print(f"\nspeedup: {legacy_elapsed / elapsed:,.1f}x; same token totals every turn: {legacy_totals == totals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark the shared event log writer against open/append/close per event.
+
+The Glimpse commit handlers, the Echoes audit log, emit_event and the outcome
+prediction store each opened their JSONL file, wrote one line and closed it
+again for every event. EventLogWriter keeps the descriptor open and commits
+events in groups. This times:
+
+* the legacy per-event open/append/close (single thread),
+* fire-and-forget appends drained by the background flusher,
+* ``wait=True`` appends from ``--threads`` threads under ``every_event``
+  durability (group commit: one write and one fsync per group) against the
+  legacy pattern with an fsync per event.
+
+Usage:
+    python tests/benchmark_event_log.py [--events 20000] [--threads 8] [--synced 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_modules.event_log import Durability, EventLogWriter
+
+
+class LegacyJsonlAppender:
+    """The pre-writer pattern: open the file, append one line, close it."""
+
+    def __init__(self, path, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+
+    def append(self, record) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def event(i: int) -> dict:
+    return {"type": "glimpse_commit", "i": i, "status": "ok", "sample": "x" * 64}
+
+
+def run_threads(append, threads: int, per_thread: int) -> float:
+    def worker(k: int) -> None:
+        for i in range(per_thread):
+            append(event(k * per_thread + i))
+
+    workers = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def count_lines(path) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--synced", type=int, default=2_000, help="events in the fsync-per-event comparison")
+    args = parser.parse_args()
+    print(f"=== Event log writes ({args.events:,} events) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyJsonlAppender(os.path.join(tmp, "legacy.jsonl"))
+        start = time.perf_counter()
+        for i in range(args.events):
+            legacy.append(event(i))
+        legacy_time = time.perf_counter() - start
+
+        writer = EventLogWriter(os.path.join(tmp, "writer.jsonl"))
+        start = time.perf_counter()
+        for i in range(args.events):
+            writer.append(event(i))
+        enqueue_time = time.perf_counter() - start
+        writer.flush()
+        writer_time = time.perf_counter() - start
+        writer.close()
+        assert count_lines(writer.path) == args.events
+
+        per_thread = max(1, args.synced // args.threads)
+        synced = LegacyJsonlAppender(os.path.join(tmp, "legacy_synced.jsonl"), fsync=True)
+        legacy_synced = run_threads(synced.append, args.threads, per_thread)
+
+        writer = EventLogWriter(os.path.join(tmp, "writer_synced.jsonl"), durability=Durability.EVERY_EVENT)
+        group_synced = run_threads(writer.append, args.threads, per_thread)
+        writer.close()
+        assert count_lines(writer.path) == args.threads * per_thread
+
+    total_synced = args.threads * per_thread
+    print(f"{'legacy open/append/close':<36} {legacy_time / args.events * 1e6:10.2f} us/event")
+    print(f"{'writer append (enqueue only)':<36} {enqueue_time / args.events * 1e6:10.2f} us/event")
+    print(f"{'writer append + final flush':<36} {writer_time / args.events * 1e6:10.2f} us/event")
+    print(f"\n=== fsync per event, {args.threads} threads ({total_synced:,} events) ===")
+    print(f"{'legacy open/append/fsync/close':<36} {legacy_synced / total_synced * 1e6:10.2f} us/event")
+    print(f"{'writer every_event (group commit)':<36} {group_synced / total_synced * 1e6:10.2f} us/event")
+    print(
+        f"\nspeedup: {legacy_time / writer_time:.1f}x buffered, "
+        f"{legacy_synced / group_synced:.1f}x with fsync per event"
+    )
+
+
+if __name__ == "__main__":
+    main()
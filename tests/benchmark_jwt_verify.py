@@ -0,0 +1,59 @@
+"""
+Microbenchmark of per-request JWT auth cost with and without the verified-token cache.
+
+Each simulated request extracts the Bearer token from the headers (as the
+auth middleware does) and verifies it. Clients reuse a small pool of access
+tokens, as real clients do across thousands of requests.
+
+Usage:
+    python tests/benchmark_jwt_verify.py [--requests 100000] [--clients 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+from api.auth.jwt_handler import JWTHandler
+
+
+def authenticate(handler: JWTHandler, headers: dict[str, str]) -> dict:
+    auth_header = headers.get("authorization", "")
+    if not auth_header.startswith("Bearer "):
+        raise ValueError("missing token")
+    return handler.verify_token(auth_header[7:])
+
+
+def timed(label: str, handler: JWTHandler, requests: list[dict[str, str]]) -> float:
+    start = time.perf_counter()
+    for headers in requests:
+        authenticate(handler, headers)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed / len(requests) * 1e6:8.2f} µs/request  {len(requests) / elapsed:12,.0f} req/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=50, help="distinct tokens in rotation")
+    args = parser.parse_args()
+
+    issuer = JWTHandler(verify_cache_size=0)
+    tokens = [issuer.create_access_token({"sub": f"client-{i}", "role": "analyst"}) for i in range(args.clients)]
+    rng = random.Random(0)
+    requests = [{"authorization": f"Bearer {rng.choice(tokens)}"} for _ in range(args.requests)]
+    print(f"=== JWT auth cost ({len(requests):,} requests, {args.clients} tokens) ===")
+
+    uncached = timed("decode every request", JWTHandler(verify_cache_size=0), requests)
+    cached = timed("verified-token cache", JWTHandler(), requests)
+    print(f"\nspeedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
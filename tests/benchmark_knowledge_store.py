@@ -0,0 +1,124 @@
+"""
+Benchmark the knowledge base: inserts and searches against a large store.
+
+The JSON-era manager rewrote knowledge_base.json on every insert and lowercased
+every entry on every search. The SQLite store appends one indexed row per
+insert and answers substring searches from the FTS5 trigram index. The legacy
+insert run is capped with --legacy-inserts because its cost grows with the
+store size.
+
+Usage:
+    python tests/benchmark_knowledge_store.py [--entries 50000] [--inserts 500] [--legacy-inserts 10] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.knowledge import KnowledgeEntry, KnowledgeManager
+
+WORDS = [f"term{i}" for i in range(2000)] + ["deploy", "rollback", "revenue", "quarterly", "analysis"]
+
+
+class LegacyKnowledge:
+    """The JSON-era storage path: full rewrite per insert, lowercase scan per search."""
+
+    def __init__(self, path: Path, entries: list[KnowledgeEntry]):
+        self.path = path
+        self.knowledge = {e.id: e for e in entries}
+        self._save()
+
+    def _save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({k: v.to_dict() for k, v in self.knowledge.items()}, f, indent=2)
+
+    def add(self, entry: KnowledgeEntry) -> None:
+        self.knowledge[entry.id] = entry
+        self._save()
+
+    def search(self, query: str, limit: int = 10) -> list[KnowledgeEntry]:
+        query_lower = query.lower()
+        results = [
+            e for e in self.knowledge.values() if query_lower in e.content.lower() or query_lower in e.source.lower()
+        ]
+        results.sort(key=lambda e: e.timestamp, reverse=True)
+        return results[:limit]
+
+
+def build_entries(count: int, seed: int, prefix: str) -> list[KnowledgeEntry]:
+    rng = random.Random(seed)
+    return [
+        KnowledgeEntry(
+            id=f"{prefix}{i:07d}",
+            content=" ".join(rng.choice(WORDS) for _ in range(40)),
+            source=rng.choice(["manual", "crawl", "ROI Analysis Tool"]),
+            category=rng.choice(["general", "ops", "roi_analysis"]),
+            timestamp=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00+00:00",
+            metadata={"i": i},
+            tags=rng.sample(["roi", "ops", "draft", "urgent"], 2),
+        )
+        for i in range(count)
+    ]
+
+
+def timed(label: str, fn, items: list) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed:8.3f}s  {elapsed / len(items) * 1000:9.3f} ms/op")
+    return elapsed / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--inserts", type=int, default=500)
+    parser.add_argument("--legacy-inserts", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    base = build_entries(args.entries, seed=1, prefix="b")
+    extra = build_entries(args.inserts, seed=2, prefix="x")
+    rng = random.Random(3)
+    # Whole words hit ~2% of entries; short prefixes ("term1") hit most of them
+    queries = [rng.choice(WORDS) if i % 4 else rng.choice(WORDS)[:5] for i in range(args.queries)]
+    print(f"=== Knowledge base ({args.entries:,} entries) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyKnowledge(Path(tmp) / "legacy.json", base)
+        legacy_insert = timed("legacy insert (full rewrite)", legacy.add, extra[: args.legacy_inserts])
+        legacy_search = timed("legacy search (scan)", legacy.search, queries)
+
+        manager = KnowledgeManager(storage_path=str(Path(tmp) / "sqlite"))
+        start = time.perf_counter()
+        manager.store.upsert_many(e.to_dict() for e in base)
+        print(f"{'sqlite bulk load':<30} {time.perf_counter() - start:8.3f}s")
+        insert = timed(
+            "sqlite insert",
+            lambda e: manager.add_knowledge(e.content, e.source, e.category, e.tags, e.metadata),
+            extra,
+        )
+        search = timed("sqlite search (fts5)", manager.search_knowledge, queries)
+        timed("sqlite ranked search (bm25)", manager.search_ranked, queries)
+
+        # Same answers as the legacy scan over the same entries (the timed runs inserted different extras)
+        check = KnowledgeManager(storage_path=str(Path(tmp) / "check"))
+        check.store.upsert_many(e.to_dict() for e in base)
+        reference = LegacyKnowledge(Path(tmp) / "check.json", base)
+        matches = all(reference.search(q) == check.search_knowledge(q) for q in queries[:50])
+
+    print(f"\nspeedup: insert {legacy_insert / insert:,.0f}x, search {legacy_search / search:,.0f}x")
+    print(f"search results match legacy scan: {matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark conversation persistence: per-turn save cost and tail loads for a long session.
+
+The legacy MemoryStore rewrote the whole history (indent=2) on every save. The
+journaled store appends the new turn and compacts every ``compact_every``
+messages. A tail load reads the last N messages from the end of the files.
+
+Usage:
+    python tests/benchmark_memory_store.py [--turns 2000] [--tail 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_modules.memory_store import MemoryStore
+
+
+class LegacyMemoryStore:
+    """The pre-journal store: full rewrite per save, full parse per load."""
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = storage_path
+
+    def save_conversation(self, session_id: str, messages: list[dict]) -> None:
+        with open(self.storage_path / f"{session_id}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {"session_id": session_id, "messages": messages, "saved_at": datetime.now(UTC).isoformat()}, f, indent=2
+            )
+
+    def load_conversation(self, session_id: str) -> list[dict]:
+        with open(self.storage_path / f"{session_id}.json", encoding="utf-8") as f:
+            return json.load(f)["messages"]
+
+
+def run(label: str, store, turns: int) -> float:
+    history = []
+    start = time.perf_counter()
+    for i in range(turns):
+        history.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 40})
+        store.save_conversation("bench", history)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {elapsed / turns * 1000:8.3f} ms/save")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--tail", type=int, default=20)
+    args = parser.parse_args()
+    print(f"=== Conversation persistence ({args.turns:,} turns) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir, journal_dir = Path(tmp) / "legacy", Path(tmp) / "journal"
+        legacy_dir.mkdir()
+        legacy = LegacyMemoryStore(legacy_dir)
+        legacy_elapsed = run("legacy save (rewrite)", legacy, args.turns)
+        store = MemoryStore(str(journal_dir))
+        elapsed = run("journaled save", store, args.turns)
+
+        start = time.perf_counter()
+        full = legacy.load_conversation("bench")[-args.tail :]
+        legacy_load = time.perf_counter() - start
+        start = time.perf_counter()
+        tail = MemoryStore(str(journal_dir)).load_conversation("bench", last_n=args.tail)
+        tail_load = time.perf_counter() - start
+        print(f"{'legacy load (full parse)':<28} {legacy_load * 1000:8.3f}ms")
+        print(f"{'tail load (reopen + last N)':<28} {tail_load * 1000:8.3f}ms")
+
+    print(f"\nspeedup: save {legacy_elapsed / elapsed:,.0f}x; tail matches full load: {tail == full}")
+
+
+if __name__ == "__main__":
+    main()
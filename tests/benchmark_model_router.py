@@ -0,0 +1,91 @@
+"""
+Benchmark routing overhead of ModelRouter on 100k prompts.
+
+Compares the legacy per-call keyword scans and inline regexes against the
+precompiled single-pass matcher, with and without the per-prompt memo.
+
+Usage:
+    python tests/benchmark_model_router.py [--prompts 100000] [--unique 0.3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model_router import ModelRouter
+from tests.test_model_router_rules import _legacy_select_model, _random_prompts
+
+TEMPLATES = [
+    "What is {n}+{n}?",
+    "Summarize the quarterly sales report for leadership, item {n}.",
+    "What are the latest developments in AI as of today? ({n})",
+    "Analyze and compare the trade-offs between design {n} and the current one.",
+    "Write a python function that sorts {n} items using a recursive algorithm.",
+    "Solve the equation x^2 = {n} and prove the result.",
+    "Explain the hypothesis behind experiment {n} in molecular biology.",
+]
+
+
+def build_prompts(count: int, unique_fraction: float, seed: int = 42) -> list[str]:
+    """Realistic templated prompts with a share of exact repeats, plus fuzz prompts."""
+    rng = random.Random(seed)
+    router = ModelRouter()
+    fuzz = list(_random_prompts(router, max(1, count // 10), seed=seed))
+    pool = [t.format(n=i) for i, t in enumerate(TEMPLATES * 20)]
+    prompts = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < unique_fraction:
+            prompts.append(rng.choice(TEMPLATES).format(n=i))
+        elif roll < unique_fraction + 0.1:
+            prompts.append(rng.choice(fuzz))
+        else:
+            prompts.append(rng.choice(pool))
+    return prompts
+
+
+def timed(label: str, fn, prompts: list[str]) -> float:
+    start = time.perf_counter()
+    fn(prompts)
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / len(prompts) * 1e6
+    print(f"{label:<32} {elapsed:8.3f}s  {per_call_us:7.2f} µs/prompt  {len(prompts) / elapsed:12,.0f} prompts/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompts", type=int, default=100_000)
+    parser.add_argument("--unique", type=float, default=0.3, help="fraction of never-repeated prompts")
+    args = parser.parse_args()
+
+    prompts = build_prompts(args.prompts, args.unique)
+    print(f"=== ModelRouter routing overhead ({len(prompts):,} prompts, {args.unique:.0%} unique) ===")
+
+    legacy_router = ModelRouter()
+    legacy = timed("legacy (per-call scans)", lambda ps: [_legacy_select_model(legacy_router, p) for p in ps], prompts)
+
+    cold_router = ModelRouter()
+    cold_router.feature_cache_size = 0
+    cold = timed("compiled, no memo", lambda ps: [cold_router.select_model(p) for p in ps], prompts)
+
+    warm_router = ModelRouter()
+    warm = timed("compiled + memo", lambda ps: [warm_router.select_model(p) for p in ps], prompts)
+
+    batch_router = ModelRouter()
+    timed("select_models_batch", batch_router.select_models_batch, prompts)
+
+    mismatches = sum(
+        1 for p in prompts[:10_000] if warm_router.select_model(p) != _legacy_select_model(legacy_router, p)
+    )
+    print(f"\nspeedup: {legacy / cold:.1f}x without memo, {legacy / warm:.1f}x with memo")
+    print(f"decision mismatches vs legacy (first 10k): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark the outcome prediction log: appends and empirical-probability queries per second.
+
+The legacy store rewrote the whole JSONL on every append once it was over its
+line cap, and re-parsed the file on every query. The segmented store appends
+in O(1) and answers queries from in-memory counters. The legacy run is capped
+with --legacy-ops because its cost grows with the log size.
+
+Usage:
+    python tests/benchmark_outcome_store.py [--ops 100000] [--legacy-ops 500] [--max-lines 10000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_modules.outcome_prediction_store import DEFAULT_PRIOR, OutcomePredictionStore
+
+ACTIONS = [f"action {i}" for i in range(50)]
+
+
+class LegacyStore:
+    """The pre-segmentation store: append + trim-by-rewrite, full re-parse per query."""
+
+    def __init__(self, log_path: Path, max_jsonl_lines: int):
+        self.log_path = log_path
+        self.max_jsonl_lines = max_jsonl_lines
+
+    def append_feedback(self, action_key: str, outcome: str) -> None:
+        with self.log_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"event": "feedback", "action_key": action_key, "outcome": outcome}) + "\n")
+        lines = [ln for ln in self.log_path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+        if len(lines) > self.max_jsonl_lines:
+            tmp = self.log_path.with_suffix(".tmp")
+            tmp.write_text("\n".join(lines[-self.max_jsonl_lines :]) + "\n", encoding="utf-8")
+            tmp.replace(self.log_path)
+
+    def feedback_counts(self, action_key: str):
+        per_action = defaultdict(lambda: defaultdict(int))
+        global_counts = defaultdict(int)
+        with self.log_path.open(encoding="utf-8") as f:
+            for line in f:
+                obj = json.loads(line)
+                per_action[obj["action_key"]][obj["outcome"]] += 1
+                global_counts[obj["outcome"]] += 1
+        return dict(per_action.get(action_key, {})), dict(global_counts)
+
+
+def build_ops(count: int, seed: int = 42) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [(rng.choice(ACTIONS), rng.choice(list(DEFAULT_PRIOR))) for _ in range(count)]
+
+
+def timed(label: str, fn, ops: list) -> float:
+    start = time.perf_counter()
+    for op in ops:
+        fn(*op)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f}s  {len(ops) / elapsed:12,.0f} ops/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--legacy-ops", type=int, default=500)
+    parser.add_argument("--max-lines", type=int, default=10_000)
+    args = parser.parse_args()
+
+    ops = build_ops(args.ops)
+    queries = [(action,) for action, _ in ops]
+    print(f"=== Outcome log ({args.ops:,} ops, cap {args.max_lines:,} lines) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fill the legacy log to its cap first so appends pay the steady-state trim cost
+        legacy = LegacyStore(Path(tmp) / "legacy.jsonl", args.max_lines)
+        legacy.log_path.write_text(
+            "".join(
+                json.dumps({"event": "feedback", "action_key": a, "outcome": o}) + "\n"
+                for a, o in build_ops(args.max_lines, seed=1)
+            ),
+            encoding="utf-8",
+        )
+        legacy_ops = ops[: args.legacy_ops]
+        legacy_append = timed("legacy append (at cap)", legacy.append_feedback, legacy_ops)
+        legacy_query = timed("legacy query", legacy.feedback_counts, queries[: args.legacy_ops])
+
+        store = OutcomePredictionStore(Path(tmp) / "segmented.jsonl", max_jsonl_lines=args.max_lines)
+        append = timed("segmented append", store.append_feedback, ops)
+        query = timed("segmented query", store.feedback_counts, queries)
+
+        shared = OutcomePredictionStore(Path(tmp) / "shared.jsonl", max_jsonl_lines=args.max_lines, shared=True)
+        shared_append = timed("segmented append (shared)", shared.append_feedback, ops)
+        shared_query = timed("segmented query (shared)", shared.feedback_counts, queries)
+
+        start = time.perf_counter()
+        reopened = OutcomePredictionStore(Path(tmp) / "segmented.jsonl", max_jsonl_lines=args.max_lines)
+        reopened.feedback_counts(ACTIONS[0])
+        print(f"{'restart (snapshot + tail scan)':<34} {time.perf_counter() - start:8.3f}s")
+
+        # Same retained window => same tallies as the legacy full scan
+        rows = sum(len(p.read_text(encoding="utf-8").splitlines()) for p in store.segment_paths())
+        check = LegacyStore(Path(tmp) / "check.jsonl", args.max_lines)
+        with check.log_path.open("w", encoding="utf-8") as f:
+            for path in store.segment_paths():
+                f.write(path.read_text(encoding="utf-8"))
+        matches = all(check.feedback_counts(a) == reopened.feedback_counts(a) for a in ACTIONS)
+
+    def speedup(legacy_elapsed: float, elapsed: float) -> float:
+        return (legacy_elapsed / len(legacy_ops)) / (elapsed / len(ops))
+
+    print(
+        f"\nper-op speedup: append {speedup(legacy_append, append):,.0f}x, "
+        f"query {speedup(legacy_query, query):,.0f}x "
+        f"(shared: {speedup(legacy_append, shared_append):,.0f}x, {speedup(legacy_query, shared_query):,.0f}x)"
+    )
+    print(f"rows retained: {rows:,}; counters match full scan of retained rows: {matches}")
+
+
+if __name__ == "__main__":
+    main()
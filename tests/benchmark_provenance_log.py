@@ -0,0 +1,118 @@
+"""
+Benchmark provenance verification as the chain grows.
+
+The legacy chain lived in a list, and verify_provenance_chain re-hashed and
+re-signed every record on each call. The durable ProvenanceLog resumes after
+the last verified checkpoint. Each round here appends a batch of DPRs and then
+verifies, the way a periodic audit would.
+
+Usage:
+    python tests/benchmark_provenance_log.py [--records 20000] [--batch 1000]
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_modules.provenance_log import GENESIS_HASH, ProvenanceLog, seal_record
+
+SECRET = b"benchmark-secret"
+
+
+class LegacyProvenanceChain:
+    """The in-memory chain: every verification walks the full list."""
+
+    def __init__(self):
+        self.chain = []
+
+    def append(self, dpr: dict) -> None:
+        self.chain.append(dpr)
+
+    def verify(self) -> dict:
+        for i, dpr in enumerate(self.chain):
+            parent_hash = self.chain[i - 1]["chain_hash"] if i > 0 else "genesis"
+            unsigned = {k: v for k, v in dpr.items() if k != "signature"}
+            partial = {k: v for k, v in unsigned.items() if k != "chain_hash"}
+            expected = hashlib.sha256((parent_hash + json.dumps(partial, sort_keys=True)).encode()).hexdigest()
+            signature = hmac.new(SECRET, json.dumps(unsigned, sort_keys=True).encode(), hashlib.sha256).hexdigest()
+            if dpr["chain_hash"] != expected or dpr["signature"] != signature:
+                return {"valid": False, "total": len(self.chain), "broken_at": i}
+        return {"valid": True, "total": len(self.chain), "broken_at": None}
+
+
+def make_records(n: int) -> list[dict]:
+    records, parent_hash, parent_id = [], GENESIS_HASH, None
+    for seq in range(n):
+        partial = {
+            "dpr_id": str(uuid.uuid4()),
+            "parent_dpr_id": parent_id,
+            "sequence_number": seq,
+            "decision_type": "benchmark",
+            "action_taken": f"action {seq}",
+            "reasoning_summary": "periodic audit benchmark",
+        }
+        dpr = seal_record(partial, parent_hash, SECRET)
+        records.append(dpr)
+        parent_hash, parent_id = dpr["chain_hash"], dpr["dpr_id"]
+    return records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    records = make_records(args.records)
+    rounds = range(0, args.records, args.batch)
+    print(f"=== Provenance verification ({args.records:,} records, verify every {args.batch:,}) ===")
+
+    legacy = LegacyProvenanceChain()
+    legacy_verify = 0.0
+    for start in rounds:
+        for dpr in records[start : start + args.batch]:
+            legacy.append(dpr)
+        began = time.perf_counter()
+        legacy_result = legacy.verify()
+        legacy_verify += time.perf_counter() - began
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ProvenanceLog(tmp, SECRET, checkpoint_every=args.batch)
+        append_elapsed = verify_elapsed = 0.0
+        for start in rounds:
+            began = time.perf_counter()
+            for dpr in records[start : start + args.batch]:
+                log.append(dpr)
+            append_elapsed += time.perf_counter() - began
+            began = time.perf_counter()
+            result = log.verify()
+            verify_elapsed += time.perf_counter() - began
+        log.close()
+
+        began = time.perf_counter()
+        reopened = ProvenanceLog(tmp, SECRET, checkpoint_every=args.batch)
+        reopen_elapsed = time.perf_counter() - began
+        began = time.perf_counter()
+        full = reopened.verify(full=True)
+        full_elapsed = time.perf_counter() - began
+        reopened.close()
+
+    print(f"{'legacy verify (all rounds)':<32} {legacy_verify:8.3f}s")
+    print(f"{'incremental verify (all rounds)':<32} {verify_elapsed:8.3f}s")
+    print(f"{'durable appends':<32} {append_elapsed:8.3f}s  {append_elapsed / args.records * 1e6:7.1f} us/record")
+    print(f"{'reopen (recover head)':<32} {reopen_elapsed * 1000:8.3f}ms")
+    print(f"{'one full verify':<32} {full_elapsed:8.3f}s")
+    agree = legacy_result["valid"] and result["valid"] and full["valid"] and result["total"] == legacy_result["total"]
+    print(f"\nspeedup: verify {legacy_verify / verify_elapsed:,.1f}x; all verifications agree: {agree}")
+
+
+if __name__ == "__main__":
+    main()
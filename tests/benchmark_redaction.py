@@ -0,0 +1,116 @@
+"""
+Benchmark telemetry redaction throughput (log events per second).
+
+Runs realistic structlog-style event dicts through the legacy per-call
+pattern compilation and quadratic overlap check, and through the compiled
+RedactionEngine with and without its LRU.
+
+Usage:
+    python tests/benchmark_redaction.py [--events 50000] [--mode advanced]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.security.advanced_routine import RedactionEngine, RoutineMode, _compile_patterns, _sanitize
+
+EVENTS = ["request_completed", "cache_hit", "websocket_connected", "pattern_detected", "user_login"]
+PATHS = ["/api/patterns/detect", "/api/truth/verify", "/health", "/metrics", "/ws/stream"]
+SECRETS = [
+    "Bearer abcdefghijklmnop.qrstuvwx",
+    "contact user@example.com",
+    "key sk-abcdefghijklmnopqrstuv",
+    "from 192.168.1.10",
+    "card 4111 1111 1111 1111",
+]
+
+
+def build_events(count: int, secret_fraction: float = 0.05, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        event = {
+            "event": rng.choice(EVENTS),
+            "logger": "api.main",
+            "level": "info",
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}.{i % 1000:03d}Z",
+            "path": rng.choice(PATHS),
+            "status": rng.choice([200, 200, 200, 404, 500]),
+            "duration_ms": round(rng.random() * 100, 3),
+            "request_id": f"req-{rng.getrandbits(48):012x}",
+        }
+        if rng.random() < secret_fraction:
+            event["detail"] = rng.choice(SECRETS)
+        events.append(event)
+    return events
+
+
+def legacy_redact(text: str, mode: RoutineMode) -> str:
+    """The pre-engine redact_text: every regex on every string, quadratic overlap check."""
+    raw = [
+        (m.start(), m.end(), prio, cat, repl, m)
+        for cat, prio, rx, repl in _compile_patterns(mode)
+        for m in rx.finditer(text)
+    ]
+    raw.sort(key=lambda t: (-t[2], -(t[1] - t[0]), t[0]))
+    chosen: list[tuple] = []
+    for start, end, _prio, _cat, repl, m in raw:
+        if any(not (end <= s or start >= e) for s, e, *_ in chosen):
+            continue
+        chosen.append((start, end, repl, m))
+    chosen.sort(key=lambda t: t[0])
+    out, pos = [], 0
+    for start, end, repl, m in chosen:
+        out.append(text[pos:start] + repl(m))
+        pos = end
+    return "".join(out) + text[pos:]
+
+
+def legacy_sanitize(obj, mode):
+    if isinstance(obj, str):
+        return legacy_redact(obj, mode) if obj else obj
+    if isinstance(obj, dict):
+        return {k: legacy_sanitize(v, mode) for k, v in obj.items()}
+    return obj
+
+
+def timed(label: str, fn, events: list[dict]) -> float:
+    start = time.perf_counter()
+    for event in events:
+        fn(event)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {len(events) / elapsed:12,.0f} events/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--mode", choices=[m.value for m in RoutineMode], default="advanced")
+    args = parser.parse_args()
+
+    mode = RoutineMode(args.mode)
+    events = build_events(args.events)
+    print(f"=== Telemetry redaction ({len(events):,} events, mode={mode}) ===")
+
+    legacy = timed("legacy (compile per call)", lambda e: legacy_sanitize(e, mode), events)
+
+    cold_engine = RedactionEngine(mode, cache_size=0)
+    cold = timed("engine, no LRU", lambda e: _sanitize(e, cold_engine, 6, 0), events)
+
+    warm_engine = RedactionEngine(mode)
+    warm = timed("engine + LRU", lambda e: _sanitize(e, warm_engine, 6, 0), events)
+
+    mismatches = sum(1 for e in events[:5000] if _sanitize(e, warm_engine, 6, 0) != legacy_sanitize(e, mode))
+    print(f"\nspeedup: {legacy / cold:.1f}x without LRU, {legacy / warm:.1f}x with LRU")
+    print(f"output mismatches vs legacy (first 5k): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
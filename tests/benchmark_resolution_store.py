@@ -0,0 +1,132 @@
+"""
+Benchmark the sharded resolution store against one JSON file per resolution.
+
+The partition conflict pipeline wrote manifests/resolutions/<conflict_id>.json
+for every resolution and found state by listing that directory. This times,
+for ``--resolutions`` conflicts:
+
+* writing every resolution (legacy: one file each, store: two appends),
+* ``--lookups`` point lookups (legacy: directory listing plus a file read),
+* a timestamp range read over a tenth of the resolutions (legacy: read and
+  filter every file),
+* re-resolving every conflict once, then compacting the superseded records.
+
+Usage:
+    python tests/benchmark_resolution_store.py [--resolutions 20000] [--lookups 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_modules.resolution_store import ResolutionStore
+
+
+class LegacyResolutionFiles:
+    """The pre-store layout: one pretty-printed JSON file per conflict."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, conflict_id, resolution) -> None:
+        with open(os.path.join(self.directory, f"{conflict_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(resolution, f, ensure_ascii=True, indent=2, sort_keys=True)
+            f.write("\n")
+
+    def get(self, conflict_id):
+        if f"{conflict_id}.json" not in os.listdir(self.directory):
+            return None
+        with open(os.path.join(self.directory, f"{conflict_id}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_range(self, start, end):
+        rows = []
+        for name in os.listdir(self.directory):
+            with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                row = json.load(f)
+            if start <= row["timestamp"] < end:
+                rows.append(row)
+        return sorted(rows, key=lambda row: row["timestamp"])
+
+
+def resolution(i: int, version: int = 0) -> dict:
+    conflict_id = f"cf-{i:012x}"
+    return {
+        "resolution_id": f"rs-{i:012x}",
+        "conflict_id": conflict_id,
+        "partition_id": f"p-{i % 500}",
+        "partition_key": f"space/domain/{i % 37}",
+        "winner": {"candidate_id": f"e{i}:path_space", "entity_id": f"e{i}", "claim_kind": "path_space"},
+        "losers": [{"candidate_id": f"e{i}:content_attraction", "entity_id": f"e{i}", "confidence": 0.6}],
+        "policy": "confidence-first",
+        "version": version,
+        "timestamp": f"2025-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}+00:00",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolutions", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+    n = args.resolutions
+    rows = [resolution(i) for i in range(n)]
+    keys = random.Random(7).sample([row["conflict_id"] for row in rows], min(args.lookups, n))
+    start_ts, end_ts = rows[n // 2]["timestamp"], rows[n // 2 + n // 10]["timestamp"]
+    print(f"=== Resolution storage ({n:,} resolutions) ===")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyResolutionFiles(os.path.join(tmp, "resolutions"))
+        store = ResolutionStore(os.path.join(tmp, "resolution_store"))
+        for name, backend in (("legacy", legacy), ("store", store)):
+            start = time.perf_counter()
+            for row in rows:
+                backend.put(row["conflict_id"], row)
+            write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for key in keys:
+                assert backend.get(key)["conflict_id"] == key
+            lookup = (time.perf_counter() - start) / len(keys)
+
+            start = time.perf_counter()
+            in_range = list(backend.iter_range(start_ts, end_ts))
+            scan = time.perf_counter() - start
+            assert len(in_range) == n // 10
+            results[name] = (write, lookup, scan)
+
+        store.close()
+        files = sum(len(names) for _, _, names in os.walk(os.path.join(tmp, "resolution_store")))
+        start = time.perf_counter()
+        store = ResolutionStore(os.path.join(tmp, "resolution_store"))
+        store.get(keys[0])
+        cold_lookup = time.perf_counter() - start
+
+        for i in range(n):
+            store.put(rows[i]["conflict_id"], resolution(i, version=1))
+        start = time.perf_counter()
+        compacted = store.compact()
+        compact = time.perf_counter() - start
+        assert compacted["dropped_records"] == n and store.get(keys[0])["version"] == 1
+        store.close()
+
+    for name, (write, lookup, scan) in results.items():
+        print(f"{name:<8} write {write / n * 1e6:9.1f} us/res   lookup {lookup * 1e6:10.1f} us   range {scan:7.3f}s")
+    print(f"store files on disk: {files} (legacy: {n})")
+    print(f"cold open + first lookup: {cold_lookup * 1000:.2f} ms (one shard index loaded)")
+    print(f"compaction of {n:,} superseded records: {compact:.3f}s ({compacted['reclaimed_bytes']:,} bytes reclaimed)")
+    (lw, ll, ls), (sw, sl, ss) = results["legacy"], results["store"]
+    print(f"\nspeedup: write {lw / sw:.1f}x, lookup {ll / sl:,.0f}x, range {ls / ss:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark ValueSystem scoring: per-response keyword scans vs the compiled matcher.
+
+The legacy evaluate_response lowercased the response once per value and
+rebuilt and rescanned each value's indicator lists on every call. This
+times, over a synthetic transcript corpus of ``--responses`` replies:
+
+* the legacy per-response scoring,
+* evaluate_response backed by the compiled IndicatorMatcher,
+* evaluate_batch (N x values NumPy matrix),
+* evaluate_jsonl streaming from disk with 1 and ``--processes`` workers.
+
+Usage:
+    python tests/benchmark_value_batch.py [--responses 50000] [--processes 4]
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.values import VALUE_INDICATORS, ValueSystem
+
+
+class LegacyValueScorer:
+    """The pre-matcher evaluate_response: per-value lowercase and list scans."""
+
+    def evaluate_response(self, response: str) -> dict[str, float]:
+        scores = {}
+        for name, (base, rules) in VALUE_INDICATORS.items():
+            response_lower = response.lower()
+            score = base
+            for change, phrases in rules:
+                indicators = list(phrases)
+                score += sum(1 for phrase in indicators if phrase in response_lower) * change
+            scores[name] = max(0.0, min(1.0, score))
+        return scores
+
+
+def corpus(n: int) -> list[str]:
+    rng = random.Random(11)
+    filler = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))) for _ in range(3000)]
+    phrases = [p for _, rules in VALUE_INDICATORS.values() for _, group in rules for p in group]
+    words = filler + phrases
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(20, 250))).capitalize() + "." for _ in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--responses", type=int, default=50_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    texts = corpus(args.responses)
+    n = len(texts)
+    print(f"=== Value scoring ({n:,} responses, {os.cpu_count()} CPUs) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        values = ValueSystem(storage_path=os.path.join(tmp, "values"))
+        legacy = LegacyValueScorer()
+
+        start = time.perf_counter()
+        expected = [legacy.evaluate_response(text) for text in texts]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [values.evaluate_response(text) for text in texts]
+        single_time = time.perf_counter() - start
+        assert single == expected
+
+        start = time.perf_counter()
+        matrix = values.evaluate_batch(texts)
+        batch_time = time.perf_counter() - start
+        assert matrix.tolist() == [list(row.values()) for row in expected]
+
+        path = os.path.join(tmp, "transcripts.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for i, text in enumerate(texts):
+                f.write(json.dumps({"id": i, "response": text}) + "\n")
+        stream_times = {}
+        for processes in sorted({1, args.processes}):
+            start = time.perf_counter()
+            rows = sum(len(lines) for lines, _ in values.evaluate_jsonl(path, processes=processes))
+            stream_times[processes] = time.perf_counter() - start
+            assert rows == n
+
+    print(f"{'legacy evaluate_response':<32} {legacy_time / n * 1e6:8.2f} us/response")
+    print(f"{'matcher evaluate_response':<32} {single_time / n * 1e6:8.2f} us/response")
+    print(f"{'evaluate_batch':<32} {batch_time / n * 1e6:8.2f} us/response")
+    for processes, elapsed in stream_times.items():
+        label = f"evaluate_jsonl ({processes} proc)"
+        print(f"{label:<32} {elapsed / n * 1e6:8.2f} us/response (includes JSON parsing)")
+    print(f"\nspeedup: single {legacy_time / single_time:.1f}x, batch {legacy_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark of WebSocket fan-out: sequential send_json vs queued ConnectionManager.
+
+Simulates N subscribers on one worker, a fraction of which are slow (each
+send takes --slow-ms). The legacy broadcast awaits every client in turn, so
+every broadcast pays for the slow ones; the queued manager serializes once,
+enqueues, and lets per-connection writers absorb the delay.
+
+Usage:
+    python tests/benchmark_ws_broadcast.py [--subscribers 10000] [--broadcasts 20] [--slow 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.connections import ConnectionManager
+from api.logging_structured import configure_structured_logging
+
+
+class FakeWebSocket:
+    """Counts delivered messages; slow clients sleep on every send."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+        self.expected: int | None = None
+        self.all_received = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        if self.received == self.expected:
+            self.all_received.set()
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+class LegacyConnectionManager:
+    """ConnectionManager.broadcast as it was: await each client in sequence."""
+
+    def __init__(self):
+        self.active_connections = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    async def broadcast(self, message: dict):
+        for connection in self.active_connections:
+            await connection.send_json(message)
+
+
+def make_clients(subscribers: int, slow_fraction: float, slow_ms: float) -> list[FakeWebSocket]:
+    slow_every = int(1 / slow_fraction) if slow_fraction else 0
+    return [FakeWebSocket(slow_ms / 1000 if slow_every and i % slow_every == 0 else 0.0) for i in range(subscribers)]
+
+
+async def run(manager, clients: list[FakeWebSocket], broadcasts: int) -> tuple[list[float], float]:
+    for ws in clients:
+        await manager.connect(ws)
+    fast = [ws for ws in clients if not ws.delay]
+    for ws in fast:
+        ws.expected = broadcasts
+    message = {"type": "insight", "data": {"pattern": "trend", "confidence": 0.91, "tags": ["a", "b", "c"]}}
+
+    call_latencies = []
+    start = time.perf_counter()
+    for i in range(broadcasts):
+        t0 = time.perf_counter()
+        await manager.broadcast({**message, "seq": i})
+        call_latencies.append(time.perf_counter() - t0)
+    # Time until every fast subscriber has everything
+    await asyncio.gather(*(ws.all_received.wait() for ws in fast))
+    delivered = time.perf_counter() - start
+    if hasattr(manager, "close_all"):
+        await manager.close_all(drain_timeout=0)
+    return call_latencies, delivered
+
+
+def report(label: str, latencies: list[float], delivered: float, subscribers: int) -> float:
+    sends = len(latencies) * subscribers / delivered
+    print(
+        f"{label:<10} broadcast() p50 {statistics.median(latencies) * 1e3:9.2f} ms  max {max(latencies) * 1e3:9.2f} ms"
+        f"   fast clients served in {delivered:7.2f} s  ({sends:11,.0f} msgs/s)"
+    )
+    return delivered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of slow subscribers")
+    parser.add_argument("--slow-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    configure_structured_logging(log_level="WARNING")  # skip per-connection connect/disconnect logs
+
+    print(
+        f"=== WebSocket fan-out: {args.subscribers:,} subscribers, {args.broadcasts} broadcasts, "
+        f"{args.slow:.0%} slow ({args.slow_ms} ms/send) ==="
+    )
+    legacy = asyncio.run(
+        run(LegacyConnectionManager(), make_clients(args.subscribers, args.slow, args.slow_ms), args.broadcasts)
+    )
+    queued = asyncio.run(
+        run(ConnectionManager(), make_clients(args.subscribers, args.slow, args.slow_ms), args.broadcasts)
+    )
+    before = report("sequential", *legacy, args.subscribers)
+    after = report("queued", *queued, args.subscribers)
+    print(f"\nspeedup (fast subscribers): {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
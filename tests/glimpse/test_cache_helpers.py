@@ -0,0 +1,157 @@
+"""
+Tests for PromptCache single-flight coalescing and shared backends
+"""
+
+import asyncio
+
+import pytest
+
+from glimpse.cache_helpers import (
+    PromptCache,
+    SQLiteCacheBackend,
+    cached_openai_call,
+    create_cache_backend,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class TestSingleFlight:
+    """Concurrent identical requests share one upstream call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesce(self):
+        cache = PromptCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"answer": 42}
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute(MESSAGES, "gpt-4o-mini", 0.0, 64, compute) for _ in range(50))
+        )
+
+        assert calls == 1
+        assert all(r == {"answer": 42} for r in results)
+        assert cache.get_stats()["coalesced"] == 49
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_waiters_and_are_not_cached(self):
+        cache = PromptCache()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute(MESSAGES, "m", 0.0, None, failing) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get(MESSAGES, "m", 0.0, None) is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_the_call_to_a_follower(self):
+        cache = PromptCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"call": calls}
+
+        leader = asyncio.create_task(cache.get_or_compute(MESSAGES, "m", 0.0, None, compute))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(cache.get_or_compute(MESSAGES, "m", 0.0, None, compute)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        assert calls == 2
+        assert results == [{"call": 2}] * 5
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_decorator_coalesces(self):
+        cache = PromptCache()
+        calls = 0
+
+        @cached_openai_call(cache=cache)
+        async def chat(messages, model, temperature, max_tokens=None, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"model": model}
+
+        await asyncio.gather(*(chat(MESSAGES, "m", 0.0, 10) for _ in range(10)))
+        await chat(MESSAGES, "m", 0.0, 10)
+
+        assert calls == 1
+        assert cache.get_hit_rate() > 0
+
+
+class TestSQLiteBackend:
+    """Shared SQLite tier survives a fresh in-process cache"""
+
+    @pytest.mark.asyncio
+    async def test_hit_across_cache_instances(self, tmp_path):
+        path = tmp_path / "cache.sqlite3"
+        first = PromptCache(backend=SQLiteCacheBackend(path))
+        await first.set(MESSAGES, "m", 0.0, None, {"text": "shared"})
+
+        # Simulates another worker process / a restart
+        second = PromptCache(backend=SQLiteCacheBackend(path))
+        assert await second.get(MESSAGES, "m", 0.0, None) == {"text": "shared"}
+        assert len(second._cache) == 1
+
+        await first.backend.close()
+        await second.backend.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_ignored(self, tmp_path):
+        backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3")
+        await backend.set("k", {"v": 1}, stored_at=0.0, ttl_seconds=1)
+        assert await backend.get("k") is None
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_trim_keeps_newest(self, tmp_path):
+        backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3", max_size=10)
+        backend.TRIM_EVERY = 5
+        for i in range(20):
+            await backend.set(f"k{i}", i, stored_at=1e12 + i, ttl_seconds=60)
+        assert await backend.get("k19") == (19, 1e12 + 19)
+        assert await backend.get("k0") is None
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_unserializable_values_stay_local(self, tmp_path):
+        cache = PromptCache(backend=SQLiteCacheBackend(tmp_path / "cache.sqlite3"))
+        marker = object()
+        await cache.set(MESSAGES, "m", 0.0, None, marker)
+        assert await cache.get(MESSAGES, "m", 0.0, None) is marker
+        assert await cache.backend.get(PromptCache._hash_prompt(MESSAGES, "m", 0.0, None)) is None
+        await cache.backend.close()
+
+
+def test_create_cache_backend_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("GLIMPSE_CACHE_BACKEND", "memory")
+    assert create_cache_backend() is None
+
+    monkeypatch.setenv("GLIMPSE_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("GLIMPSE_CACHE_PATH", str(tmp_path / "c.sqlite3"))
+    assert isinstance(create_cache_backend(), SQLiteCacheBackend)
+
+    with pytest.raises(ValueError):
+        create_cache_backend("lmdb")
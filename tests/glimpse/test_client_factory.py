@@ -0,0 +1,124 @@
+"""
+Tests for the shared pooled HTTP client factory
+"""
+
+import asyncio
+
+import pytest
+
+from glimpse import client_factory
+from glimpse.client_factory import (
+    HTTPPoolConfig,
+    aclose_http_clients,
+    close_http_clients,
+    get_async_http_client,
+    get_async_openai_client,
+    get_http_client,
+    get_openai_client,
+    get_pool_stats,
+)
+from glimpse.stub_server import LatencyDistribution, OpenAIStubServer, StubConfig
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+STUB = StubConfig(latency=LatencyDistribution("fixed", 0, 0))
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    close_http_clients()
+    client_factory.configure_http_pool(HTTPPoolConfig(max_connections=4, max_keepalive_connections=4))
+    client_factory._stats.reset()
+    yield
+    close_http_clients()
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("GLIMPSE_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("GLIMPSE_HTTP_KEEPALIVE_EXPIRY", "nope")
+    monkeypatch.setenv("GLIMPSE_HTTP2", "0")
+    config = HTTPPoolConfig.from_env()
+    assert config.max_connections == 7
+    assert config.keepalive_expiry == 30.0
+    assert config.use_http2() is False
+
+
+def test_clients_are_shared_and_borrowers_cannot_close_them():
+    assert get_openai_client(api_key="sk-test") is get_openai_client(api_key="sk-test")
+    assert get_openai_client(api_key="sk-test")._client is get_http_client()
+    assert get_async_openai_client(api_key="sk-a")._client is get_async_openai_client(api_key="sk-b")._client
+
+    get_openai_client(api_key="sk-test").close()
+    assert not get_http_client().is_closed
+
+
+@pytest.mark.asyncio
+async def test_burst_reuses_warm_connections():
+    async with OpenAIStubServer(STUB) as server:
+        client = get_async_openai_client(api_key="sk-test", base_url=server.base_url, max_retries=0)
+        for _ in range(3):
+            await asyncio.gather(
+                *(client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES) for _ in range(8))
+            )
+        await aclose_http_clients()
+
+    stats = get_pool_stats()
+    assert stats["requests"] == 24
+    assert stats["new_connections"] <= 4  # bounded by max_connections
+    assert stats["reused_connections"] >= 20
+    assert server.stats.completed == 24
+
+
+@pytest.mark.asyncio
+async def test_sync_client_reuses_connections():
+    async with OpenAIStubServer(STUB) as server:
+        client = get_openai_client(api_key="sk-test", base_url=server.base_url, max_retries=0)
+        for _ in range(3):
+            await asyncio.to_thread(client.chat.completions.create, model="gpt-4o-mini", messages=MESSAGES)
+
+    stats = get_pool_stats()
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+
+
+def test_async_pool_survives_event_loop_changes():
+    async def one_call():
+        async with OpenAIStubServer(STUB) as server:
+            client = get_async_openai_client(api_key="sk-test", base_url=server.base_url, max_retries=0)
+            await client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+
+    asyncio.run(one_call())
+    asyncio.run(one_call())
+
+    assert get_pool_stats()["requests"] == 2
+    assert get_async_http_client() is get_async_http_client()
+
+
+def test_env_key_changes_build_a_new_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-first")
+    first = get_async_openai_client()
+    assert get_async_openai_client() is first
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-second")
+    second = get_async_openai_client()
+    assert second is not first
+    assert second.api_key == "sk-second"
+
+
+def test_close_http_clients_closes_async_pools():
+    async def one_call():
+        async with OpenAIStubServer(STUB) as server:
+            client = get_async_openai_client(api_key="sk-test", base_url=server.base_url, max_retries=0)
+            await client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(one_call())
+        transport = get_async_http_client()._transport
+        pool = transport._pools[loop]
+        assert pool._pool.connections
+
+        close_http_clients()
+        assert transport.pool_count == 0
+        assert not pool._pool.connections
+    finally:
+        loop.close()
@@ -0,0 +1,94 @@
+"""
+Tests for the offline load-testing harness and OpenAI stub server
+"""
+
+import json
+import random
+
+import aiohttp
+import pytest
+
+from glimpse.load_harness import (
+    LoadTestConfig,
+    diff_reports,
+    percentile,
+    run_load_test,
+    write_report,
+)
+from glimpse.stub_server import LatencyDistribution, OpenAIStubServer, StubConfig
+
+CHAT_BODY = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hello there"}], "max_tokens": 16}
+
+
+class TestLatencyDistribution:
+    @pytest.mark.parametrize("kind", ["fixed", "uniform", "normal", "lognormal", "exponential"])
+    def test_samples_are_non_negative_and_near_mean(self, kind):
+        dist = LatencyDistribution(kind, mean_ms=100, stddev_ms=20)
+        rng = random.Random(0)
+        samples = [dist.sample(rng) for _ in range(2000)]
+        assert min(samples) >= 0
+        assert 0.08 < sum(samples) / len(samples) < 0.12
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            LatencyDistribution("pareto").sample(random.Random(0))
+
+
+class TestStubServer:
+    @pytest.mark.asyncio
+    async def test_chat_completion_and_token_accounting(self):
+        config = StubConfig(latency=LatencyDistribution("fixed", 0, 0), completion_tokens=32)
+        async with OpenAIStubServer(config) as server, aiohttp.ClientSession() as session:
+            async with session.post(f"{server.base_url}/chat/completions", json=CHAT_BODY) as resp:
+                assert resp.status == 200
+                body = await resp.json()
+
+        assert body["choices"][0]["message"]["role"] == "assistant"
+        assert body["usage"]["completion_tokens"] == 16  # capped by max_tokens
+        assert server.stats.completed == 1
+        assert server.stats.to_dict()["total_tokens"] == body["usage"]["total_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_rpm_limit_injects_429(self):
+        config = StubConfig(latency=LatencyDistribution("fixed", 0, 0), rpm_limit=2)
+        async with OpenAIStubServer(config) as server, aiohttp.ClientSession() as session:
+            statuses = []
+            for _ in range(4):
+                async with session.post(f"{server.base_url}/chat/completions", json=CHAT_BODY) as resp:
+                    statuses.append(resp.status)
+                    if resp.status == 429:
+                        assert "retry-after" in resp.headers
+
+        assert statuses == [200, 200, 429, 429]
+        assert server.stats.rate_limited == 2
+
+
+class TestLoadHarness:
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("target", ["client", "engine"])
+    async def test_run_against_stub(self, target, tmp_path):
+        config = LoadTestConfig(target=target, rps=40, duration_s=0.5, arrival="constant", seed=1)
+        stub = StubConfig(latency=LatencyDistribution("fixed", 2, 0), seed=1)
+
+        report = await run_load_test(config, stub_config=stub)
+
+        assert report.requests["scheduled"] == 20
+        assert report.requests["failed"] == 0
+        assert report.latency_ms["p50"] <= report.latency_ms["p99"]
+        # Repeated prompts are served by the PromptCache (as hits, or coalesced while a cold first call is in flight)
+        assert report.cache["hits"] + report.cache["coalesced"] > 0
+        assert report.upstream["stub"]["completed"] < report.requests["scheduled"]
+
+        path = write_report(report, tmp_path / "run.json")
+        data = json.loads(path.read_text())
+        assert data["meta"]["config"]["target"] == target
+        assert set(data["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
+
+        diff = diff_reports(data, data)
+        assert all(v["delta"] == 0 for v in diff.values())
@@ -0,0 +1,134 @@
+"""Tests for the batch helpers (api.batch) and the batch/NDJSON REST endpoints."""
+
+import asyncio
+import json
+
+import pytest
+
+from api.batch import BatchTooLarge, iter_batch, read_ndjson, run_batch
+
+
+async def test_iter_batch_bounds_concurrency_and_yields_as_completed():
+    in_flight = peak = 0
+
+    async def handler(delay):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        return delay
+
+    delays = [0.05, 0.01, 0.03, 0.0, 0.02, 0.04]
+    entries = [entry async for entry in iter_batch(delays, handler, concurrency=3)]
+    assert peak == 3
+    assert sorted(entry["index"] for entry in entries) == list(range(len(delays)))
+    assert entries[0]["index"] != 0  # the slowest item does not hold up the rest
+
+
+async def test_run_batch_isolates_failures():
+    async def handler(item):
+        if item % 3 == 0:
+            raise RuntimeError("boom")
+        return item * 2
+
+    result = await run_batch(list(range(7)), handler, concurrency=2)
+    assert [entry["index"] for entry in result["results"]] == list(range(7))
+    assert result["failed"] == 3 and result["succeeded"] == 4
+    assert result["results"][1] == {"index": 1, "ok": True, "result": 2}
+    assert result["results"][3] == {"index": 3, "ok": False, "error": "Processing failed"}
+
+
+async def test_closing_the_stream_cancels_outstanding_items():
+    started = []
+
+    async def handler(item):
+        started.append(item)
+        await asyncio.sleep(0 if item == 0 else 10)
+        return item
+
+    stream = iter_batch(list(range(100)), handler, concurrency=4)
+    first = await stream.__anext__()
+    await stream.aclose()
+    assert first["index"] == 0
+    assert len(started) <= 5
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from starlette.testclient import TestClient
+
+    from api.config import get_config
+    from api.main import app
+
+    security = get_config().security
+    monkeypatch.setattr(security, "allowed_api_keys", [*security.allowed_api_keys, "batch-test-key"])
+    with TestClient(app, headers={"X-API-Key": "batch-test-key"}) as c:
+        yield c
+
+
+def test_pattern_batch_endpoint(client):
+    items = [
+        {"text": "Revenue increased by approximately 25% compared to last year."},
+        {"nope": "missing text"},
+        {"text": "Because costs fell, margins rose over the following months."},
+    ]
+    response = client.post("/api/patterns/detect/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 2 and body["failed"] == 1
+    ok, bad, ok2 = body["results"]
+    assert ok["ok"] and ok["result"]["patterns"] and ok2["ok"]
+    assert bad == {"index": 1, "ok": False, "error": "Invalid item", "details": bad["details"]}
+    assert bad["details"][0]["loc"] == ["text"]
+
+
+def test_truth_stream_endpoint_returns_ndjson(client):
+    items = [{"claim": f"Claim number {i} is true", "evidence": ["Claim number is true"]} for i in range(12)]
+    items.append({"claim": 42})
+    with client.stream("POST", "/api/truth/verify/stream", json={"items": items}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert sorted(entry["index"] for entry in lines) == list(range(13))
+    by_index = {entry["index"]: entry for entry in lines}
+    assert by_index[12]["ok"] is False
+    assert all(by_index[i]["result"]["verdict"] in {"TRUE", "FALSE", "UNCERTAIN"} for i in range(12))
+
+
+async def test_read_ndjson_decodes_lines_across_chunks():
+    async def chunks(*parts):
+        for part in parts:
+            yield part
+
+    items = await read_ndjson(chunks(b'{"a": 1}\n{"a"', b": 2}\n\nnot json\n", b'{"a": 3}'))
+    assert items[0] == {"a": 1} and items[1] == {"a": 2} and items[3] == {"a": 3}
+    assert isinstance(items[2], json.JSONDecodeError)
+    with pytest.raises(BatchTooLarge):
+        await read_ndjson(chunks(b"1\n2\n3\n"), max_items=2)
+
+
+def test_stream_endpoint_accepts_ndjson_input(client, monkeypatch):
+    from api.config import get_config
+
+    body = "\n".join([json.dumps({"claim": "The sky is blue"}), "{broken", json.dumps({"claim": 7})]) + "\n"
+    headers = {"Content-Type": "application/x-ndjson"}
+    with client.stream("POST", "/api/truth/verify/stream", content=body, headers=headers) as response:
+        assert response.status_code == 200
+        lines = {entry["index"]: entry for entry in (json.loads(line) for line in response.iter_lines() if line)}
+    assert lines[0]["ok"] and lines[0]["result"]["verdict"] in {"TRUE", "FALSE", "UNCERTAIN"}
+    assert lines[1]["error"] == "Invalid JSON" and lines[2]["error"] == "Invalid item"
+
+    monkeypatch.setattr(get_config().api, "max_batch_size", 2)
+    response = client.post("/api/truth/verify/stream", content=body, headers=headers)
+    assert response.status_code == 413
+    assert client.post("/api/truth/verify/stream", json={"items": "nope"}).status_code == 422
+
+
+def test_batch_size_limit(client, monkeypatch):
+    from api.config import get_config
+
+    monkeypatch.setattr(get_config().api, "max_batch_size", 3)
+    response = client.post("/api/truth/verify/batch", json={"items": [{"claim": "x"}] * 4})
+    assert response.status_code == 413
+    assert response.json() == {"error": "Batch too large", "max_batch_size": 3}
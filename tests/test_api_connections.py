@@ -0,0 +1,214 @@
+"""Tests for api.connections.ConnectionManager (queued, backpressure-aware fan-out)."""
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+from prometheus_client import REGISTRY
+
+from api.connections import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.closed = None
+        self.fail = fail
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("connection reset")
+        self.sent.append(text)
+
+    async def send_json(self, message):
+        raise AssertionError("registered connections are written by their writer task")
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def connected(manager, n, **kwargs):
+    sockets = [FakeWebSocket(**kwargs) for _ in range(n)]
+    for ws in sockets:
+        await manager.connect(ws)
+    return sockets
+
+
+async def test_broadcast_serializes_once_and_preserves_order():
+    manager = ConnectionManager()
+    sockets = await connected(manager, 50)
+    for i in range(3):
+        assert await manager.broadcast({"type": "tick", "n": i, "text": "é"}) == 50
+    await settle()
+    assert all(ws.sent == sockets[0].sent for ws in sockets)
+    assert sockets[0].sent == [f'{{"type":"tick","n":{i},"text":"é"}}' for i in range(3)]
+    assert len({id(ws.sent[0]) for ws in sockets}) == 1  # one shared payload
+    await manager.close_all()
+
+
+async def test_slow_client_does_not_stall_broadcast():
+    manager = ConnectionManager(queue_size=4)
+    slow, *fast = await connected(manager, 5)
+    slow.gate.clear()
+
+    await asyncio.wait_for(manager.broadcast({"n": 1}), timeout=0.1)
+    await settle()
+    assert all(ws.sent == ['{"n":1}'] for ws in fast)
+    assert slow.sent == []
+
+    slow.gate.set()
+    await settle()
+    assert slow.sent == ['{"n":1}']
+    await manager.close_all()
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [("drop_oldest", ["0", "4", "5"]), ("drop_newest", ["0", "1", "2"])],
+)
+async def test_overflow_drop_policies(policy, expected):
+    manager = ConnectionManager(queue_size=2, overflow_policy=policy)
+    (ws,) = await connected(manager, 1)
+    ws.gate.clear()
+    await manager.broadcast(0)
+    await settle()  # writer holds "0" while blocked in send_text
+    for i in range(1, 6):
+        await manager.broadcast(i)
+    ws.gate.set()
+    await settle()
+    assert ws.sent == expected
+    assert manager.active_connections[ws].dropped == 3
+    await manager.close_all()
+
+
+async def test_overflow_close_policy_disconnects_only_the_slow_client():
+    manager = ConnectionManager(queue_size=2, overflow_policy="close")
+    slow, fast = await connected(manager, 2)
+    slow.gate.clear()
+    for i in range(4):
+        await manager.broadcast(i)
+        await settle()
+    assert slow.closed == 1013
+    assert list(manager.active_connections) == [fast]
+    assert fast.sent == ["0", "1", "2", "3"]
+    await manager.close_all()
+
+
+async def test_failed_connections_are_removed_without_skipping_others():
+    manager = ConnectionManager()
+    sockets = await connected(manager, 3, fail=True) + await connected(manager, 3)
+    await manager.broadcast({"n": 1})
+    await settle()
+    assert list(manager.active_connections) == sockets[3:]
+    assert all(ws.sent == ['{"n":1}'] for ws in sockets[3:])
+    await manager.close_all()
+
+
+async def test_personal_messages_share_the_queue_and_gauges_report_depth():
+    manager = ConnectionManager()
+    a, b = await connected(manager, 2)
+    a.gate.clear()
+    await manager.broadcast({"type": "all"})
+    await manager.send_personal_message({"type": "mine"}, a)
+    await settle()
+    assert b.sent == ['{"type":"all"}']
+    assert REGISTRY.get_sample_value("websocket_connections") == 2
+    assert REGISTRY.get_sample_value("websocket_send_queue_depth") == 1  # "all" is in flight
+    assert REGISTRY.get_sample_value("websocket_send_queue_depth_max") == 1
+
+    a.gate.set()
+    await manager.close_all()
+    assert a.sent == ['{"type":"all"}', '{"type":"mine"}']
+    assert a.closed == 1001 and not manager.active_connections
+    assert REGISTRY.get_sample_value("websocket_connections") == 0
+
+
+@pytest.mark.parametrize("policy", ["drop_oldest", "close"])
+async def test_personal_replies_wait_for_room_instead_of_overflowing(policy):
+    manager = ConnectionManager(queue_size=2, overflow_policy=policy)
+    (ws,) = await connected(manager, 1)
+    ws.gate.clear()
+
+    async def reply_all():
+        for i in range(6):
+            await manager.send_personal_message({"n": i}, ws)
+
+    replies = asyncio.create_task(reply_all())
+    await settle()
+    assert not replies.done()  # the client's own loop is held back, nothing is dropped
+    ws.gate.set()
+    await replies
+    await manager.close(ws)
+    assert ws.sent == [f'{{"n":{i}}}' for i in range(6)]
+    assert ws.closed == 1000 and not manager.active_connections
+
+
+async def test_close_sends_queued_frames_first_and_disconnect_releases_waiting_senders():
+    manager = ConnectionManager(queue_size=1)
+    a, b = await connected(manager, 2)
+    a.gate.clear()
+    await manager.send_personal_message({"type": "result"}, a)
+    closing = asyncio.create_task(manager.close(a, code=1009, reason="Message too large"))
+    await settle()
+    a.gate.set()
+    await closing
+    assert a.sent == ['{"type":"result"}'] and a.closed == 1009
+
+    b.gate.clear()
+    await manager.send_personal_message({"n": 0}, b)
+    await manager.send_personal_message({"n": 1}, b)
+    blocked = asyncio.create_task(manager.send_personal_message({"n": 2}, b))
+    await settle()
+    assert not blocked.done()
+    manager.disconnect(b)
+    await asyncio.wait_for(blocked, timeout=1)
+
+
+async def test_gauges_sum_over_managers_without_keeping_them_alive():
+    first, second = ConnectionManager(), ConnectionManager()
+    await connected(first, 2)
+    await connected(second, 3)
+    assert REGISTRY.get_sample_value("websocket_connections") == 5
+
+    await second.close_all(drain_timeout=0)
+    ref = weakref.ref(second)
+    del second
+    gc.collect()
+    assert ref() is None
+    assert REGISTRY.get_sample_value("websocket_connections") == 2
+    await first.close_all()
+
+
+def test_stream_endpoint_replies_in_order():
+    from starlette.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    from api.main import app, manager
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream") as ws:
+            ws.send_json({"type": "pattern_detection", "data": {"text": "a b a b a b"}})
+            assert ws.receive_json()["type"] == "processing_start"
+            assert ws.receive_json()["type"] == "pattern_detection_result"
+            ws.send_json({"type": "nope"})
+            assert ws.receive_json()["type"] == "error"
+        with client.websocket_connect("/ws/stream") as ws:
+            ws.send_json({"type": "nope"})
+            ws.send_text("x" * 70_000)
+            assert ws.receive_json()["type"] == "error"  # queued before the close is still delivered
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 1009
+    assert not manager.active_connections
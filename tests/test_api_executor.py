@@ -0,0 +1,117 @@
+"""Tests for the CPU executor (api.executor): process-pool offload, overload rejection and loop-lag sampling."""
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from prometheus_client import REGISTRY, generate_latest
+
+from api.executor import CPUExecutor, ExecutorOverloaded, LoopLagMonitor, detect_patterns_job, verify_truth_job
+from api.pattern_detection import detect_patterns
+from api.self_rag import verify_truth
+
+TEXT = "Because demand rose for weeks, revenue increased by approximately 25% compared to last year. " * 50
+
+
+@pytest.fixture
+async def executor():
+    executor = CPUExecutor(max_workers=1, offload_threshold=1000, max_pending=1)
+    await executor.start()
+    yield executor
+    await executor.shutdown()
+
+
+async def test_large_inputs_run_in_workers_with_inline_results(executor):
+    offloaded = await executor.submit(len(TEXT), detect_patterns_job, detect_patterns, TEXT, None, None)
+    assert offloaded == await detect_patterns(TEXT)
+
+    verdict = await executor.run(verify_truth_job, "The sky is blue", ["It is true the sky is blue"], None)
+    inline = await verify_truth("The sky is blue", ["It is true the sky is blue"])
+    assert (verdict["verdict"], verdict["confidence"]) == (inline["verdict"], inline["confidence"])
+
+
+async def test_small_inputs_stay_on_the_loop(executor):
+    calls = []
+
+    async def inline(text):
+        calls.append(text)
+        return "inline"
+
+    assert await executor.submit(10, detect_patterns_job, inline, "short") == "inline"
+    assert calls == ["short"]
+
+
+async def test_pending_cap_rejects_excess_jobs(executor):
+    busy = asyncio.ensure_future(executor.run(time.sleep, 0.5))
+    await asyncio.sleep(0)
+    assert executor.pending == 1
+    with pytest.raises(ExecutorOverloaded):
+        await executor.run(time.sleep, 0)
+    await busy
+    assert executor.pending == 0
+    await executor.run(time.sleep, 0)
+
+
+async def test_broken_pool_is_replaced_once_and_warmed():
+    executor = CPUExecutor(max_workers=1, offload_threshold=0, max_pending=4)
+    await executor.start()
+    created = []
+    create_pool = executor._create_pool
+    executor._create_pool = lambda: created.append(create_pool()) or created[-1]
+    try:
+        broken = executor._pool
+        results = await asyncio.gather(*(executor.run(os._exit, 1) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, BrokenProcessPool) for r in results)
+        assert len(created) == 1 and executor._pool is created[0] is not broken
+        assert len(created[0]._processes) == 1  # already warmed
+        assert await executor.run(pow, 2, 10) == 1024
+    finally:
+        await executor.shutdown()
+
+
+async def test_disabled_executor_runs_everything_inline():
+    executor = CPUExecutor(max_workers=0, offload_threshold=0)
+    await executor.start()
+    assert not executor.running and not executor.should_offload(10**9)
+
+
+async def test_loop_lag_monitor_reports_blocking():
+    def lag_sum():
+        return REGISTRY.get_sample_value("event_loop_lag_seconds_distribution_sum") or 0.0
+
+    before = lag_sum()
+    monitor = LoopLagMonitor(interval=0.02)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    blocked_until = time.perf_counter() + 0.2
+    while time.perf_counter() < blocked_until:  # block the loop
+        pass
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert lag_sum() - before >= 0.15
+    assert monitor.last_lag < 0.15  # a later, unblocked sample replaced the spike
+    metrics = generate_latest().decode()
+    assert "event_loop_lag_seconds " in metrics and "cpu_executor_pending_jobs " in metrics
+
+
+def test_rest_overload_returns_503(monkeypatch):
+    from starlette.testclient import TestClient
+
+    from api import main
+    from api.config import get_config
+
+    security = get_config().security
+    monkeypatch.setattr(security, "allowed_api_keys", [*security.allowed_api_keys, "executor-test-key"])
+    with TestClient(main.app, headers={"X-API-Key": "executor-test-key"}) as client:
+        monkeypatch.setattr(main.cpu_executor, "offload_threshold", 100)
+        monkeypatch.setattr(main.cpu_executor, "max_pending", 0)
+        response = client.post("/api/patterns/detect", json={"text": TEXT})
+        assert response.status_code == 503
+        assert response.json() == {"error": "Server busy"}
+        assert response.headers["Retry-After"] == "1"
+
+        # Small inputs are still served inline
+        response = client.post("/api/patterns/detect", json={"text": "Sales rose 5% in March."})
+        assert response.status_code == 200
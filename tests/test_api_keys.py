@@ -0,0 +1,148 @@
+"""Tests for api.auth.api_keys (in-memory validation with write-behind persistence)."""
+
+import json
+import logging
+import os
+import stat
+import time
+
+import pytest
+
+from api.auth.api_keys import APIKeyManager, APIKeyStore, FileAPIKeyStore, RedisAPIKeyStore
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return tmp_path / "api_keys.json"
+
+
+def _on_disk(path):
+    return json.loads(path.read_text())
+
+
+def test_validate_does_not_write_until_flush(storage):
+    manager = APIKeyManager(str(storage), flush_interval=0)
+    key = manager.generate_key("ci", role="developer")
+    assert stat.S_IMODE(os.stat(storage).st_mode) == 0o600
+    mtime = os.stat(storage).st_mtime_ns
+
+    for _ in range(50):
+        assert manager.validate_key(key)["role"] == "developer"
+    assert manager.validate_key("gp_unknown") is None
+    assert os.stat(storage).st_mtime_ns == mtime
+    assert next(iter(_on_disk(storage).values()))["last_used"] is None
+
+    assert manager.flush() == 1  # 50 validations coalesced into one update
+    assert next(iter(_on_disk(storage).values()))["last_used"] is not None
+    assert manager.flush() == 0
+
+
+def test_close_flushes_pending_updates(storage):
+    manager = APIKeyManager(str(storage), flush_interval=60)
+    key = manager.generate_key("svc")
+    manager.validate_key(key)
+    manager.close()
+    assert next(iter(_on_disk(storage).values()))["last_used"] is not None
+
+
+def test_revocation_from_other_process_is_picked_up(storage):
+    worker = APIKeyManager(str(storage), flush_interval=0, reload_interval=0)
+    admin = APIKeyManager(str(storage), flush_interval=0)
+    key = admin.generate_key("shared")
+    assert worker.validate_key(key) is not None
+
+    assert admin.revoke_key(key)
+    assert worker.validate_key(key) is None
+
+    # The worker's pending last_used flush must not resurrect the key
+    worker.flush()
+    assert next(iter(_on_disk(storage).values()))["active"] is False
+
+
+def test_flush_keeps_keys_added_elsewhere(storage):
+    admin = APIKeyManager(str(storage), flush_interval=0)
+    first = admin.generate_key("first")
+    worker = APIKeyManager(str(storage), flush_interval=0, reload_interval=3600)
+    assert worker.validate_key(first)
+
+    admin.generate_key("second")
+    worker.flush()
+    assert {k["name"] for k in _on_disk(storage).values()} == {"first", "second"}
+
+
+def test_background_flush_failures_are_logged_and_retried(storage, caplog):
+    class FlakyStore(FileAPIKeyStore):
+        failures = 1
+
+        def flush_last_used(self, updates):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            super().flush_last_used(updates)
+
+    manager = APIKeyManager(store=FlakyStore(storage), flush_interval=0.02)
+    key = manager.generate_key("bg")
+    with caplog.at_level(logging.ERROR, logger="api.auth.api_keys"):
+        manager.validate_key(key)
+        deadline = time.monotonic() + 5
+        while next(iter(_on_disk(storage).values()))["last_used"] is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+    manager.close()
+
+    assert "Failed to flush API key last_used updates" in caplog.text
+    assert next(iter(_on_disk(storage).values()))["last_used"] is not None
+    with pytest.raises(TypeError):
+        APIKeyStore()
+
+
+def test_validation_after_close_restarts_the_flusher(storage):
+    manager = APIKeyManager(store=FileAPIKeyStore(storage), flush_interval=0.02)
+    key = manager.generate_key("reopened")
+    manager.close()
+
+    assert manager.validate_key(key)
+    deadline = time.monotonic() + 5
+    while next(iter(_on_disk(storage).values()))["last_used"] is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert next(iter(_on_disk(storage).values()))["last_used"] is not None
+    manager.close()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes, self.values = {}, {}
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        h = self.hashes.setdefault(name, {})
+        if key is not None:
+            h[key] = value
+        h.update(mapping or {})
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def incr(self, name):
+        self.values[name] = int(self.values.get(name, 0)) + 1
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_redis_store_shares_keys_between_nodes():
+    client = FakeRedis()
+    node_a = APIKeyManager(store=RedisAPIKeyStore(client), flush_interval=0, reload_interval=0)
+    node_b = APIKeyManager(store=RedisAPIKeyStore(client), flush_interval=0, reload_interval=0)
+
+    key = node_a.generate_key("multi-node")
+    assert node_b.validate_key(key)["name"] == "multi-node"
+    node_b.flush()
+    assert node_a._load_keys()[node_a._hash_key(key)]["last_used"] is not None
+
+    node_a.revoke_key(key)
+    assert node_b.validate_key(key) is None
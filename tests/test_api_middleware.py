@@ -0,0 +1,192 @@
+"""Tests for the pure-ASGI middleware stack in api.middleware."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from api.middleware import (
+    AuthenticationMiddleware,
+    RequestBodyLimitMiddleware,
+    RequestLoggingMiddleware,
+    SecurityHeadersMiddleware,
+    TimeoutMiddleware,
+)
+
+
+async def echo(request: Request):
+    body = await request.body()
+    return JSONResponse({"size": len(body), "client_id": getattr(request.state, "client_id", None)})
+
+
+async def slow(request: Request):
+    await asyncio.sleep(float(request.query_params.get("delay", "1")))
+    return JSONResponse({"ok": True})
+
+
+async def stream(request: Request):
+    gap = float(request.query_params.get("gap", "0.05"))
+    stall = float(request.query_params.get("stall", "0"))
+
+    async def chunks():
+        for i in range(5):
+            await asyncio.sleep(gap)
+            yield f"chunk{i}\n".encode()
+        await asyncio.sleep(stall)
+        yield b"done\n"
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def make_app(*middleware):
+    app = Starlette(
+        routes=[
+            Route("/echo", echo, methods=["POST"]),
+            Route("/slow", slow),
+            Route("/stream", stream),
+            Route("/health", lambda request: JSONResponse({"status": "healthy"})),
+        ]
+    )
+    for cls, kwargs in middleware:
+        app.add_middleware(cls, **kwargs)
+    return app
+
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def security_config(required=True, keys=("good-key",)):
+    return SimpleNamespace(security=SimpleNamespace(api_key_required=required, allowed_api_keys=list(keys)))
+
+
+async def test_authentication_rejects_and_sets_state():
+    app = make_app((AuthenticationMiddleware, {"config": security_config()}))
+    async with client(app) as c:
+        assert (await c.get("/health")).status_code == 200
+        missing = await c.post("/echo", content=b"x")
+        assert missing.status_code == 401 and missing.json() == {"error": "API key required"}
+        bad = await c.post("/echo", content=b"x", headers={"X-API-Key": "nope"})
+        assert bad.json() == {"error": "Invalid API key"}
+        ok = await c.post("/echo", content=b"x", headers={"Authorization": "Bearer good-key"})
+        assert ok.status_code == 200 and ok.json()["client_id"] == "good-key"
+
+
+async def test_body_limit_uses_content_length_and_counts_streamed_bodies():
+    app = make_app((RequestBodyLimitMiddleware, {"max_bytes": 100}))
+    async with client(app) as c:
+        assert (await c.post("/echo", content=b"x" * 100)).json()["size"] == 100
+        assert (await c.post("/echo", content=b"x" * 101)).status_code == 413
+
+        received = []
+
+        async def chunked():
+            for _ in range(10):
+                received.append(1)
+                yield b"x" * 40
+
+        # No Content-Length: the limit trips while reading, before the body is drained
+        response = await c.post("/echo", content=chunked())
+        assert response.status_code == 413
+        assert response.json() == {"error": "Request body too large"}
+        assert len(received) < 10
+
+
+async def test_security_headers_on_streaming_response():
+    app = make_app((SecurityHeadersMiddleware, {}))
+    async with client(app) as c:
+        response = await c.get("/stream", params={"gap": 0})
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.text.endswith("done\n")
+
+
+async def test_timeout_before_first_byte_returns_408():
+    app = make_app((TimeoutMiddleware, {"timeout_seconds": 0.1}))
+    async with client(app) as c:
+        response = await c.get("/slow", params={"delay": 2})
+    assert response.status_code == 408
+    assert response.json() == {"error": "Request timeout"}
+
+
+async def test_timeout_allows_long_streams_that_keep_making_progress():
+    # Total duration (~0.3s) is well past the timeout, but no gap is
+    app = make_app((TimeoutMiddleware, {"timeout_seconds": 0.2, "idle_timeout_seconds": 0.2}))
+    async with client(app) as c:
+        response = await c.get("/stream", params={"gap": 0.06})
+    assert response.status_code == 200
+    assert response.text.count("chunk") == 5 and response.text.endswith("done\n")
+
+
+async def test_idle_stream_is_cut_off():
+    app = make_app()
+    middleware = TimeoutMiddleware(app.router, timeout_seconds=5, idle_timeout_seconds=0.1)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "query_string": b"gap=0&stall=2",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+        "asgi": {"version": "3.0"},
+    }
+    sent = []
+
+    async def receive():
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(middleware(scope, receive, send), timeout=1)
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    assert sent[0]["status"] == 200
+    # Cancelled mid-stream: no final chunk and no end-of-body message, so the server drops the connection
+    assert b"chunk4" in body and b"done" not in body
+    assert sent[-1].get("more_body") is True
+
+
+async def test_logging_counts_errors_and_full_stack_passes_through():
+    logging_layer = None
+
+    def build(app):
+        nonlocal logging_layer
+        logging_layer = RequestLoggingMiddleware(app)
+        return logging_layer
+
+    app = make_app(
+        (AuthenticationMiddleware, {"config": security_config(required=False)}),
+        (RequestBodyLimitMiddleware, {"max_bytes": 1024}),
+        (SecurityHeadersMiddleware, {}),
+        (TimeoutMiddleware, {"timeout_seconds": 1}),
+    )
+    app.add_middleware(lambda inner: build(inner))
+    async with client(app) as c:
+        assert (await c.post("/echo", content=b"abc")).json()["size"] == 3
+        assert (await c.post("/echo", content=b"x" * 2048)).status_code == 413
+        streamed = await c.get("/stream", params={"gap": 0})
+    assert streamed.headers["Referrer-Policy"] == "strict-origin-when-cross-origin"
+    assert logging_layer.request_count == 3
+    assert logging_layer.error_count == 1
+
+
+def test_api_app_uses_asgi_stack():
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.testclient import TestClient
+
+    from api.main import app
+
+    assert not any(issubclass(m.cls, BaseHTTPMiddleware) for m in app.user_middleware if isinstance(m.cls, type))
+    with TestClient(app) as c:
+        response = c.get("/health")
+    assert response.status_code == 200
+    assert response.headers["X-Frame-Options"] == "DENY"
@@ -0,0 +1,127 @@
+"""Tests for the Merkle-tree integrity of misc/Accounting/tab/audit_trail."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# The Tab components import each other as top-level packages
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "misc", "Accounting", "tab"))
+
+from audit_trail import AuditTrail, verify_consistency_proof, verify_inclusion_proof
+from audit_trail.merkle import EMPTY_ROOT, MerkleTree, leaf_hash, node_hash
+
+
+def reference_root(leaves: list[bytes]) -> bytes:
+    """RFC 6962 MTH, computed recursively from scratch."""
+    if not leaves:
+        return EMPTY_ROOT
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+def trail_lines(trail: AuditTrail) -> list[bytes]:
+    return [line.strip() for line in trail.main_audit_file.read_bytes().splitlines() if line.strip()]
+
+
+def log(trail: AuditTrail, n: int, start: int = 0):
+    for i in range(start, start + n):
+        trail.log_event("user", "work_tracking", "work_entry_logged", {"hours": i}, ["work_logged"])
+
+
+def test_tree_roots_match_the_rfc_definition(tmp_path):
+    tree = MerkleTree(tmp_path)
+    leaves = []
+    for i in range(40):
+        batch = [f"leaf {i}.{j}".encode() for j in range(i % 3 + 1)]
+        if len(batch) == 1:
+            tree.append(batch[0])
+        else:
+            tree.append_many(batch)
+        leaves += batch
+        assert tree.root() == reference_root(leaves)
+    assert all(tree.root(size) == reference_root(leaves[:size]) for size in range(len(leaves) + 1))
+    tree.close()
+
+    # Reopening at a committed size drops hashes written after it and repairs short upper levels
+    with open(tmp_path / "level_00.bin", "ab") as f:
+        f.write(os.urandom(45))
+    with open(tmp_path / "level_02.bin", "r+b") as f:
+        f.truncate(32 * 5)
+    reopened = MerkleTree(tmp_path, size=len(leaves))
+    assert reopened.size == len(leaves) and reopened.root() == reference_root(leaves)
+
+
+def test_log_event_keeps_root_and_frontier_in_the_integrity_file(tmp_path):
+    trail = AuditTrail(str(tmp_path))
+    log(trail, 13)
+    integrity = json.loads(trail.integrity_file.read_text())
+    assert integrity["tree_size"] == integrity["total_entries"] == 13
+    assert integrity["merkle_root"] == reference_root(trail_lines(trail)).hex()
+    assert sorted(integrity["frontier"]) == ["0", "2", "3"]  # 13 = 0b1101
+
+    status = trail.verify_audit_integrity()
+    assert status["integrity_status"] == "VERIFIED" and status["merkle_root"] == integrity["merkle_root"]
+
+
+def test_reopen_and_catch_up_with_lines_the_tree_has_not_seen(tmp_path):
+    trail = AuditTrail(str(tmp_path))
+    log(trail, 5)
+    trail.close()
+    # A pre-Merkle writer (or a crash before the tree update) appended lines directly
+    with open(tmp_path / "audit_trail" / "data" / "audit_trail.jsonl", "a") as f:
+        f.write(json.dumps({"entry_id": "legacy", "details": {}, "checksum": ""}) + "\n\n")
+
+    reopened = AuditTrail(str(tmp_path))
+    assert reopened.tree_size == 6
+    other = AuditTrail(str(tmp_path))
+    log(other, 3, start=100)
+    log(reopened, 1, start=200)  # notices the other instance's appends instead of double-indexing them
+    assert reopened.tree_size == 10
+    assert reopened.merkle_root() == reference_root(trail_lines(reopened)).hex()
+    assert reopened.get_inclusion_proof(5)["entry"]["entry_id"] == "legacy"
+
+
+def test_inclusion_and_consistency_proofs(tmp_path):
+    trail = AuditTrail(str(tmp_path))
+    log(trail, 11)
+    old_root = trail.merkle_root()
+    log(trail, 26, start=11)
+
+    for index in (0, 7, 10, 11, 36):
+        proof = trail.get_inclusion_proof(index)
+        assert proof["entry"]["details"] == {"hours": index}
+        assert verify_inclusion_proof(proof)
+        assert verify_inclusion_proof(trail.get_inclusion_proof(index, tree_size=index + 1))
+    forged = trail.get_inclusion_proof(7)
+    forged["leaf"] = forged["leaf"].replace('"hours": 7', '"hours": 8')
+    assert not verify_inclusion_proof(forged)
+    assert not verify_inclusion_proof(trail.get_inclusion_proof(3), trusted_root=old_root)
+
+    for old_size in (1, 8, 11, 20, 37):
+        assert verify_consistency_proof(trail.get_consistency_proof(old_size))
+    proof = trail.get_consistency_proof(11)
+    assert proof["old_root"] == old_root and verify_consistency_proof(proof, trusted_old_root=old_root)
+    assert not verify_consistency_proof(proof, trusted_old_root=trail.merkle_root(10))
+    proof["proof"][0] = "00" * 32
+    assert not verify_consistency_proof(proof)
+    with pytest.raises(IndexError):
+        trail.get_inclusion_proof(37)
+
+
+def test_rewriting_an_old_entry_is_detected(tmp_path):
+    trail = AuditTrail(str(tmp_path))
+    log(trail, 9)
+    lines = trail.main_audit_file.read_text().splitlines()
+    entry = json.loads(lines[2])
+    entry["action"] = "rewritten"  # checksum only covers details, so the per-entry check misses this
+    lines[2] = json.dumps(entry)
+    trail.main_audit_file.write_text("\n".join(lines) + "\n")
+
+    status = trail.verify_audit_integrity()
+    assert status["corrupted_entries"] == 0
+    assert status["integrity_status"] == "COMPROMISED"
+    assert any("Merkle root mismatch" in v for v in status["integrity_violations"])
@@ -0,0 +1,128 @@
+"""Tests for core_modules.context_window and the token-budgeted ContextManager in assistant_v2_core."""
+
+import random
+
+import pytest
+
+from core_modules.context_window import MESSAGE_OVERHEAD_TOKENS, ContextWindow, estimate_tokens
+
+
+def msg(i: int, size: int) -> dict:
+    return {"role": "user" if i % 2 == 0 else "assistant", "content": "x" * size, "n": i}
+
+
+def reference_window(history, max_tokens, max_messages, pinned_tokens=0):
+    """Brute force: the longest suffix within both limits (never empty)."""
+    kept = []
+    total = pinned_tokens
+    for message in reversed(history):
+        tokens = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if kept and (total + tokens > max_tokens or (max_messages is not None and len(kept) >= max_messages)):
+            break
+        kept.append(message)
+        total += tokens
+    return kept[::-1]
+
+
+@pytest.mark.parametrize("max_messages", [None, 7])
+def test_window_matches_brute_force_suffix(max_messages):
+    rng = random.Random(5)
+    window = ContextWindow(300, max_messages=max_messages)
+    history = []
+    for i in range(2000):
+        history.append(msg(i, rng.choice([0, 10, 80, 400, 2000])))
+        evicted = window.append(history[-1])
+        expected = reference_window(history, 300, max_messages)
+        assert window.messages() == expected
+        assert window.total_tokens == sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in expected)
+        assert evicted == history[len(history) - len(expected) - len(evicted) : len(history) - len(expected)]
+        assert window.messages(3) == expected[-3:]
+        assert window.tokens(3) == sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in expected[-3:])
+
+
+def test_pinned_message_counts_against_the_budget_and_comes_first():
+    window = ContextWindow(100)
+    window.extend([msg(i, 40) for i in range(10)])  # 14 tokens each
+    assert len(window) == 7
+    window.pin({"role": "system", "content": "y" * 120})  # 34 tokens
+    assert len(window) == 4
+    assert window.messages()[0]["content"] == "y" * 120
+    assert window.messages(include_pinned=False) == [msg(i, 40) for i in range(6, 10)]
+    assert window.total_tokens <= 100
+
+
+def test_summarizer_folds_evicted_turns_into_the_summary_slot():
+    folded = []
+
+    def summarize(previous, evicted):
+        folded.extend(m["n"] for m in evicted)
+        return f"{previous or ''}|{','.join(str(m['n']) for m in evicted)}"[-60:]
+
+    window = ContextWindow(120, summarizer=summarize)
+    for i in range(200):
+        window.append(msg(i, 40))
+        assert window.total_tokens <= 120
+
+    kept = [m["n"] for m in window.messages(include_pinned=False)]
+    assert folded + kept == list(range(200))  # every turn is either summarized or still in the window
+    assert window.summary["summary"] is True and window.summary["content"].endswith(str(folded[-1]))
+    assert window.pinned is None
+
+
+def test_summary_never_replaces_the_pinned_system_message():
+    previous_summaries = []
+
+    def summarize(previous, evicted):
+        previous_summaries.append(previous)
+        return f"{len(evicted)} more"
+
+    window = ContextWindow(100, summarizer=summarize)
+    system = {"role": "system", "content": "You are terse."}
+    window.pin(system)
+    window.extend([msg(i, 40) for i in range(20)])
+    window.append(msg(20, 40))
+
+    head = window.messages()[:2]
+    assert head == [system, window.summary] and window.summary["content"] == "1 more"
+    # The system prompt is never handed to the summarizer as the previous summary
+    assert previous_summaries[0] is None and all(p.endswith(" more") for p in previous_summaries[1:])
+    assert window.total_tokens <= 100
+    assert window.tokens() == sum(window.count_tokens(m) for m in window.messages())
+
+
+def test_custom_tokenizer_is_used_once_per_message():
+    calls = []
+
+    def tokenizer(text):
+        calls.append(text)
+        return len(text.split())
+
+    window = ContextWindow(50, tokenizer=tokenizer)
+    for i in range(30):
+        window.append({"role": "user", "content": f"word {i} " * 3})
+        window.messages()
+        window.tokens(5)
+    assert len(calls) == 30
+
+
+def test_context_manager_keeps_count_semantics_and_adds_token_budget():
+    from assistant_v2_core import ContextManager
+
+    manager = ContextManager(max_history=3)
+    for i in range(10):
+        manager.add_message("s", "user", f"m{i}")
+    assert [m["content"] for m in manager.get_messages("s")] == [f"m{i}" for i in range(4, 10)]
+    assert [m["content"] for m in manager.get_messages("s", limit=1)] == ["m8", "m9"]
+    assert manager.get_token_count("s", limit=1) == 2 * (1 + MESSAGE_OVERHEAD_TOKENS)
+    assert manager.get_messages("other") == [] and manager.get_token_count("other") == 0
+
+    budgeted = ContextManager(max_history=100, max_tokens=60, summarizer=lambda prev, ev: f"{len(ev)} earlier turns")
+    budgeted.load_messages("s", [{"role": "user", "content": "z" * 40} for _ in range(20)])
+    messages = budgeted.get_messages("s")
+    assert messages[0]["role"] == "system" and messages[0]["content"].endswith("earlier turns")
+    assert budgeted.get_token_count("s") <= 60
+
+    budgeted.pin_message("s", "You are terse.")
+    assert budgeted.get_messages("s")[0]["content"] == "You are terse."
+    budgeted.clear_session("s")
+    assert budgeted.get_messages("s") == []
@@ -0,0 +1,226 @@
+"""Tests for core_modules.event_log: group commit, durability, rotation and reading across segments."""
+
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+from core_modules.event_log import Durability, EventLogReader, EventLogWriter, get_event_log
+
+
+def lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def slow_writes(writer: EventLogWriter, monkeypatch, delay: float = 0.002) -> list[int]:
+    """Make each physical write slow and count them, so concurrent appends pile up behind a leader."""
+    calls = []
+    original = writer._write
+
+    def write(data: bytes) -> None:
+        calls.append(data.count(b"\n"))
+        time.sleep(delay)
+        original(data)
+
+    monkeypatch.setattr(writer, "_write", write)
+    return calls
+
+
+def test_background_flush_preserves_order(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = EventLogWriter(path, flush_interval=0.01)
+    for i in range(1000):
+        writer.append({"i": i})
+    deadline = time.monotonic() + 5
+    while writer.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.pending == 0
+    writer.flush()
+    assert [row["i"] for row in lines(path)] == list(range(1000))
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.append({"late": True})
+
+
+def test_waiting_appends_share_group_commits(tmp_path, monkeypatch):
+    writer = EventLogWriter(tmp_path / "events.jsonl", durability=Durability.EVERY_EVENT)
+    calls = slow_writes(writer, monkeypatch)
+    fsyncs = []
+    monkeypatch.setattr(writer, "_fsync", lambda: fsyncs.append(1))
+
+    def worker(k: int) -> None:
+        for i in range(100):
+            writer.append({"k": k, "i": i})
+            assert writer._synced >= writer._written or writer._writing  # returned only once synced
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    rows = lines(writer.path)
+    assert len(rows) == sum(calls) == 800
+    for k in range(8):
+        assert [row["i"] for row in rows if row["k"] == k] == list(range(100))
+    assert len(calls) < 400 and len(fsyncs) == len(calls)  # groups, one fsync each
+    writer.close()
+
+
+def test_bounded_buffer_applies_backpressure(tmp_path, monkeypatch):
+    writer = EventLogWriter(tmp_path / "events.jsonl", max_pending=5, flush_interval=0.001)
+    slow_writes(writer, monkeypatch, delay=0.001)
+    peak = 0
+    for i in range(200):
+        writer.append({"i": i})
+        peak = max(peak, writer.pending)
+    writer.flush()
+    assert peak <= 5
+    assert [row["i"] for row in lines(writer.path)] == list(range(200))
+    writer.close()
+
+
+def test_interval_durability_fsyncs_in_the_background(tmp_path, monkeypatch):
+    writer = EventLogWriter(tmp_path / "events.jsonl", fsync_interval=0.05, flush_interval=0.01)
+    writer.append({"i": 0})
+    deadline = time.monotonic() + 5
+    while writer._synced < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer._synced == 1
+    os_buffered = EventLogWriter(tmp_path / "os.jsonl", durability="os_buffered")
+    fsyncs = []
+    monkeypatch.setattr(os_buffered, "_fsync", lambda: fsyncs.append(1))
+    for i in range(50):
+        os_buffered.append({"i": i}, wait=True)
+    os_buffered.close()
+    assert fsyncs == []
+    writer.close()
+
+
+def test_size_rotation_with_gzip_and_reader(tmp_path):
+    path = tmp_path / "audit.ndjson"
+    writer = EventLogWriter(path, max_bytes=400, compress=True)
+    for i in range(100):
+        writer.append({"i": i, "pad": "x" * 20}, wait=True)
+    writer.close()
+
+    deadline = time.monotonic() + 5
+    while list(tmp_path.glob("audit.*.ndjson")) and time.monotonic() < deadline:
+        time.sleep(0.01)  # background compression
+    compressed = sorted(tmp_path.glob("audit.*.ndjson.gz"))
+    assert len(compressed) > 5
+    assert all(len(gzip.decompress(p.read_bytes())) <= 400 + 40 for p in compressed)
+
+    reader = EventLogReader(path)
+    assert reader.segments()[-1] == path
+    assert [row["i"] for row in reader] == list(range(100))
+    assert [row["i"] for row in reader.tail(25)] == list(range(75, 100))
+
+
+def test_age_rotation_runs_in_the_background(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = EventLogWriter(path, max_age=0.05, flush_interval=0.01)
+    writer.append({"i": 0}, wait=True)
+    deadline = time.monotonic() + 5
+    while not list(tmp_path.glob("events.*.jsonl")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.append({"i": 1}, wait=True)
+    assert len(list(tmp_path.glob("events.*.jsonl"))) == 1
+    assert [row["i"] for row in EventLogReader(path)] == [0, 1]
+    writer.close()
+
+
+def test_writer_reopens_a_path_replaced_from_outside(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = EventLogWriter(path)
+    writer.append({"i": 0}, wait=True)
+    path.rename(tmp_path / "sealed.jsonl")
+    writer.append({"i": 1}, wait=True)
+    path.unlink()
+    writer.append({"i": 2}, wait=True)
+    assert lines(tmp_path / "sealed.jsonl") == [{"i": 0}]
+    assert lines(path) == [{"i": 2}]
+    writer.close()
+
+
+def test_write_errors_reach_waiting_callers(tmp_path):
+    (tmp_path / "not_a_dir").write_text("")
+    writer = EventLogWriter(tmp_path / "not_a_dir" / "events.jsonl")
+    with pytest.raises(OSError):
+        writer.append({"i": 0}, wait=True)
+    writer.append({"i": 1})  # fire-and-forget: logged and kept, raised on flush
+    with pytest.raises(OSError):
+        writer.flush()
+    assert isinstance(writer.last_error, OSError)
+
+
+def test_follow_tails_across_rotations(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = EventLogWriter(path, max_bytes=200)
+    writer.append({"i": -1}, wait=True)  # before the tail starts: skipped
+    seen, stop = [], threading.Event()
+
+    def follow():
+        for row in EventLogReader(path).follow(poll_interval=0.005, stop=stop):
+            seen.append(row["i"])
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    time.sleep(0.05)
+    for i in range(60):
+        writer.append({"i": i}, wait=True)
+        time.sleep(0.001)
+    deadline = time.monotonic() + 5
+    while len(seen) < 60 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join()
+    writer.close()
+    assert len(list(tmp_path.glob("events.*.jsonl"))) >= 2
+    assert seen == list(range(60))
+
+
+def test_follow_closes_its_file_when_the_consumer_stops_early(tmp_path, monkeypatch):
+    import core_modules.event_log as event_log
+
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(event_log, "open", tracking_open, raising=False)
+    path = tmp_path / "events.jsonl"
+    writer = EventLogWriter(path)
+    writer.append({"i": 0}, wait=True)
+    writer.append({"i": 1}, wait=True)
+    writer.close()
+
+    follower = EventLogReader(path).follow(from_start=True, poll_interval=0.005)
+    assert next(follower) == {"i": 0}
+    assert opened and not opened[-1].closed
+    follower.close()
+    assert all(f.closed for f in opened)
+
+
+def test_get_event_log_shares_one_writer_per_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("ECHOES_EVENT_LOG_DURABILITY", "every_event")
+    first = get_event_log(tmp_path / "shared.jsonl")
+    assert get_event_log(str(tmp_path / "." / "shared.jsonl"), durability="os_buffered") is first
+    assert first.durability is Durability.EVERY_EVENT
+    first.close()
+    assert get_event_log(tmp_path / "shared.jsonl") is not first
+
+
+def test_pipeline_events_are_written_before_emit_event_returns(tmp_path, monkeypatch):
+    from core_modules import partition_conflict_pipeline as pipeline
+
+    path = tmp_path / "audit.ndjson"
+    monkeypatch.setenv("ECHOES_AUDIT_PATH", str(path))
+    monkeypatch.setenv("ECHOES_EVENT_LOG_DURABILITY", "interval")
+    get_event_log(path, flush_interval=60)  # the background flusher alone would not write in time
+    pipeline.emit_event("conflict_resolved", {"n": 1})
+    assert [row["event"] for row in lines(path)] == ["conflict_resolved"]
+    get_event_log(path).close()
@@ -0,0 +1,86 @@
+"""Tests for api.auth.jwt_handler verified-token cache and revocation."""
+
+import time
+from datetime import timedelta
+
+import pytest
+from jwt.exceptions import InvalidTokenError
+
+from api.metrics import JWT_VERIFY_CACHE
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret-key-with-enough-entropy-123")
+    from api.auth.jwt_handler import JWTHandler
+
+    return JWTHandler()
+
+
+def _count(result):
+    return JWT_VERIFY_CACHE.labels(result=result)._value.get()
+
+
+def test_repeated_verification_hits_cache(handler):
+    token = handler.create_access_token({"sub": "user-1", "role": "analyst"})
+    hits, misses = _count("hit"), _count("miss")
+
+    first = handler.verify_token(token)
+    first["role"] = "admin"  # callers get copies; cached claims are untouched
+    for _ in range(5):
+        assert handler.verify_token(token)["role"] == "analyst"
+
+    assert _count("miss") - misses == 1
+    assert _count("hit") - hits == 5
+
+
+def test_cached_claims_expire_with_token(handler):
+    token = handler.create_access_token({"sub": "u"})
+    handler.verify_token(token)
+    digest, (claims, _exp) = next(iter(handler._verified.items()))
+    handler._verified[digest] = (claims, time.time() - 1)  # pretend exp has passed
+
+    misses = _count("miss")
+    handler.verify_token(token)  # stale entry dropped, token fully re-verified
+    assert _count("miss") - misses == 1
+
+    expired = handler.create_access_token({"sub": "u"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(InvalidTokenError):
+        handler.verify_token(expired)
+
+
+def test_revoke_token_evicts_immediately(handler):
+    token = handler.create_access_token({"sub": "u"})
+    handler.verify_token(token)
+    handler.revoke_token(token)
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        handler.verify_token(token)
+
+
+def test_denylist_hook_applies_to_cached_tokens(handler):
+    denied: set[str] = set()
+    handler.denylist_hook = lambda claims: claims.get("sub") in denied
+    token = handler.create_access_token({"sub": "mallory"})
+    handler.verify_token(token)
+
+    denied.add("mallory")
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        handler.verify_token(token)
+    assert not handler._verified
+
+
+def test_invalid_tokens_are_not_cached(handler):
+    token = handler.create_access_token({"sub": "u"})
+    with pytest.raises(InvalidTokenError):
+        handler.verify_token(token[:-2] + "xx")
+    assert not handler._verified
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret-key-with-enough-entropy-123")
+    from api.auth.jwt_handler import JWTHandler
+
+    handler = JWTHandler(verify_cache_size=2)
+    for i in range(4):
+        handler.verify_token(handler.create_access_token({"sub": str(i)}))
+    assert len(handler._verified) == 2
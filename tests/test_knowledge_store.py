@@ -0,0 +1,142 @@
+"""Tests for the SQLite knowledge store: equivalence with the JSON-era search, ranking, batching and JSON round trips."""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.knowledge import KnowledgeEntry, KnowledgeManager
+
+WORDS = 'Revenue ROI analysis deploy rollback Quarterly bank Kelvin café naïve data-lake "quoted" it\'s 25% q3'.split()
+CATEGORIES = ["general", "roi_analysis", "ops", "research"]
+TAGS = ["roi", "financial", "ops", "urgent", "draft"]
+
+
+# --- Reference implementation (in-memory scan, as before) ---------------------
+
+
+def legacy_search(entries, query=None, category=None, tags=None, limit=10):
+    results = list(entries)
+    if category:
+        results = [e for e in results if e.category == category]
+    if tags:
+        results = [e for e in results if any(t in e.tags for t in tags)]
+    if query:
+        query_lower = query.lower()
+        results = [e for e in results if query_lower in e.content.lower() or query_lower in e.source.lower()]
+    results.sort(key=lambda e: e.timestamp, reverse=True)
+    return results[:limit]
+
+
+def random_entries(rng: random.Random, count: int) -> list[KnowledgeEntry]:
+    entries = []
+    for i in range(count):
+        entries.append(
+            KnowledgeEntry(
+                id=f"e{i:05d}",
+                content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))),
+                source=rng.choice(["ROI Analysis Tool", "manual", "Web crawl", "notes"]),
+                category=rng.choice(CATEGORIES),
+                timestamp=f"2025-10-{rng.randint(1, 3):02d}T00:00:00+00:00",  # plenty of ties
+                metadata={"n": i},
+                tags=rng.sample(TAGS, rng.randint(0, 2)),
+            )
+        )
+    return entries
+
+
+def test_search_matches_legacy_scan(tmp_path: Path):
+    rng = random.Random(7)
+    entries = random_entries(rng, 600)
+    manager = KnowledgeManager(storage_path=str(tmp_path))
+    manager.store.upsert_many(e.to_dict() for e in entries)
+
+    queries = [None, "", "a", "ro", "ROI", "roi analysis", "nue Qua", "CAFÉ", "naïve", '"quoted"', "it's", "25%", "zzz"]
+    for _ in range(300):
+        query = rng.choice(queries + [rng.choice(WORDS)[1:5]])
+        category = rng.choice([None, *CATEGORIES])
+        tags = rng.choice([None, [], rng.sample(TAGS, rng.randint(1, 3))])
+        limit = rng.choice([1, 10, 1000])
+        expected = legacy_search(entries, query, category, tags, limit)
+        assert manager.search_knowledge(query, category, tags, limit) == expected
+
+
+def test_ranked_search_prefers_denser_matches(tmp_path: Path):
+    manager = KnowledgeManager(storage_path=str(tmp_path))
+    ids = manager.add_knowledge_many(
+        [
+            {"content": "rollback plan for the deploy, rollback tested twice", "source": "ops", "tags": ["ops"]},
+            {"content": "quarterly revenue review", "source": "finance"},
+            {"content": "deploy checklist", "source": "ops", "category": "ops"},
+        ]
+    )
+    ranked = manager.search_ranked("rollback deploy")
+    assert [entry.id for entry, _ in ranked] == [ids[0], ids[2]]
+    assert ranked[0][1] > ranked[1][1]
+    assert [entry.id for entry, _ in manager.search_ranked("deploy", category="ops")] == [ids[2]]
+    assert manager.search_ranked("of") == []
+
+
+def test_batch_add_update_and_stats(tmp_path: Path):
+    manager = KnowledgeManager(storage_path=str(tmp_path))
+    ids = manager.add_knowledge_many(
+        [{"content": f"note {i}", "source": "batch", "category": "ops" if i % 2 else "general"} for i in range(50)]
+    )
+    assert len(set(ids)) == 50
+    single = manager.add_knowledge("Tagged entry", "manual", tags=["urgent", "urgent"], metadata={"k": 1})
+    entry = manager.get_knowledge(single)
+    assert entry.tags == ["urgent", "urgent"] and entry.metadata == {"k": 1}
+    assert [e.id for e in manager.search_knowledge(tags=["urgent"])] == [single]
+
+    # Re-upserting an ID keeps one row and re-indexes its text and tags
+    manager.store.upsert_many([{**entry.to_dict(), "content": "Retitled", "tags": ["draft"]}])
+    assert manager.search_knowledge("tagged") == []
+    assert [e.id for e in manager.search_knowledge("retitled", tags=["draft"])] == [single]
+    assert manager.search_knowledge(tags=["urgent"]) == []
+
+    stats = manager.get_stats()
+    assert stats["total_entries"] == 51
+    assert stats["categories"] == {"general": 26, "ops": 25}
+
+
+def test_json_import_on_first_open_and_export_round_trip(tmp_path: Path):
+    entries = random_entries(random.Random(3), 40)
+    (tmp_path / "knowledge_base.json").write_text(
+        json.dumps({e.id: e.to_dict() for e in entries}, indent=2), encoding="utf-8"
+    )
+    manager = KnowledgeManager(storage_path=str(tmp_path))
+    assert manager.get_stats()["total_entries"] == 40
+    assert manager.search_knowledge("roi", limit=100) == legacy_search(entries, "roi", limit=100)
+
+    manager.add_knowledge("added after import", "manual")
+    exported = json.loads(manager.export_json(tmp_path / "export.json").read_text(encoding="utf-8"))
+    assert list(exported)[:40] == [e.id for e in entries]
+    assert exported[entries[0].id] == entries[0].to_dict()
+    manager.close()
+
+    # The database is now authoritative; the JSON is not re-imported
+    reopened = KnowledgeManager(storage_path=str(tmp_path))
+    assert reopened.get_stats()["total_entries"] == 41
+
+    other = KnowledgeManager(storage_path=str(tmp_path / "copy"))
+    assert other.import_json(tmp_path / "export.json") == 41
+    assert [e.to_dict() for e in other.search_knowledge(limit=100)] == [
+        e.to_dict() for e in reopened.search_knowledge(limit=100)
+    ]
+
+
+@pytest.mark.parametrize("query", ["ROI Analysis", "Demo"])
+def test_roi_helpers_use_the_store(tmp_path: Path, query):
+    manager = KnowledgeManager(storage_path=str(tmp_path))
+    analysis_id = manager.store_roi_analysis(
+        {
+            "business_type": "financial",
+            "stakeholder_config": {"institution_name": "Demo Bank"},
+            "roi_metrics": {"monthly_investment": 100.0, "monthly_savings": 400.0},
+        }
+    )
+    results = manager.search_roi_analyses(institution="demo bank", business_type="financial")
+    assert [r.metadata["analysis_id"] for r in results] == [analysis_id]
+    assert manager.search_knowledge(query, category="roi_analysis")
+    assert manager.get_roi_summary()["average_roi"] == 400.0
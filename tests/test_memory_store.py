@@ -0,0 +1,134 @@
+"""Tests for core_modules.memory_store: journaled saves, compaction, tail loads, crash recovery and the catalog."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from core_modules.memory_store import MemoryStore
+
+
+def message(i: int) -> dict:
+    return {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}\nwith a newline", "n": i}
+
+
+def test_incremental_saves_only_append(tmp_path: Path):
+    store = MemoryStore(str(tmp_path), compact_every=1000)
+    history = []
+    for i in range(50):
+        history.append(message(i))
+        store.save_conversation("s1", history)
+        if i == 0:
+            snapshot = (tmp_path / "s1.json").read_bytes()
+
+    assert (tmp_path / "s1.json").read_bytes() == snapshot  # never rewritten
+    journal = (tmp_path / "s1.journal.ndjson").read_text(encoding="utf-8").splitlines()
+    assert len(journal) == 1 + 49  # header + appended messages
+    assert store.load_conversation("s1") == history
+    assert MemoryStore(str(tmp_path)).load_conversation("s1") == history
+
+
+def test_compaction_folds_the_journal_into_a_valid_snapshot(tmp_path: Path):
+    store = MemoryStore(str(tmp_path), compact_every=10)
+    history = [message(i) for i in range(25)]
+    for i in range(1, 26):
+        store.save_conversation("s1", history[:i])
+
+    data = json.loads((tmp_path / "s1.json").read_text(encoding="utf-8"))  # still plain JSON for old readers
+    assert data["session_id"] == "s1" and len(data["messages"]) == 21
+    assert store.load_conversation("s1") == history
+    assert store.conversation_info("s1")["messages"] == 25
+
+
+def test_trimmed_history_rewrites_the_snapshot(tmp_path: Path):
+    store = MemoryStore(str(tmp_path))
+    history = [message(i) for i in range(30)]
+    store.save_conversation("s1", history)
+    store.save_conversation("s1", history[10:])  # sliding window dropped the oldest turns
+    assert store.load_conversation("s1") == history[10:]
+    store.save_conversation("s1", [*history[10:], message(30)])
+    assert store.load_conversation("s1") == [*history[10:], message(30)]
+
+
+def test_a_matching_last_message_alone_does_not_extend(tmp_path: Path):
+    store = MemoryStore(str(tmp_path))
+    ok = {"role": "assistant", "content": "ok"}
+    store.save_conversation("s1", [message(0), message(1), ok])
+    # Same length prefix ending in an identical message, but the window moved
+    edited = [message(1), message(2), ok, message(3)]
+    store.save_conversation("s1", edited)
+    assert store.load_conversation("s1") == edited
+
+    # A catalog count that disagrees with the snapshot and journal counts forces a rewrite
+    store._catalog["s1"]["messages"] += 1
+    store.save_conversation("s1", [*edited, message(4)])
+    assert MemoryStore(str(tmp_path)).load_conversation("s1") == [*edited, message(4)]
+
+
+@pytest.mark.parametrize("last_n", [0, 1, 3, 7, 12, 40])
+def test_tail_load_reads_only_the_end(tmp_path: Path, last_n):
+    store = MemoryStore(str(tmp_path), compact_every=8)
+    history = [message(i) for i in range(30)]
+    for i in range(1, 31):
+        store.save_conversation("s1", history[:i])
+    assert store.load_conversation("s1", last_n=last_n) == (history[-last_n:] if last_n else [])
+
+    # Corrupt the first message line: a full parse would fail, a tail read never gets there
+    path = tmp_path / "s1.json"
+    lines = path.read_text(encoding="utf-8").splitlines()
+    path.write_text("\n".join([lines[0], "garbage", *lines[2:]]) + "\n", encoding="utf-8")
+    if last_n <= 25:
+        assert store.load_conversation("s1", last_n=last_n) == (history[-last_n:] if last_n else [])
+
+
+def test_torn_append_and_interrupted_compaction_are_recovered(tmp_path: Path):
+    store = MemoryStore(str(tmp_path), compact_every=100)
+    history = [message(i) for i in range(5)]
+    store.save_conversation("s1", history)
+    store.save_conversation("s1", [*history, message(5)])
+    with open(tmp_path / "s1.journal.ndjson", "ab") as f:
+        f.write(b'{"role": "user", "content": "half wri')  # crash mid-append
+
+    reopened = MemoryStore(str(tmp_path), compact_every=100)
+    assert reopened.load_conversation("s1") == [*history, message(5)]
+    reopened.save_conversation("s1", [*history, message(5), message(6)])
+    assert MemoryStore(str(tmp_path)).load_conversation("s1") == [*history, message(5), message(6)]
+
+    # Compaction renamed the new snapshot in but crashed before resetting the journal
+    journal = (tmp_path / "s1.journal.ndjson").read_bytes()
+    reopened.compact("s1")
+    (tmp_path / "s1.journal.ndjson").write_bytes(journal)
+    assert MemoryStore(str(tmp_path)).load_conversation("s1") == [*history, message(5), message(6)]
+
+
+def test_legacy_files_and_catalog_listing(tmp_path: Path, monkeypatch):
+    legacy = [message(i) for i in range(4)]
+    (tmp_path / "old.json").write_text(
+        json.dumps({"session_id": "old", "messages": legacy, "saved_at": "2025-10-01T00:00:00+00:00"}, indent=2),
+        encoding="utf-8",
+    )
+    store = MemoryStore(str(tmp_path))
+    store.save_conversation("new", [message(0)])
+    assert store.load_conversation("old", last_n=2) == legacy[-2:]
+    store.save_conversation("old", [*legacy, message(4)])
+    assert store.load_conversation("old") == [*legacy, message(4)]
+    assert store.load_conversation("missing") is None
+
+    infos = store.list_conversation_info()
+    assert [info["session_id"] for info in infos] == ["old", "new"]
+    assert infos[0]["messages"] == 5
+    assert (
+        infos[0]["bytes"] == (tmp_path / "old.json").stat().st_size + (tmp_path / "old.journal.ndjson").stat().st_size
+    )
+
+    monkeypatch.setattr(Path, "glob", lambda *a, **k: pytest.fail("listing must not scan the directory"))
+    assert sorted(store.list_conversations()) == ["new", "old"]
+    monkeypatch.undo()
+
+    (tmp_path / "new.json").unlink()
+    (tmp_path / "new.journal.ndjson").unlink()
+    assert MemoryStore(str(tmp_path)).list_conversations() == ["old"]
+
+    # Pre-journal sessions stored the bare message list
+    (tmp_path / "bare.json").write_text(json.dumps(legacy), encoding="utf-8")
+    assert MemoryStore(str(tmp_path)).load_conversation("bare") == legacy
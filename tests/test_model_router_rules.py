@@ -0,0 +1,174 @@
+"""
+Equivalence tests for ModelRouter's precompiled routing rules.
+
+The legacy per-call implementation (keyword scans plus inline regexes) is
+kept here as a reference so the compiled matcher can be checked against it.
+"""
+
+import random
+import re
+
+import pytest
+
+from app.model_router import ModelRouter
+
+
+def _legacy_needs_web_search(router, prompt, tools=None):
+    prompt_lower = prompt.lower()
+    for indicator in router.web_search_indicators:
+        if indicator in prompt_lower:
+            return True
+    if tools:
+        if [t for t in tools if t.get("name") in ["web_search", "get_web_page_content", "browser"]]:
+            return True
+    for pattern in [
+        r"\b(2024|2025)\b",
+        r"\bthis (week|month|year)\b",
+        r"\brecently\b",
+        r"\blately\b",
+        r"\bwhat\'s (happening|going on|new)\b",
+    ]:
+        if re.search(pattern, prompt_lower):
+            return True
+    return False
+
+
+def _legacy_is_complex_task(router, prompt):
+    prompt_lower = prompt.lower()
+    for indicator in router.complexity_indicators:
+        if indicator in prompt_lower:
+            return True
+    if len(prompt.split()) > 30:
+        return True
+    if prompt.count("?") > 1:
+        return True
+    for pattern in [
+        r"\bcompare\b",
+        r"\bdifference\b",
+        r"\bversus\b",
+        r"\bvs\b",
+        r"\bor\b.*\bor\b",
+        r"\bbetween\b.*\band\b",
+    ]:
+        if re.search(pattern, prompt_lower):
+            return True
+    return False
+
+
+def _legacy_select_specialized_model(router, prompt):
+    prompt_lower = prompt.lower()
+    word_count = len(prompt.split())
+    code_block = "```" in prompt or re.search(r"\b(def|class|import|public|private|interface|lambda)\b", prompt_lower)
+    math_score = sum(1 for kw in router.math_indicators if kw in prompt_lower)
+    science_score = sum(1 for kw in router.science_indicators if kw in prompt_lower)
+    coding_score = sum(1 for kw in router.coding_indicators if kw in prompt_lower)
+    equation_pattern = re.search(r"(=|∑|∫|√|π|≈|≥|≤|\^|\bprove\b|\bderive\b)", prompt_lower)
+    scientific_pattern = re.search(r"\bmodel(?:ing)?\b|\bsimulate\b|\bhypothesis\b|\bexperiment\b", prompt_lower)
+    heavy_trigger = word_count > 80 or any(
+        kw in prompt_lower
+        for kw in ["multi-step", "step-by-step", "detailed", "comprehensive", "optimize", "refactor", "architect"]
+    )
+    if coding_score >= 2 or code_block:
+        return "o3" if heavy_trigger or coding_score >= 4 else "o3-mini"
+    if math_score >= 2 or equation_pattern:
+        return "o3" if heavy_trigger or math_score >= 4 else "o3-mini"
+    if science_score >= 2 or scientific_pattern:
+        return "o3" if heavy_trigger or science_score >= 4 else "o3-mini"
+    return None
+
+
+def _legacy_select_model(router, prompt, tools=None):
+    if _legacy_needs_web_search(router, prompt, tools) and tools:
+        return "gpt-4o"
+    elif _legacy_needs_web_search(router, prompt, tools):
+        return "gpt-4o-search-preview"
+    specialized = _legacy_select_specialized_model(router, prompt)
+    if specialized:
+        return specialized
+    if _legacy_is_complex_task(router, prompt):
+        return "gpt-4o"
+    return router.default_model
+
+
+def _random_prompts(router, count, seed=1234):
+    rng = random.Random(seed)
+    vocabulary = (
+        router.web_search_indicators
+        + router.complexity_indicators
+        + router.math_indicators
+        + router.science_indicators
+        + router.coding_indicators
+        + ["or", "between", "and", "this week", "what's new", "modeling", "prove", "def", "```"]
+        + ["=", "^", "π", "?", "\n", "_", "know", "show", "deliver", "pick", "sort", "organic", "2024x"]
+        + ["the", "a", "report", "user", "data", "quarterly", "Hello", "WHY", "Now", "Python"]
+    )
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 40))]
+        joiners = [rng.choice([" ", " ", " ", "", ", ", "\n", "-"]) for _ in words]
+        text = "".join(w + j for w, j in zip(words, joiners, strict=True))
+        yield text.upper() if rng.random() < 0.1 else text
+
+
+@pytest.fixture
+def router():
+    return ModelRouter()
+
+
+HAND_CASES = [
+    "What is 2+2?",
+    "What are the latest developments in AI as of today?",
+    "I know how to deliver it",
+    "Is it A or B or C?",
+    "Is it A or\nB?",
+    "Pick between cats\nand dogs",
+    "choose between tea and coffee",
+    "def f(x): return x",
+    "model_x is a variable",
+    "modeling the reaction of the molecule",
+    "Compute 3^2",
+    "prove that pi is irrational",
+    "organic chemistry experiment",
+    "```python\nprint(1)\n```",
+    "c++ and c# performance",
+    "",
+]
+
+
+@pytest.mark.parametrize("prompt", HAND_CASES)
+def test_hand_cases_match_legacy(router, prompt):
+    assert router.select_model(prompt) == _legacy_select_model(router, prompt)
+
+
+def test_random_prompts_match_legacy(router):
+    tools = [{"name": "calculator"}]
+    for prompt in _random_prompts(router, 3000):
+        assert router.select_model(prompt) == _legacy_select_model(router, prompt), prompt
+        assert router.select_model(prompt, tools) == _legacy_select_model(router, prompt, tools), prompt
+
+
+def test_search_tool_forces_search(router):
+    tools = [{"name": "web_search"}]
+    assert router.select_model("hello", tools) == "gpt-4o"
+    assert router._needs_web_search("hello", tools)
+
+
+def test_features_are_memoized(router):
+    first = router.extract_features("Explain the latest results")
+    assert router.extract_features("Explain the latest results") is first
+
+    router.feature_cache_size = 2
+    for prompt in ["a", "b", "c"]:
+        router.extract_features(prompt)
+    assert len(router._feature_cache) == 2
+
+
+def test_compile_rules_picks_up_new_indicators(router):
+    assert router.select_model("tell me about the roadmap") == "gpt-4o-mini"
+    router.complexity_indicators.append("roadmap")
+    router.compile_rules()
+    assert router.select_model("tell me about the roadmap") == "gpt-4o"
+
+
+def test_select_models_batch(router):
+    prompts = ["What is 2+2?", "latest news", "solve the equation x = 1"]
+    assert router.select_models_batch(prompts) == [router.select_model(p) for p in prompts]
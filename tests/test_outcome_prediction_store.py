@@ -1,5 +1,10 @@
 """Tests for outcome log aggregation and empirical probabilities."""
 
+import json
+import multiprocessing
+import random
+import sys
+from collections import defaultdict
 from pathlib import Path
 
 import pytest
@@ -53,11 +58,112 @@ def test_prediction_rows_have_recorded_at(tmp_path: Path) -> None:
     assert "feedback" in text
 
 
+def _rows_on_disk(store: OutcomePredictionStore) -> list[str]:
+    rows = []
+    for segment in store.segment_paths():
+        rows.extend(ln for ln in segment.read_text(encoding="utf-8").splitlines() if ln.strip())
+    return rows
+
+
+def _scan_counts(rows: list[str]) -> tuple[dict[str, dict[str, int]], dict[str, int]]:
+    """Reference tallies: a full parse of every retained row, as the store used to do per query."""
+    per_action: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    global_counts: dict[str, int] = defaultdict(int)
+    for row in map(json.loads, rows):
+        if row.get("event") == "feedback":
+            per_action[row["action_key"]][row["outcome"]] += 1
+            global_counts[row["outcome"]] += 1
+    return {k: dict(v) for k, v in per_action.items()}, dict(global_counts)
+
+
 def test_jsonl_trim_keeps_last_lines(tmp_path: Path) -> None:
     path = tmp_path / "trim.jsonl"
     store = OutcomePredictionStore(log_path=path, max_jsonl_lines=5)
     for i in range(8):
         store.append_feedback(normalize_action_key(f"action-{i}"), "success")
-    lines = [ln for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    lines = _rows_on_disk(store)
     assert len(lines) == 5
     assert "action-7" in lines[-1]
+
+
+def test_counters_match_full_scan_of_retained_rows(tmp_path: Path) -> None:
+    path = tmp_path / "seg.jsonl"
+    rng = random.Random(11)
+    store = OutcomePredictionStore(log_path=path, max_jsonl_lines=40, segment_rows=7)
+    for step in range(400):
+        key = f"action-{rng.randrange(6)}"
+        if rng.random() < 0.3:
+            store.append_prediction_record(action_key=key, probabilities=dict(DEFAULT_PRIOR))
+        else:
+            store.append_feedback(key, rng.choice(list(DEFAULT_PRIOR)))
+        if step % 53 == 0:
+            store = OutcomePredictionStore(log_path=path, max_jsonl_lines=40, segment_rows=7)  # restart
+
+        rows = _rows_on_disk(store)
+        assert 40 - 2 * 7 < len(rows) <= 40 or step < 40
+        per_action, global_counts = _scan_counts(rows)
+        action_counts, got_global = store.feedback_counts(key)
+        assert action_counts == per_action.get(key, {})
+        assert {k: v for k, v in got_global.items() if v} == global_counts
+
+
+def test_restart_reads_counts_snapshot_not_sealed_segments(tmp_path: Path) -> None:
+    path = tmp_path / "snap.jsonl"
+    store = OutcomePredictionStore(log_path=path, segment_rows=3)
+    for _ in range(10):
+        store.append_feedback("a", "success")
+    sealed = store.segment_paths()[:-1]
+    assert len(sealed) == 3
+
+    # Rewrite a sealed segment behind the store's back: a restart trusts the snapshot
+    failure = json.dumps({"event": "feedback", "action_key": "a", "outcome": "failure"})
+    sealed[0].write_text(f"{failure}\n" * 3, encoding="utf-8")
+    assert OutcomePredictionStore(log_path=path, segment_rows=3).feedback_counts("a")[0] == {"success": 10}
+
+    # Without the snapshot, sealed segments are scanned once and the snapshot is rebuilt
+    (tmp_path / "snap.counts.json").unlink()
+    rebuilt = OutcomePredictionStore(log_path=path, segment_rows=3)
+    assert rebuilt.feedback_counts("a")[0] == {"success": 7, "failure": 3}
+    assert (tmp_path / "snap.counts.json").is_file()
+
+
+def test_oversized_legacy_log_is_split_into_segments(tmp_path: Path) -> None:
+    path = tmp_path / "legacy.jsonl"
+    rows = [json.dumps({"event": "feedback", "action_key": f"k{i % 3}", "outcome": "success"}) for i in range(25)]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    store = OutcomePredictionStore(log_path=path, max_jsonl_lines=20, segment_rows=5)
+    assert store.feedback_counts("k0")[1] == {"success": 25}
+
+    store.append_feedback("k0", "failure")
+    on_disk = _rows_on_disk(store)
+    assert len(on_disk) == 16  # three segments of five plus the new row; the oldest rows went whole
+    assert store.feedback_counts("k0")[1] == _scan_counts(on_disk)[1]
+
+
+def _append_from_child(path: Path, worker: int, count: int) -> None:
+    store = OutcomePredictionStore(log_path=path, segment_rows=50, shared=True)
+    for i in range(count):
+        store.append_feedback(f"worker-{worker}", "success" if i % 2 else "failure")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork + flock")
+def test_shared_mode_appends_from_several_processes(tmp_path: Path) -> None:
+    path = tmp_path / "shared.jsonl"
+    observer = OutcomePredictionStore(log_path=path, segment_rows=50, shared=True)
+    assert observer.feedback_counts("worker-0") == ({}, {})
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_from_child, args=(path, w, 120)) for w in range(3)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+        assert proc.exitcode == 0
+
+    rows = _rows_on_disk(observer)
+    assert len(rows) == 360
+    assert all(json.loads(row)["event"] == "feedback" for row in rows)  # no torn or interleaved rows
+    for store in (observer, OutcomePredictionStore(log_path=path, segment_rows=50, shared=True)):
+        action_counts, global_counts = store.feedback_counts("worker-1")
+        assert action_counts == {"success": 60, "failure": 60}
+        assert global_counts == {"success": 180, "failure": 180}
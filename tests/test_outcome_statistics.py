@@ -0,0 +1,166 @@
+"""Tests for windowed / decayed outcome statistics and their use by the store and simulation engine."""
+
+import json
+import random
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from core_modules.outcome_prediction_store import DEFAULT_PRIOR, OutcomePredictionStore
+from core_modules.outcome_statistics import GLOBAL_KEY, OutcomeStatistics, beta_cdf, beta_ppf
+
+LABELS = tuple(DEFAULT_PRIOR)
+HOUR = 3600.0
+
+
+def make_stats(**kwargs) -> OutcomeStatistics:
+    kwargs.setdefault("window_seconds", 24 * HOUR)
+    kwargs.setdefault("bucket_seconds", HOUR)
+    kwargs.setdefault("half_life_seconds", 6 * HOUR)
+    return OutcomeStatistics(LABELS, DEFAULT_PRIOR, clock=lambda: 0.0, **kwargs)
+
+
+def reference_counts(events, key, now, window, bucket, half_life):
+    """Brute force over every event: bucketed window membership and exact exponential weights."""
+    newest = int(now // bucket)
+    window_counts = dict.fromkeys(LABELS, 0)
+    decayed = dict.fromkeys(LABELS, 0.0)
+    n_buckets = int(window // bucket)
+    for action, label, at in events:
+        if key != GLOBAL_KEY and action != key:
+            continue
+        if newest - n_buckets < int(at // bucket) <= newest:
+            window_counts[label] += 1
+        decayed[label] += 0.5 ** ((now - at) / half_life)
+    return window_counts, decayed
+
+
+def test_window_and_decay_match_brute_force_with_late_events():
+    rng = random.Random(4)
+    stats = make_stats()
+    events = []
+    clock = 1_700_000_000.0
+    for _ in range(3000):
+        clock += rng.expovariate(1 / 900)  # ~4 events an hour, with multi-day gaps below
+        if rng.random() < 0.002:
+            clock += 3 * 24 * HOUR
+        at = clock - (rng.random() * 5 * HOUR if rng.random() < 0.1 else 0.0)  # some late arrivals
+        event = (f"a{rng.randrange(4)}", rng.choice(LABELS), at)
+        events.append(event)
+        stats.observe(*event)
+
+        if rng.random() < 0.05:
+            # Queries move the clock forward like real time does; later events never predate them
+            now = clock = clock + rng.random() * 30 * HOUR
+            for key in ("a0", "a3", GLOBAL_KEY):
+                summary = stats.summary(key, now=now)
+                window, decayed = reference_counts(events, key, now, 24 * HOUR, HOUR, 6 * HOUR)
+                assert summary.window_counts == window
+                assert summary.decayed_counts == pytest.approx(decayed, rel=1e-9, abs=1e-12)
+
+
+def test_beta_quantiles_match_scipy():
+    stats_beta = pytest.importorskip("scipy.stats").beta
+    rng = random.Random(9)
+    for _ in range(500):
+        a, b = rng.uniform(0.05, 400), rng.uniform(0.05, 400)
+        q = rng.choice([0.005, 0.025, 0.05, 0.5, 0.95, 0.975, rng.random()])
+        assert beta_ppf(q, a, b) == pytest.approx(stats_beta.ppf(q, a, b), abs=1e-9)
+        x = rng.random()
+        assert beta_cdf(x, a, b) == pytest.approx(stats_beta.cdf(x, a, b), abs=1e-10)
+
+
+def test_credible_intervals_follow_the_dirichlet_posterior():
+    stats = make_stats(prior_strength=2.0, level=0.9)
+    empty = stats.summary("a", now=0.0)
+    assert empty.posterior_mean == pytest.approx(DEFAULT_PRIOR)
+
+    for i in range(40):
+        stats.observe("a", "success" if i % 4 else "failure", at=float(i))
+    summary = stats.summary("a", now=40.0)
+    assert summary.window_samples == 40
+    for label, (lo, hi) in summary.intervals.items():
+        assert lo < summary.posterior_mean[label] < hi
+        assert hi - lo < empty.intervals[label][1] - empty.intervals[label][0]
+    assert summary.posterior_mean["success"] == pytest.approx((30 + 2 * 0.65) / 42, rel=1e-3)
+
+    wide = stats.summary("a", now=40.0, level=0.99)
+    assert wide.intervals["success"][0] < summary.intervals["success"][0]
+
+
+def test_old_feedback_fades_out_of_the_estimate():
+    stats = make_stats()
+    for i in range(50):
+        stats.observe("deploy", "success", at=i * 60.0)
+    for i in range(10):
+        stats.observe("deploy", "failure", at=48 * HOUR + i * 60.0)
+    summary = stats.summary("deploy", now=48 * HOUR + HOUR)
+    assert summary.window_counts == {"success": 0, "partial_success": 0, "failure": 10}
+    assert summary.posterior_mean["failure"] > 0.7  # all-time tallies would say 10/60
+
+
+def _row(action: str, outcome: str, at: float) -> str:
+    recorded_at = datetime.fromtimestamp(at, UTC).isoformat(timespec="milliseconds")
+    return json.dumps({"event": "feedback", "action_key": action, "outcome": outcome, "recorded_at": recorded_at})
+
+
+def test_store_replays_recent_segments_on_restart(tmp_path: Path):
+    path = tmp_path / "outcomes.jsonl"
+    store = OutcomePredictionStore(log_path=path, segment_rows=5)
+    for i in range(12):
+        store.append_feedback("ship it", "success" if i % 3 else "failure")
+    before = store.outcome_summary("ship it")
+    assert before.window_counts == {"success": 8, "partial_success": 0, "failure": 4}
+
+    after = OutcomePredictionStore(log_path=path, segment_rows=5).outcome_summary("ship it")
+    assert after.window_counts == before.window_counts
+    assert after.decayed_samples == pytest.approx(before.decayed_samples, rel=1e-3)
+
+
+def test_store_skips_segments_older_than_the_horizon(tmp_path: Path):
+    path = tmp_path / "outcomes.jsonl"
+    old = datetime(2020, 1, 1, tzinfo=UTC).timestamp()
+    path.write_text("".join(_row("legacy", "failure", old + i) + "\n" for i in range(5)), encoding="utf-8")
+    store = OutcomePredictionStore(log_path=path, segment_rows=5)
+    store.append_feedback("legacy", "success")  # seals the old rows into a segment
+
+    reopened = OutcomePredictionStore(log_path=path, segment_rows=5)
+    assert reopened.feedback_counts("legacy")[0] == {"failure": 5, "success": 1}  # all-time tallies keep them
+    summary = reopened.outcome_summary("legacy")
+    assert summary.window_counts == {"success": 1, "partial_success": 0, "failure": 0}
+    assert summary.decayed_samples == pytest.approx(1.0, rel=1e-3)
+
+
+def test_simulation_engine_uses_recent_posterior(tmp_path: Path):
+    from core_modules.parallel_simulation_engine import ParallelSimulationEngine, SimulationType
+
+    engine = ParallelSimulationEngine(outcome_log_path=tmp_path / "sim.jsonl")
+    try:
+        for _ in range(4):
+            engine.record_outcome_feedback("roll out canary", "failure")
+        configs = [
+            {
+                "type": SimulationType.OUTCOME_PREDICTION,
+                "input_data": {"action": "roll out canary", "context": {}},
+                "parameters": {},
+            }
+        ]
+        outcome = engine.run_parallel_simulations(configs)[0].outcome
+        engine.record_outcome_feedback("migrate schema", "success")
+        configs[0]["input_data"] = {"action": "migrate schema", "context": {}}
+        sparse = engine.run_parallel_simulations(configs)[0].outcome
+    finally:
+        engine.shutdown()
+
+    # Too little recent feedback: the estimate is not the posterior, so no interval is reported
+    assert sparse["prediction_meta"]["source"] != "recent_posterior"
+    assert sparse["prediction_meta"]["interval_level"] is None
+    assert all(predicted["probability_interval"] is None for predicted in sparse["predicted_outcomes"])
+
+    meta = outcome["prediction_meta"]
+    assert meta["source"] == "recent_posterior" and meta["window_samples"] == 4
+    assert outcome["most_likely"]["type"] == "failure"
+    for predicted in outcome["predicted_outcomes"]:
+        lo, hi = predicted["probability_interval"]
+        assert lo < predicted["probability"] < hi
@@ -0,0 +1,233 @@
+"""Tests for api.pattern_detection: compiled batch detection, streaming detection and relationship sweep."""
+
+import random
+import re
+
+import pytest
+
+from api.pattern_detection import (
+    DetectedPattern,
+    PatternDetector,
+    StreamingPatternDetector,
+    StreamTooLong,
+    detect_patterns,
+)
+
+# --- Reference implementation (all-pairs / uncompiled, as before) -------------
+
+
+def legacy_rule_based(detector, text):
+    patterns = []
+    text_lower = text.lower()
+    for pattern_type, regexes in detector.pattern_templates.items():
+        for regex in regexes:
+            for match in re.finditer(regex, text_lower, re.IGNORECASE):
+                patterns.append(
+                    DetectedPattern(
+                        pattern_type=pattern_type,
+                        description=f"{pattern_type.title()} pattern detected: '{match.group()}'",
+                        confidence=min(0.9, len(match.group()) / 20),
+                        span=(match.start(), match.end()),
+                        evidence=[f"Regex match: {regex}"],
+                        metadata={"regex": regex, "match_text": match.group(), "method": "rule_based"},
+                    )
+                )
+    return patterns
+
+
+def legacy_statistics(text):
+    words = re.findall(r"\b\w+\b", text.lower())
+    word_freq = {}
+    for word in words:
+        word_freq[word] = word_freq.get(word, 0) + 1
+    sentence_lengths = [len(s.strip().split()) for s in re.split(r"[.!?]+", text) if s.strip()]
+    return word_freq, sentence_lengths
+
+
+def legacy_relationships(patterns):
+    for i, pattern in enumerate(patterns):
+        related = []
+        for j, other in enumerate(patterns):
+            if i == j:
+                continue
+            if abs(pattern.span[0] - other.span[0]) < 500:
+                if pattern.pattern_type != other.pattern_type:
+                    related.append(f"{other.pattern_type}_{j}")
+            if pattern.pattern_type == "causal" and other.pattern_type in ["temporal", "comparative"]:
+                related.append(f"causal_link_{j}")
+        pattern.related_patterns = related
+    return patterns
+
+
+VOCAB = (
+    "if then when whenever before after during week weeks month years because therefore thus leads to results in "
+    "causes effect more less than compared to versus vs. similar different increase decrease about approximately "
+    "12 3.5 45% 7k 2.5m 10:30 2024-01-15 correlated linked depends on relies on interactions relationship data "
+    "model the a of and signal noise İstanbul ünïcode_word"
+).split()
+SEPARATORS = [" ", " ", " ", ", ", ". ", "! ", "? ", "\n", "... ", "  "]
+
+
+def random_text(rng, words=400):
+    return "".join(rng.choice(VOCAB) + rng.choice(SEPARATORS) for _ in range(words)).strip()
+
+
+def random_chunks(rng, text):
+    chunks, i = [], 0
+    while i < len(text):
+        n = rng.choice([1, 2, 3, 7, 16, 64, 200])
+        chunks.append(text[i : i + n])
+        i += n
+    return chunks
+
+
+def as_dicts(patterns):
+    return [p.to_dict() for p in patterns]
+
+
+# --- Tests --------------------------------------------------------------------
+
+
+async def test_compiled_rule_detection_matches_reference():
+    detector = PatternDetector()
+    rng = random.Random(1)
+    for _ in range(30):
+        text = random_text(rng)
+        expected = as_dicts(legacy_rule_based(detector, text))
+        assert as_dicts(await detector._detect_rule_based_patterns(text)) == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_text_statistics_are_chunking_invariant(seed):
+    from api.pattern_detection import TextStatistics
+
+    rng = random.Random(seed)
+    text = random_text(rng, 300)
+    word_freq, sentence_lengths = legacy_statistics(text)
+
+    stats = TextStatistics()
+    for chunk in random_chunks(rng, text.lower()):
+        stats.update(chunk)
+    stats.finish()
+    assert dict(stats.word_counts) == word_freq
+    assert list(stats.word_counts) == list(word_freq)  # first-occurrence order
+    assert stats.sentences == len(sentence_lengths)
+    assert stats._length_sum == sum(sentence_lengths)
+    assert stats._length_sq_sum == sum(n * n for n in sentence_lengths)
+
+
+@pytest.mark.parametrize("seed", range(25))
+async def test_streaming_matches_batch_detection(seed):
+    rng = random.Random(seed)
+    text = random_text(rng)
+    options = {"min_confidence": rng.choice([0.0, 0.3, 0.6]), "max_patterns": rng.choice([5, 10, 10_000])}
+    detector = PatternDetector()
+
+    stream = StreamingPatternDetector(detector, options, carry=1024, holdback=32)
+    events = []
+    chunks = random_chunks(rng, text)
+    for i, chunk in enumerate(chunks):
+        batch_events = stream.feed(chunk, final=i == len(chunks) - 1)
+        assert [p.span for p in batch_events] == sorted(p.span for p in batch_events)
+        events.extend(batch_events)
+    streamed = await stream.finish()
+
+    batch = await detector.detect_patterns(text, options=options)
+    batch.patterns = await detector.analyze_relationships(batch.patterns)
+    assert as_dicts(streamed.patterns) == pytest.approx(as_dicts(batch.patterns))
+    assert streamed.confidence == pytest.approx(batch.confidence)
+    assert streamed.text_length == len(text)
+
+    # Every rule pattern is pushed exactly once
+    def identity(p):
+        return p.span, p.metadata["regex"], p.confidence
+
+    expected = [p for p in legacy_rule_based(detector, text) if p.confidence >= options["min_confidence"]]
+    assert sorted(map(identity, events)) == sorted(map(identity, expected))
+
+
+def test_stream_finds_matches_split_across_chunks():
+    chunks = ["Revenue will incr", "ease by roughly 12.", "5% next mon", "th, consequ", "ently 7", "k more"]
+    stream = StreamingPatternDetector(options={"min_confidence": 0.0}, holdback=8)
+    found = []
+    for chunk in chunks:
+        found.extend(stream.feed(chunk))
+    found.extend(stream.feed("", final=True))
+
+    texts = sorted(p.metadata["match_text"] for p in found)
+    reference = sorted(p.metadata["match_text"] for p in legacy_rule_based(stream.detector, "".join(chunks)))
+    assert texts == reference
+    assert {"increase by roughly 12.5", "month", "consequently", "7k"} <= set(texts)
+
+
+def test_relationship_sweep_matches_all_pairs():
+    import asyncio
+
+    detector = PatternDetector()
+    rng = random.Random(7)
+    types = ["temporal", "causal", "comparative", "quantitative", "relational", "repetitive"]
+    for _ in range(50):
+        patterns = [
+            DetectedPattern(rng.choice(types), "", 0.7, (s, s + 5), [])
+            for s in (rng.randrange(0, 5000) for _ in range(rng.randrange(0, 60)))
+        ]
+        reference = legacy_relationships([DetectedPattern(**vars(p)) for p in patterns])
+        expected = [p.related_patterns for p in reference]
+        got = asyncio.run(detector.analyze_relationships(patterns))
+        assert [p.related_patterns for p in got] == expected
+
+
+async def test_detect_patterns_entry_point():
+    patterns = await detect_patterns("Sales increased by approximately 25% compared to last year, because demand rose.")
+    assert patterns and all(p["confidence"] >= 0.6 for p in patterns)
+
+
+def test_websocket_pattern_stream():
+    from starlette.testclient import TestClient
+
+    from api.main import app
+
+    text = "Because the trial ran for weeks, results increased by approximately 30% compared to the control. " * 20
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream") as ws:
+            pushed = []
+            for i in range(0, len(text), 500):
+                final = i + 500 >= len(text)
+                ws.send_json({"type": "pattern_stream", "data": {"text": text[i : i + 500], "final": final}})
+                message = ws.receive_json()
+                if message["type"] == "pattern_events":
+                    pushed.extend(message["data"]["patterns"])
+                    if final:
+                        message = ws.receive_json()
+            assert message["type"] == "pattern_stream_result"
+            assert message["data"]["text_length"] == len(text)
+            assert pushed and all(p["span"][0] < len(text) for p in pushed)
+
+
+def test_stream_is_capped_without_losing_state():
+    stream = StreamingPatternDetector(max_chars=40)
+    stream.feed("Sales increased by 25% ")
+    with pytest.raises(StreamTooLong):
+        stream.feed("because demand rose sharply this year.")
+    assert stream.text_length == 23
+    assert stream.stats.total_words == 4
+
+
+def test_websocket_pattern_stream_reports_errors():
+    from starlette.testclient import TestClient
+
+    from api.main import app
+
+    with TestClient(app) as client, client.websocket_connect("/ws/stream") as ws:
+        ws.send_json({"type": "pattern_stream", "data": {"text": "Revenue grew by 10%. "}})
+        ws.send_json({"type": "pattern_stream", "data": {"text": 42}})
+        error = ws.receive_json()
+        assert error["type"] == "error" and error["stream_reset"] is False
+
+        # The stream survived the bad chunk
+        ws.send_json({"type": "pattern_stream", "data": {"text": "More text.", "final": True}})
+        message = ws.receive_json()
+        while message["type"] == "pattern_events":
+            message = ws.receive_json()
+        assert message["type"] == "pattern_stream_result"
+        assert message["data"]["text_length"] == len("Revenue grew by 10%. More text.")
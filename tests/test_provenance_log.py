@@ -0,0 +1,186 @@
+"""Tests for core_modules.provenance_log and the durable mode of legal_safeguards.CognitiveAccountingSystem."""
+
+import json
+import uuid
+
+import pytest
+
+from core_modules.provenance_log import GENESIS_HASH, ProvenanceLog, seal_record, verify_proof
+
+SECRET = b"test-secret"
+
+
+def make_dpr(log: ProvenanceLog, n: int) -> dict:
+    partial = {
+        "dpr_id": str(uuid.uuid4()),
+        "parent_dpr_id": log.head_dpr_id,
+        "sequence_number": log.count,
+        "decision_type": "test",
+        "action_taken": f"action {n}",
+    }
+    return seal_record(partial, log.head_hash, SECRET)
+
+
+def fill(log: ProvenanceLog, n: int) -> list[dict]:
+    records = []
+    for i in range(n):
+        records.append(make_dpr(log, i))
+        log.append(records[-1])
+    return records
+
+
+def open_log(path, **kwargs) -> ProvenanceLog:
+    kwargs.setdefault("checkpoint_every", 10)
+    return ProvenanceLog(path, SECRET, **kwargs)
+
+
+def test_append_persists_and_recovers_head(tmp_path):
+    log = open_log(tmp_path)
+    records = fill(log, 25)
+    log.close()
+
+    reopened = open_log(tmp_path)
+    assert (reopened.count, reopened.head_hash, reopened.head_dpr_id) == (
+        25,
+        records[-1]["chain_hash"],
+        records[-1]["dpr_id"],
+    )
+    assert list(reopened.iter_records()) == records
+    records += fill(reopened, 7)
+    assert list(reopened.iter_records()) == records
+    assert reopened.verify(full=True)["valid"]
+
+
+def test_append_rejects_records_that_do_not_extend_the_head(tmp_path):
+    log = open_log(tmp_path)
+    fill(log, 3)
+    stale = seal_record({"dpr_id": "x", "parent_dpr_id": None, "sequence_number": 0}, GENESIS_HASH, SECRET)
+    with pytest.raises(ValueError):
+        log.append(stale)
+    assert log.count == 3
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    log = open_log(tmp_path)
+    records = fill(log, 14)
+    log.close()
+    segment = log.segment_paths()[-1]
+    with open(segment, "ab") as f:
+        f.write(b'{"dpr_id": "half-writ')
+
+    reopened = open_log(tmp_path)
+    assert reopened.count == 14 and list(reopened.iter_records()) == records
+    fill(reopened, 1)
+    assert reopened.verify(full=True) == {
+        "valid": True,
+        "total": 15,
+        "broken_at": None,
+        "verified_from": 0,
+        "checked": 15,
+    }
+
+
+def test_lost_index_is_rebuilt_from_segments(tmp_path):
+    log = open_log(tmp_path, segment_entries=20)
+    records = fill(log, 65)
+    log.close()
+    (tmp_path / "checkpoints.ndjson").unlink()
+
+    reopened = open_log(tmp_path, segment_entries=20)
+    assert reopened.count == 65 and reopened.head_hash == records[-1]["chain_hash"]
+    assert len(reopened.segment_paths()) == 4
+    assert verify_proof(reopened.prove(33), SECRET)
+
+
+def test_verify_is_incremental_after_a_checkpoint(tmp_path):
+    log = open_log(tmp_path)
+    fill(log, 50)
+    first = log.verify()
+    assert first["valid"] and first["checked"] == 50
+
+    fill(log, 15)
+    second = open_log(tmp_path).verify()  # the verified marker survives a restart
+    assert second["valid"] and second["verified_from"] == 50 and second["checked"] == 15
+    assert log.verify()["verified_from"] == 60
+
+
+def test_tampering_is_detected(tmp_path):
+    log = open_log(tmp_path)
+    fill(log, 30)
+    assert log.verify()["valid"]
+    log.close()
+
+    segment = log.segment_paths()[0]
+    lines = segment.read_bytes().splitlines(keepends=True)
+    record = json.loads(lines[5])
+    record["action_taken"] = "rewritten"
+    lines[5] = (json.dumps(record, sort_keys=True) + "\n").encode()
+    segment.write_bytes(b"".join(lines))
+
+    reopened = open_log(tmp_path)
+    assert reopened.verify(full=True)["broken_at"] == 5
+    # The incremental check starts past the edit, but a forged marker or changed anchor falls back to genesis
+    marker = json.loads((tmp_path / "verified.json").read_text())
+    marker["count"] = 0
+    (tmp_path / "verified.json").write_text(json.dumps(marker))
+    assert reopened.verify()["broken_at"] == 5
+
+
+def test_proofs_verify_and_fail_when_tampered(tmp_path):
+    log = open_log(tmp_path, segment_entries=20)
+    fill(log, 47)
+    with pytest.raises(ValueError):
+        log.prove(45)  # not checkpointed yet
+    with pytest.raises(IndexError):
+        log.prove(47)
+    log.checkpoint()
+
+    for seq in (0, 9, 10, 25, 46):
+        proof = log.prove(seq)
+        assert verify_proof(proof, SECRET)
+        assert not verify_proof(proof, b"other-secret")
+    proof = log.prove(25)
+    proof["records"][3]["action_taken"] = "rewritten"
+    assert not verify_proof(proof, SECRET)
+    proof = log.prove(25)
+    proof["records"].pop()
+    assert not verify_proof(proof, SECRET)
+
+
+def test_segments_rotate_after_a_checkpoint(tmp_path):
+    log = open_log(tmp_path, segment_entries=20)
+    records = fill(log, 55)
+    assert [p.name for p in log.segment_paths()] == [f"provenance.{i:08d}.ndjson" for i in range(3)]
+    log.close()
+    reopened = open_log(tmp_path, segment_entries=20)
+    records += fill(reopened, 10)
+    assert len(reopened.segment_paths()) == 4
+    assert list(reopened.iter_records()) == records
+    assert reopened.verify(full=True)["valid"]
+
+
+def test_accounting_system_durable_mode(tmp_path, monkeypatch):
+    from legal_safeguards import CognitiveAccountingSystem
+
+    monkeypatch.setenv("JWT_SECRET", "durable-secret")
+    cas = CognitiveAccountingSystem(provenance_dir=tmp_path)
+    for i in range(5):
+        assert cas._emit_provenance(decision_type="t", action_taken=f"a{i}", actor_id="u", reasoning="r") is not None
+    cas.close()
+
+    restarted = CognitiveAccountingSystem(provenance_dir=tmp_path)
+    dpr = restarted._emit_provenance(decision_type="t", action_taken="a5", actor_id="u", reasoning="r")
+    assert dpr["sequence_number"] == 5
+    chain = restarted.get_provenance_chain()
+    assert [d["action_taken"] for d in chain] == [f"a{i}" for i in range(6)]
+    assert restarted.provenance_count == 6 and len(restarted.provenance_chain) == 1
+    assert restarted.verify_provenance_chain()["valid"]
+    assert verify_proof(restarted.prove_provenance(2), b"durable-secret")
+    assert restarted.export_report()["provenance_records"] == 6
+
+    # In-memory mode is unchanged
+    memory = CognitiveAccountingSystem()
+    memory._emit_provenance(decision_type="t", action_taken="a", actor_id="u", reasoning="r")
+    assert memory.verify_provenance_chain() == {"valid": True, "total": 1, "broken_at": None}
+    with pytest.raises(RuntimeError):
+        memory.prove_provenance(0)
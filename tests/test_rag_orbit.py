@@ -299,6 +299,33 @@ class TestFAISSRetriever:
         assert loaded_retriever.chunk_texts == retriever.chunk_texts
         assert loaded_retriever.chunk_ids == retriever.chunk_ids
 
+    def test_matrix_search_matches_linear_scan(self):
+        """Test vectorised top-k search against a plain cosine scan, including ties and filters."""
+        rng = np.random.default_rng(5)
+        base = rng.random((40, 16))
+        embeddings = np.vstack([base, base[:10]])  # duplicate rows tie on cosine
+        metadata = [{"category": ["a", "b"][i % 2]} for i in range(len(embeddings))]
+        retriever = create_standard_retriever(embedding_dim=16)
+        retriever.add_documents(embeddings, [f"t{i}" for i in range(50)], metadata, [f"c{i}" for i in range(50)])
+
+        def scan(query, top_k, category=None):
+            rows = []
+            for idx, emb in enumerate(embeddings):
+                if category and metadata[idx]["category"] != category:
+                    continue
+                rows.append((float(emb @ query / (np.linalg.norm(emb) * np.linalg.norm(query))), idx))
+            rows.sort(key=lambda x: x[0], reverse=True)
+            return [(f"c{idx}", score) for score, idx in rows[:top_k]]
+
+        for query in [*base[:5], rng.random(16)]:
+            for top_k, category in [(1, None), (5, None), (11, "a"), (100, "b"), (50, None)]:
+                results, _ = retriever.search(query, top_k=top_k, category_filter=category)
+                expected = scan(query, top_k, category)
+                assert [r.similarity_score for r in results] == pytest.approx([s for _, s in expected])
+                # Duplicates score equal up to rounding; compare ids grouped by score
+                got = sorted((round(r.similarity_score, 9), r.chunk_id) for r in results)
+                assert got == sorted((round(s, 9), cid) for cid, s in expected)
+
     def test_get_stats(self):
         """Test index statistics."""
         retriever = create_standard_retriever(embedding_dim=384)
@@ -0,0 +1,121 @@
+"""Tests for core_modules.resolution_store: sharded segments, index recovery, range reads and compaction."""
+
+import json
+
+import pytest
+
+from core_modules import partition_conflict_pipeline as pipeline
+from core_modules.resolution_store import ResolutionStore
+
+
+def resolution(i: int, version: int = 0) -> dict:
+    timestamp = f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00"
+    return {"conflict_id": f"cf-{i:04d}", "version": version, "timestamp": timestamp}
+
+
+def fill(store: ResolutionStore, n: int, version: int = 0) -> None:
+    for i in range(n):
+        store.put(f"cf-{i:04d}", resolution(i, version))
+
+
+def test_point_lookups_and_reopen(tmp_path):
+    with ResolutionStore(tmp_path, shards=4) as store:
+        assert store.created
+        fill(store, 200)
+        assert store.get("cf-0042")["version"] == 0 and store.get("missing") is None
+    assert len(list(tmp_path.rglob("segment_*.jsonl"))) == 4  # files per shard, not per resolution
+
+    reopened = ResolutionStore(tmp_path, shards=99)
+    assert not reopened.created and reopened.shard_count == 4
+    assert "cf-0199" in reopened and len(reopened) == 200
+    assert reopened.get("cf-0199") == resolution(199)
+    with pytest.raises(ValueError):
+        reopened.put("bad\tkey", {})
+    reopened.close()
+
+
+def test_range_iteration_by_timestamp(tmp_path):
+    store = ResolutionStore(tmp_path, shards=8)
+    for i in reversed(range(120)):
+        store.put(f"cf-{i:04d}", resolution(i))
+    keys = [key for key, _ in store.iter_range("2025-01-01T00:00:30+00:00", "2025-01-01T00:01:10+00:00")]
+    assert keys == [f"cf-{i:04d}" for i in range(30, 70)]
+
+    store.put("cf-0000", {**resolution(0), "timestamp": "2025-02-01T00:00:00+00:00"})  # moves to the end
+    ordered = [key for key, _ in store.iter_range()]
+    assert len(ordered) == 120 and ordered[0] == "cf-0001" and ordered[-1] == "cf-0000"
+    store.close()
+
+
+def test_superseded_records_are_dropped_by_compaction(tmp_path):
+    store = ResolutionStore(tmp_path, shards=2, max_segment_bytes=2048)
+    for version in range(3):
+        fill(store, 50, version)
+    assert store.stats()["superseded_records"] == 100 and store.stats()["segments"] > 2
+
+    result = store.compact()
+    assert result["dropped_records"] == 100 and result["reclaimed_bytes"] > 0
+    assert store.stats() == {"shards": 2, "live_records": 50, "superseded_records": 0, "segments": 2}
+    assert all(store.get(f"cf-{i:04d}")["version"] == 2 for i in range(50))
+    store.put("cf-0000", resolution(0, 3))
+    store.close()
+
+    reopened = ResolutionStore(tmp_path)
+    assert len(reopened) == 50 and reopened.get("cf-0000")["version"] == 3
+    assert reopened.compact()["dropped_records"] == 1
+    reopened.close()
+
+
+def test_recovers_from_a_lagging_index_and_a_torn_tail(tmp_path):
+    store = ResolutionStore(tmp_path, shards=1)
+    fill(store, 10)
+    store.close()
+    shard = tmp_path / "shard_00"
+    index = (shard / "index.tsv").read_bytes().splitlines(keepends=True)
+    (shard / "index.tsv").write_bytes(b"".join(index[:6]) + index[6][:5])  # lost the last index lines
+    with open(shard / "segment_000001.jsonl", "ab") as f:
+        f.write(b'{"key": "cf-torn", "timest')  # crash mid-record
+
+    reopened = ResolutionStore(tmp_path)
+    assert len(reopened) == 10 and "cf-torn" not in reopened
+    assert reopened.get("cf-0009") == resolution(9)
+    assert (shard / "segment_000001.jsonl").read_bytes().endswith(b"}\n")
+    reopened.close()
+    assert len((shard / "index.tsv").read_bytes().splitlines()) == 10
+
+
+def test_interrupted_compaction_leaves_a_consistent_store(tmp_path):
+    store = ResolutionStore(tmp_path, shards=1)
+    fill(store, 20)
+    fill(store, 20, version=1)
+    store.close()
+    # Crash after the compacted segment was written but before the index swap
+    shard = tmp_path / "shard_00"
+    live = (shard / "segment_000001.jsonl").read_bytes().splitlines(keepends=True)[20:]
+    (shard / "segment_000002.jsonl").write_bytes(b"".join(live))
+
+    reopened = ResolutionStore(tmp_path)
+    assert len(reopened) == 20 and all(reopened.get(f"cf-{i:04d}")["version"] == 1 for i in range(20))
+    assert [p.name for p in shard.glob("segment_*.jsonl")] == ["segment_000002.jsonl"]
+    reopened.close()
+
+
+def test_pipeline_commits_resolutions_to_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "_scope_root", lambda: tmp_path)
+    monkeypatch.setenv("ECHOES_AUDIT_PATH", str(tmp_path / "audit.ndjson"))
+    legacy = tmp_path / "manifests" / "resolutions"
+    legacy.mkdir(parents=True)
+    (legacy / "cf-legacy.json").write_text(json.dumps({"conflict_id": "cf-legacy", "timestamp": "2024-01-01"}))
+
+    entities = [
+        {"id": "a", "dimensions": {"space": "x", "domain": "y"}, "metrics": {"complexity": 0.9}},
+        {"id": "b", "dimensions": {}},
+    ]
+    summaries = pipeline.run_conflict_pipeline([{"partition_id": "p1", "partition_key": "k", "entities": entities}])
+    conflict_id = summaries[0]["conflict_id"]
+
+    stored = pipeline.load_resolution(conflict_id)
+    assert stored["winner"]["entity_id"] == summaries[0]["winner_entity_id"]
+    assert pipeline.load_resolution("cf-legacy")["timestamp"] == "2024-01-01"
+    assert [r["conflict_id"] for r in pipeline.iter_resolutions()] == ["cf-legacy", conflict_id]
+    assert [r["conflict_id"] for r in pipeline.iter_resolutions(since="2025")] == [conflict_id]
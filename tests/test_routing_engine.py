@@ -0,0 +1,186 @@
+"""Tests for cost- and latency-aware RoutingEngine in app.model_router."""
+
+import json
+
+import pybreaker
+import pytest
+
+from app.model_router import (
+    RollingModelStats,
+    RoutingEngine,
+    RoutingSLO,
+    estimate_cost,
+)
+
+
+class _Breakers:
+    """Minimal stand-in for ExternalServiceBreakers.get_model_breaker."""
+
+    def __init__(self, fail_max: int = 2, reset_timeout: int = 60):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.by_model = {}
+
+    def get_model_breaker(self, model):
+        if model not in self.by_model:
+            self.by_model[model] = pybreaker.CircuitBreaker(
+                fail_max=self.fail_max, reset_timeout=self.reset_timeout, name=model
+            )
+        return self.by_model[model]
+
+
+SIMPLE = "What is 2+2?"
+COMPLEX = "Analyze and compare the trade-offs between these two designs in detail."
+
+
+def _engine(**kwargs):
+    kwargs.setdefault("breakers", _Breakers())
+    kwargs.setdefault("epsilon", 0.0)
+    kwargs.setdefault("min_samples", 3)
+    return RoutingEngine(**kwargs)
+
+
+def test_rolling_stats_window_is_incremental():
+    stats = RollingModelStats(window=3)
+    for latency, ok in [(1.0, False), (2.0, True), (3.0, True), (4.0, True)]:
+        stats.record(latency, ok, prompt_tokens=10, completion_tokens=20)
+
+    assert stats.count == 3
+    assert stats.error_rate == 0.0  # the failure fell out of the window
+    assert stats.avg_latency == pytest.approx(3.0)
+    assert stats.total_requests == 4
+
+
+def test_cheapest_model_meeting_baseline_quality():
+    engine = _engine()
+
+    assert engine.route(SIMPLE).model == "gpt-4o-mini"
+    # Complex prompts need gpt-4o quality; mini is not a candidate
+    decision = engine.route(COMPLEX)
+    assert decision.model == "gpt-4o"
+    assert "gpt-4o-mini" not in decision.candidates
+
+
+def test_latency_slo_excludes_slow_model():
+    engine = _engine()
+    slow = engine.route(SIMPLE)
+    for _ in range(5):
+        engine.record_outcome(slow, latency_s=9.0)
+
+    decision = engine.route(SIMPLE, slo=RoutingSLO(max_latency_s=2.0))
+    assert decision.model == "gpt-4o"
+    assert engine.route(SIMPLE).model == "gpt-4o-mini"  # no SLO, still cheapest
+
+
+def test_error_rate_excludes_failing_model():
+    engine = _engine(breakers=_Breakers(fail_max=100))  # isolate the error-rate SLO from the breaker
+    for _ in range(5):
+        engine.record_outcome(engine.route(SIMPLE), latency_s=0.1, success=False)
+
+    assert engine.route(SIMPLE).model == "gpt-4o"
+
+
+def test_open_breaker_fails_over():
+    breakers = _Breakers()
+    engine = _engine(breakers=breakers)
+    breakers.get_model_breaker("gpt-4o").open()
+
+    decision = engine.route(COMPLEX)
+    assert decision.model != "gpt-4o"
+    assert decision.reason == "failover"
+
+
+def test_recorded_failures_open_the_breaker_and_route_fails_over():
+    breakers = _Breakers(fail_max=2)
+    engine = _engine(breakers=breakers)
+    for _ in range(2):
+        engine.record_outcome(engine.route(COMPLEX), latency_s=0.1, success=False, error=TimeoutError("slow"))
+
+    assert breakers.get_model_breaker("gpt-4o").current_state == pybreaker.STATE_OPEN
+    assert not engine.is_available("gpt-4o")
+    assert engine.route(COMPLEX).reason == "failover"
+
+
+def test_expected_cost_ignores_samples_without_token_usage():
+    engine = _engine()
+    prior = engine._expected_cost("gpt-4o-mini", SIMPLE, RoutingSLO())
+    for _ in range(5):
+        engine.record_outcome(engine.route(SIMPLE), latency_s=0.1)  # caller reported no usage
+    assert engine._expected_cost("gpt-4o-mini", SIMPLE, RoutingSLO()) == prior
+
+    for _ in range(3):
+        engine.record_outcome(engine.route(SIMPLE), latency_s=0.1, prompt_tokens=10, completion_tokens=2000)
+    assert engine._expected_cost("gpt-4o-mini", SIMPLE, RoutingSLO()) > prior
+    assert engine.get_model_stats()["gpt-4o-mini"]["total_cost"] > 0
+
+
+def test_usage_tokens_reads_both_openai_apis():
+    class Usage:
+        def __init__(self, **counts):
+            self.__dict__.update(counts)
+
+    class Response:
+        def __init__(self, usage):
+            self.usage = usage
+
+    assert RoutingEngine.usage_tokens(Response(Usage(prompt_tokens=12, completion_tokens=34))) == (12, 34)
+    assert RoutingEngine.usage_tokens(Response(Usage(input_tokens=5, output_tokens=6))) == (5, 6)
+    assert RoutingEngine.usage_tokens(Response(None)) == (0, 0)
+    assert RoutingEngine.usage_tokens({"model": "x"}) == (0, 0)
+
+
+def test_execute_fails_over_and_records_outcomes():
+    breakers = _Breakers(fail_max=1)
+    engine = _engine(breakers=breakers)
+
+    def call(model):
+        if model == "gpt-4o-mini":
+            raise ConnectionError("mini down")
+        return {"model": model}
+
+    result, decision = engine.execute(SIMPLE, call)
+
+    assert result == {"model": "gpt-4o"}
+    assert decision.success is True
+    assert engine.get_model_stats()["gpt-4o-mini"]["error_rate"] == 1.0
+    assert breakers.get_model_breaker("gpt-4o-mini").current_state == pybreaker.STATE_OPEN
+
+
+def test_exploration_is_seeded():
+    engine = _engine(epsilon=1.0, seed=7)
+    models = {engine.route(SIMPLE).model for _ in range(50)}
+
+    assert models == {"gpt-4o-mini", "gpt-4o"}
+    assert all(d.explored for d in engine.decisions)
+
+
+def test_export_decisions_jsonl(tmp_path):
+    engine = _engine()
+    decision = engine.route(SIMPLE)
+    engine.record_outcome(decision, latency_s=0.5, prompt_tokens=100, completion_tokens=50)
+
+    path = tmp_path / "routing.jsonl"
+    assert engine.export_decisions(path) == 1
+
+    row = json.loads(path.read_text().strip())
+    assert row["model"] == "gpt-4o-mini"
+    assert row["cost"] == pytest.approx(estimate_cost("gpt-4o-mini", 100, 50))
+    assert row["latency_s"] == 0.5
+    assert "exported" not in row
+
+
+def test_export_decisions_writes_each_completed_decision_once(tmp_path):
+    engine = _engine()
+    done = engine.route(SIMPLE)
+    engine.record_outcome(done, latency_s=0.1)
+    pending = engine.route(SIMPLE)
+
+    path = tmp_path / "routing.jsonl"
+    assert engine.export_decisions(path) == 1
+    assert engine.export_decisions(path) == 0  # nothing new
+
+    engine.record_outcome(pending, latency_s=0.2, success=False, error="timeout")
+    assert engine.export_decisions(path) == 1
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["decision_id"] for row in rows] == [done.decision_id, pending.decision_id]
+    assert rows[1]["error"] == "timeout" and rows[1]["success"] is False
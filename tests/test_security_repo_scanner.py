@@ -0,0 +1,82 @@
+"""Tests for tools.security.repo_scanner (parallel streaming scans)."""
+
+from __future__ import annotations
+
+import os
+import random
+
+import pytest
+
+from tools.security.advanced_routine import RoutineMode, detect_findings
+from tools.security.repo_scanner import ScanCache, scan_file, scan_paths, walk_files
+
+SECRET_LINES = [
+    "api_key = s3cr3tvalue",
+    "contact ops@example.com for access",
+    "Authorization: Bearer abcdefghijklmnop",
+    "card 4111 1111 1111 1111 on file",
+    "host 192.168.1.10 key sk-abcdefghijklmnopqrstu",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("token = 'x'\n" + SECRET_LINES[1] + "\n")
+    (tmp_path / "src" / "b.txt").write_text("nothing to see here\n")
+    (tmp_path / "z.env").write_text(SECRET_LINES[0] + "\n")
+    (tmp_path / "blob.bin").write_bytes(b"\x00\x01" + b"sk-abcdefghijklmnopqrstu")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text(SECRET_LINES[2])
+    return tmp_path
+
+
+def test_walk_skips_excluded_dirs(tree):
+    paths = [os.path.relpath(p, tree) for p, _size, _mtime in walk_files([tree])]
+    assert paths == ["blob.bin", "z.env", os.path.join("src", "a.py"), os.path.join("src", "b.txt")]
+
+
+def test_binary_and_oversized_files_are_skipped(tree):
+    assert scan_file(str(tree / "blob.bin")).status == "binary"
+    assert scan_file(str(tree / "z.env"), max_file_size=4).status == "too_large"
+
+
+def test_chunked_scan_matches_whole_file_scan(tmp_path):
+    rng = random.Random(3)
+    filler = ["lorem ipsum", "dolor", "ünïcödé ✓", "x" * 30, "1234", "a=b"]
+    lines = [rng.choice(SECRET_LINES + filler * 3) for _ in range(400)]
+    path = tmp_path / "big.txt"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    expected = detect_findings(path.read_text(encoding="utf-8"), RoutineMode.ADVANCED)
+    result = scan_file(str(path), chunk_size=97, overlap=128)
+
+    assert result.status == "scanned"
+    assert result.findings == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ordered_and_unordered_streaming(tree, workers):
+    ordered = list(scan_paths([tree], workers=workers, batch_size=1))
+    assert [r.path for r in ordered] == [p for p, _s, _m in walk_files([tree])]
+
+    unordered = list(scan_paths([tree], workers=workers, ordered=False, batch_size=1))
+    assert sorted(r.path for r in unordered) == sorted(r.path for r in ordered)
+    by_path = {r.path: r for r in ordered}
+    assert by_path[str(tree / "z.env")].findings[0].category == "assign_secret"
+
+
+def test_incremental_cache_skips_unchanged_files(tree):
+    cache_path = tree / "cache" / "scan.json"
+    first = list(scan_paths([tree / "src", tree / "z.env"], workers=1, cache=ScanCache(cache_path)))
+    assert {r.status for r in first} == {"scanned"}
+
+    (tree / "src" / "b.txt").write_text("now with ops@example.com\n")
+    cache = ScanCache(cache_path)
+    second = {r.path: r for r in scan_paths([tree / "src", tree / "z.env"], workers=1, cache=cache)}
+
+    assert second[str(tree / "src" / "b.txt")].status == "scanned"
+    assert second[str(tree / "src" / "b.txt")].findings
+    assert second[str(tree / "src" / "a.py")].status == "cached"
+    assert second[str(tree / "z.env")].findings == first[-1].findings
+    assert cache.hits == 2
@@ -0,0 +1,149 @@
+"""Tests for api.self_rag: indexed knowledge-base grounding, evidence ranking and the verdict cache."""
+
+import random
+
+import pytest
+
+from api.self_rag import EvidenceChunk, SelfRAGVerifier
+from src.rag_orbit.embeddings import EmbeddingGenerator
+from src.rag_orbit.retrieval import FAISSRetriever
+
+# --- Reference implementation (per-chunk claim tokenization, as before) -------
+
+
+def legacy_analysis(claim, evidence):
+    supporting, contradictions, neutral = [], [], []
+    claim_lower = claim.lower()
+    for chunk in evidence:
+        text_lower = chunk.text.lower()
+        support_keywords = ["true", "correct", "verified", "confirmed", "supports"]
+        contradiction_keywords = ["false", "incorrect", "contradicts", "denies", "refutes"]
+        support_score = sum(1 for word in support_keywords if word in text_lower)
+        contradiction_score = sum(1 for word in contradiction_keywords if word in text_lower)
+        claim_words = set(claim_lower.split())
+        text_words = set(text_lower.split())
+        overlap = len(claim_words.intersection(text_words))
+        similarity = (
+            overlap / max(len(claim_words), len(text_words)) if max(len(claim_words), len(text_words)) > 0 else 0
+        )
+        if contradiction_score > support_score and similarity > 0.3:
+            contradictions.append(chunk.text)
+        elif support_score > contradiction_score and similarity > 0.2:
+            supporting.append(chunk.text)
+        else:
+            neutral.append(chunk.text)
+    return {
+        "supporting": supporting,
+        "contradictions": contradictions,
+        "neutral": neutral,
+        "evidence_count": len(evidence),
+    }
+
+
+VOCAB = (
+    "the sky is blue water boils at 100 degrees true false verified refutes denies correct incorrect supports".split()
+)
+
+
+def random_sentence(rng, words=8):
+    return " ".join(rng.choice(VOCAB) for _ in range(rng.randrange(0, words)))
+
+
+def kb_verifier(**kwargs):
+    return SelfRAGVerifier(retriever=FAISSRetriever(), embedding_generator=EmbeddingGenerator(), **kwargs)
+
+
+# --- Tests --------------------------------------------------------------------
+
+
+async def test_analysis_matches_reference():
+    verifier = SelfRAGVerifier()
+    rng = random.Random(3)
+    for _ in range(200):
+        claim = random_sentence(rng)
+        evidence = [EvidenceChunk(random_sentence(rng, 12), 0.8, "provided", {}) for _ in range(rng.randrange(0, 6))]
+        assert await verifier._analyze_claim_against_evidence(claim, evidence) == legacy_analysis(claim, evidence)
+
+
+async def test_knowledge_base_grounds_claims_without_provided_evidence():
+    verifier = kb_verifier(top_k=3)
+    claim = "Water boils at 100 degrees at sea level"
+    size = verifier.index_evidence(
+        [f"{claim} - this is verified and correct", "The sky is blue", "Cats are mammals", "Paris is in France"]
+    )
+    assert size == 4
+
+    result = await verifier.verify_claim(claim)
+    evidence = await verifier._gather_evidence(claim)
+    assert 0 < len(evidence) <= 3
+    assert {chunk.source for chunk in evidence} == {"knowledge_base"}
+    assert all(chunk.relevance_score > verifier.min_evidence_threshold for chunk in evidence)
+    assert result.evidence_used == [chunk.text for chunk in evidence]
+
+
+async def test_provided_evidence_is_kept_unless_capped():
+    claim = "the bridge opened in 1932"
+    evidence = [claim] * 10 + ["It is true the bridge opened then", "Records confirmed the bridge opened in 1932"]
+
+    full = await SelfRAGVerifier().verify_claim(claim, evidence)
+    assert full.verdict == "TRUE" and full.evidence_dropped == 0
+    assert len(full.evidence_used) == 12
+
+    # A cap keeps distinct entries that can move the verdict ahead of repeats
+    capped = await SelfRAGVerifier(max_evidence_chunks=3).verify_claim(claim, evidence)
+    assert capped.evidence_used == [claim, *evidence[10:]]
+    assert capped.verdict == "TRUE" and capped.evidence_dropped == 9
+
+    chunks = await SelfRAGVerifier(max_evidence_chunks=2)._gather_evidence(claim, ["a", "b", "c true", "a"])
+    assert [chunk.metadata["index"] for chunk in chunks] == [0, 2]
+
+
+def test_verifier_without_an_index_skips_embeddings(monkeypatch):
+    from api.config import get_config
+    from api.self_rag import create_verifier
+
+    monkeypatch.setattr(get_config().rag, "index_dir", None)
+    verifier = create_verifier()
+    assert verifier.retriever is None and verifier.embedding_generator is None
+
+
+async def test_verdicts_are_cached_per_claim_digest(monkeypatch):
+    verifier = kb_verifier()
+    calls = 0
+    gather = verifier._gather_evidence
+
+    async def counting_gather(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return await gather(*args, **kwargs)
+
+    monkeypatch.setattr(verifier, "_gather_evidence", counting_gather)
+
+    first = await verifier.verify_claim("The earth orbits the sun", ["It is true the earth orbits the sun"])
+    second = await verifier.verify_claim("The earth orbits the sun", ["It is true the earth orbits the sun"])
+    assert calls == 1
+    assert (second.verdict, second.confidence, second.evidence_used) == (
+        first.verdict,
+        first.confidence,
+        first.evidence_used,
+    )
+
+    await verifier.verify_claim("The earth orbits the sun", ["Different evidence"])
+    assert calls == 2
+
+    # Growing the knowledge base invalidates earlier verdicts
+    verifier.index_evidence(["The earth orbits the sun once a year"])
+    await verifier.verify_claim("The earth orbits the sun", ["It is true the earth orbits the sun"])
+    assert calls == 3
+
+
+async def test_cache_is_bounded():
+    verifier = SelfRAGVerifier(cache_size=4)
+    for i in range(10):
+        await verifier.verify_claim(f"claim {i}", ["true"])
+    assert len(verifier._cache) == 4
+
+
+def test_index_evidence_requires_retriever():
+    with pytest.raises(RuntimeError):
+        SelfRAGVerifier().index_evidence(["text"])
@@ -0,0 +1,78 @@
+"""Tests for the compiled indicator matcher and the batch/JSONL evaluators in app.values."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.values import VALUE_INDICATORS, IndicatorMatcher, ValueSystem
+
+
+@pytest.fixture
+def value_system(tmp_path):
+    return ValueSystem(storage_path=str(tmp_path))
+
+
+RESPONSES = [
+    "Sorry, I can't help with that. I think maybe you should try this example.",  # overlapping phrases
+    "According to the source, research shows the evidence was verified.",
+    "Here's how: step by step, you can pick an option. Let me help!",
+    "That's a stupid, terrible, bad idea and you must stop.",
+    "",
+    "İSTANBUL artifact with a badge",  # case folding changes length; substrings inside words count
+]
+
+
+def test_single_response_scores(value_system):
+    scores = value_system.evaluate_response(RESPONSES[0])
+    # respect: 0.7 - 0.1 ("you should") + 0.05 ("sorry"); helpfulness: 0.6 + 0.3 ("try this", "example", "help") - 0.4
+    assert scores == pytest.approx({"respect": 0.65, "accuracy": 0.7, "helpfulness": 0.5})
+    assert value_system.evaluate_response(RESPONSES[1])["accuracy"] == 1.0
+    assert value_system.evaluate_response(RESPONSES[3])["respect"] == pytest.approx(0.3)
+
+
+def test_batch_matrix_matches_single_scores_exactly(value_system):
+    corpus = RESPONSES * 7
+    matrix = value_system.evaluate_batch(corpus)
+    assert matrix.shape == (len(corpus), 3)
+    assert value_system.matcher.value_names == ("respect", "accuracy", "helpfulness")
+    for row, text in zip(matrix, corpus, strict=True):
+        assert list(row) == list(value_system.evaluate_response(text).values())
+
+    overall = value_system.get_overall_scores(matrix)
+    expected = [value_system.get_overall_score(value_system.evaluate_response(text)) for text in corpus]
+    assert overall == pytest.approx(expected)
+    assert value_system.evaluate_batch([]).shape == (0, 3)
+
+
+def test_matcher_shares_phrases_across_values():
+    matcher = IndicatorMatcher(
+        {"a": (0.5, [(0.1, ("help", "me"))]), "b": (0.5, [(-0.2, ("help",)), (0.3, ("help me",))])}
+    )
+    assert matcher.phrases == ("help", "me", "help me")
+    presence = matcher.presence(["please help me", "nothing", "helpme"])
+    assert presence.tolist() == [[True, True, True], [False, False, False], [True, True, False]]
+    assert matcher.score_matrix(["please help me"]).tolist() == [[pytest.approx(0.7), pytest.approx(0.6)]]
+    assert len(IndicatorMatcher().phrases) == sum(len(p) for _, rules in VALUE_INDICATORS.values() for _, p in rules)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_evaluate_jsonl_streams_in_file_order(value_system, tmp_path, processes):
+    corpus = tmp_path / "transcripts.jsonl"
+    lines = []
+    for i in range(50):
+        lines.append(json.dumps({"id": i, "response": RESPONSES[i % len(RESPONSES)]}))
+    lines[3] = "not json"
+    lines[7] = json.dumps({"id": 7})
+    lines[11] = json.dumps(RESPONSES[1])  # bare string record
+    lines[20] = ""
+    corpus.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    chunks = list(value_system.evaluate_jsonl(corpus, batch_size=8, processes=processes))
+    assert len(chunks) == 7
+    numbers = [n for chunk_lines, _ in chunks for n in chunk_lines]
+    assert numbers == [n for n in range(1, 51) if n not in (4, 8, 21)]
+    matrix = np.vstack([scores for _, scores in chunks])
+    assert matrix.shape == (47, 3)
+    assert list(matrix[numbers.index(12)]) == list(value_system.evaluate_response(RESPONSES[1]).values())
+    assert list(matrix[numbers.index(50)]) == list(value_system.evaluate_response(RESPONSES[49 % 6]).values())
@@ -2,18 +2,26 @@
 
 from tools.security.advanced_routine import (
     Finding,
+    RedactionEngine,
     RoutineMode,
     detect_findings,
+    get_engine,
     iter_findings_files,
     redact_text,
     sanitize_mapping,
 )
+from tools.security.repo_scanner import FileScanResult, ScanCache, scan_paths
 
 __all__ = [
+    "FileScanResult",
     "Finding",
+    "RedactionEngine",
     "RoutineMode",
+    "ScanCache",
     "detect_findings",
+    "get_engine",
     "iter_findings_files",
     "redact_text",
     "sanitize_mapping",
+    "scan_paths",
 ]
@@ -8,6 +8,29 @@ import sys
 from pathlib import Path
 
 from tools.security.advanced_routine import RoutineMode, detect_findings, redact_text
+from tools.security.repo_scanner import DEFAULT_MAX_FILE_SIZE, ScanCache, ScanSummary, scan_paths
+
+
+def run_scan(args: argparse.Namespace, mode: RoutineMode) -> None:
+    """Recursive parallel scan: one JSON line per file with findings, summary on stderr."""
+    missing = [p for p in args.paths if not Path(p).exists()]
+    if missing:
+        print(f"error: path does not exist: {missing[0]}", file=sys.stderr)
+        sys.exit(2)
+    cache = ScanCache(args.cache) if args.cache else None
+    summary = ScanSummary()
+    for result in scan_paths(
+        args.paths or ["."],
+        mode,
+        workers=args.workers,
+        ordered=not args.unordered,
+        cache=cache,
+        max_file_size=args.max_size,
+    ):
+        summary.add(result)
+        if result.findings or args.all_files:
+            print(json.dumps(result.to_dict()), flush=True)
+    print(json.dumps({"summary": summary.to_dict()}), file=sys.stderr)
 
 
 def main() -> None:
@@ -29,9 +52,24 @@ def main() -> None:
         action="store_true",
         help="Emit JSON findings instead of redacted text",
     )
+    scan = parser.add_argument_group("repository scan")
+    scan.add_argument(
+        "--scan",
+        action="store_true",
+        help="Recursively scan files/directories in parallel (JSON lines per file with findings)",
+    )
+    scan.add_argument("--workers", type=int, default=None, help="Scanner processes (default: CPU count)")
+    scan.add_argument("--unordered", action="store_true", help="Stream results as they complete")
+    scan.add_argument("--cache", default=None, help="Incremental cache file; unchanged files are skipped")
+    scan.add_argument("--max-size", type=int, default=DEFAULT_MAX_FILE_SIZE, help="Skip files larger than this")
+    scan.add_argument("--all-files", action="store_true", help="Also emit files without findings")
     args = parser.parse_args()
     mode = RoutineMode(args.mode)
 
+    if args.scan:
+        run_scan(args, mode)
+        return
+
     if args.paths:
         for p in args.paths:
             path = Path(p)
@@ -8,14 +8,19 @@ Modes:
   standard — common API key shapes, Bearer, email, US phone, SSN pattern
   advanced — + JWT-shaped blobs, URL userinfo, GitHub/Stripe/Slack/AWS, private IPv4
   paranoid — + mask all IPv4 (use sparingly; noisy in infrastructure logs)
+
+Patterns are compiled once per mode into a RedactionEngine (see get_engine);
+benchmark with ``python tests/benchmark_redaction.py``.
 """
 
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
 from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 from enum import StrEnum
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -221,30 +226,137 @@ def _compile_patterns(
     return pats
 
 
-def _collect_matches(
-    text: str,
-    mode: RoutineMode,
-) -> list[tuple[int, int, int, str, Callable[[re.Match[str]], str], re.Match[str]]]:
+# Necessary literal/character triggers per category: a pattern can only match
+# text in which its trigger occurs, so strings without any trigger skip the
+# regex work entirely. Categories missing here are always scanned.
+_TRIGGERS: dict[str, str] = {
+    "openai_sk": r"sk-",
+    "bearer": r"Bearer",
+    "aws_key": r"AKIA|ASIA",
+    "github_pat": r"gh[pousr]_",
+    "stripe": r"_live_|_test_",
+    "slack_token": r"xox",
+    "url_credentials": r"//",
+    "assign_secret": r"=",
+    "jwt_shape": r"eyJ",
+    "email": r"@",
+    "us_phone": r"\d{4}",
+    "ssn": r"\d{4}",
+    "card_luhn": r"(?:\d[ -]*){13}",
+    "ipv4_private": r"10\.|127\.|192\.168|172\.",
+    "ipv4_any": r"\d\.\d",
+}
+
+# Shortest string any pattern can match ("a@b.cd"); anything shorter is clean.
+_MIN_MATCH_LEN = 6
+
+# Strings up to this length are memoized (log events repeat the same values).
+_CACHEABLE_LEN = 512
+
+_Candidate = tuple[int, int, int, str, Callable[[re.Match[str]], str], re.Match[str]]
+_Selected = tuple[int, int, str, Callable[[re.Match[str]], str], re.Match[str]]
+
+
+class RedactionEngine:
+    """
+    Patterns for one RoutineMode, compiled once.
+
+    A combined trigger regex acts as a prefilter (no hit means nothing to
+    redact), per-category triggers gate which patterns run, overlaps are
+    resolved against an interval-sorted list, and redactions of short
+    repeated strings are served from an LRU.
+    """
+
+    def __init__(self, mode: RoutineMode, cache_size: int = 4096) -> None:
+        self.mode = mode
+        self._patterns = _compile_patterns(mode)
+        gates: dict[str, re.Pattern[str]] = {}
+        self._gated: list[tuple[re.Pattern[str] | None, str, int, re.Pattern[str], Callable]] = []
+        for category, priority, rx, replacer in self._patterns:
+            trigger = _TRIGGERS.get(category)
+            gate = None if trigger is None else gates.setdefault(trigger, re.compile(trigger))
+            self._gated.append((gate, category, priority, rx, replacer))
+        self._always_scan = any(gate is None for gate, *_ in self._gated)
+        self._prefilter = re.compile("|".join(sorted(gates)))
+        self._cached_redact = lru_cache(maxsize=cache_size)(self._redact) if cache_size > 0 else self._redact
+
+    def collect(self, text: str) -> list[_Candidate]:
+        """Candidate matches: start, end, priority, category, replacer, match object."""
+        out: list[_Candidate] = []
+        if len(text) < _MIN_MATCH_LEN or not (self._always_scan or self._prefilter.search(text)):
+            return out
+        gate_hits: dict[re.Pattern[str], bool] = {}
+        for gate, category, priority, rx, replacer in self._gated:
+            if gate is not None:
+                hit = gate_hits.get(gate)
+                if hit is None:
+                    hit = gate_hits[gate] = gate.search(text) is not None
+                if not hit:
+                    continue
+            out.extend((m.start(), m.end(), priority, category, replacer, m) for m in rx.finditer(text))
+        return out
+
+    def select(self, text: str) -> list[_Selected]:
+        return _select_non_overlapping(self.collect(text))
+
+    def _redact(self, text: str) -> str:
+        selected = self.select(text)
+        if not selected:
+            return text
+        out: list[str] = []
+        pos = 0
+        for start, end, _cat, replacer, m in selected:
+            out.append(text[pos:start])
+            out.append(replacer(m))
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+    def redact(self, text: str) -> str:
+        if len(text) < _MIN_MATCH_LEN:
+            return text
+        if len(text) <= _CACHEABLE_LEN:
+            return self._cached_redact(text)
+        return self._redact(text)
+
+    def cache_info(self) -> Any:
+        return getattr(self._cached_redact, "cache_info", lambda: None)()
+
+
+_ENGINES: dict[RoutineMode, RedactionEngine] = {}
+
+
+def get_engine(mode: RoutineMode = RoutineMode.ADVANCED) -> RedactionEngine:
+    """Shared compiled engine for a mode (built on first use)."""
+    engine = _ENGINES.get(mode)
+    if engine is None:
+        engine = _ENGINES.setdefault(mode, RedactionEngine(mode))
+    return engine
+
+
+def _collect_matches(text: str, mode: RoutineMode) -> list[_Candidate]:
     """Build candidate matches: start, end, priority, category, replacer, match object."""
-    out: list[tuple[int, int, int, str, Callable[[re.Match[str]], str], re.Match[str]]] = []
-    for category, priority, rx, replacer in _compile_patterns(mode):
-        out.extend(
-            (m.start(), m.end(), priority, category, replacer, m) for m in rx.finditer(text)
-        )
-    return out
+    return get_engine(mode).collect(text)
 
 
-def _select_non_overlapping(
-    raw: list[tuple[int, int, int, str, Callable[[re.Match[str]], str], re.Match[str]]],
-) -> list[tuple[int, int, str, Callable[[re.Match[str]], str], re.Match[str]]]:
-    """Greedy: sort by (-priority, -length, start); drop overlaps."""
+def _select_non_overlapping(raw: list[_Candidate]) -> list[_Selected]:
+    """
+    Greedy: sort by (-priority, -length, start); drop overlaps.
+
+    Chosen spans never overlap, so kept sorted by start they are also sorted
+    by end and each overlap check only needs the two bisect neighbours.
+    """
     raw.sort(key=lambda t: (-t[2], -(t[1] - t[0]), t[0]))
-    chosen: list[tuple[int, int, str, Callable[[re.Match[str]], str], re.Match[str]]] = []
+    starts: list[int] = []
+    chosen: list[_Selected] = []
     for start, end, _prio, cat, replacer, m in raw:
-        if any(not (end <= s or start >= e) for s, e, *_ in chosen):
+        i = bisect_right(starts, start)
+        if i > 0 and chosen[i - 1][1] > start:
             continue
-        chosen.append((start, end, cat, replacer, m))
-    chosen.sort(key=lambda t: t[0])
+        if i < len(chosen) and chosen[i][0] < end:
+            continue
+        starts.insert(i, start)
+        chosen.insert(i, (start, end, cat, replacer, m))
     return chosen
 
 
@@ -252,24 +364,13 @@ def redact_text(text: str, mode: RoutineMode = RoutineMode.ADVANCED) -> str:
     """Mask secrets and PII; overlapping spans resolved by priority."""
     if not text:
         return text
-    matches = _collect_matches(text, mode)
-    selected = _select_non_overlapping(matches)
-    out: list[str] = []
-    pos = 0
-    for start, end, _cat, replacer, m in selected:
-        out.append(text[pos:start])
-        out.append(replacer(m))
-        pos = end
-    out.append(text[pos:])
-    return "".join(out)
+    return get_engine(mode).redact(text)
 
 
 def detect_findings(text: str, mode: RoutineMode = RoutineMode.ADVANCED) -> list[Finding]:
     """Non-destructive inventory of spans that would be masked (preview only)."""
-    matches = _collect_matches(text, mode)
-    selected = _select_non_overlapping(matches)
     findings: list[Finding] = []
-    for start, end, cat, _repl, m in selected:
+    for start, end, cat, _repl, m in get_engine(mode).select(text):
         findings.append(
             Finding(
                 category=cat,
@@ -281,6 +382,20 @@ def detect_findings(text: str, mode: RoutineMode = RoutineMode.ADVANCED) -> list
     return findings
 
 
+def _sanitize(obj: Any, engine: RedactionEngine, max_depth: int, depth: int) -> Any:
+    if depth > max_depth:
+        return obj
+    if isinstance(obj, str):
+        return engine.redact(obj) if obj else obj
+    if isinstance(obj, dict):
+        return {k: _sanitize(v, engine, max_depth, depth + 1) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_sanitize(v, engine, max_depth, depth + 1) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_sanitize(v, engine, max_depth, depth + 1) for v in obj)
+    return obj
+
+
 def sanitize_mapping(
     obj: Any,
     mode: RoutineMode = RoutineMode.ADVANCED,
@@ -293,17 +408,7 @@ def sanitize_mapping(
 
     Stops at max_depth; non-serializable values returned as-is.
     """
-    if _depth > max_depth:
-        return obj
-    if isinstance(obj, str):
-        return redact_text(obj, mode)
-    if isinstance(obj, dict):
-        return {k: sanitize_mapping(v, mode, max_depth=max_depth, _depth=_depth + 1) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [sanitize_mapping(v, mode, max_depth=max_depth, _depth=_depth + 1) for v in obj]
-    if isinstance(obj, tuple):
-        return tuple(sanitize_mapping(v, mode, max_depth=max_depth, _depth=_depth + 1) for v in obj)
-    return obj
+    return _sanitize(obj, get_engine(mode), max_depth, _depth)
 
 
 def iter_findings_files(
@@ -0,0 +1,365 @@
+"""
+Parallel, streaming repository scanner built on the advanced routine.
+
+Walks directories with os.scandir, skips oversized files by stat and binary
+files by a NUL-byte sniff of the first block, and streams large files through
+the detector in overlapping windows so a match that straddles a chunk
+boundary is still reported once, with offsets relative to the whole file.
+Files are scanned in a process pool and results stream back in submission
+order or as they complete.
+
+An optional ScanCache (JSON) keyed by (path, mtime, size, ruleset version)
+lets a re-scan skip files that have not changed since the last run.
+
+Usage:
+    from tools.security.repo_scanner import ScanCache, scan_paths
+
+    cache = ScanCache(".security_scan_cache.json")
+    for result in scan_paths(["."], cache=cache, ordered=False):
+        for finding in result.findings:
+            print(result.path, finding.category, finding.start)
+"""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tools.security.advanced_routine import (
+    _TRIGGERS,
+    Finding,
+    RoutineMode,
+    _compile_patterns,
+    _mask_preview,
+    get_engine,
+)
+
+DEFAULT_MAX_FILE_SIZE = 20 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_OVERLAP = 4096  # matches longer than this may be split across windows
+SNIFF_BYTES = 8192
+DEFAULT_EXCLUDE_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "__pycache__",
+        "node_modules",
+        ".venv",
+        "venv",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".tox",
+    }
+)
+
+
+def ruleset_version(mode: RoutineMode) -> str:
+    """Digest of the patterns, priorities and triggers a mode scans with."""
+    h = hashlib.sha256(str(mode).encode())
+    for category, priority, rx, _replacer in _compile_patterns(mode):
+        h.update(f"\0{category}\0{priority}\0{rx.pattern}\0{rx.flags}\0{_TRIGGERS.get(category)}".encode())
+    return h.hexdigest()[:16]
+
+
+@dataclass
+class FileScanResult:
+    """Outcome for one file: status is scanned, cached, binary, too_large or error."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    status: str
+    findings: list[Finding] = field(default_factory=list)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "size": self.size,
+            "status": self.status,
+            "count": len(self.findings),
+            "findings": [
+                {"category": f.category, "start": f.start, "end": f.end, "preview": f.mask_preview}
+                for f in self.findings
+            ],
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class ScanCache:
+    """JSON cache of per-file results keyed by (path, mtime, size, ruleset version)."""
+
+    FORMAT = 1
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("format") == self.FORMAT:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, path: str, mtime_ns: int, size: int, ruleset: str) -> FileScanResult | None:
+        entry = self.entries.get(path)
+        if not entry or entry["mtime_ns"] != mtime_ns or entry["size"] != size or entry["ruleset"] != ruleset:
+            return None
+        self.hits += 1
+        findings = [Finding(*f) for f in entry["findings"]]
+        return FileScanResult(path, size, mtime_ns, "cached", findings)
+
+    def put(self, result: FileScanResult, ruleset: str) -> None:
+        if result.status not in ("scanned", "binary"):
+            return
+        self.entries[result.path] = {
+            "mtime_ns": result.mtime_ns,
+            "size": result.size,
+            "ruleset": ruleset,
+            "status": result.status,
+            "findings": [[f.category, f.start, f.end, f.mask_preview] for f in result.findings],
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write atomically (temp file + rename) if anything changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"format": self.FORMAT, "entries": self.entries}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def walk_files(
+    roots: Iterable[str | os.PathLike[str]],
+    *,
+    exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+) -> Iterator[tuple[str, int, int]]:
+    """Yield (path, size, mtime_ns) for regular files under roots; symlinks are not followed."""
+    excluded = frozenset(exclude_dirs)
+    for root in roots:
+        root = os.fspath(root)
+        if os.path.isfile(root):
+            st = os.stat(root)
+            yield root, st.st_size, st.st_mtime_ns
+            continue
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in excluded:
+                            subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        yield entry.path, st.st_size, st.st_mtime_ns
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+
+
+def _iter_window_findings(
+    fh: Any,
+    mode: RoutineMode,
+    first_block: bytes,
+    chunk_size: int,
+    overlap: int,
+) -> Iterator[Finding]:
+    """
+    Stream a binary file handle through the detector in overlapping windows.
+
+    Each window carries `overlap` characters of context on both sides of the
+    region it owns, so word boundaries and overlap resolution near the edges
+    match a whole-file scan; only findings starting in the owned region are
+    emitted, and one overlapping a finding already emitted is dropped.
+    """
+    engine = get_engine(mode)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    buf_offset = 0  # file character offset of buf[0]
+    emitted_to = 0  # findings starting before this offset have been handled
+    last_end = 0
+    data = first_block
+    while True:
+        final = not data
+        buf += decoder.decode(data, final=final)
+        limit = buf_offset + len(buf) if final else buf_offset + len(buf) - overlap
+        if limit > emitted_to:
+            for start, end, category, _replacer, m in engine.select(buf):
+                start += buf_offset
+                end += buf_offset
+                if start < emitted_to or start >= limit or start < last_end:
+                    continue
+                last_end = end
+                yield Finding(category, start, end, _mask_preview(m.group(0), 3, 2))
+            emitted_to = limit
+            cut = max(0, emitted_to - overlap - buf_offset)
+            buf = buf[cut:]
+            buf_offset += cut
+        if final:
+            return
+        data = fh.read(chunk_size)
+
+
+def scan_file(
+    path: str,
+    mode: RoutineMode = RoutineMode.ADVANCED,
+    *,
+    size: int | None = None,
+    mtime_ns: int | None = None,
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> FileScanResult:
+    """Scan one file (sniffing for binary content first)."""
+    try:
+        if size is None or mtime_ns is None:
+            st = os.stat(path)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        if size > max_file_size:
+            return FileScanResult(path, size, mtime_ns, "too_large")
+        with open(path, "rb") as fh:
+            first_block = fh.read(chunk_size)
+            if b"\0" in first_block[:SNIFF_BYTES]:
+                return FileScanResult(path, size, mtime_ns, "binary")
+            findings = list(_iter_window_findings(fh, mode, first_block, chunk_size, overlap))
+        return FileScanResult(path, size, mtime_ns, "scanned", findings)
+    except OSError as e:
+        return FileScanResult(path, size or 0, mtime_ns or 0, "error", error=str(e))
+
+
+def _scan_batch(batch: list[tuple[str, int, int]], mode: str, options: dict[str, int]) -> list[FileScanResult]:
+    """Process-pool entry point: scan a batch of (path, size, mtime_ns)."""
+    routine_mode = RoutineMode(mode)
+    return [scan_file(p, routine_mode, size=s, mtime_ns=m, **options) for p, s, m in batch]
+
+
+def scan_paths(
+    paths: Iterable[str | os.PathLike[str]],
+    mode: RoutineMode = RoutineMode.ADVANCED,
+    *,
+    workers: int | None = None,
+    ordered: bool = True,
+    cache: ScanCache | None = None,
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+    batch_size: int = 32,
+) -> Iterator[FileScanResult]:
+    """
+    Scan files and directory trees, yielding one FileScanResult per file.
+
+    workers: process count (None = os.cpu_count(); 0 or 1 scans in-process).
+    ordered: yield in walk order; otherwise as batches complete.
+    cache: unchanged files are yielded from it with status "cached"; it is
+    updated and saved when the scan finishes.
+    """
+    ruleset = ruleset_version(mode)
+    options = {"max_file_size": max_file_size, "chunk_size": chunk_size, "overlap": overlap}
+
+    def units() -> Iterator[tuple[bool, list]]:
+        """(done, items): cached results are done; everything else is a batch to scan."""
+        batch: list[tuple[str, int, int]] = []
+        total = 0
+        for path, size, mtime_ns in walk_files(paths, exclude_dirs=exclude_dirs):
+            hit = cache.get(path, mtime_ns, size, ruleset) if cache is not None else None
+            if hit is not None:
+                if ordered and batch:
+                    yield False, batch
+                    batch, total = [], 0
+                yield True, [hit]
+                continue
+            batch.append((path, size, mtime_ns))
+            total += size
+            if len(batch) >= batch_size or total >= chunk_size * 4:
+                yield False, batch
+                batch, total = [], 0
+        if batch:
+            yield False, batch
+
+    def record(results: list[FileScanResult]) -> list[FileScanResult]:
+        if cache is not None:
+            for result in results:
+                cache.put(result, ruleset)
+        return results
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for done, items in units():
+            yield from items if done else record(_scan_batch(items, str(mode), options))
+    else:
+        source = units()
+        max_in_flight = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight: deque[Future[list[FileScanResult]] | list[FileScanResult]] = deque()
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and sum(isinstance(f, Future) for f in in_flight) < max_in_flight:
+                    unit = next(source, None)
+                    if unit is None:
+                        exhausted = True
+                    elif unit[0] and not ordered:
+                        yield from unit[1]
+                    else:
+                        done, items = unit
+                        in_flight.append(items if done else executor.submit(_scan_batch, items, str(mode), options))
+                if not in_flight:
+                    continue
+                if ordered:
+                    head = in_flight.popleft()
+                    yield from head if isinstance(head, list) else record(head.result())
+                else:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        in_flight.remove(future)
+                        yield from record(future.result())
+    if cache is not None:
+        cache.save()
+
+
+@dataclass
+class ScanSummary:
+    """Aggregate counters for a scan run."""
+
+    files: int = 0
+    findings: int = 0
+    bytes_scanned: int = 0
+    by_status: dict[str, int] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    def add(self, result: FileScanResult) -> None:
+        self.files += 1
+        self.findings += len(result.findings)
+        self.by_status[result.status] = self.by_status.get(result.status, 0) + 1
+        if result.status == "scanned":
+            self.bytes_scanned += result.size
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("started")
+        data["elapsed_s"] = round(time.perf_counter() - self.started, 3)
+        return data